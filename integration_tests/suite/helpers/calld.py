@@ -1,4 +1,4 @@
-# Copyright 2015-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2015-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import json
@@ -273,9 +273,20 @@ class LegacyCalldClient:
         result = requests.put(url, json=message, headers=self._headers(token=token))
         return result
 
-    def get_voicemail_recording_result(self, voicemail_id, message_id, token=None):
+    def get_voicemail_recording_result(
+        self, voicemail_id, message_id, token=None, headers=None
+    ):
         url = self.url('voicemails', voicemail_id, 'messages', message_id, 'recording')
-        result = requests.get(url, headers=self._headers(token=token))
+        headers = dict(self._headers(token=token), **(headers or {}))
+        result = requests.get(url, headers=headers)
+        return result
+
+    def get_voicemail_greeting_result(
+        self, voicemail_id, greeting, token=None, headers=None
+    ):
+        url = self.url('voicemails', voicemail_id, 'greetings', greeting)
+        headers = dict(self._headers(token=token), **(headers or {}))
+        result = requests.get(url, headers=headers)
         return result
 
     def get_user_me_voicemail_recording_result(self, message_id, token=None):
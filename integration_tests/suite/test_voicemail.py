@@ -28,6 +28,7 @@ from .helpers.constants import (
     VALID_TENANT,
     VALID_TENANT_MULTITENANT_1,
     VALID_TENANT_MULTITENANT_2,
+    VALID_TOKEN,
 )
 from .helpers.hamcrest_ import HamcrestARIChannel
 from .helpers.real_asterisk import RealAsteriskIntegrationTest
@@ -854,6 +855,34 @@ class TestVoicemails(RealAsteriskIntegrationTest):
         )
         assert content == b'some-wav-data\n'
 
+    def test_voicemail_get_message_recording_range(self):
+        response = self.calld.get_voicemail_recording_result(
+            self._voicemail_id,
+            self._message_id,
+            token=VALID_TOKEN,
+            headers={'Range': 'bytes=5-7'},
+        )
+
+        assert_that(response.status_code, equal_to(206))
+        assert_that(response.content, equal_to(b'wav'))
+        assert_that(response.headers['Content-Range'], equal_to('bytes 5-7/14'))
+
+    def test_voicemail_get_message_recording_not_modified(self):
+        response = self.calld.get_voicemail_recording_result(
+            self._voicemail_id, self._message_id, token=VALID_TOKEN
+        )
+        assert_that(response.status_code, equal_to(200))
+
+        response = self.calld.get_voicemail_recording_result(
+            self._voicemail_id,
+            self._message_id,
+            token=VALID_TOKEN,
+            headers={'If-None-Match': response.headers['ETag']},
+        )
+
+        assert_that(response.status_code, equal_to(304))
+        assert_that(response.content, equal_to(b''))
+
     def test_voicemail_get_message_recording_does_not_mark_message_as_old(self):
         content = self.calld_client.voicemails.get_voicemail_recording(
             self._voicemail_id, self._message_id
@@ -945,6 +974,31 @@ class TestVoicemails(RealAsteriskIntegrationTest):
         # see test_voicemail_greeting_workflow
         pass
 
+    def test_voicemail_get_greeting_not_modified(self):
+        self.calld_client.voicemails.create_voicemail_greeting(
+            self._voicemail_id, 'busy', WAVE_DATA_1
+        )
+        self.addCleanup(
+            self.calld_client.voicemails.delete_voicemail_greeting,
+            self._voicemail_id,
+            'busy',
+        )
+        response = self.calld.get_voicemail_greeting_result(
+            self._voicemail_id, 'busy', token=VALID_TOKEN
+        )
+        assert_that(response.status_code, equal_to(200))
+        assert_that(response.content, equal_to(WAVE_DATA_1))
+
+        response = self.calld.get_voicemail_greeting_result(
+            self._voicemail_id,
+            'busy',
+            token=VALID_TOKEN,
+            headers={'If-None-Match': response.headers['ETag']},
+        )
+
+        assert_that(response.status_code, equal_to(304))
+        assert_that(response.content, equal_to(b''))
+
     def test_voicemail_get_greeting_from_user_invalid_greeting(self):
         assert_that(
             calling(
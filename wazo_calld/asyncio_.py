@@ -1,26 +1,105 @@
-# Copyright 2021-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2021-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from xivo.status import Status
 
 logger = logging.getLogger(__name__)
 
+TIMER_WORKERS = 4
+
+
+class Timer:
+    '''
+    Handle on a callback scheduled with CoreAsyncio.call_later.
+
+    May be cancelled from any thread; cancelling a timer that already fired or
+    was already cancelled does nothing.
+    '''
+
+    def __init__(self, core, callback, args):
+        self._core = core
+        self._callback = callback
+        self._args = args
+        self._handle = None
+        self._done = False
+
+    @property
+    def armed(self):
+        return not self._done
+
+    def cancel(self):
+        if not self._core._disarm(self):
+            return
+        self._core._loop.call_soon_threadsafe(self._cancel_handle)
+
+    def _arm(self, delay):
+        # This function will run within the asyncio thread
+        if self._done:
+            return
+        self._handle = self._core._loop.call_later(delay, self._fire)
+
+    def _cancel_handle(self):
+        if self._handle:
+            self._handle.cancel()
+
+    def _fire(self):
+        if not self._core._disarm(self):
+            return
+        # callbacks usually make blocking HTTP requests, keep them off the loop
+        self._core._executor.submit(self._run)
+
+    def _run(self):
+        try:
+            self._callback(*self._args)
+        except Exception:
+            logger.exception('Unexpected error in timer callback %s', self._callback)
+
 
 class CoreAsyncio:
-    def __init__(self):
+    def __init__(self, timer_workers=TIMER_WORKERS):
         self._loop = asyncio.new_event_loop()
+        self._executor = ThreadPoolExecutor(
+            max_workers=timer_workers, thread_name_prefix='asyncio_timer'
+        )
+        self._timers: set[Timer] = set()
+        self._timers_lock = threading.Lock()
+
+    @property
+    def armed_timers(self):
+        return len(self._timers)
 
     def run(self):
         asyncio.set_event_loop(self._loop)
         self._loop.run_forever()
 
     def call_later(self, delay, callback, *args):
-        # This function will run within the asyncio thread
-        def delay_wrapper():
-            self._loop.call_later(delay, callback, *args)
+        timer = Timer(self, callback, args)
+        with self._timers_lock:
+            self._timers.add(timer)
+        self._loop.call_soon_threadsafe(timer._arm, delay)
+        return timer
 
-        self._loop.call_soon_threadsafe(delay_wrapper)
+    def provide_status(self, status):
+        status['timers']['status'] = Status.ok
+        status['timers']['armed'] = self.armed_timers
 
     def stop(self):
+        with self._timers_lock:
+            for timer in self._timers:
+                timer._done = True
+            self._timers.clear()
         self._loop.call_soon_threadsafe(self._loop.stop)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _disarm(self, timer):
+        with self._timers_lock:
+            if timer._done:
+                return False
+            timer._done = True
+            self._timers.discard(timer)
+            return True
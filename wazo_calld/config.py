@@ -119,7 +119,16 @@ _DEFAULT_CONFIG: CalldConfigDict = {
         'transfers': True,
         'voicemails': True,
     },
+    'dial_mobile': {
+        'contact_dialer_workers': 4,
+        'confd_cache_ttl': 3600,
+    },
     'max_meeting_participants': 25,
+    'voicemails': {
+        'index_file': '/var/lib/wazo-calld/voicemails.sqlite3',
+        'confd_cache_ttl': 3600,
+        'transcription_cache_ttl': 3600,
+    },
 }
 
 
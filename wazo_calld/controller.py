@@ -1,4 +1,4 @@
-# Copyright 2015-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2015-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
@@ -80,6 +80,7 @@ class Controller:
         self.status_aggregator.add_provider(self.ari.provide_status)
         self.status_aggregator.add_provider(self.bus_consumer.provide_status)
         self.status_aggregator.add_provider(self.token_status.provide_status)
+        self.status_aggregator.add_provider(self.asyncio.provide_status)
         self.ari.init_client()
         asyncio_thread = Thread(target=self.asyncio.run, name='asyncio_thread')
         asyncio_thread.start()
@@ -0,0 +1,207 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def _copy_error(error: Exception) -> Exception:
+    # raising the same instance again would add frames to its traceback on each
+    # hit, from every thread sharing it
+    # built without calling __init__, whose signature may not match error.args
+    fresh = type(error).__new__(type(error), *error.args)
+    fresh.args = error.args
+    fresh.__dict__.update(error.__dict__)
+    return fresh
+
+
+class _Entry:
+    __slots__ = ('value', 'error', 'expires_at', 'group')
+
+    def __init__(self, value, error, expires_at, group):
+        self.value = value
+        self.error = error
+        self.expires_at = expires_at
+        self.group = group
+
+
+class _Flight:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLLRUCache:
+    '''
+    Thread-safe cache bounded in size (least recently used entries are evicted)
+    and in time (entries expire after `ttl` seconds).
+
+    Concurrent misses on the same key are collapsed into a single call to the
+    loader. Errors for which `is_negative(error)` is true are cached for
+    `negative_ttl` seconds and raised again on hits.
+
+    Entries may belong to a group, so that all entries of a group can be
+    invalidated at once.
+    '''
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float | None,
+        negative_ttl: float | None = None,
+        is_negative: Callable[[Exception], bool] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._is_negative = is_negative or (lambda error: False)
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._keys_by_group: dict[Hashable, set[Hashable]] = {}
+        self._flights: dict[Hashable, _Flight] = {}
+        self._invalidations = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key) is not None
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None or entry.error is not None:
+                return default
+            return entry.value
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], group=None):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                if entry.error is not None:
+                    raise _copy_error(entry.error)
+                return entry.value
+
+            self.misses += 1
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                is_leader = True
+                invalidations = self._invalidations
+            else:
+                is_leader = False
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise _copy_error(flight.error)
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            if self._is_negative(e) and self._negative_ttl:
+                self._store(key, None, e, self._negative_ttl, group, invalidations)
+            raise
+        else:
+            self._store(key, flight.value, None, self._ttl, group, invalidations)
+            return flight.value
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def put(self, key, value, group=None):
+        with self._lock:
+            self._insert(key, _Entry(value, None, self._expires_at(self._ttl), group))
+
+    def invalidate(self, key):
+        with self._lock:
+            self._invalidations += 1
+            self._remove(key)
+
+    def invalidate_group(self, group):
+        with self._lock:
+            self._invalidations += 1
+            for key in list(self._keys_by_group.get(group, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._invalidations += 1
+            self._entries.clear()
+            self._keys_by_group.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self._max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def _store(self, key, value, error, ttl, group, invalidations):
+        with self._lock:
+            if invalidations != self._invalidations:
+                # invalidated while loading, the loaded value may be outdated
+                return
+            self._insert(key, _Entry(value, error, self._expires_at(ttl), group))
+
+    def _expires_at(self, ttl):
+        return None if ttl is None else self._clock() + ttl
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= self._clock():
+            self.expirations += 1
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _insert(self, key, entry):
+        self._remove(key)
+        self._entries[key] = entry
+        if entry.group is not None:
+            self._keys_by_group.setdefault(entry.group, set()).add(key)
+        while len(self._entries) > self._max_size:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None or entry.group is None:
+            return
+        keys = self._keys_by_group.get(entry.group)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_group[entry.group]
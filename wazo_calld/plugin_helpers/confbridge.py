@@ -0,0 +1,302 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from threading import Lock
+from time import monotonic
+
+from requests import RequestException
+from wazo_amid_client.exceptions import AmidProtocolError
+
+from wazo_calld.bus import CoreBusConsumer as BusConsumer
+
+from .ari_ import Channel
+from .exceptions import WazoAmidError
+
+logger = logging.getLogger(__name__)
+
+# Participants are listed again from Asterisk after this many seconds, in case
+# an event has been lost
+RECONCILE_INTERVAL = 300
+
+NOT_RUNNING_MESSAGES = (
+    'No active conferences.',  # No conferences are taking place at this time.
+    'No Conference by that name found.',  # This conference is not running at this time.
+)
+
+
+@dataclass(frozen=True)
+class ConfbridgeParticipant:
+    id: str
+    caller_id_name: str
+    caller_id_number: str
+    muted: bool
+    admin: bool
+    language: str
+    talking: bool
+    user_uuid: str | None
+    # seconds since the participant joined, or since its channel answered when
+    # it was in the confbridge when first listed: Asterisk only lists the latter
+    join_time: int
+
+
+class _ParticipantEntry:
+    __slots__ = ('participant', 'received_at')
+
+    def __init__(self, participant: ConfbridgeParticipant, received_at: float):
+        self.participant = participant
+        self.received_at = received_at
+
+    def current(self, now: float) -> ConfbridgeParticipant:
+        elapsed = int(now - self.received_at)
+        if not elapsed:
+            return self.participant
+        return replace(self.participant, join_time=self.participant.join_time + elapsed)
+
+
+class _Roster:
+    __slots__ = ('entries', 'expires_at', 'loads')
+
+    def __init__(self, expires_at: float | None = None) -> None:
+        self.entries: dict[str, _ParticipantEntry] = {}
+        self.expires_at = expires_at
+        # participant ids changed by events during each pending load
+        self.loads: list[set[str]] = []
+
+    def is_fresh(self, now: float) -> bool:
+        return self.expires_at is not None and now < self.expires_at
+
+
+class ConfbridgeRosters:
+    '''
+    Participants of each confbridge accepted by `accepts(confbridge_name)`,
+    kept up to date by the Asterisk ConfBridge events.
+
+    A running confbridge is listed once with the AMI ConfBridgeList action
+    when it is first needed, then again every RECONCILE_INTERVAL seconds.
+    Confbridges started afterwards are known to be empty until their first
+    participant joins. Events received while listing are applied over the
+    result.
+    '''
+
+    def __init__(
+        self,
+        amid,
+        ari,
+        accepts: Callable[[str], bool],
+        reconcile_interval: float = RECONCILE_INTERVAL,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self._amid = amid
+        self._ari = ari
+        self._accepts = accepts
+        self._reconcile_interval = reconcile_interval
+        self._clock = clock
+        self._lock = Lock()
+        self._rosters: dict[str, _Roster] = {}
+
+    def subscribe(self, bus: BusConsumer) -> None:
+        bus.subscribe('ConfbridgeStart', self._on_confbridge_started)
+        bus.subscribe('ConfbridgeEnd', self._on_confbridge_ended)
+        bus.subscribe('ConfbridgeJoin', self._on_participant_joined)
+        bus.subscribe('ConfbridgeLeave', self._on_participant_left)
+        bus.subscribe('ConfbridgeMute', self._on_participant_muted)
+        bus.subscribe('ConfbridgeUnmute', self._on_participant_unmuted)
+        bus.subscribe('ConfbridgeTalking', self._on_participant_talking)
+        bus.subscribe('FullyBooted', self._on_asterisk_booted)
+
+    def list_participants(self, confbridge_name: str) -> list[ConfbridgeParticipant]:
+        '''Raises AmidProtocolError when a running confbridge cannot be listed'''
+        entries = self._entries(confbridge_name)
+        now = self._clock()
+        return [entry.current(now) for entry in entries.values()]
+
+    def count_participants(self, confbridge_name: str) -> int:
+        return len(self._entries(confbridge_name))
+
+    def forget(self, confbridge_name: str) -> None:
+        with self._lock:
+            self._rosters.pop(confbridge_name, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rosters.clear()
+
+    def _entries(self, confbridge_name: str) -> dict[str, _ParticipantEntry]:
+        with self._lock:
+            roster = self._rosters.get(confbridge_name)
+            if roster and roster.is_fresh(self._clock()):
+                return dict(roster.entries)
+        return self._load(confbridge_name)
+
+    def _load(self, confbridge_name: str) -> dict[str, _ParticipantEntry]:
+        with self._lock:
+            roster = self._rosters.setdefault(confbridge_name, _Roster())
+            changed: set[str] = set()
+            roster.loads.append(changed)
+
+        try:
+            results: list[dict] = self._amid.action(
+                'ConfBridgeList', {'Conference': confbridge_name}
+            )
+        except AmidProtocolError as e:
+            if e.message not in NOT_RUNNING_MESSAGES:
+                with self._lock:
+                    roster.loads.remove(changed)
+                raise
+            results = []
+        except RequestException as e:
+            with self._lock:
+                roster.loads.remove(changed)
+            raise WazoAmidError(self._amid, e)
+
+        now = self._clock()
+        loaded = {}
+        for result in results:
+            if result.get('Event') != 'ConfbridgeList':
+                continue
+            participant = self._participant_from_list_item(result)
+            loaded[participant.id] = _ParticipantEntry(participant, now)
+
+        with self._lock:
+            roster.loads.remove(changed)
+            if self._rosters.get(confbridge_name) is not roster:
+                # the confbridge has been started or ended while loading
+                return loaded
+
+            for participant_id in changed:
+                loaded.pop(participant_id, None)
+                if entry := roster.entries.get(participant_id):
+                    loaded[participant_id] = entry
+            for participant_id, listed in loaded.items():
+                entry = roster.entries.get(participant_id)
+                if entry is None or participant_id in changed:
+                    continue
+                # keep counting the join time the same way for known participants
+                entry.participant = replace(
+                    listed.participant, join_time=entry.participant.join_time
+                )
+                loaded[participant_id] = entry
+            if not loaded and not roster.loads:
+                # not running, there is nothing to keep up to date
+                del self._rosters[confbridge_name]
+                return loaded
+
+            roster.entries = loaded
+            roster.expires_at = now + self._reconcile_interval
+            logger.debug(
+                'confbridge %s: %d participants listed', confbridge_name, len(loaded)
+            )
+            return dict(loaded)
+
+    def _user_uuid(self, event: dict) -> str | None:
+        # Same variables as Channel.user(), from the event when Asterisk sends them
+        if event.get('Channel', '').startswith('Local/'):
+            variable = 'WAZO_DEREFERENCED_USERUUID'
+        else:
+            variable = 'WAZO_USERUUID'
+        variables = event.get('ChanVariable')
+        if isinstance(variables, dict) and variable in variables:
+            return variables[variable] or None
+        return Channel(event['Uniqueid'], self._ari).user()
+
+    def _participant_from_list_item(self, item: dict) -> ConfbridgeParticipant:
+        return ConfbridgeParticipant(
+            id=item['Uniqueid'],
+            caller_id_name=item['CallerIDName'],
+            caller_id_number=item['CallerIDNum'],
+            muted=item['Muted'] == 'Yes',
+            admin=item['Admin'] == 'Yes',
+            language=item['Language'],
+            talking=item.get('Talking') == 'Yes',
+            user_uuid=self._user_uuid(item),
+            join_time=int(item.get('AnsweredTime') or 0),
+        )
+
+    def _roster(self, event: dict) -> _Roster | None:
+        # This function must be called with self._lock held
+        confbridge_name = event['Conference']
+        if not self._accepts(confbridge_name):
+            return None
+        # not listed yet, the participants will be part of the listing
+        return self._rosters.get(confbridge_name)
+
+    def _update(self, event: dict, **changes) -> None:
+        participant_id = event['Uniqueid']
+        with self._lock:
+            roster = self._roster(event)
+            if roster is None:
+                return
+            entry = roster.entries.get(participant_id)
+            if entry is None:
+                return
+            entry.participant = replace(entry.participant, **changes)
+            for changed in roster.loads:
+                changed.add(participant_id)
+
+    def _on_confbridge_started(self, event: dict) -> None:
+        confbridge_name = event['Conference']
+        if not self._accepts(confbridge_name):
+            return
+        with self._lock:
+            self._rosters[confbridge_name] = _Roster(
+                expires_at=self._clock() + self._reconcile_interval
+            )
+
+    def _on_confbridge_ended(self, event: dict) -> None:
+        if self._accepts(event['Conference']):
+            self.forget(event['Conference'])
+
+    def _on_participant_joined(self, event: dict) -> None:
+        # looking up the user may query ARI, only do it for a listed confbridge
+        with self._lock:
+            if self._roster(event) is None:
+                return
+
+        participant = ConfbridgeParticipant(
+            id=event['Uniqueid'],
+            caller_id_name=event['CallerIDName'],
+            caller_id_number=event['CallerIDNum'],
+            muted=event['Muted'] == 'Yes',
+            admin=event['Admin'] == 'Yes',
+            language=event['Language'],
+            talking=False,
+            user_uuid=self._user_uuid(event),
+            join_time=0,
+        )
+        with self._lock:
+            roster = self._roster(event)
+            if roster is None:
+                return
+            roster.entries[participant.id] = _ParticipantEntry(
+                participant, self._clock()
+            )
+            for changed in roster.loads:
+                changed.add(participant.id)
+
+    def _on_participant_left(self, event: dict) -> None:
+        participant_id = event['Uniqueid']
+        with self._lock:
+            roster = self._roster(event)
+            if roster is None:
+                return
+            roster.entries.pop(participant_id, None)
+            for changed in roster.loads:
+                changed.add(participant_id)
+
+    def _on_participant_muted(self, event: dict) -> None:
+        self._update(event, muted=True)
+
+    def _on_participant_unmuted(self, event: dict) -> None:
+        self._update(event, muted=False)
+
+    def _on_participant_talking(self, event: dict) -> None:
+        self._update(event, talking=event['TalkingStatus'] == 'on')
+
+    def _on_asterisk_booted(self, event: dict) -> None:
+        logger.debug('asterisk has been restarted, forgetting confbridge participants')
+        self.clear()
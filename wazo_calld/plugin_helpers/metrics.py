@@ -0,0 +1,56 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import bisect
+import threading
+from collections.abc import Sequence
+
+DEFAULT_DURATION_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    '''
+    Cumulative histogram of observed values, in the same layout as a
+    Prometheus histogram: each bucket counts the observations lower or equal
+    to its upper bound.
+    '''
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_DURATION_BUCKETS):
+        self._upper_bounds = sorted(buckets)
+        self._counts = [0] * (len(self._upper_bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._upper_bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            sum_ = self._sum
+
+        buckets = {}
+        cumulative = 0
+        for upper_bound, count in zip(self._upper_bounds, counts):
+            cumulative += count
+            buckets[str(upper_bound)] = cumulative
+        buckets['+Inf'] = cumulative + counts[-1]
+        return {'buckets': buckets, 'count': buckets['+Inf'], 'sum': sum_}
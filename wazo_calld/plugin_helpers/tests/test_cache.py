@@ -0,0 +1,181 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import threading
+from unittest import TestCase
+from unittest.mock import Mock
+
+from hamcrest import (
+    assert_that,
+    calling,
+    equal_to,
+    has_entries,
+    not_,
+    raises,
+    same_instance,
+)
+
+from ..cache import TTLLRUCache
+
+
+class NotFound(Exception):
+    pass
+
+
+class NoSuchThing(NotFound):
+    def __init__(self, thing_id):
+        super().__init__(f'No such thing: {thing_id}')
+        self.thing_id = thing_id
+
+
+def traceback_depth(error):
+    depth, tb = 0, error.__traceback__
+    while tb:
+        depth, tb = depth + 1, tb.tb_next
+    return depth
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLLRUCache(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.cache = TTLLRUCache(
+            max_size=2,
+            ttl=10,
+            negative_ttl=1,
+            is_negative=lambda e: isinstance(e, NotFound),
+            clock=self.clock,
+        )
+
+    def test_get_or_load_hit(self):
+        loader = Mock(return_value='value')
+
+        self.cache.get_or_load('key', loader)
+        result = self.cache.get_or_load('key', loader)
+
+        assert_that(result, equal_to('value'))
+        loader.assert_called_once_with()
+        assert_that(self.cache.stats(), has_entries(hits=1, misses=1))
+
+    def test_expiration(self):
+        self.cache.get_or_load('key', lambda: 'old')
+        self.clock.now = 10
+
+        result = self.cache.get_or_load('key', lambda: 'new')
+
+        assert_that(result, equal_to('new'))
+        assert_that(self.cache.stats(), has_entries(expirations=1))
+
+    def test_lru_eviction(self):
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.get('a')
+
+        self.cache.put('c', 3)
+
+        assert_that('a' in self.cache, equal_to(True))
+        assert_that('b' in self.cache, equal_to(False))
+        assert_that(self.cache.stats(), has_entries(size=2, evictions=1))
+
+    def test_negative_caching(self):
+        loader = Mock(side_effect=NotFound())
+
+        assert_that(
+            calling(self.cache.get_or_load).with_args('key', loader), raises(NotFound)
+        )
+        assert_that(
+            calling(self.cache.get_or_load).with_args('key', loader), raises(NotFound)
+        )
+        loader.assert_called_once_with()
+
+        self.clock.now = 1
+        assert_that(
+            calling(self.cache.get_or_load).with_args('key', loader), raises(NotFound)
+        )
+        assert_that(loader.call_count, equal_to(2))
+
+    def test_negative_hits_raise_a_fresh_error(self):
+        error = NotFound('key')
+        with self.assertRaises(NotFound):
+            self.cache.get_or_load('key', Mock(side_effect=error))
+
+        raised = []
+        for _ in range(2):
+            with self.assertRaises(NotFound) as context:
+                self.cache.get_or_load('key', Mock())
+            raised.append(context.exception)
+
+        assert_that(raised[0], not_(same_instance(error)))
+        assert_that(raised[1], not_(same_instance(raised[0])))
+        assert_that(raised[1].args, equal_to(('key',)))
+        assert_that(traceback_depth(raised[1]), equal_to(traceback_depth(raised[0])))
+
+    def test_negative_hits_copy_errors_with_custom_init(self):
+        with self.assertRaises(NoSuchThing):
+            self.cache.get_or_load('key', Mock(side_effect=NoSuchThing(42)))
+
+        with self.assertRaises(NoSuchThing) as context:
+            self.cache.get_or_load('key', Mock())
+
+        assert_that(context.exception.thing_id, equal_to(42))
+        assert_that(str(context.exception), equal_to('No such thing: 42'))
+
+    def test_other_errors_are_not_cached(self):
+        loader = Mock(side_effect=[Exception(), 'value'])
+
+        assert_that(
+            calling(self.cache.get_or_load).with_args('key', loader), raises(Exception)
+        )
+        assert_that(self.cache.get_or_load('key', loader), equal_to('value'))
+
+    def test_invalidate_group(self):
+        self.cache.put(('uuid', 1), 'a', group='uuid')
+        self.cache.put(('uuid', 2), 'b', group='uuid')
+
+        self.cache.invalidate_group('uuid')
+
+        assert_that(len(self.cache), equal_to(0))
+
+    def test_single_flight(self):
+        started, release = threading.Event(), threading.Event()
+        loader = Mock()
+
+        def slow_loader():
+            loader()
+            started.set()
+            release.wait(timeout=5)
+            return 'value'
+
+        results = []
+
+        def load():
+            results.append(self.cache.get_or_load('key', slow_loader))
+
+        leader = threading.Thread(target=load)
+        leader.start()
+        started.wait(timeout=5)
+        followers = [threading.Thread(target=load) for _ in range(3)]
+        for follower in followers:
+            follower.start()
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(timeout=5)
+
+        loader.assert_called_once_with()
+        assert_that(results, equal_to(['value'] * 4))
+
+    def test_invalidation_during_load_is_not_overwritten(self):
+        def loader():
+            self.cache.invalidate('key')
+            return 'outdated'
+
+        self.cache.get_or_load('key', loader)
+
+        assert_that('key' in self.cache, equal_to(False))
@@ -0,0 +1,265 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from unittest import TestCase
+from unittest.mock import MagicMock, Mock
+
+from hamcrest import (
+    assert_that,
+    calling,
+    contains_exactly,
+    empty,
+    equal_to,
+    has_properties,
+    raises,
+)
+from requests import RequestException
+from wazo_amid_client.exceptions import AmidProtocolError
+
+from ..confbridge import ConfbridgeRosters
+from ..exceptions import WazoAmidError
+
+RECONCILE_INTERVAL = 300
+CONFBRIDGE = 'wazo-conference-1'
+
+
+def amid_error(message):
+    error = AmidProtocolError(MagicMock())
+    error.message = message
+    return error
+
+
+def confbridge_event(event, participant_id, conference=CONFBRIDGE, **kw):
+    event = {
+        'Event': event,
+        'Conference': conference,
+        'Channel': f'PJSIP/{participant_id}-00000001',
+        'Uniqueid': participant_id,
+        'CallerIDName': 'Alice',
+        'CallerIDNum': '1001',
+        'Admin': 'No',
+        'Muted': 'No',
+        'Language': 'en_US',
+        'ChanVariable': {'WAZO_USERUUID': f'user-{participant_id}'},
+    }
+    event.update(kw)
+    return event
+
+
+def confbridge_list_response(*participant_ids, answered_time='10'):
+    items = [
+        confbridge_event(
+            'ConfbridgeList',
+            participant_id,
+            Talking='No',
+            AnsweredTime=answered_time,
+        )
+        for participant_id in participant_ids
+    ]
+    return [
+        {'Response': 'Success'},
+        *items,
+        {'Event': 'ConfbridgeListComplete', 'ListItems': str(len(items))},
+    ]
+
+
+class TestConfbridgeRosters(TestCase):
+    def setUp(self):
+        self.bus = Mock()
+        self.amid = Mock()
+        self.ari = Mock()
+        self.amid.action.return_value = confbridge_list_response()
+        self.clock = Mock(return_value=1000.0)
+        self.rosters = ConfbridgeRosters(
+            self.amid,
+            self.ari,
+            accepts=lambda name: name.startswith('wazo-conference-'),
+            reconcile_interval=RECONCILE_INTERVAL,
+            clock=self.clock,
+        )
+        self.rosters.subscribe(self.bus)
+        self.handlers = {
+            call.args[0]: call.args[1] for call in self.bus.subscribe.call_args_list
+        }
+
+    def send(self, event, participant_id=None, **kw):
+        self.handlers[event](confbridge_event(event, participant_id, **kw))
+
+    def test_confbridge_is_listed_once(self):
+        self.amid.action.return_value = confbridge_list_response('p1', 'p2')
+
+        self.rosters.list_participants(CONFBRIDGE)
+        result = self.rosters.list_participants(CONFBRIDGE)
+
+        assert_that(
+            result,
+            contains_exactly(
+                has_properties(id='p1', user_uuid='user-p1', join_time=10),
+                has_properties(id='p2', user_uuid='user-p2', join_time=10),
+            ),
+        )
+        self.amid.action.assert_called_once_with(
+            'ConfBridgeList', {'Conference': CONFBRIDGE}
+        )
+        self.ari.channels.getChannelVar.assert_not_called()
+
+    def test_events_update_a_listed_confbridge(self):
+        self.amid.action.return_value = confbridge_list_response('p1', 'p2')
+        self.rosters.list_participants(CONFBRIDGE)
+
+        self.send('ConfbridgeJoin', 'p3')
+        self.send('ConfbridgeLeave', 'p1')
+        self.send('ConfbridgeMute', 'p2')
+        self.send('ConfbridgeTalking', 'p3', TalkingStatus='on')
+        self.clock.return_value = 1005.0
+
+        assert_that(
+            self.rosters.list_participants(CONFBRIDGE),
+            contains_exactly(
+                has_properties(id='p2', muted=True, talking=False, join_time=15),
+                has_properties(id='p3', muted=False, talking=True, join_time=5),
+            ),
+        )
+        assert_that(self.amid.action.call_count, equal_to(1))
+
+    def test_started_confbridge_is_not_listed(self):
+        self.send('ConfbridgeStart')
+        self.send('ConfbridgeJoin', 'p1')
+        self.send('ConfbridgeJoin', 'p2')
+
+        assert_that(self.rosters.count_participants(CONFBRIDGE), equal_to(2))
+        self.amid.action.assert_not_called()
+
+    def test_ended_confbridge_is_forgotten(self):
+        self.send('ConfbridgeStart')
+        self.send('ConfbridgeJoin', 'p1')
+        self.send('ConfbridgeEnd')
+
+        assert_that(self.rosters.list_participants(CONFBRIDGE), empty())
+        self.amid.action.assert_called_once()
+
+    def test_events_of_other_confbridges_are_ignored(self):
+        other = 'wazo-meeting-uuid-confbridge'
+        self.send('ConfbridgeStart', conference=other)
+        self.send('ConfbridgeJoin', 'p1', conference=other)
+
+        assert_that(self.rosters.count_participants(other), equal_to(0))
+        self.amid.action.assert_called_once()
+
+    def test_not_running_confbridge(self):
+        self.amid.action.side_effect = amid_error('No Conference by that name found.')
+
+        for _ in range(2):
+            assert_that(self.rosters.list_participants(CONFBRIDGE), empty())
+
+        assert_that(self.amid.action.call_count, equal_to(2))
+
+    def test_list_errors(self):
+        self.amid.action.side_effect = amid_error('Internal error')
+        assert_that(
+            calling(self.rosters.list_participants).with_args(CONFBRIDGE),
+            raises(AmidProtocolError),
+        )
+
+        self.amid.action.side_effect = RequestException()
+        assert_that(
+            calling(self.rosters.list_participants).with_args(CONFBRIDGE),
+            raises(WazoAmidError),
+        )
+
+    def test_user_uuid_without_channel_variables(self):
+        response = confbridge_list_response('p1')
+        del response[1]['ChanVariable']
+        self.amid.action.return_value = response
+        self.ari.channels.get.return_value.json = {'name': 'PJSIP/abc-0001'}
+        self.ari.channels.getChannelVar.return_value = {'value': 'user-uuid'}
+
+        result = self.rosters.list_participants(CONFBRIDGE)
+
+        assert_that(result, contains_exactly(has_properties(user_uuid='user-uuid')))
+
+    def test_user_uuid_of_local_channels(self):
+        variables = {'WAZO_USERUUID': 'caller-uuid', 'WAZO_DEREFERENCED_USERUUID': 'u'}
+        local = {'Channel': 'Local/1001@default-00000001;2', 'ChanVariable': variables}
+        response = confbridge_list_response('p1')
+        response[1].update(local)
+        self.amid.action.return_value = response
+        self.rosters.list_participants(CONFBRIDGE)
+
+        self.send('ConfbridgeJoin', 'p2', **local)
+
+        assert_that(
+            self.rosters.list_participants(CONFBRIDGE),
+            contains_exactly(
+                has_properties(id='p1', user_uuid='u'),
+                has_properties(id='p2', user_uuid='u'),
+            ),
+        )
+        self.ari.channels.getChannelVar.assert_not_called()
+
+    def test_user_uuid_without_the_channel_variable_in_the_join_event(self):
+        self.send('ConfbridgeStart')
+        self.ari.channels.get.return_value.json = {'name': 'PJSIP/abc-0001'}
+        self.ari.channels.getChannelVar.return_value = {'value': 'user-uuid'}
+
+        self.send('ConfbridgeJoin', 'p1', ChanVariable={})
+
+        assert_that(
+            self.rosters.list_participants(CONFBRIDGE),
+            contains_exactly(has_properties(user_uuid='user-uuid')),
+        )
+
+    def test_events_received_while_listing_are_applied(self):
+        def list_confbridge(*_):
+            self.send('ConfbridgeLeave', 'p1')
+            self.send('ConfbridgeJoin', 'p3')
+            return confbridge_list_response('p1', 'p2')
+
+        self.amid.action.side_effect = list_confbridge
+
+        result = self.rosters.list_participants(CONFBRIDGE)
+
+        assert_that(
+            result,
+            contains_exactly(has_properties(id='p2'), has_properties(id='p3')),
+        )
+
+    def test_confbridge_is_listed_again_after_reconcile_interval(self):
+        self.amid.action.return_value = confbridge_list_response('p1')
+        self.rosters.list_participants(CONFBRIDGE)
+
+        self.clock.return_value = 1000.0 + RECONCILE_INTERVAL
+        self.amid.action.return_value = confbridge_list_response('p2')
+
+        assert_that(
+            self.rosters.list_participants(CONFBRIDGE),
+            contains_exactly(has_properties(id='p2')),
+        )
+
+    def test_reconcile_keeps_the_join_time_of_known_participants(self):
+        self.amid.action.return_value = confbridge_list_response('p1')
+        self.rosters.list_participants(CONFBRIDGE)
+        self.send('ConfbridgeJoin', 'p2')
+
+        self.clock.return_value = 1000.0 + RECONCILE_INTERVAL
+        response = confbridge_list_response('p1', 'p2', 'p3', answered_time='500')
+        response[1]['Muted'] = 'Yes'
+        self.amid.action.return_value = response
+
+        assert_that(
+            self.rosters.list_participants(CONFBRIDGE),
+            contains_exactly(
+                has_properties(id='p1', muted=True, join_time=10 + RECONCILE_INTERVAL),
+                has_properties(id='p2', join_time=RECONCILE_INTERVAL),
+                has_properties(id='p3', join_time=500),
+            ),
+        )
+
+    def test_asterisk_restart_forgets_all_confbridges(self):
+        self.send('ConfbridgeStart')
+        self.send('ConfbridgeJoin', 'p1')
+
+        self.handlers['FullyBooted']({})
+
+        assert_that(self.rosters.list_participants(CONFBRIDGE), empty())
+        self.amid.action.assert_called_once()
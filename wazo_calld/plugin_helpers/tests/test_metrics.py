@@ -0,0 +1,27 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from unittest import TestCase
+
+from hamcrest import assert_that, equal_to
+
+from ..metrics import Histogram
+
+
+class TestHistogram(TestCase):
+    def test_to_dict(self):
+        histogram = Histogram(buckets=[0.1, 1])
+
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value)
+
+        assert_that(
+            histogram.to_dict(),
+            equal_to(
+                {
+                    'buckets': {'0.1': 2, '1': 3, '+Inf': 4},
+                    'count': 4,
+                    'sum': 2.65,
+                }
+            ),
+        )
@@ -1,4 +1,4 @@
-# Copyright 2019-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
@@ -55,7 +55,7 @@ class ConferencesBusEventHandler:
 
         participant = participant_schema.load(raw_participant)
 
-        participants_already_present = self._service.list_participants(
+        participants_already_present = self._service.participants_present(
             conference.tenant_uuid, conference_id
         )
 
@@ -95,7 +95,7 @@ class ConferencesBusEventHandler:
 
         participant = participant_schema.load(raw_participant)
 
-        participants_already_present = self._service.list_participants(
+        participants_already_present = self._service.participants_present(
             conference.tenant_uuid, conference_id
         )
 
@@ -210,7 +210,7 @@ class ConferencesBusEventHandler:
 
         conference = Conference.from_id(conference_id, self._confd)
 
-        participants = self._service.list_participants(
+        participants = self._service.participants_present(
             conference.tenant_uuid, conference_id
         )
 
@@ -1,4 +1,4 @@
-# Copyright 2018-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2018-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from __future__ import annotations
@@ -6,6 +6,7 @@ from __future__ import annotations
 from wazo_amid_client import Client as AmidClient
 from wazo_confd_client import Client as ConfdClient
 
+from wazo_calld.plugin_helpers.confbridge import ConfbridgeRosters
 from wazo_calld.types import PluginDependencies
 
 from .bus_consume import ConferencesBusEventHandler
@@ -36,7 +37,16 @@ class Plugin:
         token_changed_subscribe(amid_client.set_token)
         token_changed_subscribe(confd_client.set_token)
 
-        conferences_service = ConferencesService(amid_client, ari.client, confd_client)
+        rosters = ConfbridgeRosters(
+            amid_client,
+            ari.client,
+            accepts=lambda name: name.startswith('wazo-conference-'),
+        )
+        # subscribed first, the participants are up to date when notifying
+        rosters.subscribe(bus_consumer)
+        conferences_service = ConferencesService(
+            amid_client, ari.client, confd_client, rosters
+        )
         notifier = ConferencesNotifier(bus_publisher)
         bus_event_handler = ConferencesBusEventHandler(
             confd_client, notifier, conferences_service
@@ -1,4 +1,4 @@
-# Copyright 2018-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2018-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
@@ -8,7 +8,6 @@ from marshmallow import ValidationError
 from requests import RequestException
 from wazo_amid_client.exceptions import AmidProtocolError
 
-from wazo_calld.plugin_helpers.ari_ import Channel
 from wazo_calld.plugin_helpers.confd import Conference
 from wazo_calld.plugin_helpers.exceptions import WazoAmidError
 
@@ -28,53 +27,44 @@ logger = logging.getLogger(__name__)
 
 
 class ConferencesService:
-    def __init__(self, amid, ari, confd):
+    def __init__(self, amid, ari, confd, rosters):
         self._amid = amid
         self._ari = ari
         self._confd = confd
+        self._rosters = rosters
 
     def list_participants(self, tenant_uuid, conference_id):
         if not Conference(tenant_uuid, conference_id, self._confd).exists():
             raise NoSuchConference(tenant_uuid, conference_id)
 
+        return self.participants_present(tenant_uuid, conference_id)
+
+    def participants_present(self, tenant_uuid, conference_id):
+        '''Same as list_participants, for a conference known to exist'''
         try:
-            participant_list = self._amid.action(
-                'ConfBridgeList', {'conference': f'wazo-conference-{conference_id}'}
+            participant_list = self._rosters.list_participants(
+                f'wazo-conference-{conference_id}'
             )
         except AmidProtocolError as e:
-            no_conf_msg = [
-                'No active conferences.',  # No conferences are taking place at this time.
-                'No Conference by that name found.',  # This conference is not running at this time.
-            ]
-            if e.message in no_conf_msg:
-                return []
             raise ConferenceParticipantError(
                 tenant_uuid,
                 conference_id,
                 participant_id=None,
                 message=e.message,
             )
-        except RequestException as e:
-            raise WazoAmidError(self._amid, e)
 
         result = []
-        del participant_list[0]
         for participant_list_item in participant_list:
-            if participant_list_item['Event'] != 'ConfbridgeList':
-                continue
-
             raw_participant = {
-                'id': participant_list_item['Uniqueid'],
-                'caller_id_name': participant_list_item['CallerIDName'],
-                'caller_id_number': participant_list_item['CallerIDNum'],
-                'muted': participant_list_item['Muted'] == 'Yes',
-                'join_time': participant_list_item['AnsweredTime'],
-                'admin': participant_list_item['Admin'] == 'Yes',
-                'language': participant_list_item['Language'],
-                'call_id': participant_list_item['Uniqueid'],
-                'user_uuid': Channel(
-                    participant_list_item['Uniqueid'], self._ari
-                ).user(),
+                'id': participant_list_item.id,
+                'caller_id_name': participant_list_item.caller_id_name,
+                'caller_id_number': participant_list_item.caller_id_number,
+                'muted': participant_list_item.muted,
+                'join_time': participant_list_item.join_time,
+                'admin': participant_list_item.admin,
+                'language': participant_list_item.language,
+                'call_id': participant_list_item.id,
+                'user_uuid': participant_list_item.user_uuid,
             }
             try:
                 participant = participant_schema.load(raw_participant)
@@ -99,7 +89,7 @@ class ConferencesService:
         if not Conference(tenant_uuid, conference_id, self._confd).exists():
             raise NoSuchConference(tenant_uuid, conference_id)
 
-        participants = self.list_participants(tenant_uuid, conference_id)
+        participants = self.participants_present(tenant_uuid, conference_id)
         if participant_id not in [participant['id'] for participant in participants]:
             raise NoSuchParticipant(tenant_uuid, conference_id, participant_id)
 
@@ -127,7 +117,7 @@ class ConferencesService:
         if not Conference(tenant_uuid, conference_id, self._confd).exists():
             raise NoSuchConference(tenant_uuid, conference_id)
 
-        participants = self.list_participants(tenant_uuid, conference_id)
+        participants = self.participants_present(tenant_uuid, conference_id)
         if participant_id not in [participant['id'] for participant in participants]:
             raise NoSuchParticipant(tenant_uuid, conference_id, participant_id)
 
@@ -155,7 +145,7 @@ class ConferencesService:
         if not Conference(tenant_uuid, conference_id, self._confd).exists():
             raise NoSuchConference(tenant_uuid, conference_id)
 
-        participants = self.list_participants(tenant_uuid, conference_id)
+        participants = self.participants_present(tenant_uuid, conference_id)
         if participant_id not in [participant['id'] for participant in participants]:
             raise NoSuchParticipant(tenant_uuid, conference_id, participant_id)
 
@@ -183,7 +173,7 @@ class ConferencesService:
         if not Conference(tenant_uuid, conference_id, self._confd).exists():
             raise NoSuchConference(tenant_uuid, conference_id)
 
-        participants = self.list_participants(tenant_uuid, conference_id)
+        participants = self.participants_present(tenant_uuid, conference_id)
         if not participants:
             raise ConferenceHasNoParticipants(tenant_uuid, conference_id)
 
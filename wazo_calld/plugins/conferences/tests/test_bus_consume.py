@@ -1,11 +1,11 @@
-# Copyright 2021-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2021-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 from uuid import uuid4
 
-from hamcrest import assert_that, is_, none
+from hamcrest import assert_that, has_entries, is_, none
 
 from ..bus_consume import ConferencesBusEventHandler
 
@@ -38,3 +38,33 @@ class TestBusConsume(TestCase):
         result = handler._notify_participant_left(event)
 
         assert_that(result, is_(none()))
+
+    @patch('wazo_calld.plugins.conferences.bus_consume.Conference')
+    def test_participant_joined_notifies_the_participants_present(self, ConferenceMock):
+        ConferenceMock.from_id.return_value.tenant_uuid = 'tenant-uuid'
+        notifier, service = Mock(), Mock()
+        handler = ConferencesBusEventHandler(None, notifier, service)
+
+        handler._notify_participant_joined(
+            {
+                'Conference': 'wazo-conference-1',
+                'Uniqueid': 'p1',
+                'CallerIDName': 'Alice',
+                'CallerIDNum': '1001',
+                'Muted': 'No',
+                'Admin': 'No',
+                'Language': 'en_US',
+                'ChanVariable': {'WAZO_USERUUID': 'user-uuid'},
+            }
+        )
+
+        service.participants_present.assert_called_once_with('tenant-uuid', 1)
+        service.list_participants.assert_not_called()
+        (
+            tenant_uuid,
+            conference_id,
+            participant,
+            participants,
+        ) = notifier.participant_joined.call_args.args
+        assert_that(participant, has_entries(id='p1', user_uuid='user-uuid'))
+        assert_that(participants, is_(service.participants_present.return_value))
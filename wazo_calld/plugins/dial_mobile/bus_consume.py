@@ -18,6 +18,7 @@ class EventHandler:
     def subscribe(self, bus_consumer):
         bus_consumer.subscribe('BridgeEnter', self._on_bridge_enter)
         bus_consumer.subscribe('DialEnd', self._on_dial_end)
+        bus_consumer.subscribe('Hangup', self._on_hangup)
         bus_consumer.subscribe('UserEvent', self._on_user_event)
         bus_consumer.subscribe(
             'auth_refresh_token_created', self._on_refresh_token_created
@@ -108,3 +109,6 @@ class EventHandler:
 
         # Internal state is keyed by the call's Linkedid.
         self._service.cancel_push_mobile(event['Linkedid'])
+
+    def _on_hangup(self, event):
+        self._service.notify_channel_hungup(event['Uniqueid'])
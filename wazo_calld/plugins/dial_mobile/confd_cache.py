@@ -0,0 +1,100 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+from wazo_confd_client import Client as ConfdClient
+
+from wazo_calld.bus import CoreBusConsumer
+from wazo_calld.plugin_helpers.cache import TTLLRUCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 10000
+DEFAULT_TTL = 3600
+
+
+@dataclass(frozen=True)
+class MobileProfile:
+    mobile_fallback_enabled: bool
+    mobile_phone_number: str | None
+    line_id: int | None
+    # only fetched when the PSTN fallback can be used
+    line_context: str | None
+
+    @property
+    def pstn_fallback_eligible(self) -> bool:
+        return bool(self.mobile_fallback_enabled and self.mobile_phone_number)
+
+
+class MobileProfileCache:
+    '''
+    What the PSTN fallback needs to know about a user, by user UUID: whether
+    it is enabled, the mobile phone number and the context of the main line.
+
+    User and user line events invalidate the profile of the user. A line may
+    be the main line of several users, so line events invalidate the whole
+    cache. The TTL only limits staleness if an event is lost.
+    '''
+
+    def __init__(
+        self,
+        confd_client: ConfdClient,
+        max_size: int = DEFAULT_MAX_SIZE,
+        ttl: float | None = DEFAULT_TTL,
+    ):
+        self._confd_client = confd_client
+        self._cache = TTLLRUCache(max_size, ttl)
+
+    def subscribe(self, bus_consumer: CoreBusConsumer) -> None:
+        for event in ('user_edited', 'user_deleted'):
+            bus_consumer.subscribe(event, self._on_user_changed)
+        for event in ('user_line_associated', 'user_line_dissociated'):
+            bus_consumer.subscribe(event, self._on_user_line_changed)
+        for event in ('line_edited', 'line_deleted'):
+            bus_consumer.subscribe(event, self._on_line_changed)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+    def get_profile(self, tenant_uuid: str, user_uuid: str) -> MobileProfile:
+        '''Raises the wazo-confd client errors, which are not cached'''
+        return self._cache.get_or_load(
+            user_uuid, lambda: self._load(tenant_uuid, user_uuid)
+        )
+
+    def _load(self, tenant_uuid: str, user_uuid: str) -> MobileProfile:
+        logger.debug('fetching the mobile profile of user %s', user_uuid)
+        user = self._confd_client.users.get(user_uuid, tenant_uuid=tenant_uuid)
+        lines = user.get('lines') or []
+        line_id = lines[0]['id'] if lines else None
+        profile = MobileProfile(
+            mobile_fallback_enabled=bool(user.get('mobile_fallback_enabled')),
+            mobile_phone_number=user.get('mobile_phone_number') or None,
+            line_id=line_id,
+            line_context=None,
+        )
+        if not profile.pstn_fallback_eligible or line_id is None:
+            return profile
+
+        line = self._confd_client.lines.get(line_id, tenant_uuid=tenant_uuid)
+        return MobileProfile(
+            mobile_fallback_enabled=profile.mobile_fallback_enabled,
+            mobile_phone_number=profile.mobile_phone_number,
+            line_id=line_id,
+            line_context=line['context'],
+        )
+
+    def _on_user_changed(self, event: dict) -> None:
+        logger.debug('user %s changed, forgetting its mobile profile', event['uuid'])
+        self._cache.invalidate(event['uuid'])
+
+    def _on_user_line_changed(self, event: dict) -> None:
+        self._cache.invalidate(event['user']['uuid'])
+
+    def _on_line_changed(self, event: dict) -> None:
+        logger.debug('line %s changed, clearing the mobile profiles', event['id'])
+        self._cache.clear()
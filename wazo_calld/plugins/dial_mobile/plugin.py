@@ -7,10 +7,12 @@ from wazo_amid_client import Client as AmidClient
 from wazo_auth_client import Client as AuthClient
 from wazo_confd_client import Client as ConfdClient
 from xivo.pubsub import CallbackCollector
+from xivo.status import Status
 
-from wazo_calld.types import PluginDependencies
+from wazo_calld.types import PluginDependencies, StatusDict
 
 from .bus_consume import EventHandler
+from .confd_cache import MobileProfileCache
 from .notifier import Notifier
 from .services import (
     DEFAULT_PSTN_FALLBACK_MIN_TIMEOUT,
@@ -23,11 +25,13 @@ from .stasis import DialMobileStasis
 class Plugin:
     def load(self, dependencies: PluginDependencies) -> None:
         ari = dependencies['ari']
+        asyncio = dependencies['asyncio']
         pubsub = dependencies['pubsub']
         bus_consumer = dependencies['bus_consumer']
         token_changed_subscribe = dependencies['token_changed_subscribe']
         config = dependencies['config']
         bus_publisher = dependencies['bus_publisher']
+        status_aggregator = dependencies['status_aggregator']
 
         amid_client = AmidClient(**config['amid'])
         token_changed_subscribe(amid_client.set_token)
@@ -38,21 +42,32 @@ class Plugin:
         confd_client = ConfdClient(**config['confd'])
         token_changed_subscribe(confd_client.set_token)
 
-        pstn_fallback_config = config.get('dial_mobile', {}).get('pstn_fallback', {})
+        dial_mobile_config = config['dial_mobile']
+        pstn_fallback_config = dial_mobile_config.get('pstn_fallback', {})
         notifier = Notifier(bus_publisher)
+        profile_cache = MobileProfileCache(
+            confd_client,
+            ttl=dial_mobile_config['confd_cache_ttl'],
+        )
+        profile_cache.subscribe(bus_consumer)
+        self._profile_cache = profile_cache
         service = DialMobileService(
             ari,
             notifier,
             amid_client,
             auth_client,
             confd_client,
+            asyncio,
             pstn_fallback_min_timeout=pstn_fallback_config.get(
                 'min_timeout', DEFAULT_PSTN_FALLBACK_MIN_TIMEOUT
             ),
             pstn_fallback_ring_timeout_factor=pstn_fallback_config.get(
                 'ring_timeout_factor', DEFAULT_PSTN_FALLBACK_RING_TIMEOUT_FACTOR
             ),
+            contact_dialer_workers=dial_mobile_config['contact_dialer_workers'],
+            profile_cache=profile_cache,
         )
+        self._service = service
         stasis = DialMobileStasis(ari, service)
         event_handler = EventHandler(service)
 
@@ -61,3 +76,11 @@ class Plugin:
         startup_callback_collector = CallbackCollector()
         ari.client_initialized_subscribe(startup_callback_collector.new_source())
         startup_callback_collector.subscribe(stasis.initialize)
+        status_aggregator.add_provider(self._provide_status)
+
+    def _provide_status(self, status: StatusDict) -> None:
+        status['plugins']['dial_mobile']['status'] = Status.ok
+        status['plugins']['dial_mobile'][
+            'active_dialers'
+        ] = self._service.active_dialers
+        status['plugins']['dial_mobile']['confd_cache'] = self._profile_cache.stats()
@@ -6,15 +6,19 @@ import logging
 import threading
 import uuid
 from collections.abc import Callable
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Any
 
 import requests
 from ari.exceptions import ARINotFound, ARIServerError
 from requests import HTTPError, RequestException
 
+from wazo_calld.asyncio_ import Timer
 from wazo_calld.plugin_helpers.ari_ import Bridge
 
+from .confd_cache import MobileProfileCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -111,7 +115,7 @@ class PSTNFallbackPending:
     """Timer armed; PSTN fallback may fire when it expires"""
 
     call_id: str
-    timer: threading.Timer
+    timer: Timer
 
     def triggering(self) -> 'PSTNFallbackTriggering':
         return PSTNFallbackTriggering(call_id=self.call_id)
@@ -182,13 +186,58 @@ PSTNFallback = (
 
 DEFAULT_PSTN_FALLBACK_MIN_TIMEOUT = 10.0
 DEFAULT_PSTN_FALLBACK_RING_TIMEOUT_FACTOR = 0.5
+DEFAULT_CONTACT_DIALER_WORKERS = 4
 
 
 class _NoSuchChannel(Exception):
     pass
 
 
+class _ContactDialerScheduler:
+    """
+    Runs the steps of the contact dialers on a small pool of worker threads.
+
+    A dialer only holds a worker while it checks and dials contacts: when it
+    starts and each time it is kicked by a contact event.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_CONTACT_DIALER_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='ContactDialer'
+        )
+        self._lock = threading.Lock()
+        self._dialers: set[_ContactDialer] = set()
+
+    @property
+    def active_dialers(self) -> int:
+        return len(self._dialers)
+
+    def add(self, dialer: '_ContactDialer') -> None:
+        with self._lock:
+            self._dialers.add(dialer)
+
+    def discard(self, dialer: '_ContactDialer') -> None:
+        with self._lock:
+            self._dialers.discard(dialer)
+
+    def submit(self, fn: Callable[[], None]) -> None:
+        self._executor.submit(fn)
+
+    def stop(self) -> None:
+        # queued steps still run, to hang up the channels of stopped dialers
+        self._executor.shutdown(wait=False)
+
+
 class _ContactDialer:
+    """
+    Dials the contacts of an AOR for a call until the call is answered or
+    hung up.
+
+    The dialer has no thread of its own: its steps run on the scheduler
+    workers, one at a time. Kicks received while a step is running are
+    coalesced into a single new step.
+    """
+
     def __init__(
         self,
         ari: Any,
@@ -197,24 +246,24 @@ class _ContactDialer:
         aor: str,
         ringing_time: int,
         pickup_mark: str,
-        on_contact_dialed: Callable[[], None] | None = None,
+        scheduler: _ContactDialerScheduler,
+        on_contact_dialed: Callable[[str], None] | None = None,
     ):
         self._ari = ari
         self.future_bridge_uuid = future_bridge_uuid
         self.should_stop = threading.Event()
-        self._thread = threading.Thread(
-            name='ContactDialer',
-            target=self._run_no_exception,
-            args=(channel_id, aor),
-        )
+        self._scheduler = scheduler
         self._called_contacts: set[str] = set()
-        self.is_running = False
         self._dialed_channels: set = set()
         self._caller_channel_id = channel_id
+        self._aor = aor
+        self._caller_id: str | None = None
         self._ringing_time = ringing_time
         self.pickup_mark = pickup_mark
         self._on_contact_dialed = on_contact_dialed
-        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._step_scheduled = False
+        self._step_pending = False
 
         dialer_id = str(self)
 
@@ -229,55 +278,95 @@ class _ContactDialer:
 
     def start(self):
         self.logger.debug('Starting')
-        self._thread.start()
+        self._scheduler.add(self)
+        self._schedule_step()
 
     def stop(self):
-        if not self._thread.is_alive():
-            return
+        with self._lock:
+            if self.should_stop.is_set():
+                return
+            self.logger.debug('Stopping')
+            self.should_stop.set()
+            step_scheduled = self._step_scheduled
 
-        self.logger.debug('Stopping')
-        self.should_stop.set()
-        self._wakeup.set()
-        self._thread.join()
+        self._scheduler.discard(self)
+        if not step_scheduled:
+            try:
+                self._scheduler.submit(self._clean_up)
+            except RuntimeError:
+                self._clean_up()
+        # otherwise the running step removes them when it ends
         self.logger.debug('Stopped')
 
     def kick(self) -> None:
-        """Wake the run loop to re-check contacts."""
-        self._wakeup.set()
+        """Schedule a step to re-check contacts."""
+        self._schedule_step()
+
+    def _schedule_step(self) -> None:
+        with self._lock:
+            if self.should_stop.is_set():
+                return
+            if self._step_scheduled:
+                self._step_pending = True
+                return
+            self._step_scheduled = True
 
-    def _run_no_exception(self, *args, **kwargs):
         try:
-            return self._run(*args, **kwargs)
-        except Exception:
-            self.logger.exception('Unhandled exception in %s thread', self._thread.name)
+            self._scheduler.submit(self._run_steps)
+        except RuntimeError:
+            self.logger.debug('scheduler is stopped, not dialing')
+            with self._lock:
+                self._step_scheduled = False
 
-    def _run(self, channel_id, aor):
-        channel = self._ari.channels.get(channelId=channel_id)
-        caller_id = '"{name}" <{number}>'.format(**channel.json['caller'])
+    def _run_steps(self) -> None:
+        while True:
+            with self._lock:
+                self._step_pending = False
 
-        # Initial check: contact may already be registered when the call lands.
-        self._dial_current_contacts(channel_id, aor, caller_id)
+            try:
+                self._step()
+            except Exception:
+                self.logger.exception('Unhandled exception in contact dialer step')
 
-        while not self.should_stop.is_set():
-            self._wakeup.wait()
-            self._wakeup.clear()
+            with self._lock:
+                if self._step_pending and not self.should_stop.is_set():
+                    continue
+                self._step_scheduled = False
+                stopped = self.should_stop.is_set()
 
-            if self.should_stop.is_set():
-                break
+            if stopped:
+                self._clean_up()
+            return
 
-            if not self._channel_is_up(channel_id):
-                self.logger.debug(
-                    'calling channel %s is gone: stopping %s thread',
-                    channel_id,
-                    self._thread.name,
-                )
-                break
+    def _clean_up(self) -> None:
+        try:
+            self._remove_unanswered_channels()
+        except Exception:
+            self.logger.exception('Unhandled exception removing unanswered channels')
 
+    def _step(self) -> None:
+        channel_id = self._caller_channel_id
+        caller_id = self._caller_id
+        if caller_id is None:
+            # Initial check: contact may already be registered when the call lands.
+            try:
+                channel = self._ari.channels.get(channelId=channel_id)
+            except ARINotFound:
+                pass
+            else:
+                caller_id = '"{name}" <{number}>'.format(**channel.json['caller'])
+                self._caller_id = caller_id
+        elif self._channel_is_up(channel_id):
             self.logger.debug('woke up for new contacts')
-            self._dial_current_contacts(channel_id, aor, caller_id)
+        else:
+            caller_id = None
 
-        self.logger.debug('Interrupted run loop')
-        self._remove_unanswered_channels()
+        if caller_id is None:
+            self.logger.debug('calling channel %s is gone: stopping', channel_id)
+            self.stop()
+            return
+
+        self._dial_current_contacts(channel_id, self._aor, caller_id)
 
     def _dial_current_contacts(self, channel_id, aor, caller_id):
         for contact in self._get_contacts(channel_id, aor):
@@ -315,7 +404,7 @@ class _ContactDialer:
         self._called_contacts.add(contact)
         self._dialed_channels.add(channel)
         if self._on_contact_dialed is not None:
-            self._on_contact_dialed()
+            self._on_contact_dialed(channel.id)
 
     def _remove_unanswered_channels(self):
         for channel in self._dialed_channels:
@@ -368,6 +457,188 @@ class _ContactDialer:
                 pass  # Already gone
 
 
+@dataclass(eq=False)
+class _MobileCall:
+    """A call to a mobile user, keyed by its origin call id (linkedid)"""
+
+    origin_call_id: str
+    lock: threading.RLock = field(default_factory=threading.RLock)
+    # {future_bridge_uuid: leg}, the newest leg last
+    legs: dict[str, '_MobileCallLeg'] = field(default_factory=dict)
+    # channels that requested a push notification for this call
+    push_channel_ids: set[str] = field(default_factory=set)
+
+
+@dataclass(eq=False)
+class _MobileCallLeg:
+    """A dial_mobile channel of a call, waiting for a contact to join its bridge"""
+
+    call: _MobileCall
+    bridge_uuid: str
+    caller_channel_id: str
+    aor: str
+    pickup_mark: str
+    dialer: _ContactDialer | None
+    # caller, dialed contacts and PSTN fallback channels
+    channel_ids: set[str] = field(default_factory=set)
+
+
+class _MobileCallRegistry:
+    """
+    Calls to mobile users by origin call id and push channel, and their legs
+    by future bridge, pickup mark, AOR and channel.
+
+    Removing a leg or a call removes it from every index at once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _MobileCall] = {}
+        self._legs_by_bridge: dict[str, _MobileCallLeg] = {}
+        # {pickup_mark: {bridge_uuid: leg}}, the oldest leg is picked up first
+        self._legs_by_pickup_mark: dict[str, dict[str, _MobileCallLeg]] = {}
+        self._legs_by_aor: dict[str, dict[str, _MobileCallLeg]] = {}
+        self._legs_by_channel: dict[str, _MobileCallLeg] = {}
+        self._calls_by_push_channel: dict[str, _MobileCall] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def add_call(self, origin_call_id: str) -> _MobileCall:
+        with self._lock:
+            call = self._calls.get(origin_call_id)
+            if call is None:
+                call = self._calls[origin_call_id] = _MobileCall(origin_call_id)
+            return call
+
+    def get_call(self, origin_call_id: str) -> _MobileCall | None:
+        return self._calls.get(origin_call_id)
+
+    def add_push_channel(self, call: _MobileCall, channel_id: str) -> None:
+        with self._lock:
+            if self._calls.get(call.origin_call_id) is call:
+                call.push_channel_ids.add(channel_id)
+                self._calls_by_push_channel[channel_id] = call
+
+    def pop_push_channel(self, channel_id: str) -> _MobileCall | None:
+        """Returns the call of the push channel, if it was its last channel"""
+        with self._lock:
+            call = self._calls_by_push_channel.pop(channel_id, None)
+            if call is None:
+                return None
+            call.push_channel_ids.discard(channel_id)
+            if call.legs or call.push_channel_ids:
+                return None
+            return call
+
+    def add_leg(
+        self,
+        call: _MobileCall,
+        bridge_uuid: str,
+        caller_channel_id: str,
+        aor: str,
+        pickup_mark: str,
+        dialer: _ContactDialer | None,
+    ) -> _MobileCallLeg:
+        leg = _MobileCallLeg(
+            call, bridge_uuid, caller_channel_id, aor, pickup_mark, dialer
+        )
+        with self._lock:
+            self._calls.setdefault(call.origin_call_id, call)
+            call.legs[bridge_uuid] = leg
+            self._legs_by_bridge[bridge_uuid] = leg
+            self._legs_by_aor.setdefault(aor, {})[bridge_uuid] = leg
+            if pickup_mark:
+                self._legs_by_pickup_mark.setdefault(pickup_mark, {})[bridge_uuid] = leg
+            leg.channel_ids.add(caller_channel_id)
+            self._legs_by_channel[caller_channel_id] = leg
+        return leg
+
+    def find_leg_by_bridge(self, bridge_uuid: str) -> _MobileCallLeg | None:
+        return self._legs_by_bridge.get(bridge_uuid)
+
+    def find_leg_by_channel(self, channel_id: str) -> _MobileCallLeg | None:
+        return self._legs_by_channel.get(channel_id)
+
+    def find_leg_by_pickup_mark(self, pickup_mark: str) -> _MobileCallLeg | None:
+        with self._lock:
+            legs = self._legs_by_pickup_mark.get(pickup_mark)
+            return next(iter(legs.values())) if legs else None
+
+    def dialers_by_aor(self, aor: str) -> list[_ContactDialer]:
+        with self._lock:
+            legs = self._legs_by_aor.get(aor, {}).values()
+            return [leg.dialer for leg in legs if leg.dialer]
+
+    def dialers(self) -> list[_ContactDialer]:
+        with self._lock:
+            legs = self._legs_by_bridge.values()
+            return [leg.dialer for leg in legs if leg.dialer]
+
+    def pop_dialer(self, leg: _MobileCallLeg) -> _ContactDialer | None:
+        """The leg can no longer be picked up, it is still found by bridge"""
+        with self._lock:
+            dialer, leg.dialer = leg.dialer, None
+            self._unindex_dialer(leg)
+            return dialer
+
+    def add_channel(self, leg: _MobileCallLeg, channel_id: str) -> None:
+        with self._lock:
+            if self._legs_by_bridge.get(leg.bridge_uuid) is leg:
+                leg.channel_ids.add(channel_id)
+                self._legs_by_channel[channel_id] = leg
+
+    def discard_channel(self, channel_id: str) -> None:
+        with self._lock:
+            if leg := self._legs_by_channel.pop(channel_id, None):
+                leg.channel_ids.discard(channel_id)
+
+    def remove_leg(self, leg: _MobileCallLeg) -> None:
+        """Removes the leg and ends its call, the other legs stay indexed"""
+        with self._lock:
+            self._remove_leg(leg)
+            self._remove_call(leg.call)
+
+    def remove_call(self, call: _MobileCall) -> None:
+        with self._lock:
+            for leg in list(call.legs.values()):
+                self._remove_leg(leg)
+            self._remove_call(call)
+
+    def _remove_call(self, call: _MobileCall) -> None:
+        # This function must be called with self._lock held
+        if self._calls.get(call.origin_call_id) is call:
+            del self._calls[call.origin_call_id]
+        for channel_id in call.push_channel_ids:
+            if self._calls_by_push_channel.get(channel_id) is call:
+                del self._calls_by_push_channel[channel_id]
+        call.push_channel_ids.clear()
+
+    def _remove_leg(self, leg: _MobileCallLeg) -> None:
+        # This function must be called with self._lock held
+        self._unindex_dialer(leg)
+        if leg.call.legs.get(leg.bridge_uuid) is leg:
+            del leg.call.legs[leg.bridge_uuid]
+        if self._legs_by_bridge.get(leg.bridge_uuid) is leg:
+            del self._legs_by_bridge[leg.bridge_uuid]
+        for channel_id in leg.channel_ids:
+            if self._legs_by_channel.get(channel_id) is leg:
+                del self._legs_by_channel[channel_id]
+        leg.channel_ids.clear()
+
+    def _unindex_dialer(self, leg: _MobileCallLeg) -> None:
+        # This function must be called with self._lock held
+        for index, key in (
+            (self._legs_by_aor, leg.aor),
+            (self._legs_by_pickup_mark, leg.pickup_mark),
+        ):
+            legs = index.get(key)
+            if legs and legs.get(leg.bridge_uuid) is leg:
+                del legs[leg.bridge_uuid]
+                if not legs:
+                    del index[key]
+
+
 class DialMobileService:
     def __init__(
         self,
@@ -376,31 +647,30 @@ class DialMobileService:
         amid_client,
         auth_client,
         confd_client,
+        asyncio,
         pstn_fallback_min_timeout: float = DEFAULT_PSTN_FALLBACK_MIN_TIMEOUT,
         pstn_fallback_ring_timeout_factor: float = DEFAULT_PSTN_FALLBACK_RING_TIMEOUT_FACTOR,
+        contact_dialer_workers: int = DEFAULT_CONTACT_DIALER_WORKERS,
+        profile_cache: MobileProfileCache | None = None,
     ):
         self._ari = ari.client
         self._auth_client = auth_client
         self._amid_client = amid_client
-        self._confd_client = confd_client
-        self._contact_dialers: dict[str, _ContactDialer] = {}
-        self._dialers_by_aor: dict[str, set[_ContactDialer]] = {}
-        self._caller_channel_leg_by_bridge: dict[str, str] = {}
+        self._asyncio = asyncio
+        self._calls = _MobileCallRegistry()
+        self._dialer_scheduler = _ContactDialerScheduler(contact_dialer_workers)
         self._call_ring_time: dict[str, int] = {}
         self._incoming_calls: dict[str, IncomingCall] = {}
         self._notifier = notifier
+        self._profiles = profile_cache or MobileProfileCache(confd_client)
         self._pstn_fallbacks: dict[str, PSTNFallback] = {}
-        self._call_locks: dict[str, threading.RLock] = {}
-        self._origin_call_id_by_bridge_uuid: dict[str, str] = {}
-        self._bridge_uuid_by_origin_call_id: dict[str, str] = {}
         self._pstn_fallback_min_timeout = pstn_fallback_min_timeout
         self._pstn_fallback_ring_timeout_factor = pstn_fallback_ring_timeout_factor
 
     def find_bridge_by_exten_context(self, exten, context):
-        pickup_mark = f'{exten}%{context}'
-        for bridge_uuid, dialer in self._contact_dialers.items():
-            if dialer.pickup_mark == pickup_mark:
-                return bridge_uuid
+        leg = self._calls.find_leg_by_pickup_mark(f'{exten}%{context}')
+        if leg:
+            return leg.bridge_uuid
 
     def dial_all_contacts(self, caller_channel_id, origin_channel_id, aor):
         self._ari.channels.ring(channelId=caller_channel_id)
@@ -423,15 +693,15 @@ class DialMobileService:
             logger.warning('PJSIP_ENDPOINT(%s,PICKUPMARK) lookup failed: %s', aor, e)
             pickup_mark = ''
 
-        def _on_contact_dialed() -> None:
+        def _on_contact_dialed(channel_id: str) -> None:
             # The mobile has registered and the SIP INVITE has been sent;
             # the PSTN fallback is no longer needed.
-            if call_id := self._call_id_for_bridge(future_bridge_uuid):
-                logger.debug(
-                    'mobile contact dialed for call %s: cancelling PSTN fallback',
-                    call_id,
-                )
-                self._cancel_pstn_fallback(call_id)
+            self._calls.add_channel(leg, channel_id)
+            logger.debug(
+                'mobile contact dialed for call %s: cancelling PSTN fallback',
+                origin_channel_id,
+            )
+            self._cancel_pstn_fallback(origin_channel_id)
 
         dialer = _ContactDialer(
             self._ari,
@@ -440,31 +710,27 @@ class DialMobileService:
             aor,
             ringing_time,
             pickup_mark,
+            self._dialer_scheduler,
             on_contact_dialed=_on_contact_dialed,
         )
-        self._contact_dialers[future_bridge_uuid] = dialer
-        self._dialers_by_aor.setdefault(aor, set()).add(dialer)
-        self._caller_channel_leg_by_bridge[future_bridge_uuid] = caller_channel_id
-        self._origin_call_id_by_bridge_uuid[future_bridge_uuid] = origin_channel_id
-        self._bridge_uuid_by_origin_call_id[origin_channel_id] = future_bridge_uuid
+        call = self._calls.add_call(origin_channel_id)
+        leg = self._calls.add_leg(
+            call, future_bridge_uuid, caller_channel_id, aor, pickup_mark, dialer
+        )
         dialer.start()
 
     def notify_contact_available(self, aor: str) -> None:
         logger.debug('new contact available for monitored aor %s', aor)
-        for dialer in self._dialers_by_aor.get(aor, set()):
+        for dialer in self._calls.dialers_by_aor(aor):
             dialer.kick()
 
-    def _unregister_dialer_by_aor(self, dialer: _ContactDialer) -> None:
-        for aor, dialers in list(self._dialers_by_aor.items()):
-            dialers.discard(dialer)
-            if not dialers:
-                self._dialers_by_aor.pop(aor, None)
-
     def join_bridge(self, channel_id, future_bridge_uuid):
         logger.info('%s is joining bridge %s', channel_id, future_bridge_uuid)
-        call_id = self._call_id_for_bridge(future_bridge_uuid)
-        if call_id and (lock := self._call_locks.get(call_id)):
-            with lock:
+        leg = self._calls.find_leg_by_bridge(future_bridge_uuid)
+        dialer = None
+        if leg:
+            call_id = leg.call.origin_call_id
+            with leg.call.lock:
                 match self._pstn_fallbacks.get(call_id):
                     case PSTNFallbackDialing(channel_id=cid) as current if (
                         cid == channel_id
@@ -479,13 +745,9 @@ class DialMobileService:
                         # Different channel / non-Dialing state — cancel.
                         logger.debug('cancelling pstn fallback for call %s', call_id)
                         self._cancel_pstn_fallback(call_id)
+            dialer = self._calls.pop_dialer(leg)
 
-        dialer = self._contact_dialers.pop(future_bridge_uuid, None)
-        if dialer:
-            logger.debug('Removing dialer: %s', str(dialer))
-            self._unregister_dialer_by_aor(dialer)
-            dialer.stop()
-        else:
+        if leg is None or dialer is None:
             # no dialer can mean  bridge is untracked, or call state already torn down
             # (cancelled or already answered)
             logger.warning(
@@ -493,7 +755,7 @@ class DialMobileService:
                 channel_id,
                 future_bridge_uuid,
             )
-            if call_id and (incoming := self._incoming_calls.get(call_id)):
+            if leg and (incoming := self._incoming_calls.get(call_id)):
                 logger.warning(
                     'join_bridge(channel=%s, bridge=%s): call %s has no dialer '
                     'but call push state is %s',
@@ -508,7 +770,10 @@ class DialMobileService:
                 pass
             return
 
-        outgoing_channel_id = self._caller_channel_leg_by_bridge.get(future_bridge_uuid)
+        logger.debug('Removing dialer: %s', str(dialer))
+        dialer.stop()
+
+        outgoing_channel_id = leg.caller_channel_id
         try:
             try:
                 self._ari.channels.answer(channelId=outgoing_channel_id)
@@ -522,8 +787,7 @@ class DialMobileService:
                 except ARINotFound:
                     # If its already gone do nothing
                     pass
-                if call_id:
-                    self.cancel_push_mobile(call_id)
+                self.cancel_push_mobile(call_id)
                 return
 
             try:
@@ -547,68 +811,77 @@ class DialMobileService:
                 channel=outgoing_channel_id, inhibitConnectedLineUpdates=True
             )
         finally:
-            self._prune_call_state(future_bridge_uuid)
+            self._prune_call_state(leg)
 
-    def _call_id_for_bridge(self, bridge_uuid: str) -> str | None:
-        return self._origin_call_id_by_bridge_uuid.get(bridge_uuid)
+    def _prune_call_state(self, leg: _MobileCallLeg) -> None:
+        # Tear down the per-call state so it doesn't grow unbounded across
+        # the lifetime of the service.
+        self._calls.remove_leg(leg)
+        self._forget_call(leg.call.origin_call_id)
 
-    def _prune_call_state(self, future_bridge_uuid: str) -> None:
-        # Tear down per-call indirection so the maps don't grow unbounded
-        # across the lifetime of the service.
-        origin_call_id = self._origin_call_id_by_bridge_uuid.pop(
-            future_bridge_uuid, None
-        )
-        if origin_call_id is not None:
-            self._bridge_uuid_by_origin_call_id.pop(origin_call_id, None)
-            self._call_ring_time.pop(origin_call_id, None)
-            self._pstn_fallbacks.pop(origin_call_id, None)
-            self._call_locks.pop(origin_call_id, None)
-            self._incoming_calls.pop(origin_call_id, None)
-        self._caller_channel_leg_by_bridge.pop(future_bridge_uuid, None)
+    def _forget_call(self, call_id: str) -> None:
+        self._call_ring_time.pop(call_id, None)
+        self._pstn_fallbacks.pop(call_id, None)
+        self._incoming_calls.pop(call_id, None)
 
     def notify_channel_gone(self, channel_id):
+        leg = self._calls.find_leg_by_channel(channel_id)
+        if leg is None:
+            return
+        call_id = leg.call.origin_call_id
+
         # If a PSTN-fallback channel has torn down on its own, transition
         # its state to Cancelled so it isn't double-hung-up later.
         # Re-read the state under the per-call lock so we don't race with
         # the timer thread or another cancellation path.
-        for tracked_call_id in list(self._pstn_fallbacks):
-            with self._incoming_call_lock(tracked_call_id):
-                state = self._pstn_fallbacks.get(tracked_call_id)
-                match state:
-                    case PSTNFallbackDialing(channel_id=cid) if cid == channel_id:
-                        self._pstn_fallbacks[tracked_call_id] = state.cancelled()
+        with leg.call.lock:
+            match self._pstn_fallbacks.get(call_id):
+                case PSTNFallbackDialing(channel_id=cid) as state if cid == channel_id:
+                    self._pstn_fallbacks[call_id] = state.cancelled()
 
-        to_remove: list[tuple[str, bool]] = []
+        dialer = leg.dialer
+        try:
+            if dialer is None:
+                raise _NoSuchChannel(channel_id)
+            dialer._on_channel_gone(channel_id)
+        except _NoSuchChannel:
+            self._calls.discard_channel(channel_id)
+            return
 
-        for key, dialer in self._contact_dialers.items():
-            try:
-                dialer._on_channel_gone(channel_id)
-            except _NoSuchChannel:
-                continue
-            else:
-                is_caller_gone = channel_id == dialer._caller_channel_id
-                to_remove.append((key, is_caller_gone))
-
-        for key, is_caller_gone in to_remove:
-            dialer = self._contact_dialers[key]
-            logger.debug('Removing dialer: %s', str(dialer))
-            del self._contact_dialers[key]
-            self._unregister_dialer_by_aor(dialer)
-            if call_id := self._call_id_for_bridge(key):
-                if is_caller_gone:
-                    logger.debug(
-                        'Caller channel gone for call %s: cancelling PSTN fallback',
-                        call_id,
-                    )
-                else:
-                    logger.debug(
-                        'Dialed mobile contact gone for call %s: '
-                        'mobile was reachable, cancelling PSTN fallback',
-                        call_id,
-                    )
-                self._cancel_pstn_fallback(call_id)
-                self.cancel_push_mobile(call_id)
-            self._prune_call_state(key)
+        logger.debug('Removing dialer: %s', str(dialer))
+        self._calls.pop_dialer(leg)
+        if channel_id == leg.caller_channel_id:
+            logger.debug(
+                'Caller channel gone for call %s: cancelling PSTN fallback',
+                call_id,
+            )
+        else:
+            logger.debug(
+                'Dialed mobile contact gone for call %s: '
+                'mobile was reachable, cancelling PSTN fallback',
+                call_id,
+            )
+        self._cancel_pstn_fallback(call_id)
+        self.cancel_push_mobile(call_id)
+        self._prune_call_state(leg)
+
+    def notify_channel_hungup(self, channel_id: str) -> None:
+        # Calls that reached dial_mobile are removed with their legs, the others
+        # when the last channel that requested a push notification hangs up
+        call = self._calls.pop_push_channel(channel_id)
+        if call is None:
+            return
+
+        call_id = call.origin_call_id
+        logger.debug('call %s has ended: removing its mobile call state', call_id)
+        for leg in list(call.legs.values()):
+            if dialer := self._calls.pop_dialer(leg):
+                dialer.stop()
+        self._cancel_pstn_fallback(call_id)
+        if call_id in self._incoming_calls:
+            self.cancel_push_mobile(call_id)
+        self._calls.remove_call(call)
+        self._forget_call(call_id)
 
     def clean_bridge(self, bridge_id):
         bridge_helper = Bridge(bridge_id, self._ari)
@@ -627,11 +900,15 @@ class DialMobileService:
             except ARINotFound:
                 pass
 
+    @property
+    def active_dialers(self) -> int:
+        return self._dialer_scheduler.active_dialers
+
     def on_calld_stopping(self):
-        for dialer in self._contact_dialers.values():
+        for dialer in self._calls.dialers():
             dialer.stop()
-        # Cancel any armed PSTN fallback timers so the (non-daemon) Timer
-        # threads do not block process exit, and the callback doesn't run
+        self._dialer_scheduler.stop()
+        # Cancel any armed PSTN fallback timers so the callback doesn't run
         # against half-torn-down clients.
         for state in self._pstn_fallbacks.values():
             match state:
@@ -696,7 +973,9 @@ class DialMobileService:
             origin_call_id=origin_call_id,
             payload=payload,
         )
-        lock = self._call_locks.setdefault(origin_call_id, threading.RLock())
+        call = self._calls.add_call(origin_call_id)
+        self._calls.add_push_channel(call, call_id)
+        lock = call.lock
         with lock:
             self._incoming_calls[origin_call_id] = pending
 
@@ -724,22 +1003,22 @@ class DialMobileService:
                     self._pstn_fallback_min_timeout,
                     self._pstn_fallback_ring_timeout_factor * int(ring_timeout),
                 )
-                timer = threading.Timer(
-                    fallback_timeout, self._pstn_fallback, args=[origin_call_id]
-                )
-                self._pstn_fallbacks[origin_call_id] = PSTNFallbackPending(
-                    call_id=origin_call_id, timer=timer
-                )
                 logger.info(
                     'call %s: Arming PSTN fallback timer with timeout=%d',
                     origin_call_id,
                     fallback_timeout,
                 )
-                timer.start()
+                # the callback takes the call lock, held here, before reading state
+                timer = self._asyncio.call_later(
+                    fallback_timeout, self._pstn_fallback, origin_call_id
+                )
+                self._pstn_fallbacks[origin_call_id] = PSTNFallbackPending(
+                    call_id=origin_call_id, timer=timer
+                )
 
     def _pstn_fallback_eligible(self, user_uuid: str, tenant_uuid: str) -> bool:
         try:
-            user = self._confd_client.users.get(user_uuid, tenant_uuid=tenant_uuid)
+            profile = self._profiles.get_profile(tenant_uuid, user_uuid)
         except (HTTPError, RequestException) as e:
             logger.warning(
                 'PSTN fallback eligibility lookup failed for user %s: %s; '
@@ -748,20 +1027,18 @@ class DialMobileService:
                 e,
             )
             return True
-        return bool(
-            user.get('mobile_fallback_enabled') and user.get('mobile_phone_number')
-        )
+        return profile.pstn_fallback_eligible
 
     def _cancel_pstn_fallback(self, call_id: str) -> None:
-        lock = self._call_locks.get(call_id)
-        if lock is None:
+        call = self._calls.get_call(call_id)
+        if call is None:
             assert call_id not in self._pstn_fallbacks, (
-                f'PSTN fallback state for {call_id} present without lock '
-                f'(state={self._pstn_fallbacks[call_id]!r}); _call_locks and '
-                '_pstn_fallbacks lifetimes have drifted'
+                f'PSTN fallback state for {call_id} present without a call '
+                f'(state={self._pstn_fallbacks[call_id]!r}); the call registry '
+                'and _pstn_fallbacks lifetimes have drifted'
             )
             return
-        with lock:
+        with call.lock:
             logger.info('cancelling PSTN fallback for call %s', call_id)
             match self._pstn_fallbacks.get(call_id):
                 case None | PSTNFallbackCancelled() | PSTNFallbackDialAnswered() as state:
@@ -866,20 +1143,21 @@ class DialMobileService:
                     )
 
     def _incoming_call_lock(self, call_id: str) -> contextlib.AbstractContextManager:
-        lock = self._call_locks.get(call_id)
+        call = self._calls.get_call(call_id)
         # handle missing lock as a no-op context manager
-        return lock if lock is not None else contextlib.nullcontext()
+        return call.lock if call is not None else contextlib.nullcontext()
 
     def _pstn_fallback(self, call_id: str) -> None:
         """Timer-fired callback, dispatch PSTN fallback call"""
-        lock = self._call_locks.get(call_id)
-        if lock is None:
+        call = self._calls.get_call(call_id)
+        if call is None:
             logger.warning(
                 'PSTN fallback timer fired for call %s but no lock available, '
                 'aborting',
                 call_id,
             )
             return
+        lock = call.lock
 
         # Phase 1: transition Pending → Triggering atomically. From here
         # on, observers (e.g. `_cancel_pstn_fallback`) see Triggering.
@@ -914,25 +1192,25 @@ class DialMobileService:
                     raise _PSTNFallbackAbort
 
             try:
-                user = self._confd_client.users.get(
-                    pending.user_uuid, tenant_uuid=pending.tenant_uuid
+                profile = self._profiles.get_profile(
+                    pending.tenant_uuid, pending.user_uuid
                 )
             except (HTTPError, RequestException) as e:
                 logger.error(
-                    'PSTN fallback: cannot fetch user %s: %s',
+                    'PSTN fallback: cannot fetch the profile of user %s: %s',
                     pending.user_uuid,
                     e,
                 )
                 raise _PSTNFallbackAbort from e
 
-            if not user.get('mobile_fallback_enabled'):
+            if not profile.mobile_fallback_enabled:
                 logger.info(
                     'PSTN fallback: user %s has mobile fallback disabled, skipping',
                     pending.user_uuid,
                 )
                 raise _PSTNFallbackAbort
 
-            mobile_phone_number = user.get('mobile_phone_number')
+            mobile_phone_number = profile.mobile_phone_number
             if not mobile_phone_number:
                 logger.info(
                     'PSTN fallback: user %s has no mobile_phone_number, skipping',
@@ -940,42 +1218,27 @@ class DialMobileService:
                 )
                 raise _PSTNFallbackAbort
 
-            # get user's dialplan context for outbound dialing; use the main line's context
-            lines = user.get('lines', [])
-            if not lines:
+            # the outbound call is dialed from the context of the user's main line
+            user_context = profile.line_context
+            if not user_context:
                 logger.warning(
                     'PSTN fallback: user %s has no lines, skipping',
                     pending.user_uuid,
                 )
                 raise _PSTNFallbackAbort
 
-            try:
-                line = self._confd_client.lines.get(
-                    lines[0]['id'], tenant_uuid=pending.tenant_uuid
-                )
-            except (HTTPError, RequestException) as e:
-                logger.error(
-                    'PSTN fallback: cannot fetch line for user %s: %s',
-                    pending.user_uuid,
-                    e,
-                )
-                raise _PSTNFallbackAbort from e
-
-            user_context = line['context']
-
-            future_bridge_uuid = self._bridge_uuid_by_origin_call_id.get(
-                pending.origin_call_id
-            )
-            if not future_bridge_uuid:
+            # the newest dial_mobile leg of the call
+            legs = list(call.legs.values())
+            if not legs:
                 logger.warning(
                     'PSTN fallback: no bridge found for call %s, skipping',
                     call_id,
                 )
                 raise _PSTNFallbackAbort
 
-            caller_channel_id = self._caller_channel_leg_by_bridge.get(
-                future_bridge_uuid
-            )
+            leg = legs[-1]
+            future_bridge_uuid = leg.bridge_uuid
+            caller_channel_id = leg.caller_channel_id
             try:
                 self._ari.channels.get(channelId=caller_channel_id)
             except ARINotFound as e:
@@ -1041,6 +1304,7 @@ class DialMobileService:
                         self._pstn_fallbacks[call_id] = triggering.dialing(
                             pstn_channel.id
                         )
+                        self._calls.add_channel(leg, pstn_channel.id)
                     case _ as state:
                         logger.debug(
                             'PSTN fallback for call %s no longer in Triggering '
@@ -293,3 +293,15 @@ class TestEventHandler(TestCase):
 
         self.service.cancel_push_mobile.assert_called_once_with(s.linkedid)
         self.service.complete_pending_push_mobile.assert_not_called()
+
+    def test_hangup_notifies_the_channel(self):
+        event = {
+            'Event': 'Hangup',
+            'Channel': 'PJSIP/zcua59c9-00000015',
+            'Uniqueid': '1647612626.40',
+            'Linkedid': '1647612626.39',
+        }
+
+        self.event_handler._on_hangup(event)
+
+        self.service.notify_channel_hungup.assert_called_once_with('1647612626.40')
@@ -0,0 +1,125 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+from hamcrest import assert_that, calling, equal_to, none, raises
+from requests import HTTPError
+
+from ..confd_cache import MobileProfile, MobileProfileCache
+
+USER = {
+    'uuid': 'user-uuid',
+    'mobile_fallback_enabled': True,
+    'mobile_phone_number': '+15555550100',
+    'lines': [{'id': 42}, {'id': 43}],
+}
+
+
+class TestMobileProfileCache(TestCase):
+    def setUp(self):
+        self.confd_client = Mock()
+        self.confd_client.users.get.return_value = USER
+        self.confd_client.lines.get.return_value = {'id': 42, 'context': 'ctx'}
+        self.bus_consumer = Mock()
+        self.cache = MobileProfileCache(self.confd_client)
+        self.cache.subscribe(self.bus_consumer)
+        self.handlers = {
+            call.args[0]: call.args[1]
+            for call in self.bus_consumer.subscribe.call_args_list
+        }
+
+    def test_get_profile(self):
+        self.cache.get_profile('tenant', 'user-uuid')
+        result = self.cache.get_profile('tenant', 'user-uuid')
+
+        assert_that(
+            result,
+            equal_to(
+                MobileProfile(
+                    mobile_fallback_enabled=True,
+                    mobile_phone_number='+15555550100',
+                    line_id=42,
+                    line_context='ctx',
+                )
+            ),
+        )
+        assert_that(result.pstn_fallback_eligible, equal_to(True))
+        self.confd_client.users.get.assert_called_once_with(
+            'user-uuid', tenant_uuid='tenant'
+        )
+        self.confd_client.lines.get.assert_called_once_with(42, tenant_uuid='tenant')
+
+    def test_line_is_not_fetched_when_not_eligible(self):
+        self.confd_client.users.get.return_value = dict(USER, mobile_phone_number=None)
+
+        result = self.cache.get_profile('tenant', 'user-uuid')
+
+        assert_that(result.pstn_fallback_eligible, equal_to(False))
+        assert_that(result.line_context, none())
+        self.confd_client.lines.get.assert_not_called()
+
+    def test_user_without_lines(self):
+        self.confd_client.users.get.return_value = dict(USER, lines=[])
+
+        result = self.cache.get_profile('tenant', 'user-uuid')
+
+        assert_that(result.line_id, none())
+        assert_that(result.line_context, none())
+        self.confd_client.lines.get.assert_not_called()
+
+    def test_errors_are_not_cached(self):
+        self.confd_client.lines.get.side_effect = [HTTPError(), {'context': 'ctx'}]
+
+        assert_that(
+            calling(self.cache.get_profile).with_args('tenant', 'user-uuid'),
+            raises(HTTPError),
+        )
+        result = self.cache.get_profile('tenant', 'user-uuid')
+
+        assert_that(result.line_context, equal_to('ctx'))
+
+    def test_disabled_cache(self):
+        cache = MobileProfileCache(self.confd_client, ttl=0)
+
+        cache.get_profile('tenant', 'user-uuid')
+        cache.get_profile('tenant', 'user-uuid')
+
+        assert_that(self.confd_client.users.get.call_count, equal_to(2))
+
+    def test_user_events_invalidate_the_user(self):
+        self.cache.get_profile('tenant', 'user-uuid')
+        self.cache.get_profile('tenant', 'other-uuid')
+
+        self.handlers['user_edited']({'uuid': 'user-uuid'})
+        self.handlers['user_line_dissociated'](
+            {'user': {'uuid': 'user-uuid'}, 'line': {'id': 42}}
+        )
+        self.cache.get_profile('tenant', 'user-uuid')
+        self.cache.get_profile('tenant', 'other-uuid')
+
+        assert_that(self.confd_client.users.get.call_count, equal_to(3))
+
+    def test_line_events_invalidate_all_users(self):
+        self.cache.get_profile('tenant', 'user-uuid')
+        self.cache.get_profile('tenant', 'other-uuid')
+
+        self.handlers['line_edited']({'id': 42})
+        self.cache.get_profile('tenant', 'user-uuid')
+        self.cache.get_profile('tenant', 'other-uuid')
+
+        assert_that(self.confd_client.users.get.call_count, equal_to(4))
+        assert_that(
+            set(self.handlers),
+            equal_to(
+                {
+                    'user_edited',
+                    'user_deleted',
+                    'user_line_associated',
+                    'user_line_dissociated',
+                    'line_edited',
+                    'line_deleted',
+                }
+            ),
+        )
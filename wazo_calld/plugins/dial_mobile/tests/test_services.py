@@ -1,7 +1,6 @@
 # Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import threading
 from unittest import TestCase
 from unittest.mock import Mock, patch
 from unittest.mock import sentinel as s
@@ -9,7 +8,17 @@ from unittest.mock import sentinel as s
 import pytest
 import requests
 from ari.exceptions import ARINotFound
-from hamcrest import assert_that, contains_exactly, empty, equal_to, has_items
+from hamcrest import (
+    assert_that,
+    contains_exactly,
+    contains_inanyorder,
+    empty,
+    equal_to,
+    has_items,
+    has_length,
+    none,
+    same_instance,
+)
 
 from ..notifier import Notifier
 from ..services import (
@@ -22,10 +31,25 @@ from ..services import (
     PSTNFallbackDialing,
     PSTNFallbackPending,
     _ContactDialer,
+    _ContactDialerScheduler,
+    _MobileCallLeg,
+    _MobileCallRegistry,
     _NoSuchChannel,
 )
 
 
+def find_leg(service: DialMobileService, channel_id: str) -> _MobileCallLeg:
+    leg = service._calls.find_leg_by_channel(channel_id)
+    assert leg, f'no leg for channel {channel_id}'
+    return leg
+
+
+def find_dialer(service: DialMobileService, channel_id: str) -> _ContactDialer:
+    dialer = find_leg(service, channel_id).dialer
+    assert dialer, f'no dialer for channel {channel_id}'
+    return dialer
+
+
 class DialerTestCase(TestCase):
     def setUp(self):
         self.ari = Mock()
@@ -34,6 +58,8 @@ class DialerTestCase(TestCase):
         self.channel_id = '1234567890.42'
         self.ringing_time = 42
         self.pickup_mark = '1003%default'
+        self.scheduler = Mock(_ContactDialerScheduler)
+        self.scheduler.submit.side_effect = lambda fn: fn()
 
         self.poller = _ContactDialer(
             self.ari,
@@ -42,6 +68,7 @@ class DialerTestCase(TestCase):
             self.aor,
             self.ringing_time,
             self.pickup_mark,
+            self.scheduler,
         )
 
 
@@ -86,6 +113,110 @@ class TestSendContactToCurrentCall(DialerTestCase):
         )
 
 
+class TestDialerSteps(DialerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ari.channels.get.return_value = Mock(
+            json={'caller': {'name': 'Alice', 'number': '1001'}}
+        )
+        self.ari.channels.getChannelVar.return_value = {'value': 'contact1'}
+
+    def test_start_dials_current_contacts(self):
+        self.poller.start()
+
+        self.scheduler.add.assert_called_once_with(self.poller)
+        self.ari.channels.originate.assert_called_once_with(
+            endpoint='contact1',
+            app='dial_mobile',
+            appArgs=['join', self.future_bridge_uuid],
+            callerId='"Alice" <1001>',
+            originator=self.channel_id,
+            timeout=self.ringing_time,
+        )
+
+    def test_kick_dials_new_contacts(self):
+        self.poller.start()
+        self.ari.channels.getChannelVar.return_value = {'value': 'contact1&contact2'}
+
+        self.poller.kick()
+
+        self.ari.channels.originate.assert_called_with(
+            endpoint='contact2',
+            app='dial_mobile',
+            appArgs=['join', self.future_bridge_uuid],
+            callerId='"Alice" <1001>',
+            originator=self.channel_id,
+            timeout=self.ringing_time,
+        )
+        assert_that(self.ari.channels.originate.call_count, equal_to(2))
+
+    def test_kicks_are_coalesced(self):
+        steps: list = []
+        self.scheduler.submit.side_effect = steps.append
+        self.poller.start()
+
+        self.poller.kick()
+        self.poller.kick()
+        assert_that(steps, has_length(1))
+
+        steps[0]()
+
+        assert_that(self.ari.channels.getChannelVar.call_count, equal_to(1))
+
+    def test_kick_during_a_step_runs_another_step(self):
+        steps: list = []
+        self.scheduler.submit.side_effect = steps.append
+        self.poller.start()
+
+        def get_contacts(**kwargs):
+            if self.ari.channels.getChannelVar.call_count == 1:
+                self.poller.kick()
+            return {'value': 'contact1'}
+
+        self.ari.channels.getChannelVar.side_effect = get_contacts
+        steps[0]()
+
+        assert_that(steps, has_length(1))
+        assert_that(self.ari.channels.getChannelVar.call_count, equal_to(2))
+
+    def test_caller_gone_on_kick_stops_the_dialer(self):
+        self.poller.start()
+        dialed_channel = self.ari.channels.originate.return_value
+        dialed_channel.get.return_value = Mock(json={'state': 'Ringing'})
+        self.ari.channels.get.side_effect = ARINotFound(s.ari_client, s.error)
+
+        self.poller.kick()
+
+        assert_that(self.poller.should_stop.is_set(), equal_to(True))
+        self.scheduler.discard.assert_called_once_with(self.poller)
+        self.ari.channels.hangup.assert_called_once_with(channelId=dialed_channel.id)
+
+    def test_stop_during_a_step_removes_channels_at_the_end_of_the_step(self):
+        steps: list = []
+        self.scheduler.submit.side_effect = steps.append
+        self.poller.start()
+        dialed_channel = self.ari.channels.originate.return_value
+        dialed_channel.get.return_value = Mock(json={'state': 'Ringing'})
+
+        def stop_while_dialing(**kwargs):
+            self.poller.stop()
+            self.ari.channels.hangup.assert_not_called()
+            return dialed_channel
+
+        self.ari.channels.originate.side_effect = stop_while_dialing
+        steps[0]()
+
+        self.ari.channels.hangup.assert_called_once_with(channelId=dialed_channel.id)
+
+    def test_stopped_dialer_is_not_scheduled(self):
+        self.poller.stop()
+        self.scheduler.submit.reset_mock()
+
+        self.poller.kick()
+
+        self.scheduler.submit.assert_not_called()
+
+
 class TestChannelIsUp(DialerTestCase):
     def test_no_channel(self):
         self.ari.channels.get.side_effect = ARINotFound(s.ari_client, s.original_error)
@@ -215,6 +346,123 @@ class TestChannelGone(DialerTestCase):
         )
 
 
+class TestMobileCallRegistry(TestCase):
+    def setUp(self):
+        self.registry = _MobileCallRegistry()
+
+    def add_leg(self, call_id, bridge_uuid, aor='aor', pickup_mark='1001%default'):
+        call = self.registry.add_call(call_id)
+        dialer = Mock()
+        leg = self.registry.add_leg(
+            call, bridge_uuid, f'caller-{bridge_uuid}', aor, pickup_mark, dialer
+        )
+        return leg
+
+    def test_lookups(self):
+        leg = self.add_leg('call-id', 'bridge-1')
+        self.registry.add_channel(leg, 'dialed-ch')
+
+        assert_that(self.registry.get_call('call-id'), same_instance(leg.call))
+        assert_that(self.registry.find_leg_by_bridge('bridge-1'), same_instance(leg))
+        assert_that(
+            self.registry.find_leg_by_channel('caller-bridge-1'), same_instance(leg)
+        )
+        assert_that(self.registry.find_leg_by_channel('dialed-ch'), same_instance(leg))
+        assert_that(
+            self.registry.find_leg_by_pickup_mark('1001%default'), same_instance(leg)
+        )
+        assert_that(self.registry.dialers_by_aor('aor'), contains_exactly(leg.dialer))
+
+    def test_oldest_leg_is_picked_up_first(self):
+        first = self.add_leg('call-1', 'bridge-1')
+        second = self.add_leg('call-2', 'bridge-2')
+
+        assert_that(
+            self.registry.find_leg_by_pickup_mark('1001%default'), same_instance(first)
+        )
+        self.registry.pop_dialer(first)
+        assert_that(
+            self.registry.find_leg_by_pickup_mark('1001%default'), same_instance(second)
+        )
+
+    def test_pop_dialer_keeps_the_leg_by_bridge(self):
+        leg = self.add_leg('call-id', 'bridge-1')
+        dialer = leg.dialer
+
+        assert_that(self.registry.pop_dialer(leg), same_instance(dialer))
+
+        assert_that(self.registry.find_leg_by_bridge('bridge-1'), same_instance(leg))
+        assert_that(self.registry.find_leg_by_pickup_mark('1001%default'), none())
+        assert_that(self.registry.dialers_by_aor('aor'), empty())
+        assert_that(self.registry.dialers(), empty())
+
+    def test_remove_leg_ends_the_call(self):
+        leg = self.add_leg('call-id', 'bridge-1')
+        other_leg = self.add_leg('call-id', 'bridge-2')
+        self.registry.add_channel(leg, 'dialed-ch')
+
+        self.registry.remove_leg(leg)
+
+        assert_that(self.registry.get_call('call-id'), none())
+        assert_that(self.registry.find_leg_by_bridge('bridge-1'), none())
+        assert_that(self.registry.find_leg_by_channel('caller-bridge-1'), none())
+        assert_that(self.registry.find_leg_by_channel('dialed-ch'), none())
+        assert_that(
+            self.registry.find_leg_by_pickup_mark('1001%default'),
+            same_instance(other_leg),
+        )
+        assert_that(self.registry.dialers(), contains_exactly(other_leg.dialer))
+
+        self.registry.add_channel(leg, 'late-ch')
+        assert_that(self.registry.find_leg_by_channel('late-ch'), none())
+
+    def test_remove_call_removes_all_its_legs(self):
+        leg_1 = self.add_leg('call-id', 'bridge-1', aor='aor-1')
+        leg_2 = self.add_leg('call-id', 'bridge-2', aor='aor-2')
+        other_leg = self.add_leg('other-call-id', 'bridge-3', aor='aor-1')
+
+        self.registry.remove_call(leg_1.call)
+
+        assert_that(self.registry, has_length(1))
+        assert_that(self.registry.find_leg_by_bridge('bridge-1'), none())
+        assert_that(self.registry.find_leg_by_bridge('bridge-2'), none())
+        assert_that(
+            self.registry.dialers_by_aor('aor-1'), contains_exactly(other_leg.dialer)
+        )
+        assert_that(self.registry.dialers_by_aor('aor-2'), empty())
+        assert_that(leg_2.call.legs, equal_to({}))
+
+    def test_discard_channel(self):
+        leg = self.add_leg('call-id', 'bridge-1')
+        self.registry.add_channel(leg, 'pstn-ch')
+
+        self.registry.discard_channel('pstn-ch')
+
+        assert_that(self.registry.find_leg_by_channel('pstn-ch'), none())
+        assert_that(leg.channel_ids, contains_inanyorder('caller-bridge-1'))
+
+    def test_push_channels(self):
+        call = self.registry.add_call('call-id')
+        self.registry.add_push_channel(call, 'push-1')
+        self.registry.add_push_channel(call, 'push-2')
+
+        assert_that(self.registry.pop_push_channel('push-1'), none())
+        assert_that(self.registry.pop_push_channel('push-2'), same_instance(call))
+        assert_that(self.registry.pop_push_channel('push-2'), none())
+
+    def test_push_channel_of_a_call_with_legs(self):
+        leg = self.add_leg('call-id', 'bridge-1')
+        self.registry.add_push_channel(leg.call, 'push-ch')
+
+        assert_that(self.registry.pop_push_channel('push-ch'), none())
+
+        self.registry.add_push_channel(leg.call, 'other-push-ch')
+        self.registry.remove_leg(leg)
+
+        assert_that(self.registry.pop_push_channel('other-push-ch'), none())
+        assert_that(leg.call.push_channel_ids, empty())
+
+
 class DialMobileServiceTestCase(DialerTestCase):
     def setUp(self):
         self.ari = Mock()
@@ -222,6 +470,7 @@ class DialMobileServiceTestCase(DialerTestCase):
         self.amid_client = Mock()
         self.auth_client = Mock()
         self.confd_client = Mock()
+        self.asyncio = Mock()
         self.notifier = Mock(Notifier)
         self.service = DialMobileService(
             self.ari,
@@ -229,11 +478,18 @@ class DialMobileServiceTestCase(DialerTestCase):
             self.amid_client,
             self.auth_client,
             self.confd_client,
+            self.asyncio,
         )
         self.channel_id = '1234567890.42'
         self.aor = 'foobar'
         self.origin_channel_id = '1234567890.84'
 
+    def _dialed(self, leg, channel_id):
+        channel = Mock()
+        channel.id = channel_id
+        leg.dialer._dialed_channels.add(channel)
+        self.service._calls.add_channel(leg, channel_id)
+
     def test_that_caller_channel_rings(self):
         self.ari.client.channels.getChannelVar.return_value = {'value': 'pickupmark'}
 
@@ -307,21 +563,18 @@ class DialMobileServiceTestCase(DialerTestCase):
             caller_channel_id, self.origin_channel_id, self.aor
         )
 
-        assert_that(len(self.service._contact_dialers), equal_to(1))
-        bridge_uuid = next(iter(self.service._contact_dialers))
-        dialer = self.service._contact_dialers[bridge_uuid]
+        assert_that(self.service._calls.dialers(), has_length(1))
+        leg = find_leg(self.service, caller_channel_id)
         # Simulate the poller having dialed a channel
-        mock_dialed_channel = Mock()
-        mock_dialed_channel.id = dialed_channel_id
-        dialer._dialed_channels.add(mock_dialed_channel)
-        dialer.stop()
+        self._dialed(leg, dialed_channel_id)
+        find_dialer(self.service, caller_channel_id).stop()
 
         self.service.notify_channel_gone(dialed_channel_id)
 
         self.ari_client.channels.hangup.assert_called_with(
             channelId=caller_channel_id, reason_code=21
         )
-        assert_that(self.service._contact_dialers, equal_to({}))
+        assert_that(self.service._calls.dialers(), empty())
 
     def test_notify_channel_gone_cancels_pstn_timer(self):
         caller_channel_id = '1234567890.42'
@@ -336,19 +589,15 @@ class DialMobileServiceTestCase(DialerTestCase):
             caller_channel_id, self.origin_channel_id, self.aor
         )
 
-        bridge_uuid = next(iter(self.service._contact_dialers))
-        dialer = self.service._contact_dialers[bridge_uuid]
-        mock_dialed_channel = Mock()
-        mock_dialed_channel.id = dialed_channel_id
-        dialer._dialed_channels.add(mock_dialed_channel)
-        dialer.stop()
+        leg = find_leg(self.service, caller_channel_id)
+        self._dialed(leg, dialed_channel_id)
+        find_dialer(self.service, caller_channel_id).stop()
         # PSTN fallback state is keyed by the call's linkedid
         # (origin_call_id), which here is self.origin_channel_id.
         timer = Mock()
         self.service._pstn_fallbacks[self.origin_channel_id] = PSTNFallbackPending(
             call_id=self.origin_channel_id, timer=timer
         )
-        self.service._call_locks[self.origin_channel_id] = threading.RLock()
         # mock cancel_push_mobile so it does NOT cancel the timer — proves
         # notify_channel_gone cancels it independently
         with patch.object(self.service, 'cancel_push_mobile'):
@@ -357,7 +606,10 @@ class DialMobileServiceTestCase(DialerTestCase):
         timer.cancel.assert_called_once()
 
     def test_join_bridge_unknown_future_bridge_will_hangup(self):
-        self.service._origin_call_id_by_bridge_uuid[s.bridge_uuid] = s.call_id
+        call = self.service._calls.add_call(s.call_id)
+        self.service._calls.add_leg(
+            call, s.bridge_uuid, s.caller_channel, 'aor', '', None
+        )
 
         with patch.object(self.service, 'cancel_push_mobile') as push_cancel:
             self.service.join_bridge(s.channel_id, s.bridge_uuid)
@@ -367,9 +619,10 @@ class DialMobileServiceTestCase(DialerTestCase):
 
     def test_join_bridge_caller_gone_will_hangup(self):
         dialer = Mock()
-        self.service._contact_dialers = {s.bridge_uuid: dialer}
-        self.service._caller_channel_leg_by_bridge = {s.bridge_uuid: s.caller_channel}
-        self.service._origin_call_id_by_bridge_uuid[s.bridge_uuid] = s.call_id
+        call = self.service._calls.add_call(s.call_id)
+        self.service._calls.add_leg(
+            call, s.bridge_uuid, s.caller_channel, 'aor', '', dialer
+        )
         self.ari_client.channels.answer.side_effect = ARINotFound(
             self.ari_client, s.error
         )
@@ -390,12 +643,15 @@ class TestCancelPushNotification(TestCase):
         self.amid_client = Mock()
         self.auth_client = Mock()
         self.confd_client = Mock()
+        self.confd_client.users.get.return_value = {'lines': []}
+        self.asyncio = Mock()
         self.service = DialMobileService(
             self.ari,
             self.notifier,
             self.amid_client,
             self.auth_client,
             self.confd_client,
+            self.asyncio,
         )
 
     def _make_notified(self):
@@ -452,8 +708,7 @@ class TestCancelPushNotification(TestCase):
         # Already terminal — no second cancellation dispatched.
         self.notifier.cancel_push_notification.assert_not_called()
 
-    @patch('wazo_calld.plugins.dial_mobile.services.threading.Timer')
-    def test_that_original_payload_is_sent_when_canceling(self, _mock_timer):
+    def test_that_original_payload_is_sent_when_canceling(self):
         self.service.send_push_notification(
             s.tenant_uuid,
             s.user_uuid,
@@ -484,12 +739,14 @@ class TestPSTNFallback(TestCase):
         self.amid_client = Mock()
         self.auth_client = Mock()
         self.confd_client = Mock()
+        self.asyncio = Mock()
         self.service = DialMobileService(
             self.ari,
             self.notifier,
             self.amid_client,
             self.auth_client,
             self.confd_client,
+            self.asyncio,
         )
 
     def _make_notified(self, call_id='call-id', origin_call_id='call-id'):
@@ -516,6 +773,12 @@ class TestPSTNFallback(TestCase):
             },
         )
 
+    def _add_leg(self, dialer=None):
+        call = self.service._calls.add_call('call-id')
+        return self.service._calls.add_leg(
+            call, 'bridge-uuid', 'caller-ch', 'aor', '', dialer
+        )
+
     def _send_push(self, **overrides):
         kwargs = {
             'tenant_uuid': 't-uuid',
@@ -545,8 +808,8 @@ class TestPSTNFallback(TestCase):
 
         assert 'call-linkedid' in self.service._incoming_calls
         assert 'channel-uniqueid' not in self.service._incoming_calls
-        assert 'call-linkedid' in self.service._call_locks
-        assert 'channel-uniqueid' not in self.service._call_locks
+        assert self.service._calls.get_call('call-linkedid')
+        assert not self.service._calls.get_call('channel-uniqueid')
 
     def test_pstn_fallback_state_keyed_by_origin_call_id(self):
         # Same invariant for the PSTN fallback state machine.
@@ -555,8 +818,7 @@ class TestPSTNFallback(TestCase):
             'mobile_phone_number': '+33123456789',
         }
 
-        with patch('wazo_calld.plugins.dial_mobile.services.threading.Timer'):
-            self._send_push(call_id='channel-uniqueid', origin_call_id='call-linkedid')
+        self._send_push(call_id='channel-uniqueid', origin_call_id='call-linkedid')
 
         assert 'call-linkedid' in self.service._pstn_fallbacks
         assert 'channel-uniqueid' not in self.service._pstn_fallbacks
@@ -590,8 +852,7 @@ class TestPSTNFallback(TestCase):
             self.service._incoming_calls['call-linkedid'], IncomingCallReceived
         )
 
-    @patch('wazo_calld.plugins.dial_mobile.services.threading.Timer')
-    def test_pstn_fallback_timer_starts_on_push_notification(self, mock_timer_cls):
+    def test_pstn_fallback_timer_starts_on_push_notification(self):
         self.confd_client.users.get.return_value = {
             'mobile_fallback_enabled': True,
             'mobile_phone_number': '+33123456789',
@@ -599,22 +860,21 @@ class TestPSTNFallback(TestCase):
 
         self._send_push()
 
-        mock_timer_cls.assert_called_once_with(
-            15.0, self.service._pstn_fallback, args=['call-id']
-        )
-        mock_timer_cls.return_value.start.assert_called_once()
-        assert isinstance(
-            self.service._pstn_fallbacks.get('call-id'), PSTNFallbackPending
+        self.asyncio.call_later.assert_called_once_with(
+            15.0, self.service._pstn_fallback, 'call-id'
         )
+        state = self.service._pstn_fallbacks.get('call-id')
+        assert isinstance(state, PSTNFallbackPending)
+        assert state.timer is self.asyncio.call_later.return_value
 
-    @patch('wazo_calld.plugins.dial_mobile.services.threading.Timer')
-    def test_pstn_fallback_timer_uses_configured_min_and_factor(self, mock_timer_cls):
+    def test_pstn_fallback_timer_uses_configured_min_and_factor(self):
         service = DialMobileService(
             self.ari,
             self.notifier,
             self.amid_client,
             self.auth_client,
             self.confd_client,
+            self.asyncio,
             pstn_fallback_min_timeout=1.0,
             pstn_fallback_ring_timeout_factor=0.05,
         )
@@ -637,8 +897,8 @@ class TestPSTNFallback(TestCase):
         )
 
         # max(1.0, 0.05 * 20) == 1.0
-        mock_timer_cls.assert_called_once_with(
-            1.0, service._pstn_fallback, args=['call-id']
+        self.asyncio.call_later.assert_called_once_with(
+            1.0, service._pstn_fallback, 'call-id'
         )
 
     def test_send_push_notification_always_creates_call_lock(self):
@@ -652,7 +912,7 @@ class TestPSTNFallback(TestCase):
 
         self._send_push()
 
-        assert 'call-id' in self.service._call_locks
+        assert self.service._calls.get_call('call-id')
 
     def test_call_lock_reused_across_transitions(self):
         # Reusing the same RLock across transitions is what gives us
@@ -664,12 +924,13 @@ class TestPSTNFallback(TestCase):
             'mobile_phone_number': None,
         }
         self._send_push()
-        first_lock = self.service._call_locks['call-id']
+        first_call = self.service._calls.get_call('call-id')
 
         self._send_push()
-        second_lock = self.service._call_locks['call-id']
+        second_call = self.service._calls.get_call('call-id')
 
-        assert first_lock is second_lock
+        assert first_call and second_call
+        assert first_call.lock is second_call.lock
 
     def test_push_not_sent_when_cancelled_during_eligibility_lookup(self):
         # Race: caller hangs up while send_push_notification has released
@@ -699,8 +960,7 @@ class TestPSTNFallback(TestCase):
             self.service._incoming_calls['call-id'], IncomingCallPushCancelled
         )
 
-    @patch('wazo_calld.plugins.dial_mobile.services.threading.Timer')
-    def test_pstn_fallback_timer_skipped_when_disabled(self, mock_timer_cls):
+    def test_pstn_fallback_timer_skipped_when_disabled(self):
         self.confd_client.users.get.return_value = {
             'mobile_fallback_enabled': False,
             'mobile_phone_number': '+33123456789',
@@ -708,13 +968,12 @@ class TestPSTNFallback(TestCase):
 
         self._send_push()
 
-        mock_timer_cls.assert_not_called()
+        self.asyncio.call_later.assert_not_called()
         assert not isinstance(
             self.service._pstn_fallbacks.get('call-id'), PSTNFallbackPending
         )
 
-    @patch('wazo_calld.plugins.dial_mobile.services.threading.Timer')
-    def test_pstn_fallback_timer_skipped_when_no_mobile_number(self, mock_timer_cls):
+    def test_pstn_fallback_timer_skipped_when_no_mobile_number(self):
         self.confd_client.users.get.return_value = {
             'mobile_fallback_enabled': True,
             'mobile_phone_number': None,
@@ -722,20 +981,19 @@ class TestPSTNFallback(TestCase):
 
         self._send_push()
 
-        mock_timer_cls.assert_not_called()
+        self.asyncio.call_later.assert_not_called()
         assert not isinstance(
             self.service._pstn_fallbacks.get('call-id'), PSTNFallbackPending
         )
 
-    @patch('wazo_calld.plugins.dial_mobile.services.threading.Timer')
-    def test_pstn_fallback_timer_armed_on_confd_error(self, mock_timer_cls):
+    def test_pstn_fallback_timer_armed_on_confd_error(self):
         # If we can't determine eligibility, preserve the existing behavior:
         # arm the timer and let _pstn_fallback handle the re-check.
         self.confd_client.users.get.side_effect = requests.HTTPError()
 
         self._send_push()
 
-        mock_timer_cls.assert_called_once()
+        self.asyncio.call_later.assert_called_once()
         assert isinstance(
             self.service._pstn_fallbacks.get('call-id'), PSTNFallbackPending
         )
@@ -745,7 +1003,7 @@ class TestPSTNFallback(TestCase):
         self.service._pstn_fallbacks['call-id'] = PSTNFallbackPending(
             call_id='call-id', timer=timer
         )
-        self.service._call_locks['call-id'] = threading.RLock()
+        self.service._calls.add_call('call-id')
         self.service._incoming_calls['call-id'] = self._make_notified()
 
         self.service.cancel_push_mobile('call-id')
@@ -767,12 +1025,7 @@ class TestPSTNFallback(TestCase):
         self.service._pstn_fallbacks['call-id'] = PSTNFallbackPending(
             call_id='call-id', timer=timer
         )
-        self.service._call_locks['call-id'] = threading.RLock()
-        self.service._origin_call_id_by_bridge_uuid['bridge-uuid'] = 'call-id'
-
-        dialer = Mock()
-        self.service._contact_dialers['bridge-uuid'] = dialer
-        self.service._caller_channel_leg_by_bridge['bridge-uuid'] = 'caller-ch'
+        self._add_leg(Mock())
 
         self.service.join_bridge('mobile-ch', 'bridge-uuid')
 
@@ -797,8 +1050,7 @@ class TestPSTNFallback(TestCase):
 
     def test_pstn_fallback_noop_when_no_mobile_number(self):
         self.service._incoming_calls['call-id'] = self._make_notified()
-        self.service._bridge_uuid_by_origin_call_id['call-id'] = 'bridge-uuid'
-        self.service._caller_channel_leg_by_bridge['bridge-uuid'] = 'caller-ch'
+        self._add_leg()
         self.confd_client.users.get.return_value = {
             'mobile_fallback_enabled': True,
             'mobile_phone_number': None,
@@ -811,12 +1063,11 @@ class TestPSTNFallback(TestCase):
 
     def test_pstn_fallback_originates_local_channel(self):
         self.service._incoming_calls['call-id'] = self._make_notified()
-        self.service._bridge_uuid_by_origin_call_id['call-id'] = 'bridge-uuid'
-        self.service._caller_channel_leg_by_bridge['bridge-uuid'] = 'caller-ch'
+        self._add_leg()
         self.service._pstn_fallbacks['call-id'] = PSTNFallbackPending(
             call_id='call-id', timer=Mock()
         )
-        self.service._call_locks['call-id'] = threading.RLock()
+        self.service._calls.add_call('call-id')
         self.confd_client.users.get.return_value = {
             'mobile_fallback_enabled': True,
             'mobile_phone_number': '+33123456789',
@@ -835,14 +1086,39 @@ class TestPSTNFallback(TestCase):
             variables={'variables': {'_WAZO_TENANT_UUID': 'tenant-uuid'}},
         )
 
+    def test_pstn_fallback_reuses_the_profile_fetched_for_the_push(self):
+        self.confd_client.users.get.return_value = {
+            'mobile_fallback_enabled': True,
+            'mobile_phone_number': '+33123456789',
+            'lines': [{'id': 42}],
+        }
+        self.confd_client.lines.get.return_value = {'context': 'my-outbound-context'}
+        self._add_leg()
+        self._send_push()
+
+        self.service._pstn_fallback('call-id')
+
+        self.confd_client.users.get.assert_called_once_with(
+            'u-uuid', tenant_uuid='t-uuid'
+        )
+        self.confd_client.lines.get.assert_called_once_with(42, tenant_uuid='t-uuid')
+        self.ari_client.channels.originate.assert_called_once()
+        assert_that(
+            self.ari_client.channels.originate.call_args.kwargs['endpoint'],
+            equal_to('Local/+33123456789@my-outbound-context'),
+        )
+
     def test_notify_contact_available_kicks_matching_dialers(self):
         dialer_a = Mock()
         dialer_b = Mock()
         dialer_other = Mock()
-        self.service._dialers_by_aor = {
-            'aor-a': {dialer_a, dialer_b},
-            'aor-b': {dialer_other},
-        }
+        for call_id, aor, dialer in (
+            ('call-a', 'aor-a', dialer_a),
+            ('call-b', 'aor-a', dialer_b),
+            ('call-c', 'aor-b', dialer_other),
+        ):
+            call = self.service._calls.add_call(call_id)
+            self.service._calls.add_leg(call, call_id, 'caller-ch', aor, '', dialer)
 
         self.service.notify_contact_available('aor-a')
 
@@ -861,20 +1137,18 @@ class TestPSTNFallback(TestCase):
 
         self.service.dial_all_contacts('caller-ch', 'call-id', 'my-aor')
 
-        bridge_uuid = next(iter(self.service._contact_dialers))
-        dialer = self.service._contact_dialers[bridge_uuid]
-        assert dialer in self.service._dialers_by_aor['my-aor']
+        dialer = find_dialer(self.service, 'caller-ch')
+        assert dialer in self.service._calls.dialers_by_aor('my-aor')
         # Cleanup
         dialer.stop()
 
     def test_pstn_fallback_records_originated_channel_id(self):
         self.service._incoming_calls['call-id'] = self._make_notified()
-        self.service._bridge_uuid_by_origin_call_id['call-id'] = 'bridge-uuid'
-        self.service._caller_channel_leg_by_bridge['bridge-uuid'] = 'caller-ch'
+        self._add_leg()
         self.service._pstn_fallbacks['call-id'] = PSTNFallbackPending(
             call_id='call-id', timer=Mock()
         )
-        self.service._call_locks['call-id'] = threading.RLock()
+        self.service._calls.add_call('call-id')
         self.confd_client.users.get.return_value = {
             'mobile_fallback_enabled': True,
             'mobile_phone_number': '+33123456789',
@@ -896,7 +1170,7 @@ class TestPSTNFallback(TestCase):
             call_id='call-id',
             channel_id='pstn-channel-id',
         )
-        self.service._call_locks['call-id'] = threading.RLock()
+        self.service._calls.add_call('call-id')
 
         self.service._cancel_pstn_fallback('call-id')
 
@@ -912,7 +1186,7 @@ class TestPSTNFallback(TestCase):
             call_id='call-id',
             channel_id='pstn-channel-id',
         )
-        self.service._call_locks['call-id'] = threading.RLock()
+        self.service._calls.add_call('call-id')
         self.ari_client.channels.hangup.side_effect = ARINotFound(
             self.ari_client, s.error
         )
@@ -924,9 +1198,9 @@ class TestPSTNFallback(TestCase):
         )
 
     def test_cancel_pstn_fallback_asserts_when_state_present_without_lock(self):
-        # Invariant: _pstn_fallbacks[call_id] and _call_locks[call_id] share
+        # Invariant: _pstn_fallbacks[call_id] and the registered call share
         # their lifetime (always pruned together in _prune_call_state). If
-        # the lock is missing but a fallback state is present, that's a bug
+        # the call is missing but a fallback state is present, that's a bug
         # that would otherwise leak a ringing PSTN channel.
         self.service._pstn_fallbacks['call-id'] = PSTNFallbackDialing(
             call_id='call-id',
@@ -942,12 +1216,7 @@ class TestPSTNFallback(TestCase):
             call_id='call-id',
             channel_id='pstn-channel-id',
         )
-        self.service._call_locks['call-id'] = threading.RLock()
-        self.service._origin_call_id_by_bridge_uuid['bridge-uuid'] = 'call-id'
-
-        dialer = Mock()
-        self.service._contact_dialers['bridge-uuid'] = dialer
-        self.service._caller_channel_leg_by_bridge['bridge-uuid'] = 'caller-ch'
+        self._add_leg(Mock())
 
         self.service.join_bridge('answering-ch', 'bridge-uuid')
 
@@ -961,12 +1230,7 @@ class TestPSTNFallback(TestCase):
             call_id='call-id',
             channel_id='pstn-channel-id',
         )
-        self.service._call_locks['call-id'] = threading.RLock()
-        self.service._origin_call_id_by_bridge_uuid['bridge-uuid'] = 'call-id'
-
-        dialer = Mock()
-        self.service._contact_dialers['bridge-uuid'] = dialer
-        self.service._caller_channel_leg_by_bridge['bridge-uuid'] = 'caller-ch'
+        self._add_leg(Mock())
 
         self.service.join_bridge('pstn-channel-id', 'bridge-uuid')
         # PSTN channel must not be hung up
@@ -983,16 +1247,14 @@ class TestPSTNFallback(TestCase):
             call_id='call-id',
             channel_id='pstn-channel-id',
         )
-        self.service._call_locks['call-id'] = threading.RLock()
+        self.service._calls.add_call('call-id')
 
         self.ari.client.channels.getChannelVar.return_value = {'value': 'pickupmark'}
         self.ari.client.channels.get.return_value = Mock(
             json={'caller': {'name': 'Test', 'number': '1001'}}
         )
         self.service.dial_all_contacts(caller_channel_id, 'call-id', 'aor')
-        bridge_uuid = next(iter(self.service._contact_dialers))
-        dialer = self.service._contact_dialers[bridge_uuid]
-        dialer.stop()
+        find_dialer(self.service, caller_channel_id).stop()
 
         with patch.object(self.service, 'cancel_push_mobile'):
             self.service.notify_channel_gone(caller_channel_id)
@@ -1006,7 +1268,7 @@ class TestPSTNFallback(TestCase):
         self.service._pstn_fallbacks['call-id'] = PSTNFallbackPending(
             call_id='call-id', timer=timer
         )
-        self.service._call_locks['call-id'] = threading.RLock()
+        self.service._calls.add_call('call-id')
 
         self.ari.client.channels.getChannelVar.return_value = {'value': 'pickupmark'}
         self.ari.client.channels.get.return_value = Mock(
@@ -1014,11 +1276,12 @@ class TestPSTNFallback(TestCase):
         )
         self.service.dial_all_contacts('caller-ch', 'call-id', 'aor')
 
-        bridge_uuid = next(iter(self.service._contact_dialers))
-        dialer = self.service._contact_dialers[bridge_uuid]
+        dialer = find_dialer(self.service, 'caller-ch')
         dialer.stop()
         # Simulate the polling thread finding a contact and dialing it.
-        dialer._send_contact_to_current_call('sip:contact', bridge_uuid, 'caller-id')
+        dialer._send_contact_to_current_call(
+            'sip:contact', dialer.future_bridge_uuid, 'caller-id'
+        )
 
         timer.cancel.assert_called_once()
 
@@ -1026,12 +1289,11 @@ class TestPSTNFallback(TestCase):
         # Populate the state needed for _pstn_fallback to reach the commit
         # lock without short-circuiting.
         self.service._incoming_calls['call-id'] = self._make_notified()
-        self.service._bridge_uuid_by_origin_call_id['call-id'] = 'bridge-uuid'
-        self.service._caller_channel_leg_by_bridge['bridge-uuid'] = 'caller-ch'
+        self._add_leg()
         self.service._pstn_fallbacks['call-id'] = PSTNFallbackPending(
             call_id='call-id', timer=Mock()
         )
-        self.service._call_locks['call-id'] = threading.RLock()
+        self.service._calls.add_call('call-id')
         self.confd_client.users.get.return_value = {
             'mobile_fallback_enabled': True,
             'mobile_phone_number': '+33123456789',
@@ -1094,20 +1356,16 @@ class TestPSTNFallback(TestCase):
     def test_join_bridge_prunes_call_state(self):
         # Successful bridge creation should clean up per-call mapping dicts
         # so they don't grow unbounded.
-        self.service._origin_call_id_by_bridge_uuid['bridge-uuid'] = 'call-id'
-        self.service._bridge_uuid_by_origin_call_id['call-id'] = 'bridge-uuid'
+        self._add_leg(Mock())
         self.service._call_ring_time['call-id'] = 30
         self.service._incoming_calls['call-id'] = self._make_notified().received()
-        dialer = Mock()
-        self.service._contact_dialers['bridge-uuid'] = dialer
-        self.service._caller_channel_leg_by_bridge['bridge-uuid'] = 'caller-ch'
 
         self.service.join_bridge('mobile-ch', 'bridge-uuid')
 
-        assert 'bridge-uuid' not in self.service._origin_call_id_by_bridge_uuid
-        assert 'call-id' not in self.service._bridge_uuid_by_origin_call_id
+        assert_that(self.service._calls, has_length(0))
+        assert not self.service._calls.find_leg_by_bridge('bridge-uuid')
+        assert not self.service._calls.find_leg_by_channel('caller-ch')
         assert 'call-id' not in self.service._call_ring_time
-        assert 'bridge-uuid' not in self.service._caller_channel_leg_by_bridge
         assert 'call-id' not in self.service._incoming_calls
 
     def test_has_a_registered_mobile_and_pending_push_false_on_terminal_state(
@@ -1141,21 +1399,23 @@ class TestPSTNFallback(TestCase):
         )
 
         self.service.dial_all_contacts(caller_channel_id, 'call-id', 'aor')
-        bridge_uuid = next(iter(self.service._contact_dialers))
-        assert 'call-id' in self.service._bridge_uuid_by_origin_call_id
+        leg = find_leg(self.service, caller_channel_id)
+        dialer = find_dialer(self.service, caller_channel_id)
+        assert self.service._calls.get_call('call-id')
 
-        dialer = self.service._contact_dialers[bridge_uuid]
         mock_dialed_channel = Mock()
         mock_dialed_channel.id = dialed_channel_id
         dialer._dialed_channels.add(mock_dialed_channel)
+        self.service._calls.add_channel(leg, dialed_channel_id)
         dialer.stop()
 
         self.service.notify_channel_gone(dialed_channel_id)
 
-        assert bridge_uuid not in self.service._origin_call_id_by_bridge_uuid
-        assert 'call-id' not in self.service._bridge_uuid_by_origin_call_id
+        assert_that(self.service._calls, has_length(0))
+        assert not self.service._calls.find_leg_by_bridge(leg.bridge_uuid)
+        assert not self.service._calls.find_leg_by_channel(caller_channel_id)
+        assert not self.service._calls.find_leg_by_channel(dialed_channel_id)
         assert 'call-id' not in self.service._call_ring_time
-        assert bridge_uuid not in self.service._caller_channel_leg_by_bridge
 
     def test_on_calld_stopping_cancels_pstn_timers(self):
         timer_a = Mock()
@@ -1178,7 +1438,7 @@ class TestPSTNFallback(TestCase):
         self.service._pstn_fallbacks['call-id'] = PSTNFallbackPending(
             call_id='call-id', timer=timer
         )
-        self.service._call_locks['call-id'] = threading.RLock()
+        self.service._calls.add_call('call-id')
 
         self.service._cancel_pstn_fallback('call-id')
 
@@ -1189,8 +1449,7 @@ class TestPSTNFallback(TestCase):
 
     def test_pstn_fallback_noop_when_caller_channel_gone(self):
         self.service._incoming_calls['call-id'] = self._make_notified()
-        self.service._bridge_uuid_by_origin_call_id['call-id'] = 'bridge-uuid'
-        self.service._caller_channel_leg_by_bridge['bridge-uuid'] = 'caller-ch'
+        self._add_leg()
         self.confd_client.users.get.return_value = {
             'mobile_fallback_enabled': True,
             'mobile_phone_number': '+33123456789',
@@ -1221,3 +1480,105 @@ class TestPSTNFallback(TestCase):
         assert isinstance(
             self.service._pstn_fallbacks.get('call-id'), PSTNFallbackCancelled
         )
+
+    def test_notify_channel_gone_keeps_the_other_legs_of_the_call(self):
+        # e.g. a group ringing two mobile users: both legs share the linkedid
+        self.ari.client.channels.getChannelVar.return_value = {'value': ''}
+        self.ari.client.channels.get.return_value = Mock(
+            json={'caller': {'name': 'Test', 'number': '1001'}}
+        )
+        self.service.dial_all_contacts('caller-1', 'call-id', 'aor-1')
+        self.service.dial_all_contacts('caller-2', 'call-id', 'aor-2')
+        other_leg = find_leg(self.service, 'caller-2')
+        other_dialer = find_dialer(self.service, 'caller-2')
+
+        with patch.object(self.service, 'cancel_push_mobile'):
+            self.service.notify_channel_gone('caller-1')
+
+        assert_that(self.service._calls.dialers(), contains_exactly(other_dialer))
+        assert_that(
+            self.service._calls.find_leg_by_channel('caller-2'),
+            same_instance(other_leg),
+        )
+        other_dialer.stop()
+
+    def test_notify_channel_gone_pstn_channel_keeps_the_call(self):
+        leg = self._add_leg(Mock())
+        self.service._calls.add_channel(leg, 'pstn-channel-id')
+        leg.dialer._on_channel_gone.side_effect = _NoSuchChannel
+        self.service._pstn_fallbacks['call-id'] = PSTNFallbackDialing(
+            call_id='call-id',
+            channel_id='pstn-channel-id',
+        )
+
+        self.service.notify_channel_gone('pstn-channel-id')
+
+        assert isinstance(
+            self.service._pstn_fallbacks.get('call-id'), PSTNFallbackCancelled
+        )
+        assert_that(self.service._calls.find_leg_by_channel('pstn-channel-id'), none())
+        assert_that(
+            self.service._calls.find_leg_by_bridge('bridge-uuid'), same_instance(leg)
+        )
+        leg.dialer.stop.assert_not_called()
+
+    def test_push_channel_hangup_removes_calls_that_never_dialed_the_mobile(self):
+        self.confd_client.users.get.return_value = {
+            'mobile_fallback_enabled': True,
+            'mobile_phone_number': '+33123456789',
+        }
+        self._send_push(call_id='push-ch')
+        timer = self.asyncio.call_later.return_value
+
+        self.service.notify_channel_hungup('push-ch')
+
+        timer.cancel.assert_called_once_with()
+        self.notifier.cancel_push_notification.assert_called_once()
+        assert_that(self.service._calls, has_length(0))
+        assert 'call-id' not in self.service._pstn_fallbacks
+        assert 'call-id' not in self.service._incoming_calls
+        assert 'call-id' not in self.service._call_ring_time
+
+    def test_linkedid_channel_hangup_keeps_the_call_ringing_the_mobile(self):
+        # e.g. a blind transfer: the transferer is the origin of the call and
+        # hangs up while the transferred call rings the mobile user
+        self.confd_client.users.get.return_value = {
+            'mobile_fallback_enabled': False,
+            'mobile_phone_number': None,
+        }
+        self._send_push(call_id='push-ch', origin_call_id='call-id')
+        dialer = Mock()
+        leg = self._add_leg(dialer)
+
+        self.service.notify_channel_hungup('call-id')
+        self.service.notify_channel_hungup('push-ch')
+
+        dialer.stop.assert_not_called()
+        self.notifier.cancel_push_notification.assert_not_called()
+        assert_that(
+            self.service._calls.find_leg_by_bridge('bridge-uuid'), same_instance(leg)
+        )
+        assert 'call-id' in self.service._incoming_calls
+
+    def test_call_is_kept_until_its_last_push_channel_hangs_up(self):
+        self.confd_client.users.get.return_value = {
+            'mobile_fallback_enabled': False,
+            'mobile_phone_number': None,
+        }
+        self._send_push(call_id='push-1')
+        self._send_push(call_id='push-2')
+
+        self.service.notify_channel_hungup('push-1')
+
+        assert_that(self.service._calls, has_length(1))
+        self.notifier.cancel_push_notification.assert_not_called()
+
+        self.service.notify_channel_hungup('push-2')
+
+        assert_that(self.service._calls, has_length(0))
+        assert 'call-id' not in self.service._incoming_calls
+
+    def test_notify_channel_hungup_unknown_channel_is_noop(self):
+        self.service.notify_channel_hungup('unknown-channel-id')
+
+        self.notifier.cancel_push_notification.assert_not_called()
@@ -1,7 +1,10 @@
-# Copyright 2019-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
+from functools import partial
+
+from wazo_calld.plugin_helpers.exceptions import CalldUninitializedError
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,7 @@ class EventHandler:
         self._confd_cache = confd_cache
 
     def subscribe(self, consumer):
+        consumer.subscribe('FullyBooted', self.on_asterisk_fully_booted)
         consumer.subscribe('Hangup', self.on_hangup)
         consumer.subscribe('Newchannel', self.on_new_channel)
         consumer.subscribe('PeerStatus', self.on_peer_status)
@@ -65,6 +69,10 @@ class EventHandler:
             'trunk_endpoint_sip_dissociated', self.on_trunk_endpoint_dissociated
         )
 
+    def on_asterisk_fully_booted(self, event):
+        logger.info('Asterisk restarted, resynchronizing endpoint status')
+        self._endpoint_status_cache.resync()
+
     def on_hangup(self, event):
         techno, name = self._techno_name_from_channel(event['Channel'])
         if techno == 'Local':
@@ -106,8 +114,18 @@ class EventHandler:
             except ValueError:
                 return
 
-        trunk = self._confd_cache.get_trunk_by_username(techno, username)
         registered = event['Status'] == 'Registered'
+        try:
+            self._update_registration(techno, username, registered)
+        except CalldUninitializedError:
+            logger.info('trunks not loaded yet, delaying registration of %s', username)
+            self._confd_cache.call_when_initialized(
+                ('registry', techno, username),
+                partial(self._update_registration, techno, username, registered),
+            )
+
+    def _update_registration(self, techno, username, registered):
+        trunk = self._confd_cache.get_trunk_by_username(techno, username)
         if not trunk and not registered:
             # The trunk as already been dissociated from the trunk
             return
@@ -209,7 +227,10 @@ class EventHandler:
         self._confd_cache.delete_line(event['id'])
 
     def on_trunk_endpoint_deleted(self, event):
-        trunk = self._confd_cache.get_trunk_by_id(event['id'])
+        try:
+            trunk = self._confd_cache.get_trunk_by_id(event['id'])
+        except CalldUninitializedError:
+            trunk = None
         self._confd_cache.delete_trunk(event['id'])
         if trunk:
             self._endpoint_status_cache.pop(
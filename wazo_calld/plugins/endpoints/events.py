@@ -0,0 +1,24 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from wazo_bus.resources.common.event import TenantEvent
+
+
+class LinesStatusUpdatedEvent(TenantEvent):
+    service = 'calld'
+    name = 'lines_status_updated'
+    routing_key_fmt = 'lines.status.updated'
+
+    def __init__(self, statuses, tenant_uuid):
+        content = {'items': statuses}
+        super().__init__(content, tenant_uuid)
+
+
+class TrunksStatusUpdatedEvent(TenantEvent):
+    service = 'calld'
+    name = 'trunks_status_updated'
+    routing_key_fmt = 'trunks.status.updated'
+
+    def __init__(self, statuses, tenant_uuid):
+        content = {'items': statuses}
+        super().__init__(content, tenant_uuid)
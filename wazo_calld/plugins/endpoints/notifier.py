@@ -1,9 +1,23 @@
-# Copyright 2019-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import logging
+import threading
+
 from wazo_bus.resources.line.event import LineStatusUpdatedEvent
 from wazo_bus.resources.trunk.event import TrunkStatusUpdatedEvent
 
+from wazo_calld.plugin_helpers.exceptions import CalldUninitializedError
+
+from .events import LinesStatusUpdatedEvent, TrunksStatusUpdatedEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_WINDOW = 0.5
+
+TRUNK = 'trunk'
+LINE = 'line'
+
 
 class EndpointStatusNotifier:
     _asterisk_to_confd_techno_map = {
@@ -15,32 +29,128 @@ class EndpointStatusNotifier:
     def __init__(self, publisher, confd_cache):
         self._publisher = publisher
         self._confd_cache = confd_cache
+        self._lock = threading.Lock()
+        # endpoints updated before the lines and trunks were loaded
+        self._deferred = {}
 
     def endpoint_updated(self, endpoint):
-        techno = self._asterisk_to_confd_techno_map.get(
-            endpoint.techno, endpoint.techno
+        try:
+            kind, confd_endpoint = self._find_confd_endpoint(endpoint)
+        except CalldUninitializedError:
+            return self._defer([endpoint])
+        if confd_endpoint:
+            event = self._status_updated_event(kind, confd_endpoint, endpoint)
+            return self._publisher.publish(event)
+
+    def endpoints_updated(self, endpoints):
+        statuses_by_tenant: dict[str, dict[str, list[dict]]] = {TRUNK: {}, LINE: {}}
+        deferred = []
+        for endpoint in endpoints:
+            try:
+                kind, confd_endpoint = self._find_confd_endpoint(endpoint)
+            except CalldUninitializedError:
+                deferred.append(endpoint)
+                continue
+            if not confd_endpoint:
+                continue
+            event = self._status_updated_event(kind, confd_endpoint, endpoint)
+            self._publisher.publish(event)
+            statuses = statuses_by_tenant[kind].setdefault(
+                confd_endpoint['tenant_uuid'], []
+            )
+            statuses.append(self._status(confd_endpoint, endpoint))
+
+        for tenant_uuid, statuses in statuses_by_tenant[TRUNK].items():
+            self._publisher.publish(TrunksStatusUpdatedEvent(statuses, tenant_uuid))
+        for tenant_uuid, statuses in statuses_by_tenant[LINE].items():
+            self._publisher.publish(LinesStatusUpdatedEvent(statuses, tenant_uuid))
+        if deferred:
+            self._defer(deferred)
+
+    def _defer(self, endpoints):
+        logger.debug(
+            'lines and trunks not loaded yet, delaying the status of %s endpoints',
+            len(endpoints),
+        )
+        with self._lock:
+            for endpoint in endpoints:
+                # the latest state is read when notifying, only the endpoint is kept
+                self._deferred[(endpoint.techno, endpoint.name)] = endpoint
+        self._confd_cache.call_when_initialized(
+            'endpoint_status', self._notify_deferred
         )
 
+    def _notify_deferred(self):
+        with self._lock:
+            deferred, self._deferred = self._deferred, {}
+        if deferred:
+            self.endpoints_updated(list(deferred.values()))
+
+    def _find_confd_endpoint(self, endpoint):
+        '''Raises CalldUninitializedError before the lines and trunks are loaded'''
         trunk = self._confd_cache.get_trunk(endpoint.techno, endpoint.name)
         if trunk:
-            event = TrunkStatusUpdatedEvent(
-                trunk['id'],
-                techno,
-                endpoint.name,
-                endpoint.registered,
-                endpoint.current_call_count,
-                trunk['tenant_uuid'],
-            )
-            return self._publisher.publish(event)
-
+            return TRUNK, trunk
         line = self._confd_cache.get_line(endpoint.techno, endpoint.name)
         if line:
-            event = LineStatusUpdatedEvent(
-                line['id'],
-                techno,
-                endpoint.name,
-                endpoint.registered,
-                endpoint.current_call_count,
-                line['tenant_uuid'],
-            )
-            return self._publisher.publish(event)
+            return LINE, line
+        return None, None
+
+    def _status_updated_event(self, kind, confd_endpoint, endpoint):
+        event_class = (
+            TrunkStatusUpdatedEvent if kind == TRUNK else LineStatusUpdatedEvent
+        )
+        return event_class(
+            confd_endpoint['id'],
+            self._confd_techno(endpoint),
+            endpoint.name,
+            endpoint.registered,
+            endpoint.current_call_count,
+            confd_endpoint['tenant_uuid'],
+        )
+
+    def _status(self, confd_endpoint, endpoint):
+        return {
+            'id': confd_endpoint['id'],
+            'technology': self._confd_techno(endpoint),
+            'name': endpoint.name,
+            'registered': endpoint.registered,
+            'current_call_count': endpoint.current_call_count,
+        }
+
+    def _confd_techno(self, endpoint):
+        return self._asterisk_to_confd_techno_map.get(endpoint.techno, endpoint.techno)
+
+
+class EndpointStatusBatcher:
+    '''
+    Collects the endpoints updated during `window` seconds and notifies them at
+    once, so that a registration storm results in one bus event per endpoint
+    and one bulk event per tenant, instead of one event per status change.
+    '''
+
+    def __init__(self, notifier, asyncio, window=DEFAULT_BATCH_WINDOW):
+        self._notifier = notifier
+        self._asyncio = asyncio
+        self._window = window
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+
+    def endpoint_updated(self, endpoint):
+        with self._lock:
+            # the latest state is read when flushing, only the endpoint is kept
+            self._pending[(endpoint.techno, endpoint.name)] = endpoint
+            if self._timer is None:
+                self._timer = self._asyncio.call_later(self._window, self.flush)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            timer, self._timer = self._timer, None
+        if timer:
+            timer.cancel()
+        if not pending:
+            return
+        logger.debug('notifying status of %s endpoints', len(pending))
+        self._notifier.endpoints_updated(list(pending.values()))
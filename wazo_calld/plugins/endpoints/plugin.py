@@ -1,4 +1,4 @@
-# Copyright 2019-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from __future__ import annotations
@@ -11,27 +11,42 @@ from wazo_calld.types import PluginDependencies, StatusDict
 
 from .bus import EventHandler
 from .http import LineEndpoints, TrunkEndpoints
-from .notifier import EndpointStatusNotifier
-from .services import ConfdCache, EndpointsService, NotifyingStatusCache
+from .notifier import EndpointStatusBatcher, EndpointStatusNotifier
+from .services import (
+    ConfdCache,
+    ConfdCacheSynchronizer,
+    EndpointsService,
+    NotifyingStatusCache,
+)
 
 
 class Plugin:
     def load(self, dependencies: PluginDependencies) -> None:
         api = dependencies['api']
         ari = dependencies['ari']
+        asyncio = dependencies['asyncio']
         config = dependencies['config']
         status_aggregator = dependencies['status_aggregator']
         token_changed_subscribe = dependencies['token_changed_subscribe']
+        next_token_changed_subscribe = dependencies['next_token_changed_subscribe']
         bus_consumer = dependencies['bus_consumer']
         bus_publisher = dependencies['bus_publisher']
+        pubsub = dependencies['pubsub']
 
         confd_client = ConfdClient(**config['confd'])
         token_changed_subscribe(confd_client.set_token)
 
         confd_cache = ConfdCache(confd_client)
+        self._confd_cache = confd_cache
+        synchronizer = ConfdCacheSynchronizer(confd_cache, asyncio)
+        next_token_changed_subscribe(lambda _: synchronizer.start())
+        pubsub.subscribe('stopping', lambda _: synchronizer.stop())
+
         notifier = EndpointStatusNotifier(bus_publisher, confd_cache)
+        batcher = EndpointStatusBatcher(notifier, asyncio)
+        pubsub.subscribe('stopping', lambda _: batcher.flush())
 
-        status_cache = NotifyingStatusCache(notifier.endpoint_updated, ari.client)
+        status_cache = NotifyingStatusCache(batcher.endpoint_updated, ari.client)
         endpoints_service = EndpointsService(confd_cache, status_cache)
 
         self._async_tasks_completed = False
@@ -65,5 +80,6 @@ class Plugin:
         self._async_tasks_completed = True
 
     def _provide_status(self, status: StatusDict) -> None:
-        value = Status.ok if self._async_tasks_completed else Status.fail
+        ready = self._async_tasks_completed and self._confd_cache.ready
+        value = Status.ok if ready else Status.fail
         status['plugins']['endpoints']['status'] = value
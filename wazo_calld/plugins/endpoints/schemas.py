@@ -1,8 +1,11 @@
-# Copyright 2019-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from xivo.mallow.validate import OneOf, Range
 from xivo.mallow_helpers import Schema, fields
 
+VALID_ENDPOINT_ORDER = ('id', 'name', 'technology')
+
 
 class EndpointBaseSchema(Schema):
     id = fields.Integer()
@@ -21,5 +24,14 @@ class TrunkEndpointSchema(EndpointBaseSchema):
     pass
 
 
+class EndpointListRequestSchema(Schema):
+    limit = fields.Integer(validate=Range(min=0), load_default=None)
+    offset = fields.Integer(validate=Range(min=0), load_default=0)
+    order = fields.String(validate=OneOf(VALID_ENDPOINT_ORDER), load_default='id')
+    direction = fields.String(validate=OneOf(('asc', 'desc')), load_default='asc')
+    search = fields.String(load_default=None)
+
+
+endpoint_list_request_schema = EndpointListRequestSchema()
 trunk_endpoint_schema = TrunkEndpointSchema()
 line_endpoint_schema = LineEndpointSchema()
@@ -1,7 +1,6 @@
-# Copyright 2019-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-import copy
 import logging
 import threading
 from contextlib import contextmanager
@@ -10,19 +9,44 @@ from wazo_calld.plugin_helpers.exceptions import CalldUninitializedError
 
 logger = logging.getLogger(__name__)
 
+CONFD_RESYNC_INTERVAL = 3600
+CONFD_RETRY_DELAY = 10
+
 
 class Endpoint:
     def __init__(self, techno, name, registered, channel_ids):
         self.techno = techno
         self.name = name
-        self.registered = registered
+        self._registered = registered
         self._channel_ids = set(channel_ids)
+        # incremented on every change of the registration or call count
+        self.version = 0
+
+    @property
+    def registered(self):
+        return self._registered
+
+    @registered.setter
+    def registered(self, registered):
+        if registered != self._registered:
+            self._registered = registered
+            self.version += 1
 
     def add_call(self, channel_id):
-        self._channel_ids.add(channel_id)
+        if channel_id not in self._channel_ids:
+            self._channel_ids.add(channel_id)
+            self.version += 1
 
     def remove_call(self, channel_id):
-        self._channel_ids.discard(channel_id)
+        if channel_id in self._channel_ids:
+            self._channel_ids.remove(channel_id)
+            self.version += 1
+
+    def update_from(self, other):
+        self.registered = other.registered
+        if other._channel_ids != self._channel_ids:
+            self._channel_ids = set(other._channel_ids)
+            self.version += 1
 
     @property
     def current_call_count(self):
@@ -122,7 +146,7 @@ class NotifyingStatusCache(StatusCache):
     @contextmanager
     def update(self, techno, name):
         endpoint = self.get(techno, name)
-        before = copy.deepcopy(endpoint)
+        version = endpoint.version if endpoint else None
         try:
             yield endpoint
         except Exception:
@@ -133,9 +157,91 @@ class NotifyingStatusCache(StatusCache):
             else:
                 raise
         else:
-            if endpoint != before:
+            if endpoint and endpoint.version != version:
                 self._notify_fn(endpoint)
 
+    def resync(self):
+        logger.debug('resynchronizing endpoint status...')
+        seen = set()
+        for ari_endpoint in self._ari.endpoints.list():
+            fresh = Endpoint.from_ari_endpoint_list(ari_endpoint.json)
+            seen.add((fresh.techno, fresh.name))
+            if not self.get(fresh.techno, fresh.name):
+                self.add_endpoint(fresh)
+                self._notify_fn(fresh)
+                continue
+            with self.update(fresh.techno, fresh.name) as endpoint:
+                endpoint.update_from(fresh)
+
+        gone = [
+            (techno, name)
+            for techno, endpoints in self._endpoints.items()
+            for name in endpoints
+            if (techno, name) not in seen
+        ]
+        for techno, name in gone:
+            logger.debug('endpoint %s/%s is gone, removing its status', techno, name)
+            endpoint = self.pop(techno, name)
+            endpoint.update_from(Endpoint(techno, name, False, []))
+            self._notify_fn(endpoint)
+
+
+class _ConfdEndpointIndex:
+    '''
+    Lines or trunks from wazo-confd, indexed by technology and identifier
+    (name or username), by ID and by tenant.
+    '''
+
+    def __init__(self):
+        self._by_techno = {}
+        self._by_id = {}
+        self._by_tenant = {}
+        self._keys_by_id = {}
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def add(self, techno, value, identifiers):
+        endpoint_id = value['id']
+        previous = self._by_id.get(endpoint_id)
+        if previous and previous['tenant_uuid'] != value['tenant_uuid']:
+            self._remove_from_tenant(previous)
+
+        keys = self._keys_by_id.setdefault(endpoint_id, [])
+        indexes = self._by_techno.setdefault(techno, {})
+        for index, identifier in identifiers.items():
+            indexes.setdefault(index, {})[identifier] = value
+            keys.append((techno, index, identifier))
+
+        self._by_id[endpoint_id] = value
+        self._by_tenant.setdefault(value['tenant_uuid'], {})[endpoint_id] = value
+
+    def delete(self, endpoint_id):
+        value = self._by_id.pop(endpoint_id, None)
+        if value:
+            self._remove_from_tenant(value)
+
+        for techno, index, identifier in self._keys_by_id.pop(endpoint_id, []):
+            identifiers = self._by_techno[techno][index]
+            indexed = identifiers.get(identifier)
+            if indexed and indexed['id'] == endpoint_id:
+                del identifiers[identifier]
+
+    def get(self, techno, index, identifier):
+        return self._by_techno.get(techno, {}).get(index, {}).get(identifier)
+
+    def get_by_id(self, endpoint_id):
+        return self._by_id.get(endpoint_id)
+
+    def list_by_tenant(self, tenant_uuid):
+        return list(self._by_tenant.get(tenant_uuid, {}).values())
+
+    def _remove_from_tenant(self, value):
+        tenant_endpoints = self._by_tenant.get(value['tenant_uuid'], {})
+        tenant_endpoints.pop(value['id'], None)
+        if not tenant_endpoints:
+            self._by_tenant.pop(value['tenant_uuid'], None)
+
 
 class ConfdCache:
     _asterisk_to_confd_techno_map = {
@@ -146,61 +252,30 @@ class ConfdCache:
 
     def __init__(self, confd_client):
         self._confd = confd_client
-        self._trunks = {}
-        self._lines = {}
+        self._trunks = _ConfdEndpointIndex()
+        self._lines = _ConfdEndpointIndex()
         self._initialized = False
-        self._initialization_lock = threading.Lock()
+        self._lock = threading.Lock()
+        # changes received while the cache is being reloaded from wazo-confd
+        self._pending_changes = None
+        # callbacks waiting for the first load, by key
+        self._deferred = {}
+
+    @property
+    def ready(self):
+        return self._initialized
 
     def add_line(self, techno, line_id, name, username, tenant_uuid):
-        value = {
-            'id': line_id,
-            'technology': techno,
-            'name': name,
-            'tenant_uuid': tenant_uuid,
-        }
-        self._lines.setdefault(techno, {'name': {}, 'username': {}})
-        self._lines[techno]['name'][name] = value
-        if username:
-            self._lines[techno].setdefault('username', {})
-            self._lines[techno]['username'][username] = value
+        self._apply(_add_line, techno, line_id, name, username, tenant_uuid)
 
     def add_trunk(self, techno, trunk_id, name, username, tenant_uuid):
-        value = {
-            'id': trunk_id,
-            'technology': techno,
-            'name': name,
-            'tenant_uuid': tenant_uuid,
-        }
-        self._trunks.setdefault(techno, {'id': {}, 'name': {}, 'username': {}})
-        self._trunks[techno]['name'][name] = value
-        self._trunks[techno]['id'][trunk_id] = value
-        if username:
-            self._trunks[techno].setdefault('username', {})
-            self._trunks[techno]['username'][username] = value
+        self._apply(_add_trunk, techno, trunk_id, name, username, tenant_uuid)
 
     def delete_line(self, line_id):
-        to_remove = []
-
-        for techno, items in self._lines.items():
-            for index, items in items.items():
-                for identifier, line in items.items():
-                    if line['id'] == line_id:
-                        to_remove.append((techno, index, identifier))
-
-        for techno, index, identifier in to_remove:
-            del self._lines[techno][index][identifier]
+        self._apply(_delete_line, line_id)
 
     def delete_trunk(self, trunk_id):
-        to_remove = []
-
-        for techno, items in self._trunks.items():
-            for index, items in items.items():
-                for identifier, trunk in items.items():
-                    if trunk['id'] == trunk_id:
-                        to_remove.append((techno, index, identifier))
-
-        for techno, index, identifier in to_remove:
-            del self._trunks[techno][index][identifier]
+        self._apply(_delete_trunk, trunk_id)
 
     def get_line(self, techno, name):
         return self._get_endpoint_by_index(techno, name, self._lines, index='name')
@@ -209,12 +284,8 @@ class ConfdCache:
         return self._get_endpoint_by_index(techno, name, self._trunks, index='name')
 
     def get_trunk_by_id(self, trunk_id):
-        for techno in self._trunks.keys():
-            if trunk := self._get_endpoint_by_index(
-                techno, trunk_id, self._trunks, index='id'
-            ):
-                return trunk
-        return None
+        self._check_initialized()
+        return self._trunks.get_by_id(trunk_id)
 
     def get_trunk_by_username(self, techno, username):
         return self._get_endpoint_by_index(
@@ -222,59 +293,92 @@ class ConfdCache:
         )
 
     def list_lines(self, tenant_uuid):
-        if not self._initialized:
-            self._initialize()
-
-        results = []
-        for index_lines in self._lines.values():
-            for line in index_lines['name'].values():
-                if line['tenant_uuid'] != tenant_uuid:
-                    continue
-                results.append(line)
-        return results
+        self._check_initialized()
+        return self._lines.list_by_tenant(tenant_uuid)
 
     def list_trunks(self, tenant_uuid):
-        if not self._initialized:
-            self._initialize()
-
-        results = []
-        for index_trunks in self._trunks.values():
-            for trunk in index_trunks['name'].values():
-                if trunk['tenant_uuid'] != tenant_uuid:
-                    continue
-                results.append(trunk)
-        return results
+        self._check_initialized()
+        return self._trunks.list_by_tenant(tenant_uuid)
+
+    def call_when_initialized(self, key, callback):
+        '''
+        Call `callback` now if the cache is loaded, or after its first load.
+        A deferred callback replaces the previous one deferred with the same key.
+        '''
+        with self._lock:
+            if not self._initialized:
+                self._deferred[key] = callback
+                return
+        callback()
 
     def update_line(self, techno, line_id, name, username, tenant_uuid):
-        self.delete_line(line_id)
-        self.add_line(techno, line_id, name, username, tenant_uuid)
+        with self._lock:
+            self._apply_locked(_delete_line, line_id)
+            self._apply_locked(_add_line, techno, line_id, name, username, tenant_uuid)
 
     def update_trunk(self, techno, trunk_id, name, username, tenant_uuid):
-        self.delete_trunk(trunk_id)
-        self.add_trunk(techno, trunk_id, name, username, tenant_uuid)
-
-    def _get_endpoint_by_index(self, techno, value, endpoints, index):
-        if not self._initialized:
-            self._initialize()
-
-        confd_techno = self._asterisk_to_confd_techno_map.get(techno, techno)
-        return endpoints.get(confd_techno, {index: {}})[index].get(value, None)
-
-    def _initialize(self):
-        with self._initialization_lock:
-            # The initialization migh have happened while we were waiting on the lock
-            if self._initialized:
-                return
+        with self._lock:
+            self._apply_locked(_delete_trunk, trunk_id)
+            self._apply_locked(
+                _add_trunk, techno, trunk_id, name, username, tenant_uuid
+            )
 
+    def initialize(self):
+        '''
+        (Re)load all lines and trunks from wazo-confd. Changes received from
+        the bus during the reload are applied again on the new content.
+        '''
+        with self._lock:
+            self._pending_changes = []
+        try:
             trunks = self._confd.trunks.list(recurse=True)['items']
-            self._update_trunk_cache(trunks)
-
             lines = self._confd.lines.list(recurse=True)['items']
-            self._update_line_cache(lines)
-
+        except Exception:
+            with self._lock:
+                self._pending_changes = None
+            raise
+
+        trunk_index = self._build_trunk_index(trunks)
+        line_index = self._build_line_index(lines)
+        with self._lock:
+            for change, args in self._pending_changes:
+                change(trunk_index, line_index, *args)
+            self._pending_changes = None
+            self._trunks, self._lines = trunk_index, line_index
             self._initialized = True
+            deferred, self._deferred = self._deferred, {}
+
+        logger.info(
+            'confd cache updated: %s trunks, %s lines',
+            len(trunk_index),
+            len(line_index),
+        )
+        for callback in deferred.values():
+            try:
+                callback()
+            except Exception:
+                logger.exception('error while applying a deferred endpoint change')
+
+    def _apply(self, change, *args):
+        with self._lock:
+            self._apply_locked(change, *args)
+
+    def _apply_locked(self, change, *args):
+        change(self._trunks, self._lines, *args)
+        if self._pending_changes is not None:
+            self._pending_changes.append((change, args))
+
+    def _check_initialized(self):
+        if not self._initialized:
+            raise CalldUninitializedError()
+
+    def _get_endpoint_by_index(self, techno, value, endpoints, index):
+        self._check_initialized()
+        confd_techno = self._asterisk_to_confd_techno_map.get(techno, techno)
+        return endpoints.get(confd_techno, index, value)
 
-    def _update_line_cache(self, lines):
+    def _build_line_index(self, lines):
+        index = _ConfdEndpointIndex()
         for line in lines:
             techno = line['protocol']
             name = line['name']
@@ -284,17 +388,12 @@ class ConfdCache:
                 'name': name,
                 'tenant_uuid': line['tenant_uuid'],
             }
+            index.add(techno, value, {'name': name})
+        return index
 
-            self._lines.setdefault(techno, {'name': {}})
-            self._lines[techno]['name'][name] = value
-
-        logger.info(
-            'line cache updated %s entries',
-            sum(len(names) for names in self._lines.values()),
-        )
-
-    def _update_trunk_cache(self, trunks):
-        def update(trunk):
+    def _build_trunk_index(self, trunks):
+        index = _ConfdEndpointIndex()
+        for trunk in trunks:
             if trunk.get('endpoint_sip'):
                 techno = 'sip'
                 name = trunk['endpoint_sip']['name']
@@ -317,7 +416,7 @@ class ConfdCache:
                     'ignoring trunk %s which is not associated to an endpoint',
                     trunk['id'],
                 )
-                return
+                continue
 
             value = {
                 'id': trunk['id'],
@@ -325,19 +424,95 @@ class ConfdCache:
                 'name': name,
                 'tenant_uuid': trunk['tenant_uuid'],
             }
+            index.add(techno, value, {'name': name, 'username': username})
+        return index
 
-            self._trunks.setdefault(techno, {'id': {}, 'name': {}, 'username': {}})
-            self._trunks[techno]['name'][name] = value
-            self._trunks[techno]['id'][trunk['id']] = value
-            self._trunks[techno]['username'][username] = value
 
-        for trunk in trunks:
-            update(trunk)
+def _endpoint_value(techno, endpoint_id, name, tenant_uuid):
+    return {
+        'id': endpoint_id,
+        'technology': techno,
+        'name': name,
+        'tenant_uuid': tenant_uuid,
+    }
 
-        logger.info(
-            'trunk cache updated %s entries',
-            sum(len(names) for names in self._trunks.values()),
-        )
+
+def _identifiers(name, username):
+    identifiers = {'name': name}
+    if username:
+        identifiers['username'] = username
+    return identifiers
+
+
+def _add_line(trunks, lines, techno, line_id, name, username, tenant_uuid):
+    value = _endpoint_value(techno, line_id, name, tenant_uuid)
+    lines.add(techno, value, _identifiers(name, username))
+
+
+def _add_trunk(trunks, lines, techno, trunk_id, name, username, tenant_uuid):
+    value = _endpoint_value(techno, trunk_id, name, tenant_uuid)
+    trunks.add(techno, value, _identifiers(name, username))
+
+
+def _delete_line(trunks, lines, line_id):
+    lines.delete(line_id)
+
+
+def _delete_trunk(trunks, lines, trunk_id):
+    trunks.delete(trunk_id)
+
+
+class ConfdCacheSynchronizer:
+    '''
+    Loads the confd cache in the background, retrying until wazo-confd
+    answers, then reloads it periodically in case bus events were missed.
+    '''
+
+    def __init__(
+        self,
+        confd_cache,
+        asyncio,
+        interval=CONFD_RESYNC_INTERVAL,
+        retry_delay=CONFD_RETRY_DELAY,
+    ):
+        self._confd_cache = confd_cache
+        self._asyncio = asyncio
+        self._interval = interval
+        self._retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._timer = None
+        self._stopped = False
+
+    def start(self):
+        self._schedule(0)
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            if self._timer:
+                self._timer.cancel()
+
+    def synchronize(self):
+        try:
+            self._confd_cache.initialize()
+        except Exception as e:
+            logger.warning(
+                'failed to load lines and trunks from wazo-confd, '
+                'retrying in %s seconds: %s',
+                self._retry_delay,
+                e,
+            )
+            self._schedule(self._retry_delay)
+        else:
+            self._schedule(self._interval)
+
+    def _schedule(self, delay):
+        with self._lock:
+            if self._stopped:
+                return
+            if self._timer:
+                self._timer.cancel()
+            self._timer = self._asyncio.call_later(delay, self.synchronize)
 
 
 class EndpointsService:
@@ -350,17 +525,54 @@ class EndpointsService:
         self._confd = confd_cache
         self.status_cache = status_cache
 
-    def list_lines(self, tenant_uuid):
+    def list_lines(self, tenant_uuid, **list_params):
         confd_endpoints = self._confd.list_lines(tenant_uuid)
-        return self._list_endpoints(confd_endpoints)
+        return self._list_endpoints(confd_endpoints, **list_params)
 
-    def list_trunks(self, tenant_uuid):
+    def list_trunks(self, tenant_uuid, **list_params):
         confd_endpoints = self._confd.list_trunks(tenant_uuid)
-        return self._list_endpoints(confd_endpoints)
+        return self._list_endpoints(confd_endpoints, **list_params)
+
+    def _list_endpoints(
+        self,
+        confd_endpoints,
+        search=None,
+        order='id',
+        direction='asc',
+        limit=None,
+        offset=0,
+    ):
+        total = len(confd_endpoints)
+        if search:
+            search = search.lower()
+            confd_endpoints = [
+                confd_endpoint
+                for confd_endpoint in confd_endpoints
+                if search in (confd_endpoint['name'] or '').lower()
+                or search in (confd_endpoint['technology'] or '').lower()
+            ]
+        filtered = len(confd_endpoints)
+
+        # lines without an endpoint have no name nor technology, they come last
+        without_value = []
+        with_value = []
+        for confd_endpoint in confd_endpoints:
+            if confd_endpoint[order] is None:
+                without_value.append(confd_endpoint)
+            else:
+                with_value.append(confd_endpoint)
+        confd_endpoints = sorted(
+            with_value,
+            key=lambda confd_endpoint: confd_endpoint[order],
+            reverse=direction == 'desc',
+        )
+        confd_endpoints.extend(without_value)
+        end = offset + limit if limit is not None else None
+        page = confd_endpoints[offset:end]
 
-    def _list_endpoints(self, confd_endpoints):
+        # the status is only looked up for the requested page
         results = []
-        for confd_endpoint in confd_endpoints:
+        for confd_endpoint in page:
             endpoint = dict(confd_endpoint)
             ast_techno = self._techno_map.get(
                 endpoint['technology'], endpoint['technology']
@@ -371,5 +583,4 @@ class EndpointsService:
                 endpoint['current_call_count'] = ast_endpoint.current_call_count
             results.append(endpoint)
 
-        count = len(results)
-        return results, count, count
+        return results, total, filtered
@@ -1,15 +1,33 @@
 # Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import logging
+import time
 from contextlib import contextmanager
 from unittest import TestCase
 from unittest.mock import Mock
 from unittest.mock import sentinel as s
 
-from hamcrest import assert_that, calling, has_properties, not_, raises
+from hamcrest import (
+    assert_that,
+    calling,
+    equal_to,
+    has_length,
+    has_properties,
+    not_,
+    raises,
+)
+
+from wazo_calld.plugin_helpers.exceptions import CalldUninitializedError
 
 from ..bus import EventHandler
-from ..services import ConfdCache, Endpoint, StatusCache
+from ..notifier import EndpointStatusBatcher, EndpointStatusNotifier
+from ..services import ConfdCache, Endpoint, NotifyingStatusCache, StatusCache
+
+logger = logging.getLogger(__name__)
+
+NB_ENDPOINTS = 10000
+NB_TENANTS = 10
 
 
 class TestBusEvent(TestCase):
@@ -100,6 +118,38 @@ class TestBusEvent(TestCase):
             not_(raises(Exception)),
         )
 
+    def test_on_trunk_registering_before_the_cache_is_loaded(self):
+        self.confd_cache.get_trunk_by_username.side_effect = CalldUninitializedError
+        event = {
+            'ChannelType': 'PJSIP',
+            'Event': 'Registry',
+            'Status': 'Registered',
+            'Username': 'sip:dev_370@gateway.example.com',
+        }
+
+        self.handler.on_registry(event)
+
+        self.endpoint_status_cache.assert_not_called()
+        key, replay = self.confd_cache.call_when_initialized.call_args.args
+        assert_that(key, equal_to(('registry', 'PJSIP', event['Username'])))
+
+        self.confd_cache.get_trunk_by_username.side_effect = None
+        self.confd_cache.get_trunk_by_username.return_value = {'name': 'foobar'}
+        replay()
+
+        assert_that(
+            self.updated_endpoint,
+            has_properties(techno='PJSIP', name='foobar', registered=True),
+        )
+
+    def test_on_asterisk_fully_booted(self):
+        status_cache = Mock(NotifyingStatusCache)
+        handler = EventHandler(status_cache, self.confd_cache)
+
+        handler.on_asterisk_fully_booted({})
+
+        status_cache.resync.assert_called_once_with()
+
     def test_on_peer_status_pjsip_registering(self):
         event = {
             'Event': 'PeerStatus',
@@ -655,3 +705,51 @@ class TestBusEvent(TestCase):
             None,
             s.tenant_uuid,
         )
+
+
+class TestPeerStatusStorm(TestCase):
+    def setUp(self):
+        self.publisher = Mock()
+        self.asyncio = Mock()
+        self.confd_cache = Mock(ConfdCache)
+        self.confd_cache.get_trunk.return_value = None
+        self.confd_cache.get_line.side_effect = self._get_line
+        notifier = EndpointStatusNotifier(self.publisher, self.confd_cache)
+        self.batcher = EndpointStatusBatcher(notifier, self.asyncio)
+        self.status_cache = NotifyingStatusCache(self.batcher.endpoint_updated, Mock())
+        for i in range(NB_ENDPOINTS):
+            self.status_cache.add_endpoint(Endpoint('PJSIP', f'line-{i}', False, []))
+        self.handler = EventHandler(self.status_cache, self.confd_cache)
+
+    def _get_line(self, techno, name):
+        line_id = int(name.split('-')[1])
+        return {'id': line_id, 'tenant_uuid': f'tenant-{line_id % NB_TENANTS}'}
+
+    def replay(self, status):
+        start = time.perf_counter()
+        for i in range(NB_ENDPOINTS):
+            self.handler.on_peer_status(
+                {'Peer': f'PJSIP/line-{i}', 'PeerStatus': status}
+            )
+        self.batcher.flush()
+        elapsed = time.perf_counter() - start
+        logger.info('replayed %s PeerStatus events in %.3fs', NB_ENDPOINTS, elapsed)
+
+    def test_registration_storm(self):
+        self.replay('Reachable')
+
+        self.asyncio.call_later.assert_called_once()
+        # one event per line and one bulk event per tenant
+        assert_that(
+            self.publisher.publish.call_args_list,
+            has_length(NB_ENDPOINTS + NB_TENANTS),
+        )
+
+    def test_repeated_registration_storm_is_not_notified(self):
+        self.replay('Reachable')
+        self.publisher.reset_mock()
+
+        self.replay('Reachable')
+
+        self.publisher.publish.assert_not_called()
+        assert_that(self.status_cache.get('PJSIP', 'line-0').registered, equal_to(True))
@@ -1,11 +1,22 @@
-# Copyright 2019-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 from unittest.mock import sentinel as s
 
+from hamcrest import (
+    assert_that,
+    contains_inanyorder,
+    equal_to,
+    has_entries,
+    has_length,
+)
+
+from wazo_calld.plugin_helpers.exceptions import CalldUninitializedError
+
 from ..notifier import (
+    EndpointStatusBatcher,
     EndpointStatusNotifier,
     LineStatusUpdatedEvent,
     TrunkStatusUpdatedEvent,
@@ -53,3 +64,98 @@ class TestEndpointStatusNotifier(TestCase):
         self.publisher.publish.assert_called_once_with(
             LineStatusUpdatedEvent(s.line_id, 'sccp', s.name, True, 3, s.tenant_uuid)
         )
+
+    def test_updates_before_the_confd_cache_is_loaded_are_deferred(self):
+        self.confd_cache.get_trunk.side_effect = CalldUninitializedError
+        endpoint_1 = Endpoint('PJSIP', 'one', False, [])
+        endpoint_2 = Endpoint('PJSIP', 'two', True, [])
+
+        self.notifier.endpoints_updated([endpoint_1])
+        self.notifier.endpoint_updated(endpoint_2)
+        endpoint_1.registered = True
+
+        self.publisher.publish.assert_not_called()
+        key, notify = self.confd_cache.call_when_initialized.call_args.args
+        assert_that(key, equal_to('endpoint_status'))
+
+        self.confd_cache.get_trunk.side_effect = None
+        self.confd_cache.get_trunk.return_value = {'id': 1, 'tenant_uuid': 't1'}
+        with patch(
+            'wazo_calld.plugins.endpoints.notifier.TrunksStatusUpdatedEvent'
+        ) as bulk_event:
+            notify()
+
+        (statuses, tenant_uuid) = bulk_event.call_args.args
+        assert_that(
+            statuses,
+            contains_inanyorder(
+                has_entries(name='one', registered=True),
+                has_entries(name='two', registered=True),
+            ),
+        )
+
+    def test_endpoints_updated_sends_one_bulk_event_per_tenant(self):
+        lines = {
+            'l1': {'id': 1, 'tenant_uuid': 't1'},
+            'l2': {'id': 2, 'tenant_uuid': 't1'},
+            'l3': {'id': 3, 'tenant_uuid': 't2'},
+        }
+        self.confd_cache.get_trunk.return_value = None
+        self.confd_cache.get_line.side_effect = lambda techno, name: lines.get(name)
+        endpoints = [
+            Endpoint('PJSIP', name, True, []) for name in ('l1', 'l2', 'l3', 'other')
+        ]
+
+        with patch(
+            'wazo_calld.plugins.endpoints.notifier.LinesStatusUpdatedEvent'
+        ) as bulk_event:
+            self.notifier.endpoints_updated(endpoints)
+
+        assert_that(self.publisher.publish.call_count, equal_to(3 + 2))
+        (statuses, tenant_uuid) = bulk_event.call_args_list[0].args
+        assert_that(tenant_uuid, equal_to('t1'))
+        assert_that(statuses, has_length(2))
+        assert_that(
+            statuses[0],
+            has_entries(id=1, technology='sip', name='l1', registered=True),
+        )
+        assert_that(statuses[1], has_entries(id=2, current_call_count=0))
+        (statuses, tenant_uuid) = bulk_event.call_args_list[1].args
+        assert_that(tenant_uuid, equal_to('t2'))
+
+
+class TestEndpointStatusBatcher(TestCase):
+    def setUp(self):
+        self.notifier = Mock(EndpointStatusNotifier)
+        self.asyncio = Mock()
+        self.batcher = EndpointStatusBatcher(self.notifier, self.asyncio, window=1)
+
+    def test_updates_are_coalesced_until_flush(self):
+        endpoint_1 = Endpoint('PJSIP', 'one', True, [])
+        endpoint_2 = Endpoint('PJSIP', 'two', True, [])
+
+        self.batcher.endpoint_updated(endpoint_1)
+        self.batcher.endpoint_updated(endpoint_2)
+        self.batcher.endpoint_updated(endpoint_1)
+
+        self.notifier.endpoints_updated.assert_not_called()
+        self.asyncio.call_later.assert_called_once_with(1, self.batcher.flush)
+
+        self.batcher.flush()
+
+        self.notifier.endpoints_updated.assert_called_once_with(
+            [endpoint_1, endpoint_2]
+        )
+
+    def test_a_new_timer_is_armed_after_flush(self):
+        self.batcher.endpoint_updated(Endpoint('PJSIP', 'one', True, []))
+        self.batcher.flush()
+
+        self.batcher.endpoint_updated(Endpoint('PJSIP', 'one', False, []))
+
+        assert_that(self.asyncio.call_later.call_count, equal_to(2))
+
+    def test_flush_without_updates(self):
+        self.batcher.flush()
+
+        self.notifier.endpoints_updated.assert_not_called()
@@ -1,4 +1,4 @@
-# Copyright 2019-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from unittest import TestCase
@@ -7,14 +7,26 @@ from unittest.mock import sentinel as s
 
 from hamcrest import (
     assert_that,
+    calling,
+    contains_exactly,
     contains_inanyorder,
     equal_to,
     has_entries,
     has_properties,
+    none,
     not_,
+    raises,
 )
 
-from ..services import ConfdCache, Endpoint, EndpointsService, NotifyingStatusCache
+from wazo_calld.plugin_helpers.exceptions import CalldUninitializedError
+
+from ..services import (
+    ConfdCache,
+    ConfdCacheSynchronizer,
+    Endpoint,
+    EndpointsService,
+    NotifyingStatusCache,
+)
 
 
 class TestEndpointService(TestCase):
@@ -104,6 +116,75 @@ class TestEndpointService(TestCase):
             ),
         )
 
+    def test_list_lines_paginated(self):
+        self.confd_cache.list_lines.return_value = [
+            {'id': i, 'technology': 'sip', 'name': f'line-{i}', 'tenant_uuid': 't'}
+            for i in range(10)
+        ]
+        self.status_cache.add_endpoint(Endpoint('PJSIP', 'line-7', True, [123]))
+        self.status_cache.add_endpoint(Endpoint('PJSIP', 'line-1', True, [123]))
+
+        items, total, filtered = self.service.list_lines(
+            't', order='name', direction='desc', limit=2, offset=2
+        )
+
+        assert_that(total, equal_to(10))
+        assert_that(filtered, equal_to(10))
+        assert_that(
+            items,
+            contains_exactly(
+                has_entries(id=7, registered=True, current_call_count=1),
+                has_entries(id=6),
+            ),
+        )
+
+    def test_list_trunks_search(self):
+        self.confd_cache.list_trunks.return_value = [
+            {'id': 1, 'technology': 'sip', 'name': 'provider-a', 'tenant_uuid': 't'},
+            {'id': 2, 'technology': 'iax', 'name': 'Provider-B', 'tenant_uuid': 't'},
+            {'id': 3, 'technology': 'sip', 'name': 'backup', 'tenant_uuid': 't'},
+        ]
+
+        items, total, filtered = self.service.list_trunks('t', search='provider')
+
+        assert_that(total, equal_to(3))
+        assert_that(filtered, equal_to(2))
+        assert_that(items, contains_exactly(has_entries(id=1), has_entries(id=2)))
+
+    def test_list_lines_without_endpoint(self):
+        self.confd_cache.list_lines.return_value = [
+            {'id': 1, 'technology': 'sip', 'name': 'line-b', 'tenant_uuid': 't'},
+            {'id': 2, 'technology': None, 'name': None, 'tenant_uuid': 't'},
+            {'id': 3, 'technology': 'sccp', 'name': 'line-a', 'tenant_uuid': 't'},
+        ]
+
+        for order in ('name', 'technology'):
+            items, _, _ = self.service.list_lines('t', order=order)
+            assert_that(items[-1], has_entries(id=2))
+
+        items, _, _ = self.service.list_lines('t', order='name', direction='desc')
+        assert_that(
+            items,
+            contains_exactly(has_entries(id=1), has_entries(id=3), has_entries(id=2)),
+        )
+
+        items, total, filtered = self.service.list_lines('t', search='sccp')
+        assert_that(total, equal_to(3))
+        assert_that(filtered, equal_to(1))
+        assert_that(items, contains_exactly(has_entries(id=3)))
+
+    def test_list_lines_does_not_look_up_the_status_outside_the_page(self):
+        self.confd_cache.list_lines.return_value = [
+            {'id': i, 'technology': 'sip', 'name': f'line-{i}', 'tenant_uuid': 't'}
+            for i in range(10)
+        ]
+        self.service.status_cache = Mock(NotifyingStatusCache)
+        self.service.status_cache.get.return_value = None
+
+        self.service.list_lines('t', limit=3)
+
+        assert_that(self.service.status_cache.get.call_count, equal_to(3))
+
 
 class TestCachingConfdClient(TestCase):
     def setUp(self):
@@ -421,6 +502,7 @@ class TestCachingConfdClient(TestCase):
             ],
         }
 
+        self.client.initialize()
         result = self.client.list_lines(s.tenant_uuid)
 
         assert_that(
@@ -447,13 +529,152 @@ class TestCachingConfdClient(TestCase):
             ),
         )
 
+    def test_list_lines_after_tenant_change(self):
+        self._set_cache([])
+        self.client.add_line('sip', 1, 'line-1', None, 'tenant-1')
+
+        self.client.update_line('sip', 1, 'line-1', None, 'tenant-2')
+
+        assert_that(self.client.list_lines('tenant-1'), equal_to([]))
+        assert_that(
+            self.client.list_lines('tenant-2'), contains_exactly(has_entries(id=1))
+        )
+
+    def test_delete_line_keeps_another_line_with_the_same_name(self):
+        self._set_cache([])
+        self.client.add_line('sip', 1, 'line', None, 'tenant')
+        self.client.add_line('sip', 2, 'line', None, 'tenant')
+
+        self.client.delete_line(1)
+
+        assert_that(self.client.get_line('sip', 'line'), has_entries(id=2))
+        assert_that(
+            self.client.list_lines('tenant'), contains_exactly(has_entries(id=2))
+        )
+
+    def test_get_trunk_by_id(self):
+        self._set_cache([])
+        self.client.add_trunk('sip', 1, 'trunk', 'username', 'tenant')
+
+        assert_that(self.client.get_trunk_by_id(1), has_entries(name='trunk'))
+        assert_that(self.client.get_trunk_by_id(2), equal_to(None))
+
+    def test_not_initialized(self):
+        assert_that(self.client.ready, equal_to(False))
+        assert_that(
+            calling(self.client.list_lines).with_args(s.tenant_uuid),
+            raises(CalldUninitializedError),
+        )
+        assert_that(
+            calling(self.client.get_trunk).with_args('sip', s.name),
+            raises(CalldUninitializedError),
+        )
+
+    def test_initialize_failure_keeps_the_cache_uninitialized(self):
+        self.confd.trunks.list.side_effect = Exception('confd unreachable')
+
+        assert_that(calling(self.client.initialize), raises(Exception))
+
+        assert_that(self.client.ready, equal_to(False))
+
+    def test_changes_received_during_initialize_are_replayed(self):
+        def list_lines(**kwargs):
+            self.client.add_line('sip', 2, 'new', None, s.tenant_uuid)
+            self.client.delete_line(1)
+            return {'items': [a_confd_line(1, 'old'), a_confd_line(3, 'other')]}
+
+        self.confd.trunks.list.return_value = {'items': []}
+        self.confd.lines.list.side_effect = list_lines
+
+        self.client.initialize()
+
+        assert_that(
+            self.client.list_lines(s.tenant_uuid),
+            contains_inanyorder(has_entries(id=2), has_entries(id=3)),
+        )
+
+    def test_callbacks_are_deferred_until_the_first_load(self):
+        first, replaced, other = Mock(), Mock(), Mock()
+        self.client.call_when_initialized('key', first)
+        self.client.call_when_initialized('key', replaced)
+        self.client.call_when_initialized('other', other)
+
+        replaced.assert_not_called()
+        self._set_cache()
+
+        first.assert_not_called()
+        replaced.assert_called_once_with()
+        other.assert_called_once_with()
+
+        self._set_cache()
+        self.client.call_when_initialized('key', first)
+
+        replaced.assert_called_once_with()
+        first.assert_called_once_with()
+
+    def test_reinitialize_replaces_the_content(self):
+        self._set_cache(lines=[a_confd_line(1, 'old')])
+
+        self._set_cache(lines=[a_confd_line(2, 'new')])
+
+        assert_that(self.client.get_line('sip', 'old'), equal_to(None))
+        assert_that(self.client.get_line('sip', 'new'), has_entries(id=2))
+
     def _set_cache(self, trunks=None, lines=None):
-        if trunks:
-            self.client._update_trunk_cache(trunks)
-        if lines:
-            self.client._update_line_cache(lines)
+        self.confd.trunks.list.return_value = {'items': trunks or []}
+        self.confd.lines.list.return_value = {'items': lines or []}
+        self.client.initialize()
+
+
+def a_confd_line(line_id, name):
+    return {
+        'id': line_id,
+        'protocol': 'sip',
+        'name': name,
+        'tenant_uuid': s.tenant_uuid,
+    }
+
+
+class TestConfdCacheSynchronizer(TestCase):
+    def setUp(self):
+        self.confd_cache = Mock()
+        self.asyncio = Mock()
+        self.synchronizer = ConfdCacheSynchronizer(
+            self.confd_cache, self.asyncio, interval=60, retry_delay=5
+        )
+
+    def test_start(self):
+        self.synchronizer.start()
+
+        self.asyncio.call_later.assert_called_once_with(
+            0, self.synchronizer.synchronize
+        )
+
+    def test_synchronize_reschedules_after_the_interval(self):
+        self.synchronizer.synchronize()
+
+        self.confd_cache.initialize.assert_called_once_with()
+        self.asyncio.call_later.assert_called_once_with(
+            60, self.synchronizer.synchronize
+        )
 
-        self.client._initialized = True
+    def test_synchronize_retries_on_failure(self):
+        self.confd_cache.initialize.side_effect = Exception('confd unreachable')
+
+        self.synchronizer.synchronize()
+
+        self.asyncio.call_later.assert_called_once_with(
+            5, self.synchronizer.synchronize
+        )
+
+    def test_stop(self):
+        self.synchronizer.start()
+
+        self.synchronizer.stop()
+        self.synchronizer.synchronize()
+
+        self.asyncio.call_later.return_value.cancel.assert_called_once_with()
+        assert_that(self.asyncio.call_later.call_count, equal_to(1))
 
 
 class TestEndpoint(TestCase):
@@ -541,6 +762,19 @@ class TestEndpoint(TestCase):
         endpoint.remove_call(s.unique_id_2)
         assert_that(endpoint.current_call_count, equal_to(0))
 
+    def test_version_changes_only_with_the_state(self):
+        endpoint = Endpoint(s.techno, s.name, True, [s.unique_id_1])
+
+        endpoint.registered = True
+        endpoint.add_call(s.unique_id_1)
+        endpoint.remove_call(s.unique_id_2)
+        assert_that(endpoint.version, equal_to(0))
+
+        endpoint.registered = False
+        endpoint.add_call(s.unique_id_2)
+        endpoint.remove_call(s.unique_id_1)
+        assert_that(endpoint.version, equal_to(3))
+
     def test_eq(self):
         assert_that(
             Endpoint(s.techno, s.name, True, []),
@@ -596,3 +830,43 @@ class TestNotifyingStatusCache(TestCase):
         with self.cache.update(s.not_found, s.name) as e:
             assert_that(e, equal_to(None))
             e.add_call(s.unique_id_1)
+
+    def test_resync_notifies_changed_endpoints_only(self):
+        unchanged = Endpoint(s.techno, s.unchanged, True, [])
+        self.cache.add_endpoint(unchanged)
+        self.ari.endpoints.list.return_value = [
+            an_ari_endpoint(s.techno, s.name, s.registered, [s.unique_id_1]),
+            an_ari_endpoint(s.techno, s.unchanged, True, []),
+            an_ari_endpoint(s.techno, s.new, False, []),
+        ]
+
+        self.cache.resync()
+
+        assert_that(
+            [call.args[0].name for call in self.notify.call_args_list],
+            contains_inanyorder(s.name, s.new),
+        )
+        assert_that(self.endpoint.current_call_count, equal_to(1))
+        assert_that(self.cache.get(s.techno, s.new), has_properties(registered=False))
+
+    def test_resync_removes_endpoints_gone_from_asterisk(self):
+        self.ari.endpoints.list.return_value = []
+
+        self.cache.resync()
+
+        assert_that(self.cache.get(s.techno, s.name), none())
+        self.notify.assert_called_once_with(self.endpoint)
+        assert_that(
+            self.endpoint, has_properties(registered=False, current_call_count=0)
+        )
+
+
+def an_ari_endpoint(techno, name, registered, channel_ids):
+    endpoint = Mock()
+    endpoint.json = {
+        'technology': techno,
+        'resource': name,
+        'state': 'online' if registered else 'offline',
+        'channel_ids': channel_ids,
+    }
+    return endpoint
@@ -1,4 +1,4 @@
-# Copyright 2021-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2021-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
@@ -56,7 +56,7 @@ class MeetingsBusEventHandler:
 
         participant = participant_schema.load(raw_participant)
 
-        participants_already_present = self._service.list_participants(
+        participants_already_present = self._service.participants_present(
             meeting.tenant_uuid, meeting_uuid
         )
 
@@ -95,7 +95,7 @@ class MeetingsBusEventHandler:
 
         participant = participant_schema.load(raw_participant)
 
-        participants_already_present = self._service.list_participants(
+        participants_already_present = self._service.participants_present(
             meeting.tenant_uuid, meeting_uuid
         )
 
@@ -1,4 +1,4 @@
-# Copyright 2021-2023 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2021-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 CONFBRIDGE_NAME_PREFIX = 'wazo-meeting-'
@@ -36,3 +36,11 @@ class AsteriskMeeting:
             raise InvalidMeetingConfbridgeName(confbridge_name)
 
         return cls(uuid)
+
+
+def is_meeting_confbridge_name(confbridge_name):
+    try:
+        AsteriskMeeting.from_confbridge_name(confbridge_name)
+    except InvalidMeetingConfbridgeName:
+        return False
+    return True
@@ -1,4 +1,4 @@
-# Copyright 2021-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2021-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from __future__ import annotations
@@ -6,6 +6,7 @@ from __future__ import annotations
 from wazo_amid_client import Client as AmidClient
 from wazo_confd_client import Client as ConfdClient
 
+from wazo_calld.plugin_helpers.confbridge import ConfbridgeRosters
 from wazo_calld.types import PluginDependencies
 
 from .bus_consume import MeetingsBusEventHandler
@@ -16,6 +17,7 @@ from .http import (
     MeetingParticipantsUserResource,
     MeetingStatusGuestResource,
 )
+from .meeting import is_meeting_confbridge_name
 from .notifier import MeetingsNotifier
 from .services import MeetingsService
 
@@ -35,8 +37,13 @@ class Plugin:
         token_changed_subscribe(amid_client.set_token)
         token_changed_subscribe(confd_client.set_token)
 
+        rosters = ConfbridgeRosters(
+            amid_client, ari.client, accepts=is_meeting_confbridge_name
+        )
+        # subscribed first, the participants are up to date when notifying
+        rosters.subscribe(bus_consumer)
         meetings_service = MeetingsService(
-            amid_client, ari.client, confd_client, config
+            amid_client, ari.client, confd_client, config, rosters
         )
         notifier = MeetingsNotifier(bus_publisher)
         bus_event_handler = MeetingsBusEventHandler(
@@ -1,4 +1,4 @@
-# Copyright 2021-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2021-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
@@ -23,11 +23,12 @@ logger = logging.getLogger(__name__)
 
 
 class MeetingsService:
-    def __init__(self, amid, ari, confd, config):
+    def __init__(self, amid, ari, confd, config, rosters):
         self._amid = amid
         self._ari = ari
         self._confd = confd
         self._max_participants = config['max_meeting_participants']
+        self._rosters = rosters
 
     def get_status(self, meeting_uuid):
         tenant_uuid = None
@@ -37,28 +38,16 @@ class MeetingsService:
             raise NoSuchMeeting(tenant_uuid, meeting_uuid)
 
         try:
-            participant_list = self._amid.action(
-                'ConfBridgeList',
-                {'Conference': meeting.asterisk_name()},
+            participant_count = self._rosters.count_participants(
+                meeting.asterisk_name()
             )
-            participant_count = (
-                len(participant_list) - 2
-            )  # 1 event for the success and on for the list complete
         except AmidProtocolError as e:
-            if e.message in [
-                'No active conferences.',
-                'No Conference by that name found.',
-            ]:
-                participant_count = 0
-            else:
-                raise MeetingParticipantError(
-                    tenant_uuid,
-                    meeting_uuid,
-                    participant_id=None,
-                    message=e.message,
-                )
-        except RequestException as e:
-            raise WazoAmidError(self._amid, e)
+            raise MeetingParticipantError(
+                tenant_uuid,
+                meeting_uuid,
+                participant_id=None,
+                message=e.message,
+            )
 
         return {'full': participant_count >= self._max_participants}
 
@@ -68,40 +57,29 @@ class MeetingsService:
         if not meeting.exists():
             raise NoSuchMeeting(tenant_uuid, meeting_uuid)
 
+        return self.participants_present(tenant_uuid, meeting_uuid)
+
+    def participants_present(self, tenant_uuid, meeting_uuid):
+        '''Same as list_participants, for a meeting known to exist'''
+        meeting = Meeting(tenant_uuid, meeting_uuid)
         try:
-            participant_list = self._amid.action(
-                'ConfBridgeList',
-                {'Conference': meeting.asterisk_name()},
-            )
+            participant_list = self._rosters.list_participants(meeting.asterisk_name())
         except AmidProtocolError as e:
-            if e.message in [
-                'No active conferences.',
-                'No Conference by that name found.',
-            ]:
-                return []
             raise MeetingParticipantError(
                 tenant_uuid,
                 meeting_uuid,
                 participant_id=None,
                 message=e.message,
             )
-        except RequestException as e:
-            raise WazoAmidError(self._amid, e)
 
         result = []
-        del participant_list[0]
         for participant_list_item in participant_list:
-            if participant_list_item['Event'] != 'ConfbridgeList':
-                continue
-
             raw_participant = {
-                'id': participant_list_item['Uniqueid'],
-                'caller_id_name': participant_list_item['CallerIDName'],
-                'caller_id_number': participant_list_item['CallerIDNum'],
-                'call_id': participant_list_item['Uniqueid'],
-                'user_uuid': Channel(
-                    participant_list_item['Uniqueid'], self._ari
-                ).user(),
+                'id': participant_list_item.id,
+                'caller_id_name': participant_list_item.caller_id_name,
+                'caller_id_number': participant_list_item.caller_id_number,
+                'call_id': participant_list_item.id,
+                'user_uuid': participant_list_item.user_uuid,
             }
             try:
                 participant = participant_schema.load(raw_participant)
@@ -1,9 +1,12 @@
-# Copyright 2024 The Wazo Authors (see the AUTHORS file)
+# Copyright 2024-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from __future__ import annotations
 
+import heapq
 import logging
+from collections.abc import Callable
+from itertools import count
 from threading import Lock
 from time import monotonic_ns
 from typing import TypedDict
@@ -19,6 +22,8 @@ from .exceptions import NoSuchParking
 
 logger = logging.getLogger(__name__)
 
+INVALID_ID_TTL = 10
+
 
 def to_nsec(seconds: int) -> int:
     return seconds * 1_000_000_000
@@ -32,55 +37,166 @@ class _TTLEntry:
     hits: int
     expiration: int
 
-    def __init__(self, ttl: int = 10):
+    def __init__(self, now: int, ttl: int = INVALID_ID_TTL):
         self.hits = 0
-        self.expiration = monotonic_ns() + to_nsec(ttl)
+        self.expiration = now + to_nsec(ttl)
 
-    def refresh(self, ttl: int = 10):
+    def refresh(self, now: int, ttl: int = INVALID_ID_TTL):
         self.hits += 1
-        self.expiration = monotonic_ns() + to_nsec(ttl)
+        self.expiration = now + to_nsec(ttl)
         return self
 
 
 class ParkingLotCache:
-    def __init__(self, bus: BusConsumer, confd: ConfdClient):
+    '''
+    Parking lots from wazo-confd, by ID and by tenant.
+
+    All parking lots are listed once when the cache is first used. Created
+    and edited parking lots are fetched again when they are next needed.
+    Unknown IDs are remembered for INVALID_ID_TTL seconds after their last
+    lookup, and expire in order of expiration.
+    '''
+
+    def __init__(
+        self,
+        bus: BusConsumer,
+        confd: ConfdClient,
+        clock: Callable[[], int] = monotonic_ns,
+    ):
         self._cache: dict[int, ConfdParkingLot] = {}
+        self._by_tenant: dict[str, dict[int, ConfdParkingLot]] = {}
+        self._stale_ids: set[int] = set()
         self._invalid_ids: dict[int, _TTLEntry] = {}
+        self._expirations: list[tuple[int, int, int, _TTLEntry]] = []
+        self._sequence = count()
+        self._loaded = False
+        self._changed_while_loading: set[int] | None = None
+        self._clock = clock
         self._confd = confd
         self._lock = Lock()
+        # only one request lists the parking lots, the others wait for it
+        self._load_lock = Lock()
         self._subscribe(bus)
 
     def __getitem__(self, parking_id: int) -> ConfdParkingLot:
-        self.evict_expired()
+        self._ensure_loaded()
 
-        if parking_id in self._invalid_ids:
-            with self._lock:
-                self._invalid_ids[parking_id].refresh()
-            raise NoSuchParking(parking_id)
+        with self._lock:
+            now = self._clock()
+            self._evict_expired(now)
+            if entry := self._invalid_ids.get(parking_id):
+                entry.refresh(now)
+                raise NoSuchParking(parking_id)
+
+            if parking_id not in self._stale_ids:
+                if parking := self._cache.get(parking_id):
+                    return parking
+
+        return self._fetch_parking_lot(parking_id)
 
-        if parking_id not in self._cache:
+    def list_by_tenant(self, tenant_uuid: str) -> list[ConfdParkingLot]:
+        self._ensure_loaded()
+
+        with self._lock:
+            stale_ids = list(self._stale_ids)
+        for parking_id in stale_ids:
             try:
-                return self._fetch_parking_lot(parking_id)
-            except Exception:
-                with self._lock:
-                    self._invalid_ids[parking_id] = _TTLEntry(10)
-                raise
-
-        return self._cache[parking_id]
-
-    def evict_expired(self):
-        now = monotonic_ns()
-        for index in list(self._invalid_ids.keys()):
-            if now >= self._invalid_ids[index].expiration:
-                logger.debug('evicted expired id from cache: %d', index)
-                with self._lock:
-                    del self._invalid_ids[index]
+                self._fetch_parking_lot(parking_id)
+            except NoSuchParking:
+                pass
+
+        with self._lock:
+            parkings = self._by_tenant.get(tenant_uuid, {})
+            return sorted(parkings.values(), key=lambda parking: parking.id)
+
+    def evict_expired(self) -> None:
+        with self._lock:
+            self._evict_expired(self._clock())
 
     def invalidate(self, key: int) -> None:
         logger.debug('invalidating parking: %s', key)
         with self._lock:
             self._invalid_ids.pop(key, None)
-            self._cache.pop(key, None)
+            self._remove(key)
+            if self._loaded:
+                self._stale_ids.add(key)
+            if self._changed_while_loading is not None:
+                self._changed_while_loading.add(key)
+
+    def delete(self, key: int) -> None:
+        logger.debug('deleting parking: %s', key)
+        with self._lock:
+            self._invalid_ids.pop(key, None)
+            self._remove(key)
+            self._stale_ids.discard(key)
+            if self._changed_while_loading is not None:
+                self._changed_while_loading.add(key)
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+
+        with self._load_lock:
+            if not self._loaded:
+                self._load()
+
+    def _load(self) -> None:
+        # This function must be called with self._load_lock held
+        logger.debug('listing parking lots from confd')
+        with self._lock:
+            self._changed_while_loading = set()
+        try:
+            result = self._confd.parking_lots.list(recurse=True)
+        except RequestException as e:
+            with self._lock:
+                self._changed_while_loading = None
+            raise WazoConfdUnreachable(self._confd, e)
+
+        parkings = [ConfdParkingLot.from_dict(item) for item in result['items']]
+        with self._lock:
+            changed = self._changed_while_loading or set()
+            self._changed_while_loading = None
+            for parking in parkings:
+                if parking.id not in changed:
+                    self._add(parking)
+            self._stale_ids.update(changed)
+            self._loaded = True
+        logger.debug('listed %d parking lots from confd', len(parkings))
+
+    def _evict_expired(self, now: int) -> None:
+        # This function must be called with self._lock held
+        while self._expirations and self._expirations[0][0] <= now:
+            _, _, index, entry = heapq.heappop(self._expirations)
+            if self._invalid_ids.get(index) is not entry:
+                continue
+            if entry.expiration > now:
+                # refreshed since it was scheduled
+                self._schedule_expiration(index, entry)
+                continue
+            logger.debug('evicted expired id from cache: %d', index)
+            del self._invalid_ids[index]
+
+    def _schedule_expiration(self, index: int, entry: _TTLEntry) -> None:
+        # This function must be called with self._lock held
+        heapq.heappush(
+            self._expirations, (entry.expiration, next(self._sequence), index, entry)
+        )
+
+    def _add(self, parking: ConfdParkingLot) -> None:
+        # This function must be called with self._lock held
+        self._remove(parking.id)
+        self._cache[parking.id] = parking
+        self._by_tenant.setdefault(parking.tenant_uuid, {})[parking.id] = parking
+
+    def _remove(self, parking_id: int) -> None:
+        # This function must be called with self._lock held
+        parking = self._cache.pop(parking_id, None)
+        if parking is None:
+            return
+        tenant_parkings = self._by_tenant.get(parking.tenant_uuid, {})
+        tenant_parkings.pop(parking_id, None)
+        if not tenant_parkings:
+            self._by_tenant.pop(parking.tenant_uuid, None)
 
     def _fetch_parking_lot(self, parking_id: int) -> ConfdParkingLot:
         logger.debug('fetching parking_lot from confd: %d', parking_id)
@@ -88,6 +204,7 @@ class ParkingLotCache:
             result = self._confd.parking_lots.get(parking_id)
         except HTTPError as e:
             if e.response.status_code == 404:
+                self._set_invalid(parking_id)
                 raise NoSuchParking(parking_id)
             raise
         except RequestException as e:
@@ -95,10 +212,19 @@ class ParkingLotCache:
         else:
             parking = ConfdParkingLot.from_dict(result)
             with self._lock:
-                self._cache[parking.id] = parking
+                self._stale_ids.discard(parking_id)
+                self._add(parking)
 
             return parking
 
+    def _set_invalid(self, parking_id: int) -> None:
+        with self._lock:
+            self._stale_ids.discard(parking_id)
+            self._remove(parking_id)
+            entry = _TTLEntry(self._clock())
+            self._invalid_ids[parking_id] = entry
+            self._schedule_expiration(parking_id, entry)
+
     def _on_parking_created(self, payload: _ParkinglotEventPayload) -> None:
         self.invalidate(payload['id'])
 
@@ -106,7 +232,7 @@ class ParkingLotCache:
         self.invalidate(payload['id'])
 
     def _on_parking_deleted(self, payload: _ParkinglotEventPayload) -> None:
-        self.invalidate(payload['id'])
+        self.delete(payload['id'])
 
     def _subscribe(self, bus: BusConsumer) -> None:
         bus.subscribe('parking_lot_created', self._on_parking_created)
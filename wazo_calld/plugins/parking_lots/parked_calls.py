@@ -0,0 +1,290 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from dataclasses import replace
+from threading import Event, Lock
+from time import monotonic
+from typing import TypedDict
+
+from requests import RequestException
+from wazo_amid_client import Client as AmidClient
+
+from wazo_calld.bus import CoreBusConsumer as BusConsumer
+from wazo_calld.plugin_helpers.exceptions import WazoAmidError
+
+from .dataclasses_ import AsteriskParkedCall
+from .helpers import split_parking_id_from_name
+
+logger = logging.getLogger(__name__)
+
+# Parked calls are listed again from Asterisk after this many seconds, in case
+# an event has been lost
+RECONCILE_INTERVAL = 300
+
+
+class _ParkinglotEventPayload(TypedDict, total=False):
+    id: int
+
+
+class _ParkedCallEntry:
+    __slots__ = ('call', 'received_at')
+
+    def __init__(self, call: AsteriskParkedCall, received_at: float):
+        self.call = call
+        self.received_at = received_at
+
+    def current(self, now: float) -> AsteriskParkedCall:
+        '''The parked call with its duration and timeout as of now'''
+        elapsed = int(now - self.received_at)
+        if not elapsed:
+            return self.call
+        timeout = int(self.call.parking_timeout or 0)
+        if timeout:
+            timeout = max(timeout - elapsed, 1)
+        return replace(
+            self.call,
+            parking_duration=str(int(self.call.parking_duration or 0) + elapsed),
+            parking_timeout=str(timeout),
+        )
+
+
+class _ParkingLotCalls:
+    __slots__ = ('entries', 'expires_at', 'loads')
+
+    def __init__(self) -> None:
+        self.entries: dict[str, _ParkedCallEntry] = {}
+        self.expires_at: float | None = None
+        # call ids changed by events during each pending load
+        self.loads: list[set[str]] = []
+
+    def is_fresh(self, now: float) -> bool:
+        return self.expires_at is not None and now < self.expires_at
+
+
+class ParkedCallWaiter:
+    '''Waits for the ParkedCall event of a call, see ParkedCallsMirror.expect_call'''
+
+    def __init__(self, mirror: ParkedCallsMirror, parking_id: int, call_id: str):
+        self.parking_id = parking_id
+        self.call_id = call_id
+        self.call: AsteriskParkedCall | None = None
+        self._event = Event()
+        self._mirror = mirror
+
+    def __enter__(self) -> ParkedCallWaiter:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._mirror._remove_waiter(self)
+
+    def wait(self, timeout: float) -> AsteriskParkedCall | None:
+        self._event.wait(timeout)
+        return self.call
+
+    def _notify(self, call: AsteriskParkedCall) -> None:
+        self.call = call
+        self._event.set()
+
+
+class ParkedCallsMirror:
+    '''
+    Calls parked in each parking lot, kept up to date by the Asterisk parking
+    events.
+
+    A parking lot is listed once with the AMI ParkedCalls action when it is
+    first needed, then again every RECONCILE_INTERVAL seconds. Events received
+    while listing are applied over the result.
+    '''
+
+    def __init__(
+        self,
+        bus: BusConsumer,
+        amid: AmidClient,
+        reconcile_interval: float = RECONCILE_INTERVAL,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self._amid = amid
+        self._reconcile_interval = reconcile_interval
+        self._clock = clock
+        self._lock = Lock()
+        self._parkings: dict[int, _ParkingLotCalls] = {}
+        self._parkings_by_call: dict[str, int] = {}
+        self._waiters: dict[tuple[int, str], list[ParkedCallWaiter]] = {}
+        self._subscribe(bus)
+
+    def expect_call(self, parking_id: int, call_id: str) -> ParkedCallWaiter:
+        '''
+        Returns a context manager waiting for the next ParkedCall event of the
+        call in the parking lot. It must be entered before parking the call.
+        '''
+        waiter = ParkedCallWaiter(self, parking_id, call_id)
+        with self._lock:
+            self._waiters.setdefault((parking_id, call_id), []).append(waiter)
+        return waiter
+
+    def _remove_waiter(self, waiter: ParkedCallWaiter) -> None:
+        key = (waiter.parking_id, waiter.call_id)
+        with self._lock:
+            waiters = self._waiters.get(key, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+            if not waiters:
+                self._waiters.pop(key, None)
+
+    def list_calls(self, parking_id: int) -> list[AsteriskParkedCall]:
+        entries = self._entries(parking_id)
+        now = self._clock()
+        return [entry.current(now) for entry in entries.values()]
+
+    def find_call(self, parking_id: int, call_id: str) -> AsteriskParkedCall | None:
+        entry = self._entries(parking_id).get(call_id)
+        if entry is None:
+            return None
+        return entry.current(self._clock())
+
+    def count_calls(self, parking_id: int) -> int:
+        return len(self._entries(parking_id))
+
+    def _entries(self, parking_id: int) -> dict[str, _ParkedCallEntry]:
+        with self._lock:
+            parking = self._parkings.get(parking_id)
+            if parking and parking.is_fresh(self._clock()):
+                return dict(parking.entries)
+        return self._load(parking_id)
+
+    def _load(self, parking_id: int) -> dict[str, _ParkedCallEntry]:
+        with self._lock:
+            parking = self._parkings.setdefault(parking_id, _ParkingLotCalls())
+            changed: set[str] = set()
+            parking.loads.append(changed)
+
+        try:
+            results: list[dict] = self._amid.action(
+                'ParkedCalls', {'ParkingLot': f'parkinglot-{parking_id}'}
+            )
+        except RequestException as e:
+            with self._lock:
+                parking.loads.remove(changed)
+            raise WazoAmidError(self._amid, e)
+
+        now = self._clock()
+        loaded = {}
+        for result in results:
+            if result.get('Event') != 'ParkedCall':
+                continue
+            call = AsteriskParkedCall.from_dict(result)
+            loaded[call.parkee_uniqueid] = _ParkedCallEntry(call, now)
+
+        with self._lock:
+            parking.loads.remove(changed)
+            if self._parkings.get(parking_id) is not parking:
+                # the parking lot has been forgotten while loading
+                return loaded
+
+            for call_id in changed:
+                loaded.pop(call_id, None)
+                if entry := parking.entries.get(call_id):
+                    loaded[call_id] = entry
+            for call_id in parking.entries.keys() - loaded.keys():
+                if self._parkings_by_call.get(call_id) == parking_id:
+                    del self._parkings_by_call[call_id]
+            for call_id in loaded:
+                previous_id = self._parkings_by_call.get(call_id, parking_id)
+                if previous_id != parking_id:
+                    self._remove(call_id)
+                self._parkings_by_call[call_id] = parking_id
+            parking.entries = loaded
+            parking.expires_at = now + self._reconcile_interval
+            logger.debug(
+                'parking lot %s: %d parked calls listed', parking_id, len(loaded)
+            )
+            return dict(loaded)
+
+    def _add(self, parking_id: int, call: AsteriskParkedCall) -> None:
+        # This function must be called with self._lock held
+        call_id = call.parkee_uniqueid
+        self._remove(call_id)
+        for waiter in self._waiters.pop((parking_id, call_id), []):
+            waiter._notify(call)
+        parking = self._parkings.get(parking_id)
+        if parking is None:
+            # not listed yet, the call will be part of the listing
+            return
+        parking.entries[call_id] = _ParkedCallEntry(call, self._clock())
+        self._parkings_by_call[call_id] = parking_id
+        for changed in parking.loads:
+            changed.add(call_id)
+
+    def _remove(self, call_id: str) -> None:
+        # This function must be called with self._lock held
+        parking_id = self._parkings_by_call.pop(call_id, None)
+        if parking_id is None:
+            return
+        if parking := self._parkings.get(parking_id):
+            parking.entries.pop(call_id, None)
+            for changed in parking.loads:
+                changed.add(call_id)
+
+    def forget(self, parking_id: int) -> None:
+        with self._lock:
+            parking = self._parkings.pop(parking_id, None)
+            if parking is None:
+                return
+            for call_id in parking.entries:
+                if self._parkings_by_call.get(call_id) == parking_id:
+                    del self._parkings_by_call[call_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._parkings.clear()
+            self._parkings_by_call.clear()
+
+    def _on_call_parked(self, event: dict) -> None:
+        call = AsteriskParkedCall.from_dict(event)
+        try:
+            parking_id = split_parking_id_from_name(call.parkinglot)
+        except ValueError:
+            return
+        with self._lock:
+            self._add(parking_id, call)
+
+    def _on_call_left(self, event: dict) -> None:
+        if call_id := event.get('ParkeeUniqueid'):
+            with self._lock:
+                self._remove(call_id)
+
+    def _on_call_swapped(self, event: dict) -> None:
+        call = AsteriskParkedCall.from_dict(event)
+        try:
+            parking_id = split_parking_id_from_name(call.parkinglot)
+        except ValueError:
+            return
+        with self._lock:
+            # the swapped out channel is the one parked in the same space
+            if parking := self._parkings.get(parking_id):
+                for entry in list(parking.entries.values()):
+                    if entry.call.parking_space == call.parking_space:
+                        self._remove(entry.call.parkee_uniqueid)
+            self._add(parking_id, call)
+
+    def _on_asterisk_booted(self, event: dict) -> None:
+        logger.debug('asterisk has been restarted, forgetting parked calls')
+        self.clear()
+
+    def _on_parking_changed(self, payload: _ParkinglotEventPayload) -> None:
+        self.forget(payload['id'])
+
+    def _subscribe(self, bus: BusConsumer) -> None:
+        bus.subscribe('ParkedCall', self._on_call_parked)
+        bus.subscribe('ParkedCallGiveUp', self._on_call_left)
+        bus.subscribe('ParkedCallSwap', self._on_call_swapped)
+        bus.subscribe('ParkedCallTimeOut', self._on_call_left)
+        bus.subscribe('UnParkedCall', self._on_call_left)
+        bus.subscribe('FullyBooted', self._on_asterisk_booted)
+        bus.subscribe('parking_lot_created', self._on_parking_changed)
+        bus.subscribe('parking_lot_deleted', self._on_parking_changed)
+        bus.subscribe('parking_lot_edited', self._on_parking_changed)
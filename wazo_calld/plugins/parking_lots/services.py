@@ -1,10 +1,9 @@
-# Copyright 2024-2025 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2024-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from __future__ import annotations
 
 import logging
-from time import sleep
 from typing import NotRequired, TypedDict
 
 from requests import RequestException
@@ -30,11 +29,11 @@ from .exceptions import (
     NoSuchParking,
     ParkingFull,
 )
-from .helpers import DONT_CHECK_TENANT, DontCheckTenant, split_parking_id_from_name
+from .helpers import DONT_CHECK_TENANT, DontCheckTenant
 from .notifier import ParkingNotifier
+from .parked_calls import ParkedCallsMirror
 
-CHECK_PARKING_DELAY_BETWEEN_RETRIES = 0.2
-CHECK_PARKING_MAX_RETRIES = 5
+PARK_TIMEOUT = 1.0
 PARKED_CHANNEL_VAR = 'WAZO_CALL_PARKED'
 
 logger = logging.getLogger(__name__)
@@ -63,6 +62,7 @@ class ParkingService:
         self._confd = confd
         self._notifier = notifier
         self._parkings = ParkingLotCache(bus, confd)
+        self._parked_calls = ParkedCallsMirror(bus, ami)
 
     def _get_connected_channel(self, channel: Channel) -> Channel:
         try:
@@ -95,50 +95,38 @@ class ParkingService:
 
         parked_call = self.find_parked_call(tenant_uuid, parking.id, parkee.id)
         if not parked_call:
+            if self.is_parking_full(tenant_uuid, parking.id):
+                raise ParkingFull(tenant_uuid, parking.id, parkee.id)
             callback_channel = self._get_connected_channel(parkee)
             park_payload['TimeoutChannel'] = callback_channel.asterisk_name()
         else:
             # If call is already parked, preserve callback
             park_payload['TimeoutChannel'] = parked_call.parker_dial_string
 
-        try:
-            self._amid.action('Park', park_payload)
-        except RequestException as e:
-            raise WazoAmidError(self._amid, e)
-
-        check_full: bool | None = None
-        for _ in range(CHECK_PARKING_MAX_RETRIES):
+        with self._parked_calls.expect_call(parking.id, parkee.id) as waiter:
             try:
-                return self.get_parked_call(tenant_uuid, parking.id, parkee.id)
-            except NoSuchParkedCall:
-                if check_full is None:
-                    if check_full := self.is_parking_full(tenant_uuid, parking.id):
-                        raise ParkingFull(tenant_uuid, parking.id, parkee.id)
-                sleep(CHECK_PARKING_DELAY_BETWEEN_RETRIES)
+                self._amid.action('Park', park_payload)
+            except RequestException as e:
+                raise WazoAmidError(self._amid, e)
+
+            if new_parked_call := waiter.wait(PARK_TIMEOUT):
+                return new_parked_call
+
+        if parked_call := self.find_parked_call(tenant_uuid, parking.id, parkee.id):
+            return parked_call
+        if self.is_parking_full(tenant_uuid, parking.id):
+            raise ParkingFull(tenant_uuid, parking.id, parkee.id)
         raise NoSuchParkedCall(tenant_uuid, parking.id, parkee.id)
 
     def count_parked_calls(self, tenant_uuid: str, parking_id: int) -> int:
         parking = self.get_parking(tenant_uuid, parking_id)
-
-        try:
-            results: list[dict] = self._amid.action(
-                'ParkedCalls', {'ParkingLot': f'parkinglot-{parking.id}'}
-            )
-        except RequestException as e:
-            raise WazoAmidError(self._amid, e)
-
-        complete = results.pop()
-        if complete.get('Event') != 'ParkedCallsComplete':
-            raise WazoAmidError(self._amid, 'missing ParkedCallsComplete message')
-        return int(complete['Total'])
+        return self._parked_calls.count_calls(parking.id)
 
     def find_parked_call(
         self, tenant_uuid: str, parking_id: int, call_id: str
     ) -> AsteriskParkedCall | None:
-        for call in self.list_parked_calls(tenant_uuid, parking_id):
-            if call.parkee_uniqueid == call_id:
-                return call
-        return None
+        parking = self.get_parking(tenant_uuid, parking_id)
+        return self._parked_calls.find_call(parking.id, call_id)
 
     def get_parked_call(
         self, tenant_uuid: str, parking_id: int, call_id: str
@@ -166,39 +154,10 @@ class ParkingService:
         self, tenant_uuid: str, parking_id: int
     ) -> list[AsteriskParkedCall]:
         parking = self.get_parking(tenant_uuid, parking_id)
-
-        try:
-            results: list[dict] = self._amid.action(
-                'ParkedCalls', {'ParkingLot': f'parkinglot-{parking.id}'}
-            )
-        except RequestException as e:
-            raise WazoAmidError(self._amid, e)
-
-        parked_calls = [
-            AsteriskParkedCall.from_dict(result)
-            for result in results
-            if result.get('Event') == 'ParkedCall'
-        ]
-        return parked_calls
+        return self._parked_calls.list_calls(parking.id)
 
     def list_parkings(self, tenant_uuid: str) -> list[ConfdParkingLot]:
-        try:
-            results: list[dict] = self._amid.action('Parkinglots')
-        except RequestException as e:
-            raise WazoAmidError(self._amid, e)
-
-        parkinglots: list[ConfdParkingLot] = []
-        for result in results:
-            if result.get('Event') != 'Parkinglot':
-                continue
-            try:
-                id_ = split_parking_id_from_name(result['Name'])
-            except ValueError:
-                continue
-            parkinglot = self._parkings[id_]
-            if parkinglot.tenant_uuid == tenant_uuid:
-                parkinglots.append(parkinglot)
-        return parkinglots
+        return self._parkings.list_by_tenant(tenant_uuid)
 
     def park_call(
         self,
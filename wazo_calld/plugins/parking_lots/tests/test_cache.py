@@ -0,0 +1,210 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from threading import Thread
+from unittest import TestCase
+from unittest.mock import Mock
+
+from hamcrest import (
+    assert_that,
+    calling,
+    contains_exactly,
+    empty,
+    equal_to,
+    has_length,
+    has_properties,
+    raises,
+)
+from requests import HTTPError, RequestException
+
+from wazo_calld.plugin_helpers.exceptions import WazoConfdUnreachable
+
+from ..cache import ParkingLotCache, to_nsec
+from ..exceptions import NoSuchParking
+
+TENANT_1 = '00000000-0000-0000-0000-000000000001'
+TENANT_2 = '00000000-0000-0000-0000-000000000002'
+
+
+def parking_lot(id_, tenant_uuid=TENANT_1, name=None):
+    return {
+        'id': id_,
+        'tenant_uuid': tenant_uuid,
+        'name': name or f'parking-{id_}',
+        'slots_start': '701',
+        'slots_end': '750',
+        'timeout': '45',
+        'music_on_hold': 'default',
+        'extensions': [{'id': id_, 'exten': '700', 'context': 'default'}],
+    }
+
+
+def not_found():
+    return HTTPError(response=Mock(status_code=404))
+
+
+class TestParkingLotCache(TestCase):
+    def setUp(self):
+        self.bus = Mock()
+        self.confd = Mock()
+        self.confd.parking_lots.list.return_value = {
+            'items': [parking_lot(1), parking_lot(2), parking_lot(3, TENANT_2)],
+            'total': 3,
+        }
+        self.confd.parking_lots.get.side_effect = not_found()
+        self.clock = Mock(return_value=0)
+        self.cache = ParkingLotCache(self.bus, self.confd, self.clock)
+        self.handlers = {
+            call.args[0]: call.args[1] for call in self.bus.subscribe.call_args_list
+        }
+
+    def test_parking_lots_are_listed_once(self):
+        assert_that(self.cache[1], has_properties(id=1, tenant_uuid=TENANT_1))
+        assert_that(
+            self.cache.list_by_tenant(TENANT_1),
+            contains_exactly(has_properties(id=1), has_properties(id=2)),
+        )
+        assert_that(
+            self.cache.list_by_tenant(TENANT_2),
+            contains_exactly(has_properties(id=3)),
+        )
+        assert_that(self.cache.list_by_tenant('unknown'), empty())
+
+        self.confd.parking_lots.list.assert_called_once_with(recurse=True)
+        self.confd.parking_lots.get.assert_not_called()
+
+    def test_listing_error(self):
+        self.confd.parking_lots.list.side_effect = RequestException()
+
+        assert_that(
+            calling(self.cache.__getitem__).with_args(1), raises(WazoConfdUnreachable)
+        )
+
+        self.confd.parking_lots.list.side_effect = None
+        assert_that(self.cache[1], has_properties(id=1))
+
+    def test_edited_parking_lot_is_fetched_again(self):
+        self.cache[1]
+        self.confd.parking_lots.get.side_effect = None
+        self.confd.parking_lots.get.return_value = parking_lot(1, TENANT_2, 'edited')
+
+        self.handlers['parking_lot_edited']({'id': 1})
+
+        assert_that(
+            self.cache.list_by_tenant(TENANT_2),
+            contains_exactly(has_properties(id=1, name='edited'), has_properties(id=3)),
+        )
+        assert_that(
+            self.cache.list_by_tenant(TENANT_1), contains_exactly(has_properties(id=2))
+        )
+        assert_that(self.cache[1], has_properties(name='edited'))
+        self.confd.parking_lots.get.assert_called_once_with(1)
+
+    def test_created_parking_lot_is_listed(self):
+        self.cache[1]
+        self.confd.parking_lots.get.side_effect = None
+        self.confd.parking_lots.get.return_value = parking_lot(4)
+
+        self.handlers['parking_lot_created']({'id': 4})
+
+        assert_that(self.cache.list_by_tenant(TENANT_1), has_length(3))
+
+    def test_deleted_parking_lot(self):
+        self.cache[1]
+
+        self.handlers['parking_lot_deleted']({'id': 1})
+
+        assert_that(
+            self.cache.list_by_tenant(TENANT_1), contains_exactly(has_properties(id=2))
+        )
+        assert_that(calling(self.cache.__getitem__).with_args(1), raises(NoSuchParking))
+
+    def test_unknown_id_is_remembered(self):
+        assert_that(
+            calling(self.cache.__getitem__).with_args(42), raises(NoSuchParking)
+        )
+        self.clock.return_value = to_nsec(5)
+        assert_that(
+            calling(self.cache.__getitem__).with_args(42), raises(NoSuchParking)
+        )
+        assert_that(self.confd.parking_lots.get.call_count, equal_to(1))
+
+        # the TTL is refreshed by the second lookup
+        self.clock.return_value = to_nsec(12)
+        assert_that(
+            calling(self.cache.__getitem__).with_args(42), raises(NoSuchParking)
+        )
+        assert_that(self.confd.parking_lots.get.call_count, equal_to(1))
+
+        self.clock.return_value = to_nsec(30)
+        assert_that(
+            calling(self.cache.__getitem__).with_args(42), raises(NoSuchParking)
+        )
+        assert_that(self.confd.parking_lots.get.call_count, equal_to(2))
+
+    def test_expired_ids_are_evicted_in_order(self):
+        for parking_id in (10, 11, 12):
+            self.clock.return_value = to_nsec(parking_id)
+            assert_that(
+                calling(self.cache.__getitem__).with_args(parking_id),
+                raises(NoSuchParking),
+            )
+
+        self.clock.return_value = to_nsec(21)
+        self.cache.evict_expired()
+
+        assert_that(list(self.cache._invalid_ids), equal_to([12]))
+        assert_that(self.cache._expirations, has_length(1))
+
+    def test_confd_unreachable_is_not_remembered(self):
+        self.confd.parking_lots.get.side_effect = RequestException()
+        assert_that(
+            calling(self.cache.__getitem__).with_args(42), raises(WazoConfdUnreachable)
+        )
+
+        self.confd.parking_lots.get.side_effect = None
+        self.confd.parking_lots.get.return_value = parking_lot(42)
+        assert_that(self.cache[42], has_properties(id=42))
+
+    def test_event_while_listing(self):
+        def listing(**_):
+            self.handlers['parking_lot_deleted']({'id': 2})
+            self.handlers['parking_lot_edited']({'id': 3})
+            return {'items': [parking_lot(1), parking_lot(2), parking_lot(3)]}
+
+        def get(id_):
+            if id_ != 3:
+                raise not_found()
+            return parking_lot(3, TENANT_2)
+
+        self.confd.parking_lots.list.side_effect = listing
+        self.confd.parking_lots.get.side_effect = get
+
+        assert_that(
+            self.cache.list_by_tenant(TENANT_1), contains_exactly(has_properties(id=1))
+        )
+        assert_that(
+            self.cache.list_by_tenant(TENANT_2), contains_exactly(has_properties(id=3))
+        )
+
+    def test_concurrent_first_requests_list_once(self):
+        waiting = []
+
+        def listing(**_):
+            other = Thread(target=self.cache.list_by_tenant, args=(TENANT_1,))
+            other.start()
+            other.join(timeout=0.1)  # waits for this listing
+            waiting.append(other)
+            self.handlers['parking_lot_deleted']({'id': 2})
+            return {'items': [parking_lot(1), parking_lot(2)]}
+
+        self.confd.parking_lots.list.side_effect = listing
+
+        result = self.cache.list_by_tenant(TENANT_1)
+        waiting[0].join()
+
+        assert_that(result, contains_exactly(has_properties(id=1)))
+        assert_that(
+            self.cache.list_by_tenant(TENANT_1), contains_exactly(has_properties(id=1))
+        )
+        self.confd.parking_lots.list.assert_called_once_with(recurse=True)
@@ -0,0 +1,228 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+from hamcrest import (
+    assert_that,
+    calling,
+    contains_exactly,
+    contains_inanyorder,
+    empty,
+    equal_to,
+    has_properties,
+    none,
+    raises,
+)
+from requests import RequestException
+
+from wazo_calld.plugin_helpers.exceptions import WazoAmidError
+
+from ..parked_calls import ParkedCallsMirror
+
+RECONCILE_INTERVAL = 300
+
+
+def parked_call_event(call_id, parking_id=1, space='701', event='ParkedCall', **kw):
+    event = {
+        'Event': event,
+        'ParkeeChannel': f'PJSIP/abc-{call_id}',
+        'ParkeeChannelState': '6',
+        'ParkeeChannelStateDesc': 'Up',
+        'ParkeeCallerIDNum': '1001',
+        'ParkeeCallerIDName': 'Alice',
+        'ParkeeConnectedLineNum': '1002',
+        'ParkeeConnectedLineName': 'Bob',
+        'ParkeeLanguage': 'en_US',
+        'ParkeeAccountCode': '',
+        'ParkeeContext': 'parkedcalls',
+        'ParkeeExten': '700',
+        'ParkeePriority': '1',
+        'ParkeeUniqueid': call_id,
+        'ParkeeLinkedid': call_id,
+        'ParkeeChanVariable': '',
+        'ParkerDialString': 'PJSIP/bob',
+        'Parkinglot': f'parkinglot-{parking_id}',
+        'ParkingSpace': space,
+        'ParkingTimeout': '45',
+        'ParkingDuration': '0',
+    }
+    event.update(kw)
+    return event
+
+
+def parked_calls_response(*events):
+    return [
+        {'Response': 'Success'},
+        *events,
+        {'Event': 'ParkedCallsComplete', 'Total': str(len(events))},
+    ]
+
+
+class TestParkedCallsMirror(TestCase):
+    def setUp(self):
+        self.bus = Mock()
+        self.amid = Mock()
+        self.amid.action.return_value = parked_calls_response()
+        self.clock = Mock(return_value=1000.0)
+        self.mirror = ParkedCallsMirror(
+            self.bus, self.amid, RECONCILE_INTERVAL, self.clock
+        )
+        self.handlers = {
+            call.args[0]: call.args[1] for call in self.bus.subscribe.call_args_list
+        }
+
+    def send(self, event):
+        self.handlers[event['Event']](event)
+
+    def test_parking_lot_is_listed_once(self):
+        self.amid.action.return_value = parked_calls_response(parked_call_event('c1'))
+
+        assert_that(
+            self.mirror.list_calls(1),
+            contains_exactly(has_properties(parkee_uniqueid='c1')),
+        )
+        assert_that(self.mirror.count_calls(1), equal_to(1))
+        assert_that(self.mirror.find_call(1, 'c1'), has_properties(parking_space='701'))
+        assert_that(self.mirror.find_call(1, 'c2'), none())
+
+        self.amid.action.assert_called_once_with(
+            'ParkedCalls', {'ParkingLot': 'parkinglot-1'}
+        )
+
+    def test_events_update_listed_parking_lots(self):
+        self.mirror.list_calls(1)
+
+        self.send(parked_call_event('c1'))
+        self.send(parked_call_event('c2', space='702'))
+        self.send(parked_call_event('c1', event='UnParkedCall'))
+        self.send(parked_call_event('c3', parking_id=2))
+
+        assert_that(
+            self.mirror.list_calls(1),
+            contains_exactly(has_properties(parkee_uniqueid='c2')),
+        )
+        self.send(parked_call_event('c2', event='ParkedCallTimeOut'))
+        assert_that(self.mirror.count_calls(1), equal_to(0))
+        self.amid.action.assert_called_once()
+
+    def test_reparked_call_moves_to_the_other_parking_lot(self):
+        self.mirror.list_calls(1)
+        self.mirror.list_calls(2)
+        self.send(parked_call_event('c1', parking_id=1))
+
+        self.send(parked_call_event('c1', parking_id=2))
+
+        assert_that(self.mirror.list_calls(1), empty())
+        assert_that(
+            self.mirror.list_calls(2),
+            contains_exactly(has_properties(parkee_uniqueid='c1')),
+        )
+
+    def test_swapped_call_replaces_the_call_in_the_same_space(self):
+        self.mirror.list_calls(1)
+        self.send(parked_call_event('c1', space='701'))
+        self.send(parked_call_event('c2', space='702'))
+
+        self.send(parked_call_event('c3', space='701', event='ParkedCallSwap'))
+
+        assert_that(
+            self.mirror.list_calls(1),
+            contains_inanyorder(
+                has_properties(parkee_uniqueid='c2'),
+                has_properties(parkee_uniqueid='c3'),
+            ),
+        )
+
+    def test_events_during_listing_are_applied_over_the_result(self):
+        self.mirror.list_calls(1)
+        self.send(parked_call_event('c1'))
+        self.clock.return_value += RECONCILE_INTERVAL
+
+        def listing(*_):
+            self.send(parked_call_event('c1', event='ParkedCallGiveUp'))
+            self.send(parked_call_event('c3', space='703'))
+            return parked_calls_response(
+                parked_call_event('c1'), parked_call_event('c2', space='702')
+            )
+
+        self.amid.action.side_effect = listing
+
+        result = self.mirror.list_calls(1)
+
+        assert_that(
+            result,
+            contains_inanyorder(
+                has_properties(parkee_uniqueid='c2'),
+                has_properties(parkee_uniqueid='c3'),
+            ),
+        )
+
+    def test_parking_lot_is_reconciled_after_the_interval(self):
+        self.mirror.list_calls(1)
+        self.send(parked_call_event('lost'))
+        self.amid.action.return_value = parked_calls_response(parked_call_event('c1'))
+
+        self.clock.return_value += RECONCILE_INTERVAL
+        result = self.mirror.list_calls(1)
+
+        assert_that(result, contains_exactly(has_properties(parkee_uniqueid='c1')))
+        assert_that(self.amid.action.call_count, equal_to(2))
+
+    def test_durations_are_current(self):
+        self.mirror.list_calls(1)
+        self.send(parked_call_event('c1', ParkingDuration='5', ParkingTimeout='45'))
+        self.send(parked_call_event('c2', space='702', ParkingTimeout='0'))
+
+        self.clock.return_value += 10
+
+        assert_that(
+            self.mirror.find_call(1, 'c1'),
+            has_properties(parking_duration='15', parking_timeout='35'),
+        )
+        assert_that(
+            self.mirror.find_call(1, 'c2'),
+            has_properties(parking_duration='10', parking_timeout='0'),
+        )
+
+    def test_parking_lot_changes_and_asterisk_restart_forget_calls(self):
+        self.mirror.list_calls(1)
+        self.mirror.list_calls(2)
+
+        self.handlers['parking_lot_edited']({'id': 1})
+        self.mirror.list_calls(1)
+        self.mirror.list_calls(2)
+        assert_that(self.amid.action.call_count, equal_to(3))
+
+        self.handlers['FullyBooted']({})
+        self.mirror.list_calls(1)
+        self.mirror.list_calls(2)
+        assert_that(self.amid.action.call_count, equal_to(5))
+
+    def test_amid_error(self):
+        self.amid.action.side_effect = RequestException()
+
+        assert_that(calling(self.mirror.list_calls).with_args(1), raises(WazoAmidError))
+
+        self.amid.action.side_effect = None
+        assert_that(self.mirror.list_calls(1), empty())
+
+    def test_expect_call(self):
+        self.mirror.list_calls(1)
+
+        with self.mirror.expect_call(1, 'c1') as waiter:
+            self.send(parked_call_event('c2'))
+            self.send(parked_call_event('c1', parking_id=2))
+            assert_that(waiter.wait(0), none())
+
+            self.send(parked_call_event('c1', space='705'))
+            assert_that(waiter.wait(0), has_properties(parking_space='705'))
+
+    def test_expect_call_is_removed_on_exit(self):
+        with self.mirror.expect_call(1, 'c1') as waiter:
+            pass
+
+        self.send(parked_call_event('c1'))
+
+        assert_that(waiter.wait(0), none())
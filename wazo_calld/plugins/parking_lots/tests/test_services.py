@@ -0,0 +1,122 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from hamcrest import assert_that, calling, equal_to, has_properties, raises
+
+from ..exceptions import NoSuchParkedCall, ParkingFull
+from ..services import ParkingService
+from .test_parked_calls import parked_call_event, parked_calls_response
+
+TENANT_UUID = '00000000-0000-0000-0000-000000000001'
+PARKING = {
+    'id': 1,
+    'tenant_uuid': TENANT_UUID,
+    'name': 'parking',
+    'slots_start': '701',
+    'slots_end': '702',
+    'timeout': '45',
+    'music_on_hold': 'default',
+    'extensions': [],
+}
+
+
+@patch('wazo_calld.plugins.parking_lots.services.PARK_TIMEOUT', 0)
+class TestParkChannel(TestCase):
+    def setUp(self):
+        self.amid = Mock()
+        self.bus = Mock()
+        self.confd = Mock()
+        self.confd.parking_lots.list.return_value = {'items': [PARKING], 'total': 1}
+        self.service = ParkingService(self.amid, Mock(), self.bus, self.confd, Mock())
+        self.handlers = {
+            call.args[0]: call.args[1] for call in self.bus.subscribe.call_args_list
+        }
+        self.parked_calls = []
+        self.park_events = []
+        self.amid.action.side_effect = self._amid_action
+        self.parkee = Mock(id='parkee')
+        self.parkee.asterisk_name.return_value = 'PJSIP/parkee'
+        self.parkee.only_connected_channel.return_value.asterisk_name.return_value = (
+            'PJSIP/parker'
+        )
+
+    def _amid_action(self, action, payload=None):
+        if action == 'ParkedCalls':
+            return parked_calls_response(*self.parked_calls)
+        for event in self.park_events:
+            self.handlers[event['Event']](event)
+        return [{'Response': 'Success'}]
+
+    def _park(self):
+        parking = self.service.get_parking(TENANT_UUID, 1)
+        return self.service._park_channel(self.parkee, parking, TENANT_UUID)
+
+    def _park_actions(self):
+        return [c for c in self.amid.action.call_args_list if c.args[0] == 'Park']
+
+    def test_park_returns_the_parked_call_event(self):
+        self.park_events = [parked_call_event('parkee', space='702')]
+
+        result = self._park()
+
+        assert_that(result, has_properties(parkee_uniqueid='parkee'))
+        assert_that(self.service.count_parked_calls(TENANT_UUID, 1), equal_to(1))
+        self.amid.action.assert_any_call(
+            'Park',
+            {
+                'Channel': 'PJSIP/parkee',
+                'Parkinglot': 'parkinglot-1',
+                'TimeoutChannel': 'PJSIP/parker',
+            },
+        )
+        assert_that(
+            [c.args[0] for c in self.amid.action.call_args_list],
+            equal_to(['ParkedCalls', 'Park']),
+        )
+
+    def test_full_parking_is_not_parked(self):
+        self.parked_calls = [
+            parked_call_event('c1', space='701'),
+            parked_call_event('c2', space='702'),
+        ]
+
+        assert_that(calling(self._park), raises(ParkingFull))
+        assert_that(self._park_actions(), equal_to([]))
+
+    def test_already_parked_call_is_parked_again_in_a_full_parking(self):
+        self.parked_calls = [
+            parked_call_event('parkee', space='701', ParkerDialString='PJSIP/bob'),
+            parked_call_event('c2', space='702'),
+        ]
+        self.park_events = [parked_call_event('parkee', space='701')]
+
+        result = self._park()
+
+        assert_that(result, has_properties(parkee_uniqueid='parkee'))
+        assert_that(
+            self._park_actions()[0].args[1],
+            equal_to(
+                {
+                    'Channel': 'PJSIP/parkee',
+                    'Parkinglot': 'parkinglot-1',
+                    'TimeoutChannel': 'PJSIP/bob',
+                }
+            ),
+        )
+
+    def test_no_parked_call_event(self):
+        assert_that(calling(self._park), raises(NoSuchParkedCall))
+
+    def test_parking_full_when_no_parked_call_event(self):
+        def fill_parking(action, payload=None):
+            if action == 'Park':
+                self.handlers['ParkedCall'](parked_call_event('c1', space='701'))
+                self.handlers['ParkedCall'](parked_call_event('c2', space='702'))
+            return self._amid_action(action, payload)
+
+        self.amid.action.side_effect = fill_parking
+
+        assert_that(calling(self._park), raises(ParkingFull))
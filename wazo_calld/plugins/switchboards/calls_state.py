@@ -0,0 +1,145 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+
+from .call import HeldCall, QueuedCall
+
+logger = logging.getLogger(__name__)
+
+BRIDGE_ID_RE = re.compile(r'^switchboard-(?P<uuid>.+)-(?P<kind>queue|hold)$')
+
+QUEUE = 'queue'
+HOLD = 'hold'
+
+
+def parse_bridge_id(bridge_id):
+    match = BRIDGE_ID_RE.match(bridge_id or '')
+    if not match:
+        return None, None
+    return match.group('kind'), match.group('uuid')
+
+
+class SwitchboardCallsState:
+    '''
+    In-memory view of the calls waiting in the queue and hold bridges of every
+    switchboard, maintained from bridge enter/leave events.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[tuple[str, str], dict[str, QueuedCall | HeldCall]] = {}
+        self._bridge_by_call: dict[str, tuple[str, str]] = {}
+
+    def queued_calls(self, switchboard_uuid):
+        return self._list(QUEUE, switchboard_uuid)
+
+    def held_calls(self, switchboard_uuid):
+        return self._list(HOLD, switchboard_uuid)
+
+    def has_queued_call(self, switchboard_uuid, call_id):
+        with self._lock:
+            return self._bridge_by_call.get(call_id) == (QUEUE, switchboard_uuid)
+
+    def has_held_call(self, switchboard_uuid, call_id):
+        with self._lock:
+            return self._bridge_by_call.get(call_id) == (HOLD, switchboard_uuid)
+
+    def add(self, kind, switchboard_uuid, channel_json):
+        call = self._new_call(kind, channel_json)
+        with self._lock:
+            self._discard(call.id)
+            self._calls.setdefault((kind, switchboard_uuid), {})[call.id] = call
+            self._bridge_by_call[call.id] = (kind, switchboard_uuid)
+        return call
+
+    def remove(self, kind, switchboard_uuid, call_id):
+        with self._lock:
+            if self._bridge_by_call.get(call_id) != (kind, switchboard_uuid):
+                return None
+            return self._discard(call_id)
+
+    def remove_call(self, call_id):
+        with self._lock:
+            bridge_key = self._bridge_by_call.get(call_id)
+            if not bridge_key:
+                return None, None, None
+            kind, switchboard_uuid = bridge_key
+            return kind, switchboard_uuid, self._discard(call_id)
+
+    def update_caller_id(self, channel_json):
+        call_id = channel_json['id']
+        with self._lock:
+            bridge_key = self._bridge_by_call.get(call_id)
+            if not bridge_key:
+                return None, None
+            kind, switchboard_uuid = bridge_key
+            self._calls[bridge_key][call_id] = self._new_call(kind, channel_json)
+            return kind, switchboard_uuid
+
+    def clear(self, kind, switchboard_uuid):
+        self.reset(kind, switchboard_uuid, [])
+
+    def reset(self, kind, switchboard_uuid, channels_json):
+        calls = {
+            channel_json['id']: self._new_call(kind, channel_json)
+            for channel_json in channels_json
+        }
+        with self._lock:
+            for call_id in self._calls.pop((kind, switchboard_uuid), {}):
+                self._bridge_by_call.pop(call_id, None)
+            for call_id in calls:
+                self._discard(call_id)
+                self._bridge_by_call[call_id] = (kind, switchboard_uuid)
+            if calls:
+                self._calls[(kind, switchboard_uuid)] = calls
+
+    def reset_all(self, calls_by_bridge):
+        '''
+        calls_by_bridge: {(kind, switchboard_uuid): [channel_json, ...]}
+        '''
+        calls = {
+            bridge_key: {
+                channel_json['id']: self._new_call(bridge_key[0], channel_json)
+                for channel_json in channels_json
+            }
+            for bridge_key, channels_json in calls_by_bridge.items()
+            if channels_json
+        }
+        with self._lock:
+            self._calls = calls
+            self._bridge_by_call = {
+                call_id: bridge_key
+                for bridge_key, bridge_calls in calls.items()
+                for call_id in bridge_calls
+            }
+
+    def _list(self, kind, switchboard_uuid):
+        with self._lock:
+            return list(self._calls.get((kind, switchboard_uuid), {}).values())
+
+    def _discard(self, call_id):
+        bridge_key = self._bridge_by_call.pop(call_id, None)
+        if not bridge_key:
+            return None
+        bridge_calls = self._calls.get(bridge_key, {})
+        call = bridge_calls.pop(call_id, None)
+        if not bridge_calls:
+            self._calls.pop(bridge_key, None)
+        return call
+
+    @staticmethod
+    def _new_call(kind, channel_json):
+        call: QueuedCall | HeldCall
+        call = (
+            QueuedCall(channel_json['id'])
+            if kind == QUEUE
+            else HeldCall(channel_json['id'])
+        )
+        call.caller_id_name = channel_json['caller']['name']
+        call.caller_id_number = channel_json['caller']['number']
+        return call
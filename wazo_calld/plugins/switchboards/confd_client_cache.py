@@ -2,19 +2,44 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
-import threading
+
+from requests import HTTPError
+
+from wazo_calld.plugin_helpers.cache import TTLLRUCache
+from wazo_calld.plugin_helpers.confd import not_found
 
 logger = logging.getLogger(__name__)
 
 hashed_args_kwargs_mark = object()  # sentinel for separating args from kwargs
 
+DEFAULT_MAX_SIZE = 10000
+DEFAULT_TTL = 3600
+DEFAULT_NEGATIVE_TTL = 30
+
+
+def _is_not_found(error):
+    return isinstance(error, HTTPError) and not_found(error)
+
 
 class ConfdClientGetUUIDCacheDecorator:
-    def __init__(self, decorated_get, resource_name):
+    def __init__(
+        self,
+        decorated_get,
+        resource_name,
+        max_size=DEFAULT_MAX_SIZE,
+        ttl=DEFAULT_TTL,
+        negative_ttl=DEFAULT_NEGATIVE_TTL,
+    ):
         self._decorated_get = decorated_get
         self._resource_name = resource_name
-        self._cache = {}
-        self._lock = threading.Lock()
+        # bus events invalidate entries, the TTL only limits staleness if one is lost
+        self._cache = TTLLRUCache(
+            max_size, ttl, negative_ttl=negative_ttl, is_negative=_is_not_found
+        )
+
+    @property
+    def resource_name(self):
+        return self._resource_name
 
     def subscribe(self, bus_consumer, events):
         for event in events:
@@ -25,9 +50,11 @@ class ConfdClientGetUUIDCacheDecorator:
         self.invalidate_cache_entry(uuid)
 
     def invalidate_cache_entry(self, uuid):
-        with self._lock:
-            logger.debug('Removing %s %s from cache', self._resource_name, uuid)
-            self._cache.pop(uuid, None)
+        logger.debug('Removing %s %s from cache', self._resource_name, uuid)
+        self._cache.invalidate_group(uuid)
+
+    def stats(self):
+        return self._cache.stats()
 
     def _make_key(self, args, kwargs):
         # See lru_cache code for more details:
@@ -36,24 +63,13 @@ class ConfdClientGetUUIDCacheDecorator:
         return args + (hashed_args_kwargs_mark,) + tuple(sorted(kwargs.items()))
 
     def __call__(self, uuid, *args, **kwargs):
-        args_key = self._make_key(args, kwargs)
-
-        try:
-            response = self._cache[uuid][args_key]
-        except KeyError:
-            pass
-        else:
-            logger.debug('Found %s %s in cache', self._resource_name, uuid)
-            return response
-
-        response = self._decorated_get(uuid, *args, **kwargs)
+        key = (uuid, self._make_key(args, kwargs))
 
-        with self._lock:
-            logger.debug('Adding %s %s to cache', self._resource_name, uuid)
-            self._cache.setdefault(uuid, {})
-            self._cache[uuid][args_key] = response
+        def load():
+            logger.debug('Fetching %s %s to cache', self._resource_name, uuid)
+            return self._decorated_get(uuid, *args, **kwargs)
 
-        return response
+        return self._cache.get_or_load(key, load, group=uuid)
 
 
 class ConfdClientGetIDCacheDecorator(ConfdClientGetUUIDCacheDecorator):
@@ -64,7 +80,7 @@ class ConfdClientGetIDCacheDecorator(ConfdClientGetUUIDCacheDecorator):
 
 class ConfdClientUserLineGetCacheDecorator(ConfdClientGetUUIDCacheDecorator):
     def subscribe(self, bus_consumer, events=None):
-        for event in ('user_edited', 'user_deleted'):
+        for event in ('user_created', 'user_edited', 'user_deleted'):
             bus_consumer.subscribe(event, self._on_user_changed)
         for event in ('user_line_associated', 'user_line_dissociated'):
             bus_consumer.subscribe(event, self._on_user_line_changed)
@@ -0,0 +1,34 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from wazo_bus.resources.common.event import TenantEvent
+
+
+class _SwitchboardCallEvent(TenantEvent):
+    service = 'calld'
+
+    def __init__(self, call, switchboard_uuid, tenant_uuid):
+        content = {'switchboard_uuid': str(switchboard_uuid), 'call': call}
+        super().__init__(content, tenant_uuid)
+        self.switchboard_uuid = switchboard_uuid
+        self.call_id = call['id']
+
+
+class SwitchboardQueuedCallAddedEvent(_SwitchboardCallEvent):
+    name = 'switchboard_queued_call_added'
+    routing_key_fmt = 'switchboards.{switchboard_uuid}.calls.queued.{call_id}.added'
+
+
+class SwitchboardQueuedCallRemovedEvent(_SwitchboardCallEvent):
+    name = 'switchboard_queued_call_removed'
+    routing_key_fmt = 'switchboards.{switchboard_uuid}.calls.queued.{call_id}.removed'
+
+
+class SwitchboardHeldCallAddedEvent(_SwitchboardCallEvent):
+    name = 'switchboard_held_call_added'
+    routing_key_fmt = 'switchboards.{switchboard_uuid}.calls.held.{call_id}.added'
+
+
+class SwitchboardHeldCallRemovedEvent(_SwitchboardCallEvent):
+    name = 'switchboard_held_call_removed'
+    routing_key_fmt = 'switchboards.{switchboard_uuid}.calls.held.{call_id}.removed'
@@ -1,12 +1,15 @@
-# Copyright 2023-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2023-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
 import random
 import threading
 import time
+from collections import deque
 from contextlib import contextmanager
 
+from wazo_calld.plugin_helpers.metrics import Histogram
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,9 +19,48 @@ def generate_transaction_id():
     return rand_hex
 
 
+class FairLock:
+    '''
+    Lock granted to waiting threads in the order they asked for it.
+    '''
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._waiters: deque[threading.Lock] = deque()
+        self._locked = False
+
+    def acquire(self):
+        with self._mutex:
+            if not self._locked:
+                self._locked = True
+                return True
+            waiter = threading.Lock()
+            waiter.acquire()
+            self._waiters.append(waiter)
+        # released by the previous owner, which hands the lock over to us
+        waiter.acquire()
+        return True
+
+    def release(self):
+        with self._mutex:
+            if self._waiters:
+                self._waiters.popleft().release()
+            else:
+                self._locked = False
+
+
+class _SwitchboardLockEntry:
+    def __init__(self):
+        self.lock = FairLock()
+        self.users = 0
+
+
 class SwitchboardsLock:
     def __init__(self):
-        self._lock = threading.Lock()
+        self._locks: dict[str, _SwitchboardLockEntry] = {}
+        self._locks_mutex = threading.Lock()
+        self.acquire_wait_durations = Histogram()
+        self.hold_durations = Histogram()
 
     @contextmanager
     def acquired(self, switchboard_uuid, call_id):
@@ -30,27 +72,54 @@ class SwitchboardsLock:
             switchboard_uuid,
             call_id,
         )
-        acquire_start_time = time.time()
-        result = self._lock.acquire()
-        acquire_end_time = time.time()
-        logger.debug(
-            'Action lock acquired after %.3f '
-            '(transaction id=%s, switchboard_uuid=%s, call_id=%s)',
-            acquire_end_time - acquire_start_time,
-            transaction_id,
-            switchboard_uuid,
-            call_id,
-        )
+        entry = self._take(switchboard_uuid)
+        acquire_start_time = time.monotonic()
         try:
-            yield result
-        finally:
-            self._lock.release()
-            release_end_time = time.time()
+            result = entry.lock.acquire()
+            acquire_end_time = time.monotonic()
+            self.acquire_wait_durations.observe(acquire_end_time - acquire_start_time)
             logger.debug(
-                'Action lock released after %.3f '
+                'Action lock acquired after %.3f '
                 '(transaction id=%s, switchboard_uuid=%s, call_id=%s)',
-                release_end_time - acquire_end_time,
+                acquire_end_time - acquire_start_time,
                 transaction_id,
                 switchboard_uuid,
                 call_id,
             )
+            try:
+                yield result
+            finally:
+                entry.lock.release()
+                release_end_time = time.monotonic()
+                self.hold_durations.observe(release_end_time - acquire_end_time)
+                logger.debug(
+                    'Action lock released after %.3f '
+                    '(transaction id=%s, switchboard_uuid=%s, call_id=%s)',
+                    release_end_time - acquire_end_time,
+                    transaction_id,
+                    switchboard_uuid,
+                    call_id,
+                )
+        finally:
+            self._give_back(switchboard_uuid)
+
+    def provide_status(self, status):
+        with self._locks_mutex:
+            status['locked_switchboards'] = len(self._locks)
+        status['lock_acquire_wait_seconds'] = self.acquire_wait_durations.to_dict()
+        status['lock_hold_seconds'] = self.hold_durations.to_dict()
+
+    def _take(self, switchboard_uuid):
+        with self._locks_mutex:
+            entry = self._locks.get(switchboard_uuid)
+            if entry is None:
+                entry = self._locks[switchboard_uuid] = _SwitchboardLockEntry()
+            entry.users += 1
+            return entry
+
+    def _give_back(self, switchboard_uuid):
+        with self._locks_mutex:
+            entry = self._locks[switchboard_uuid]
+            entry.users -= 1
+            if not entry.users:
+                del self._locks[switchboard_uuid]
@@ -1,4 +1,4 @@
-# Copyright 2017-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2017-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
@@ -10,6 +10,12 @@ from wazo_bus.resources.switchboard.event import (
     SwitchboardQueuedCallsUpdatedEvent,
 )
 
+from .events import (
+    SwitchboardHeldCallAddedEvent,
+    SwitchboardHeldCallRemovedEvent,
+    SwitchboardQueuedCallAddedEvent,
+    SwitchboardQueuedCallRemovedEvent,
+)
 from .http import held_call_schema, queued_call_schema
 
 logger = logging.getLogger(__name__)
@@ -30,6 +36,22 @@ class SwitchboardsNotifier:
         event = SwitchboardQueuedCallsUpdatedEvent(items, switchboard_uuid, tenant_uuid)
         self._bus.publish(event)
 
+    def queued_call_added(self, tenant_uuid, switchboard_uuid, call):
+        logger.debug('Call %s queued in switchboard %s', call.id, switchboard_uuid)
+
+        item = queued_call_schema.dump(call)
+        event = SwitchboardQueuedCallAddedEvent(item, switchboard_uuid, tenant_uuid)
+        self._bus.publish(event)
+
+    def queued_call_removed(self, tenant_uuid, switchboard_uuid, call):
+        logger.debug(
+            'Call %s removed from switchboard %s queue', call.id, switchboard_uuid
+        )
+
+        item = queued_call_schema.dump(call)
+        event = SwitchboardQueuedCallRemovedEvent(item, switchboard_uuid, tenant_uuid)
+        self._bus.publish(event)
+
     def queued_call_answered(
         self, tenant_uuid, switchboard_uuid, operator_call_id, queued_call_id
     ):
@@ -56,6 +78,22 @@ class SwitchboardsNotifier:
         event = SwitchboardHeldCallsUpdatedEvent(items, switchboard_uuid, tenant_uuid)
         self._bus.publish(event)
 
+    def held_call_added(self, tenant_uuid, switchboard_uuid, call):
+        logger.debug('Call %s held in switchboard %s', call.id, switchboard_uuid)
+
+        item = held_call_schema.dump(call)
+        event = SwitchboardHeldCallAddedEvent(item, switchboard_uuid, tenant_uuid)
+        self._bus.publish(event)
+
+    def held_call_removed(self, tenant_uuid, switchboard_uuid, call):
+        logger.debug(
+            'Call %s removed from switchboard %s hold', call.id, switchboard_uuid
+        )
+
+        item = held_call_schema.dump(call)
+        event = SwitchboardHeldCallRemovedEvent(item, switchboard_uuid, tenant_uuid)
+        self._bus.publish(event)
+
     def held_call_answered(
         self, tenant_uuid, switchboard_uuid, operator_call_id, held_call_id
     ):
@@ -1,12 +1,13 @@
-# Copyright 2017-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2017-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from __future__ import annotations
 
 from wazo_confd_client import Client as ConfdClient
 from xivo.pubsub import CallbackCollector
+from xivo.status import Status
 
-from wazo_calld.types import PluginDependencies
+from wazo_calld.types import PluginDependencies, StatusDict
 
 from .confd_client_cache import (
     ConfdClientGetIDCacheDecorator,
@@ -33,6 +34,7 @@ class Plugin:
         bus_publisher = dependencies['bus_publisher']
         bus_consumer = dependencies['bus_consumer']
         config = dependencies['config']
+        status_aggregator = dependencies['status_aggregator']
         token_changed_subscribe = dependencies['token_changed_subscribe']
         next_token_changed_subscribe = dependencies['next_token_changed_subscribe']
 
@@ -57,14 +59,26 @@ class Plugin:
             ari.client, asyncio, confd_client, switchboards_notifier
         )
 
+        self._switchboards_service = switchboards_service
+        self._confd_caches = [
+            switchboard_get_cache,
+            line_get_cache,
+            user_line_get_cache,
+        ]
+        status_aggregator.add_provider(self._provide_status)
+
         switchboards_stasis = SwitchboardsStasis(
             ari, confd_client, switchboards_notifier, switchboards_service
         )
+        # created events forget the not found responses cached for that ID
         switchboard_get_cache.subscribe(
-            bus_consumer, events=['switchboard_edited', 'switchboard_deleted']
+            bus_consumer,
+            events=['switchboard_created', 'switchboard_edited', 'switchboard_deleted'],
         )
         # line-endpoint association emits line_edited too
-        line_get_cache.subscribe(bus_consumer, events=['line_edited', 'line_deleted'])
+        line_get_cache.subscribe(
+            bus_consumer, events=['line_created', 'line_edited', 'line_deleted']
+        )
         user_line_get_cache.subscribe(bus_consumer)
 
         startup_callback_collector = CallbackCollector()
@@ -97,3 +111,11 @@ class Plugin:
             '/switchboards/<switchboard_uuid>/calls/held/<call_id>/answer',
             resource_class_args=[switchboards_service],
         )
+
+    def _provide_status(self, status: StatusDict) -> None:
+        switchboards_status = status['plugins']['switchboards']
+        switchboards_status['status'] = Status.ok
+        self._switchboards_service.provide_status(switchboards_status)
+        switchboards_status['confd_cache'] = {
+            cache.resource_name: cache.stats() for cache in self._confd_caches
+        }
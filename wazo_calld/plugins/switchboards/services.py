@@ -2,8 +2,10 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
+import threading
 
 from ari.exceptions import ARINotFound, ARIUnprocessable
+from requests import RequestException
 from xivo.caller_id import assemble_caller_id
 
 from wazo_calld.ari_ import DEFAULT_APPLICATION_NAME
@@ -12,7 +14,7 @@ from wazo_calld.plugin_helpers.confd import User
 from wazo_calld.plugin_helpers.exceptions import InvalidUserUUID
 
 from .ari_helpers import Switchboard as SwitchboardARI
-from .call import HeldCall, QueuedCall
+from .calls_state import HOLD, QUEUE, SwitchboardCallsState, parse_bridge_id
 from .confd import Switchboard as SwitchboardConfd
 from .constants import BRIDGE_HOLD_ID, BRIDGE_QUEUE_ID
 from .exceptions import NoSuchCall, NoSuchConfdUser, NoSuchSwitchboard
@@ -28,6 +30,12 @@ class SwitchboardsService:
         self._confd = confd
         self._notifier = notifier
         self._switchboards_lock = SwitchboardsLock()
+        self._calls_state = SwitchboardCallsState()
+        self._noanswer_timers = {}
+        self._noanswer_timers_lock = threading.Lock()
+
+    def provide_status(self, status):
+        self._switchboards_lock.provide_status(status)
 
     def queued_calls(self, tenant_uuid, switchboard_uuid):
         logger.debug(
@@ -38,27 +46,7 @@ class SwitchboardsService:
         if not SwitchboardConfd(tenant_uuid, switchboard_uuid, self._confd).exists():
             raise NoSuchSwitchboard(switchboard_uuid)
 
-        call_ids = SwitchboardARI(switchboard_uuid, self._ari).queued_call_ids()
-
-        result = []
-        for call_id in call_ids:
-            try:
-                channel = self._ari.channels.get(channelId=call_id)
-            except ARINotFound:
-                # channel may have exited ARI since bridge's channels were looked up
-                logger.debug(
-                    'Switchboard %s: channel %s not found in ARI, skipping',
-                    switchboard_uuid,
-                    call_id,
-                )
-                continue
-
-            call = QueuedCall(call_id)
-            call.caller_id_name = channel.json['caller']['name']
-            call.caller_id_number = channel.json['caller']['number']
-
-            result.append(call)
-        return result
+        return self._calls_state.queued_calls(switchboard_uuid)
 
     def new_queued_call(self, tenant_uuid, switchboard_uuid, channel_id):
         logger.debug(
@@ -85,9 +73,6 @@ class SwitchboardsService:
         channel.answer()
         bridge.addChannel(channel=channel_id)
 
-        calls = self.queued_calls(tenant_uuid, switchboard_uuid)
-        self._notifier.queued_calls(tenant_uuid, switchboard_uuid, calls)
-
         noanswer_timeout = Channel(channel_id, self._ari).switchboard_timeout()
         if not noanswer_timeout:
             logger.debug(
@@ -113,13 +98,18 @@ class SwitchboardsService:
             channel_id,
             noanswer_timeout,
         )
-        self._asyncio.call_later(
+        timer = self._asyncio.call_later(
             noanswer_timeout,
             self.on_queued_call_noanswer_timeout,
             tenant_uuid,
             switchboard_uuid,
             channel_id,
         )
+        with self._noanswer_timers_lock:
+            previous_timer = self._noanswer_timers.pop(channel_id, None)
+            self._noanswer_timers[channel_id] = timer
+        if previous_timer:
+            previous_timer.cancel()
 
     def on_queued_call_noanswer_timeout(self, tenant_uuid, switchboard_uuid, call_id):
         logger.debug(
@@ -127,8 +117,10 @@ class SwitchboardsService:
             switchboard_uuid,
             call_id,
         )
+        with self._noanswer_timers_lock:
+            self._noanswer_timers.pop(call_id, None)
 
-        if not SwitchboardARI(switchboard_uuid, self._ari).has_queued_call(call_id):
+        if not self._calls_state.has_queued_call(switchboard_uuid, call_id):
             logger.debug(
                 'Switchboard %s: no answer timeout for call %s cancelled: call is not queued',
                 switchboard_uuid,
@@ -286,16 +278,14 @@ class SwitchboardsService:
                 else:
                     hold_bridge.startMoh()
 
-            hold_bridge.addChannel(channel=channel_to_hold.id)
+            # variables are set first to be in the ChannelEnteredBridge snapshot
             channel_to_hold.setChannelVar(
                 variable='WAZO_SWITCHBOARD_HOLD', value=switchboard_uuid
             )
             channel_to_hold.setChannelVar(
                 variable='WAZO_TENANT_UUID', value=tenant_uuid
             )
-
-            held_calls = self.held_calls(tenant_uuid, switchboard_uuid)
-            self._notifier.held_calls(tenant_uuid, switchboard_uuid, held_calls)
+            hold_bridge.addChannel(channel=channel_to_hold.id)
 
             for previous_bridge in previous_bridges:
                 try:
@@ -328,32 +318,7 @@ class SwitchboardsService:
         if not SwitchboardConfd(tenant_uuid, switchboard_uuid, self._confd).exists():
             raise NoSuchSwitchboard(switchboard_uuid)
 
-        bridge_id = BRIDGE_HOLD_ID.format(uuid=switchboard_uuid)
-        try:
-            bridge = self._ari.bridges.get(bridgeId=bridge_id)
-        except ARINotFound:
-            return []
-
-        channel_ids = bridge.json.get('channels', None)
-
-        result = []
-        for channel_id in channel_ids:
-            try:
-                channel = self._ari.channels.get(channelId=channel_id)
-            except ARINotFound:
-                logger.debug(
-                    'Switchboard %s: channel %s not found in ARI, skipping',
-                    switchboard_uuid,
-                    channel_id,
-                )
-                continue
-
-            call = HeldCall(channel.id)
-            call.caller_id_name = channel.json['caller']['name']
-            call.caller_id_number = channel.json['caller']['number']
-
-            result.append(call)
-        return result
+        return self._calls_state.held_calls(switchboard_uuid)
 
     def answer_held_call(
         self, tenant_uuid, switchboard_uuid, held_call_id, user_uuid, line_id=None
@@ -423,3 +388,149 @@ class SwitchboardsService:
                 pass
 
             return channel.id
+
+    def refresh_calls(self):
+        logger.debug('Refreshing calls of all switchboards')
+        bridges = [
+            bridge
+            for bridge in self._ari.bridges.list()
+            if parse_bridge_id(bridge.id) != (None, None)
+        ]
+        channels = {}
+        if bridges:
+            channels = {
+                channel.id: channel.json for channel in self._ari.channels.list()
+            }
+
+        calls_by_bridge = {}
+        for bridge in bridges:
+            calls_by_bridge[parse_bridge_id(bridge.id)] = [
+                channels[channel_id]
+                for channel_id in bridge.json['channels']
+                if channel_id in channels
+            ]
+        self._calls_state.reset_all(calls_by_bridge)
+
+    def refresh_switchboard_calls(self, switchboard_uuid):
+        logger.debug('Refreshing calls of switchboard %s', switchboard_uuid)
+        switchboard = SwitchboardARI(switchboard_uuid, self._ari)
+        for kind, call_ids in (
+            (QUEUE, switchboard.queued_call_ids()),
+            (HOLD, switchboard.held_call_ids()),
+        ):
+            channels = []
+            for call_id in call_ids:
+                try:
+                    channel = self._ari.channels.get(channelId=call_id)
+                except ARINotFound:
+                    # channel may have exited ARI since bridge's channels were looked up
+                    logger.debug(
+                        'Switchboard %s: channel %s not found in ARI, skipping',
+                        switchboard_uuid,
+                        call_id,
+                    )
+                    continue
+                channels.append(channel.json)
+            self._calls_state.reset(kind, switchboard_uuid, channels)
+
+    def on_call_entered_bridge(self, tenant_uuid, bridge_id, channel_json):
+        kind, switchboard_uuid = parse_bridge_id(bridge_id)
+        if not kind:
+            return
+
+        call = self._calls_state.add(kind, switchboard_uuid, channel_json)
+        tenant_uuid = self._resolve_tenant_uuid(tenant_uuid, switchboard_uuid)
+        if not tenant_uuid:
+            return
+
+        if kind == QUEUE:
+            self._notify_queued_calls(tenant_uuid, switchboard_uuid)
+            self._notifier.queued_call_added(tenant_uuid, switchboard_uuid, call)
+        else:
+            self._notify_held_calls(tenant_uuid, switchboard_uuid)
+            self._notifier.held_call_added(tenant_uuid, switchboard_uuid, call)
+
+    def on_call_left_bridge(self, tenant_uuid, bridge_id, call_id):
+        kind, switchboard_uuid = parse_bridge_id(bridge_id)
+        if not kind:
+            return
+
+        if kind == QUEUE:
+            self._cancel_noanswer_timer(call_id)
+        call = self._calls_state.remove(kind, switchboard_uuid, call_id)
+        tenant_uuid = self._resolve_tenant_uuid(tenant_uuid, switchboard_uuid)
+        if tenant_uuid:
+            self._notify_call_removed(tenant_uuid, kind, switchboard_uuid, call)
+
+    def on_call_hangup(self, tenant_uuid, call_id):
+        # Asterisk sends ChannelLeftBridge before ChannelDestroyed, this only
+        # cleans up calls whose bridge events were lost
+        self._cancel_noanswer_timer(call_id)
+        kind, switchboard_uuid, call = self._calls_state.remove_call(call_id)
+        if not call:
+            return
+
+        tenant_uuid = self._resolve_tenant_uuid(tenant_uuid, switchboard_uuid)
+        if tenant_uuid:
+            self._notify_call_removed(tenant_uuid, kind, switchboard_uuid, call)
+
+    def on_call_caller_id_changed(self, tenant_uuid, channel_json):
+        kind, switchboard_uuid = self._calls_state.update_caller_id(channel_json)
+        if not kind:
+            return
+
+        tenant_uuid = self._resolve_tenant_uuid(tenant_uuid, switchboard_uuid)
+        if not tenant_uuid:
+            return
+
+        if kind == QUEUE:
+            self._notify_queued_calls(tenant_uuid, switchboard_uuid)
+        elif kind == HOLD:
+            self._notify_held_calls(tenant_uuid, switchboard_uuid)
+
+    def on_bridge_destroyed(self, bridge_id):
+        kind, switchboard_uuid = parse_bridge_id(bridge_id)
+        if kind:
+            self._calls_state.clear(kind, switchboard_uuid)
+
+    def _resolve_tenant_uuid(self, tenant_uuid, switchboard_uuid):
+        # channels without WAZO_TENANT_UUID belong to the switchboard's tenant
+        if tenant_uuid:
+            return tenant_uuid
+
+        try:
+            switchboard = self._confd.switchboards.get(switchboard_uuid)
+        except RequestException as e:
+            logger.warning(
+                'Switchboard %s: call without tenant and switchboard lookup '
+                'failed, not publishing its events: %s',
+                switchboard_uuid,
+                e,
+            )
+            return None
+        return switchboard['tenant_uuid']
+
+    def _cancel_noanswer_timer(self, call_id):
+        with self._noanswer_timers_lock:
+            timer = self._noanswer_timers.pop(call_id, None)
+        if timer:
+            logger.debug('Cancelling no answer timeout for call %s', call_id)
+            timer.cancel()
+
+    def _notify_call_removed(self, tenant_uuid, kind, switchboard_uuid, call):
+        if kind == QUEUE:
+            self._notify_queued_calls(tenant_uuid, switchboard_uuid)
+            if call:
+                self._notifier.queued_call_removed(tenant_uuid, switchboard_uuid, call)
+        else:
+            self._notify_held_calls(tenant_uuid, switchboard_uuid)
+            if call:
+                self._notifier.held_call_removed(tenant_uuid, switchboard_uuid, call)
+
+    def _notify_queued_calls(self, tenant_uuid, switchboard_uuid):
+        calls = self._calls_state.queued_calls(switchboard_uuid)
+        self._notifier.queued_calls(tenant_uuid, switchboard_uuid, calls)
+
+    def _notify_held_calls(self, tenant_uuid, switchboard_uuid):
+        calls = self._calls_state.held_calls(switchboard_uuid)
+        self._notifier.held_calls(tenant_uuid, switchboard_uuid, calls)
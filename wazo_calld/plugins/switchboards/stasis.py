@@ -25,6 +25,9 @@ class SwitchboardsStasis:
         self._core_ari.register_application(DEFAULT_APPLICATION_NAME)
 
     def _subscribe(self):
+        self._ari.on_application_registered(
+            DEFAULT_APPLICATION_NAME, self._service.refresh_calls
+        )
         self._ari.on_application_registered(
             DEFAULT_APPLICATION_NAME, self.notify_all_switchboard_queued
         )
@@ -32,8 +35,11 @@ class SwitchboardsStasis:
             DEFAULT_APPLICATION_NAME, self.notify_all_switchboard_held
         )
         self._ari.on_channel_event('StasisStart', self.stasis_start)
-        self._ari.on_channel_event('ChannelLeftBridge', self.unqueue)
-        self._ari.on_channel_event('ChannelLeftBridge', self.unhold)
+        self._ari.on_channel_event('ChannelEnteredBridge', self.entered_bridge)
+        self._ari.on_channel_event('ChannelLeftBridge', self.left_bridge)
+        self._ari.on_channel_event('ChannelDestroyed', self.hangup)
+        self._ari.on_channel_event('ChannelCallerId', self.caller_id_changed)
+        self._ari.on_bridge_event('BridgeDestroyed', self.bridge_destroyed)
 
     def notify_all_switchboard_queued(self):
         for switchboard in self._confd.switchboards.list(recurse=True)['items']:
@@ -104,10 +110,12 @@ class SwitchboardsStasis:
                 channel.setChannelVar(
                     variable='WAZO_SWITCHBOARD_QUEUE', value=queue_uuid
                 )
+                self._service.refresh_switchboard_calls(queue_uuid)
                 queued = self._service.queued_calls(tenant_uuid, queue_uuid)
                 self._notifier.queued_calls(tenant_uuid, queue_uuid, queued)
             if hold_uuid:
                 channel.setChannelVar(variable='WAZO_SWITCHBOARD_HOLD', value=hold_uuid)
+                self._service.refresh_switchboard_calls(hold_uuid)
                 held = self._service.held_calls(tenant_uuid, hold_uuid)
                 self._notifier.held_calls(tenant_uuid, hold_uuid, held)
         except ARINotFound:
@@ -205,24 +213,28 @@ class SwitchboardsStasis:
             tenant_uuid, switchboard_uuid, operator_channel.id, held_channel_id
         )
 
-    def unqueue(self, channel, event):
-        switchboard_uuid = channel.json['channelvars']['WAZO_SWITCHBOARD_QUEUE']
-        tenant_uuid = channel.json['channelvars']['WAZO_TENANT_UUID']
+    def entered_bridge(self, channel, event):
+        self._service.on_call_entered_bridge(
+            self._tenant_uuid(event), event['bridge']['id'], event['channel']
+        )
 
-        try:
-            queued_calls = self._service.queued_calls(tenant_uuid, switchboard_uuid)
-        except NoSuchSwitchboard:
-            return
+    def left_bridge(self, channel, event):
+        self._service.on_call_left_bridge(
+            self._tenant_uuid(event), event['bridge']['id'], channel.id
+        )
 
-        self._notifier.queued_calls(tenant_uuid, switchboard_uuid, queued_calls)
+    def hangup(self, channel, event):
+        self._service.on_call_hangup(self._tenant_uuid(event), channel.id)
 
-    def unhold(self, channel, event):
-        switchboard_uuid = channel.json['channelvars']['WAZO_SWITCHBOARD_HOLD']
-        tenant_uuid = channel.json['channelvars']['WAZO_TENANT_UUID']
+    def caller_id_changed(self, channel, event):
+        self._service.on_call_caller_id_changed(
+            self._tenant_uuid(event), event['channel']
+        )
 
-        try:
-            held_calls = self._service.held_calls(tenant_uuid, switchboard_uuid)
-        except NoSuchSwitchboard:
-            return
+    def bridge_destroyed(self, bridge, event):
+        self._service.on_bridge_destroyed(bridge.id)
 
-        self._notifier.held_calls(tenant_uuid, switchboard_uuid, held_calls)
+    @staticmethod
+    def _tenant_uuid(event):
+        channelvars = event['channel'].get('channelvars') or {}
+        return channelvars.get('WAZO_TENANT_UUID') or None
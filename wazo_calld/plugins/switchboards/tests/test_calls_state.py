@@ -0,0 +1,86 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from unittest import TestCase
+
+from hamcrest import assert_that, contains_exactly, empty, equal_to, has_properties
+
+from ..calls_state import HOLD, QUEUE, SwitchboardCallsState, parse_bridge_id
+
+
+def a_channel(id_, name='name', number='1234'):
+    return {'id': id_, 'caller': {'name': name, 'number': number}}
+
+
+class TestParseBridgeId(TestCase):
+    def test_parse_bridge_id(self):
+        assert_that(parse_bridge_id('switchboard-abc-queue'), equal_to((QUEUE, 'abc')))
+        assert_that(parse_bridge_id('switchboard-abc-hold'), equal_to((HOLD, 'abc')))
+        assert_that(parse_bridge_id('some-bridge'), equal_to((None, None)))
+        assert_that(parse_bridge_id(None), equal_to((None, None)))
+
+
+class TestSwitchboardCallsState(TestCase):
+    def setUp(self):
+        self.state = SwitchboardCallsState()
+
+    def test_add_keeps_order(self):
+        self.state.add(QUEUE, 'sb', a_channel('c1'))
+        self.state.add(QUEUE, 'sb', a_channel('c2'))
+
+        assert_that(
+            self.state.queued_calls('sb'),
+            contains_exactly(has_properties(id='c1'), has_properties(id='c2')),
+        )
+        assert_that(self.state.held_calls('sb'), empty())
+
+    def test_moving_from_queue_to_hold(self):
+        self.state.add(QUEUE, 'sb', a_channel('c1'))
+
+        self.state.add(HOLD, 'sb', a_channel('c1'))
+
+        assert_that(self.state.queued_calls('sb'), empty())
+        assert_that(
+            self.state.held_calls('sb'), contains_exactly(has_properties(id='c1'))
+        )
+        assert_that(self.state.has_held_call('sb', 'c1'), equal_to(True))
+        assert_that(self.state.has_queued_call('sb', 'c1'), equal_to(False))
+
+    def test_remove_from_another_bridge_is_ignored(self):
+        self.state.add(HOLD, 'sb', a_channel('c1'))
+
+        result = self.state.remove(QUEUE, 'sb', 'c1')
+
+        assert_that(result, equal_to(None))
+        assert_that(
+            self.state.held_calls('sb'), contains_exactly(has_properties(id='c1'))
+        )
+
+    def test_remove_call(self):
+        self.state.add(HOLD, 'sb', a_channel('c1'))
+
+        kind, switchboard_uuid, call = self.state.remove_call('c1')
+
+        assert_that((kind, switchboard_uuid, call.id), equal_to((HOLD, 'sb', 'c1')))
+        assert_that(self.state.held_calls('sb'), empty())
+
+    def test_update_caller_id(self):
+        self.state.add(QUEUE, 'sb', a_channel('c1', name='old'))
+
+        self.state.update_caller_id(a_channel('c1', name='new'))
+
+        assert_that(
+            self.state.queued_calls('sb'),
+            contains_exactly(has_properties(caller_id_name='new')),
+        )
+
+    def test_reset_all(self):
+        self.state.add(QUEUE, 'sb1', a_channel('c1'))
+
+        self.state.reset_all({(HOLD, 'sb2'): [a_channel('c2')]})
+
+        assert_that(self.state.queued_calls('sb1'), empty())
+        assert_that(
+            self.state.held_calls('sb2'), contains_exactly(has_properties(id='c2'))
+        )
+        assert_that(self.state.remove_call('c1'), equal_to((None, None, None)))
@@ -1,10 +1,11 @@
-# Copyright 2019-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2019-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from unittest import TestCase
 from unittest.mock import Mock
 
-from hamcrest import assert_that, calling, equal_to, raises
+from hamcrest import assert_that, calling, equal_to, has_entries, raises
+from requests import HTTPError
 
 from ..confd_client_cache import ConfdClientGetUUIDCacheDecorator
 
@@ -64,3 +65,42 @@ class TestConfdCacheGetUUID(TestCase):
             self.cache_get.invalidate_cache_entry('some-uuid')
         except KeyError:
             self.fail('invalidate_cache_entry raised KeyError')
+
+    def test_not_found_is_cached(self):
+        self.mock_get.side_effect = HTTPError(response=Mock(status_code=404))
+
+        for _ in range(2):
+            assert_that(
+                calling(self.cache_get).with_args('some-uuid'), raises(HTTPError)
+            )
+
+        self.mock_get.assert_called_once_with('some-uuid')
+
+    def test_invalidate_not_found(self):
+        self.mock_get.side_effect = HTTPError(response=Mock(status_code=404))
+        assert_that(calling(self.cache_get).with_args('some-uuid'), raises(HTTPError))
+        self.mock_get.side_effect = None
+        self.mock_get.return_value = 'some-response'
+
+        self.cache_get.invalidate_cache_entry('some-uuid')
+
+        assert_that(self.cache_get('some-uuid'), equal_to('some-response'))
+
+    def test_created_event_invalidates_not_found(self):
+        bus_consumer = Mock()
+        self.cache_get.subscribe(bus_consumer, events=['test_created'])
+        (event, handler), _ = bus_consumer.subscribe.call_args
+        self.mock_get.side_effect = HTTPError(response=Mock(status_code=404))
+        assert_that(calling(self.cache_get).with_args('some-uuid'), raises(HTTPError))
+        self.mock_get.side_effect = None
+        self.mock_get.return_value = 'some-response'
+
+        handler({'uuid': 'some-uuid'})
+
+        assert_that(self.cache_get('some-uuid'), equal_to('some-response'))
+
+    def test_stats(self):
+        self.cache_get('some-uuid')
+        self.cache_get('some-uuid')
+
+        assert_that(self.cache_get.stats(), has_entries(size=1, hits=1, misses=1))
@@ -0,0 +1,87 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import threading
+import time
+from unittest import TestCase
+
+from hamcrest import assert_that, equal_to, has_entries
+
+from ..lock import FairLock, SwitchboardsLock
+
+
+class TestFairLock(TestCase):
+    def test_waiters_acquire_in_order(self):
+        lock = FairLock()
+        order: list[int] = []
+        lock.acquire()
+
+        threads = []
+        for i in range(5):
+            thread = threading.Thread(
+                target=self._acquire_and_log, args=(lock, order, i)
+            )
+            thread.start()
+            threads.append(thread)
+            self._wait_for_waiters(lock, i + 1)
+
+        lock.release()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert_that(order, equal_to([0, 1, 2, 3, 4]))
+
+    @staticmethod
+    def _acquire_and_log(lock, order, i):
+        lock.acquire()
+        order.append(i)
+        lock.release()
+
+    @staticmethod
+    def _wait_for_waiters(lock, count):
+        deadline = time.monotonic() + 5
+        while len(lock._waiters) < count and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+
+class TestSwitchboardsLock(TestCase):
+    def setUp(self):
+        self.lock = SwitchboardsLock()
+
+    def test_different_switchboards_do_not_contend(self):
+        entered = threading.Event()
+
+        def other_switchboard():
+            with self.lock.acquired('switchboard-2', 'call-2'):
+                entered.set()
+
+        with self.lock.acquired('switchboard-1', 'call-1'):
+            thread = threading.Thread(target=other_switchboard)
+            thread.start()
+            assert entered.wait(timeout=5)
+        thread.join()
+
+    def test_same_switchboard_is_exclusive(self):
+        entered = threading.Event()
+
+        def same_switchboard():
+            with self.lock.acquired('switchboard-1', 'call-2'):
+                entered.set()
+
+        with self.lock.acquired('switchboard-1', 'call-1'):
+            thread = threading.Thread(target=same_switchboard)
+            thread.start()
+            assert not entered.wait(timeout=0.1)
+        assert entered.wait(timeout=5)
+        thread.join()
+
+    def test_unused_locks_are_forgotten(self):
+        with self.lock.acquired('switchboard-1', 'call-1'):
+            pass
+
+        status: dict = {}
+        self.lock.provide_status(status)
+
+        assert_that(status['locked_switchboards'], equal_to(0))
+        assert_that(status['lock_acquire_wait_seconds'], has_entries(count=1))
+        assert_that(status['lock_hold_seconds'], has_entries(count=1))
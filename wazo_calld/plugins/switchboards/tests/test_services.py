@@ -1,10 +1,13 @@
-# Copyright 2021-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2021-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from unittest import TestCase
 from unittest.mock import Mock
 from unittest.mock import sentinel as s
 
+from hamcrest import assert_that, contains_exactly, empty, has_properties
+from requests import HTTPError
+
 from wazo_calld.plugins.switchboards.services import SwitchboardsService
 
 
@@ -60,3 +63,140 @@ class TestSwitchboardService(TestCase):
         self.service.hold_call(self, s.tenant_uuid, s.switchboard_uuid)
 
         bridge.startMoh.assert_called_once_with()
+
+
+class TestSwitchboardCallsEvents(TestCase):
+    def setUp(self):
+        self.ari = Mock()
+        self.confd = Mock()
+        self.notifier = Mock()
+
+        self.service = SwitchboardsService(self.ari, Mock(), self.confd, self.notifier)
+
+    def test_call_entering_queue_is_listed_without_ari_requests(self):
+        channel = {'id': 'c1', 'caller': {'name': 'Alice', 'number': '1001'}}
+
+        self.service.on_call_entered_bridge('tenant', 'switchboard-sb-queue', channel)
+        calls = self.service.queued_calls('tenant', 'sb')
+
+        assert_that(calls, contains_exactly(has_properties(id='c1')))
+        self.ari.bridges.get.assert_not_called()
+        self.ari.channels.get.assert_not_called()
+        self.notifier.queued_calls.assert_called_once_with('tenant', 'sb', calls)
+        self.notifier.queued_call_added.assert_called_once_with(
+            'tenant', 'sb', calls[0]
+        )
+
+    def test_call_leaving_hold(self):
+        channel = {'id': 'c1', 'caller': {'name': 'Alice', 'number': '1001'}}
+        self.service.on_call_entered_bridge('tenant', 'switchboard-sb-hold', channel)
+
+        self.service.on_call_left_bridge('tenant', 'switchboard-sb-hold', 'c1')
+
+        assert_that(self.service.held_calls('tenant', 'sb'), empty())
+        (
+            tenant_uuid,
+            switchboard_uuid,
+            call,
+        ) = self.notifier.held_call_removed.call_args.args
+        assert_that(call, has_properties(id='c1'))
+
+    def test_other_bridges_are_ignored(self):
+        channel = {'id': 'c1', 'caller': {'name': 'Alice', 'number': '1001'}}
+
+        self.service.on_call_entered_bridge('tenant', 'some-bridge', channel)
+
+        self.notifier.queued_calls.assert_not_called()
+        self.notifier.held_calls.assert_not_called()
+
+    def test_call_without_tenant_uses_the_switchboard_tenant(self):
+        self.confd.switchboards.get.return_value = {'tenant_uuid': 'sb-tenant'}
+        channel = {'id': 'c1', 'caller': {'name': 'Alice', 'number': '1001'}}
+
+        self.service.on_call_entered_bridge(None, 'switchboard-sb-queue', channel)
+
+        self.confd.switchboards.get.assert_called_once_with('sb')
+        self.notifier.queued_calls.assert_called_once_with(
+            'sb-tenant', 'sb', self.service.queued_calls('sb-tenant', 'sb')
+        )
+
+    def test_call_without_tenant_of_unknown_switchboard_is_not_published(self):
+        self.confd.switchboards.get.side_effect = HTTPError()
+        channel = {'id': 'c1', 'caller': {'name': 'Alice', 'number': '1001'}}
+
+        self.service.on_call_entered_bridge(None, 'switchboard-sb-queue', channel)
+        self.service.on_call_left_bridge(None, 'switchboard-sb-queue', 'c1')
+
+        self.notifier.queued_calls.assert_not_called()
+        self.notifier.queued_call_added.assert_not_called()
+        self.notifier.queued_call_removed.assert_not_called()
+
+    def test_refresh_calls(self):
+        queue = Mock(id='switchboard-sb-queue', json={'channels': ['c1', 'gone']})
+        other = Mock(id='other', json={'channels': ['c2']})
+        self.ari.bridges.list.return_value = [queue, other]
+        self.ari.channels.list.return_value = [
+            Mock(id='c1', json={'id': 'c1', 'caller': {'name': '', 'number': ''}}),
+            Mock(id='c2', json={'id': 'c2', 'caller': {'name': '', 'number': ''}}),
+        ]
+
+        self.service.refresh_calls()
+
+        assert_that(
+            self.service.queued_calls('tenant', 'sb'),
+            contains_exactly(has_properties(id='c1')),
+        )
+        self.ari.channels.get.assert_not_called()
+
+
+class TestSwitchboardNoAnswerTimeout(TestCase):
+    def setUp(self):
+        self.ari = Mock()
+        self.asyncio = Mock()
+        self.confd = Mock()
+        self.notifier = Mock()
+
+        self.service = SwitchboardsService(
+            self.ari, self.asyncio, self.confd, self.notifier
+        )
+        self.confd.switchboards.get.return_value = {'queue_music_on_hold': None}
+        self.ari.bridges.get.return_value.json = {'channels': []}
+        self.ari.channels.getChannelVar.return_value = {'value': '10'}
+        self.timer = self.asyncio.call_later.return_value
+
+    def test_timer_cancelled_when_call_leaves_queue(self):
+        self.service.new_queued_call('tenant', 'sb', 'c1')
+
+        self.service.on_call_left_bridge('tenant', 'switchboard-sb-queue', 'c1')
+
+        self.timer.cancel.assert_called_once_with()
+
+    def test_timer_cancelled_on_hangup(self):
+        self.service.new_queued_call('tenant', 'sb', 'c1')
+
+        self.service.on_call_hangup('tenant', 'c1')
+
+        self.timer.cancel.assert_called_once_with()
+
+    def test_timer_not_cancelled_when_call_leaves_hold(self):
+        self.service.new_queued_call('tenant', 'sb', 'c1')
+
+        self.service.on_call_left_bridge('tenant', 'switchboard-sb-hold', 'c1')
+
+        self.timer.cancel.assert_not_called()
+
+    def test_timeout_of_call_not_queued_makes_no_ari_request(self):
+        self.service.on_queued_call_noanswer_timeout('tenant', 'sb', 'c1')
+
+        self.ari.bridges.get.assert_not_called()
+        self.ari.channels.continueInDialplan.assert_not_called()
+
+    def test_timeout_of_queued_call(self):
+        channel = {'id': 'c1', 'caller': {'name': 'Alice', 'number': '1001'}}
+        self.service.on_call_entered_bridge('tenant', 'switchboard-sb-queue', channel)
+
+        self.service.on_queued_call_noanswer_timeout('tenant', 'sb', 'c1')
+
+        self.ari.channels.continueInDialplan.assert_called_once_with(
+            channelId='c1', context='switchboard', extension='noanswer', priority='1'
+        )
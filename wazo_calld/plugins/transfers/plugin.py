@@ -1,4 +1,4 @@
-# Copyright 2016-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2016-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from __future__ import annotations
@@ -31,6 +31,7 @@ class Plugin:
         ari = dependencies['ari']
         bus_publisher = dependencies['bus_publisher']
         config = dependencies['config']
+        pubsub = dependencies['pubsub']
         token_changed_subscribe = dependencies['token_changed_subscribe']
 
         amid_client = AmidClient(**config['amid'])
@@ -40,6 +41,8 @@ class Plugin:
         token_changed_subscribe(confd_client.set_token)
 
         state_persistor = StatePersistor(ari.client)
+        state_persistor.start()
+        pubsub.subscribe('stopping', lambda _: state_persistor.stop())
         transfer_lock = TransferLock()
 
         notifier = TransferNotifier(bus_publisher)
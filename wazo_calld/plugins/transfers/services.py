@@ -1,4 +1,4 @@
-# Copyright 2016-2025 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2016-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
@@ -59,10 +59,7 @@ class TransfersService:
         self.transfer_lock: TransferLock = transfer_lock
 
     def list_from_user(self, user_uuid):
-        transfers = self.state_persistor.list()
-        return [
-            transfer for transfer in transfers if transfer.initiator_uuid == user_uuid
-        ]
+        return self.state_persistor.list_by_user(user_uuid)
 
     def create(
         self, transferred_call, initiator_call, context, exten, flow, variables, timeout
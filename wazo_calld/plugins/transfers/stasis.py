@@ -1,4 +1,4 @@
-# Copyright 2016-2025 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2016-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import logging
@@ -8,7 +8,7 @@ from wazo_amid_client import Client as AmidClient
 from xivo.pubsub import Pubsub
 
 from wazo_calld.ari_ import DEFAULT_APPLICATION_NAME, ARIClientProxy, CoreARI
-from wazo_calld.plugin_helpers.ari_ import Channel, GlobalVariableAdapter
+from wazo_calld.plugin_helpers.ari_ import GlobalVariableAdapter
 from wazo_calld.plugin_helpers.exceptions import WazoAmidError
 
 from . import ari_helpers
@@ -39,15 +39,16 @@ class TransfersStasis:
         self.state_persistor: StatePersistor = state_persistor
 
     def initialize(self):
+        try:
+            self.state_persistor.restore()
+        except Exception:
+            logger.exception('could not restore transfers from Asterisk')
         self._subscribe()
         self._core_ari.register_application(DEFAULT_APPLICATION_NAME)
 
     def _subscribe(self):
         self.ari.on_application_registered(
-            DEFAULT_APPLICATION_NAME, self.process_lost_hangups
-        )
-        self.ari.on_application_registered(
-            DEFAULT_APPLICATION_NAME, self.process_answered_calls
+            DEFAULT_APPLICATION_NAME, self.process_lost_transfers
         )
         self.ari.on_bridge_event('BridgeDestroyed', self.clean_bridge_variables)
 
@@ -110,48 +111,61 @@ class TransfersStasis:
     def handle_error(self, exception):
         logger.error('%s: %s', exception.message, exception.details)
 
-    def process_lost_hangups(self):
-        transfers = list(self.state_persistor.list())
-
-        logger.debug('Processing lost hangups since last stop...')
-        for transfer in transfers:
-            with self.state_factory.make(transfer.id) as transfer_state:
-                if not Channel(transfer.transferred_call, self.ari).exists():
-                    logger.debug('Transferred hangup from transfer %s', transfer.id)
-                    transfer_state = transfer_state.transferred_hangup()
-                if not Channel(transfer.initiator_call, self.ari).exists():
-                    logger.debug('Initiator hangup from transfer %s', transfer.id)
-                    transfer_state = transfer_state.initiator_hangup()
-                if not Channel(transfer.recipient_call, self.ari).exists():
-                    logger.debug('Recipient hangup from transfer %s', transfer.id)
-                    transfer_state = transfer_state.recipient_hangup()
-        logger.debug('Done.')
-
-    def process_answered_calls(self):
-        transfers = list(self.state_persistor.list())
+    def process_lost_transfers(self):
+        transfers = self.state_persistor.list()
 
         logger.info(
-            'Processing lost answered calls for %d remaining transfers since last stop...',
-            len(transfers),
+            'Processing %d remaining transfers since last stop...', len(transfers)
         )
-        answered_calls = 0
+        if not transfers:
+            return
+
+        channels = {channel.id: channel for channel in self.ari.channels.list()}
+
+        hangups = answered_calls = 0
         for transfer in transfers:
-            with self.state_factory.make(transfer.id) as transfer_state:
-                if (
-                    transfer_state.name == TransferStatus.ringback
-                    and Channel(transfer.recipient_call, self.ari).exists()
-                ):
-                    channel = self.ari.channels.get(channelId=transfer.recipient_call)
-                    if channel.json['state'] != 'Up':
-                        logger.debug('Recipient answered from transfer %s', transfer.id)
-                        continue
+            lost_roles = [
+                role
+                for role, call_id in (
+                    (TransferRole.transferred, transfer.transferred_call),
+                    (TransferRole.initiator, transfer.initiator_call),
+                    (TransferRole.recipient, transfer.recipient_call),
+                )
+                if call_id not in channels
+            ]
+            try:
+                if lost_roles:
+                    self._process_lost_hangups(transfer, lost_roles)
+                    hangups += 1
+                elif self._is_lost_answered_call(transfer, channels):
+                    recipient_channel = channels[transfer.recipient_call]
                     event = {'args': ['', '', transfer.id]}
-                    self.transfer_recipient_answered((channel, event))
+                    self.transfer_recipient_answered((recipient_channel, event))
                     answered_calls += 1
+            except Exception:
+                logger.exception('failed to recover transfer %s', transfer.id)
+
         logger.debug(
-            'Finished processing %d answered calls since last stop.', answered_calls
+            'Finished processing %d lost hangups and %d answered calls since last stop.',
+            hangups,
+            answered_calls,
         )
 
+    def _process_lost_hangups(self, transfer, lost_roles):
+        with self.state_factory.make(transfer.id) as transfer_state:
+            for role in lost_roles:
+                logger.debug('%s hangup from transfer %s', role, transfer.id)
+                transfer_state = getattr(transfer_state, f'{role}_hangup')()
+
+    def _is_lost_answered_call(self, transfer, channels):
+        if transfer.status != TransferStatus.ringback:
+            return False
+        recipient_channel = channels[transfer.recipient_call]
+        if recipient_channel.json['state'] != 'Up':
+            return False
+        logger.debug('Recipient answered from transfer %s', transfer.id)
+        return True
+
     def stasis_start(self, event_objects, event):
         try:
             sub_app, *_ = event['args']
@@ -1,6 +1,8 @@
-# Copyright 2016-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2016-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from __future__ import annotations
+
 import logging
 import threading
 
@@ -16,10 +18,19 @@ from .transfer import Transfer
 
 logger = logging.getLogger(__name__)
 
+FLUSH_DELAY = 0.2
+FLUSH_RETRY_DELAY = 5
+
 
 class StatePersistor:
-    def __init__(self, ari: ARIClientProxy):
-        self._transfers = GlobalVariableNameDecorator(
+    '''
+    The in-memory store is authoritative. Asterisk global variables are only
+    written asynchronously, in batches, so that transfers can be restored
+    after a wazo-calld restart.
+    '''
+
+    def __init__(self, ari: ARIClientProxy, flush_delay: float = FLUSH_DELAY):
+        self._transfer_variables = GlobalVariableNameDecorator(
             GlobalVariableJsonAdapter(GlobalVariableAdapter(ari)), 'XIVO_TRANSFERS_{}'
         )
         self._index = GlobalVariableConstantNameAdapter(
@@ -27,56 +38,159 @@ class StatePersistor:
             'XIVO_TRANSFERS_INDEX',
         )
         self._lock = threading.RLock()
+        self._transfers: dict[str, dict] = {}
+        self._transfer_ids_by_channel: dict[str, str] = {}
+        self._transfer_ids_by_user: dict[str, set[str]] = {}
+
+        self._flush_delay = flush_delay
+        self._dirty: set[str] = set()
+        self._dirty_event = threading.Event()
+        self._should_stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
 
     def get(self, transfer_id) -> Transfer:
         with self._lock:
-            transfer_dict = self._transfers.get(transfer_id)
+            transfer_dict = self._transfers[transfer_id]
         return Transfer.from_dict(transfer_dict)
 
     def get_by_channel(self, channel_id) -> Transfer:
-        for transfer in self.list():
-            if channel_id in (
-                transfer.transferred_call,
-                transfer.initiator_call,
-                transfer.recipient_call,
-            ):
-                return transfer
-        else:
-            raise KeyError(channel_id)
+        with self._lock:
+            transfer_id = self._transfer_ids_by_channel[channel_id]
+            return self.get(transfer_id)
 
     def upsert(self, transfer):
         logger.debug('transfer: %s upsert starting', transfer.id)
         with self._lock:
-            self._transfers.set(transfer.id, transfer.to_internal_dict())
-            index = set(self._index.get(default=[]))
-            index.add(transfer.id)
-            self._index.set(list(index))
+            self._unindex(transfer.id)
+            self._index_transfer(transfer.to_internal_dict())
+            self._mark_dirty(transfer.id)
         logger.debug('transfer: %s upsert done', transfer.id)
 
     def remove(self, transfer_id):
         logger.debug('transfer: %s remove starting', transfer_id)
         with self._lock:
-            self._transfers.unset(transfer_id)
-            index = set(self._index.get(default=[]))
-            try:
-                index.remove(transfer_id)
-            except KeyError:
+            if not self._unindex(transfer_id):
                 logger.debug('transfer: %s remove done, not found', transfer_id)
                 return
-            self._index.set(list(index))
+            self._mark_dirty(transfer_id)
         logger.debug('transfer: %s remove done', transfer_id)
 
+    def list_by_user(self, user_uuid) -> list[Transfer]:
+        with self._lock:
+            transfer_ids = self._transfer_ids_by_user.get(user_uuid, set())
+            transfer_dicts = [self._transfers[id_] for id_ in transfer_ids]
+        return [Transfer.from_dict(transfer_dict) for transfer_dict in transfer_dicts]
+
     def list(self) -> list[Transfer]:
-        results = []
         with self._lock:
-            for transfer_id in self._index.get(default=[]):
-                try:
-                    transfer = self.get(transfer_id)
-                except KeyError:
-                    logger.debug(
-                        'transfer list: transfer %s found in index, but details not found',
-                        transfer_id,
-                    )
+            transfer_dicts = list(self._transfers.values())
+        return [Transfer.from_dict(transfer_dict) for transfer_dict in transfer_dicts]
+
+    def restore(self):
+        logger.debug('restoring transfers from Asterisk...')
+        transfer_ids = self._index.get(default=[])
+        restored = 0
+        for transfer_id in transfer_ids:
+            try:
+                transfer_dict = self._transfer_variables.get(transfer_id)
+            except KeyError:
+                logger.debug(
+                    'transfer restore: transfer %s found in index, but details not found',
+                    transfer_id,
+                )
+                continue
+
+            with self._lock:
+                if transfer_id in self._transfers or transfer_id in self._dirty:
+                    # the in-memory state is more recent than the persisted one
                     continue
-                results.append(transfer)
-        return results
+                self._index_transfer(transfer_dict)
+            restored += 1
+        logger.info('restored %d transfers from Asterisk', restored)
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name='transfers_state_persistor'
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._should_stop.set()
+        self._dirty_event.set()
+        if self._thread:
+            logger.debug('joining transfers_state_persistor thread...')
+            self._thread.join()
+        self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+                self._dirty_event.clear()
+                pending = {
+                    transfer_id: self._transfers.get(transfer_id)
+                    for transfer_id in dirty
+                }
+                index = list(self._transfers)
+
+            if not pending:
+                return True
+
+            logger.debug('transfers: persisting %d changes', len(pending))
+            try:
+                for transfer_id, transfer_dict in pending.items():
+                    if transfer_dict is None:
+                        self._transfer_variables.unset(transfer_id)
+                    else:
+                        self._transfer_variables.set(transfer_id, transfer_dict)
+                self._index.set(index)
+            except Exception:
+                logger.exception('transfers: failed to persist state, will retry')
+                with self._lock:
+                    for transfer_id in dirty:
+                        self._mark_dirty(transfer_id)
+                return False
+            return True
+
+    def _run(self):
+        while not self._should_stop.is_set():
+            self._dirty_event.wait()
+            # let further changes accumulate to write them in a single batch
+            self._should_stop.wait(timeout=self._flush_delay)
+            if not self.flush():
+                self._should_stop.wait(timeout=FLUSH_RETRY_DELAY)
+
+    def _mark_dirty(self, transfer_id):
+        self._dirty.add(transfer_id)
+        self._dirty_event.set()
+
+    def _index_transfer(self, transfer_dict):
+        transfer_id = transfer_dict['id']
+        self._transfers[transfer_id] = transfer_dict
+        for channel_id in self._channel_ids(transfer_dict):
+            self._transfer_ids_by_channel[channel_id] = transfer_id
+        user_uuid = transfer_dict['initiator_uuid']
+        self._transfer_ids_by_user.setdefault(user_uuid, set()).add(transfer_id)
+
+    def _unindex(self, transfer_id):
+        transfer_dict = self._transfers.pop(transfer_id, None)
+        if transfer_dict is None:
+            return False
+
+        for channel_id in self._channel_ids(transfer_dict):
+            if self._transfer_ids_by_channel.get(channel_id) == transfer_id:
+                del self._transfer_ids_by_channel[channel_id]
+
+        user_uuid = transfer_dict['initiator_uuid']
+        user_transfers = self._transfer_ids_by_user.get(user_uuid, set())
+        user_transfers.discard(transfer_id)
+        if not user_transfers:
+            self._transfer_ids_by_user.pop(user_uuid, None)
+        return True
+
+    @staticmethod
+    def _channel_ids(transfer_dict):
+        for key in ('transferred_call', 'initiator_call', 'recipient_call'):
+            if transfer_dict[key]:
+                yield transfer_dict[key]
@@ -0,0 +1,136 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from unittest import TestCase
+from unittest.mock import MagicMock, Mock, sentinel
+
+from hamcrest import assert_that, contains_inanyorder, equal_to
+
+from ..stasis import TransfersStasis
+from ..state_persistor import StatePersistor
+from ..transfer import InternalTransferStatus, Transfer, TransferStatus
+
+NB_TRANSFERS = 500
+
+
+def a_transfer(id_, status=TransferStatus.answered):
+    transfer = Transfer(
+        id_=id_,
+        initiator_uuid='user-uuid',
+        initiator_tenant_uuid='tenant-uuid',
+        transferred_call=f'{id_}-transferred',
+        initiator_call=f'{id_}-initiator',
+        recipient_call=f'{id_}-recipient',
+    )
+    transfer.status = status
+    return transfer
+
+
+def a_channel(id_, state='Up'):
+    return Mock(id=id_, json={'id': id_, 'state': state})
+
+
+class TestProcessLostTransfers(TestCase):
+    def setUp(self):
+        self.ari = Mock()
+        self.state_persistor = StatePersistor(Mock())
+        self.state_factory = Mock()
+        self.transfer_states = {}
+        self.state_factory.make.side_effect = self._make_state
+        self.stasis = TransfersStasis(
+            sentinel.amid,
+            self.ari,
+            Mock(),
+            self.state_factory,
+            self.state_persistor,
+            sentinel.xivo_uuid,
+        )
+
+    def _make_state(self, transfer_id):
+        state = self.transfer_states.setdefault(transfer_id, Mock())
+        state.transferred_hangup.return_value = state
+        state.initiator_hangup.return_value = state
+        state.recipient_hangup.return_value = state
+        context = MagicMock()
+        context.__enter__.return_value = state
+        return context
+
+    def given_channels(self, *channels):
+        self.ari.client.channels.list.return_value = list(channels)
+
+    def test_no_transfers(self):
+        self.stasis.process_lost_transfers()
+
+        self.ari.client.channels.list.assert_not_called()
+
+    def test_lost_hangups(self):
+        transfer = a_transfer('t1')
+        self.state_persistor.upsert(transfer)
+        self.given_channels(a_channel('t1-initiator'))
+
+        self.stasis.process_lost_transfers()
+
+        state = self.transfer_states['t1']
+        state.transferred_hangup.assert_called_once_with()
+        state.initiator_hangup.assert_not_called()
+        state.recipient_hangup.assert_called_once_with()
+
+    def test_lost_answered_call(self):
+        transfer = a_transfer('t1', status=TransferStatus.ringback)
+        self.state_persistor.upsert(transfer)
+        self.given_channels(
+            a_channel('t1-transferred'),
+            a_channel('t1-initiator'),
+            a_channel('t1-recipient', state='Up'),
+        )
+
+        self.stasis.process_lost_transfers()
+
+        self.transfer_states['t1'].recipient_answer.assert_called_once_with()
+
+    def test_ringing_recipient_is_left_alone(self):
+        transfer = a_transfer('t1', status=TransferStatus.ringback)
+        self.state_persistor.upsert(transfer)
+        self.given_channels(
+            a_channel('t1-transferred'),
+            a_channel('t1-initiator'),
+            a_channel('t1-recipient', state='Ringing'),
+        )
+
+        self.stasis.process_lost_transfers()
+
+        self.state_factory.make.assert_not_called()
+
+    def test_recovery_of_many_transfers_uses_a_single_channel_listing(self):
+        channels = []
+        for i in range(NB_TRANSFERS):
+            transfer_id = f't{i}'
+            status: InternalTransferStatus
+            if i % 2:
+                status = TransferStatus.ringback
+                channels.extend(
+                    [
+                        a_channel(f'{transfer_id}-transferred'),
+                        a_channel(f'{transfer_id}-initiator'),
+                        a_channel(f'{transfer_id}-recipient'),
+                    ]
+                )
+            else:
+                status = TransferStatus.answered
+            self.state_persistor.upsert(a_transfer(transfer_id, status))
+        self.given_channels(*channels)
+
+        self.stasis.process_lost_transfers()
+
+        self.ari.client.channels.list.assert_called_once_with()
+        self.ari.client.channels.get.assert_not_called()
+        assert_that(self.state_factory.make.call_count, equal_to(NB_TRANSFERS))
+        answered = [
+            transfer_id
+            for transfer_id, state in self.transfer_states.items()
+            if state.recipient_answer.called
+        ]
+        assert_that(
+            answered,
+            contains_inanyorder(*(f't{i}' for i in range(1, NB_TRANSFERS, 2))),
+        )
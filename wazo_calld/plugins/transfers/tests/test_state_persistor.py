@@ -0,0 +1,152 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+from unittest import TestCase
+from unittest.mock import Mock, call
+
+from hamcrest import (
+    assert_that,
+    calling,
+    contains_inanyorder,
+    empty,
+    equal_to,
+    raises,
+)
+
+from ..state_persistor import StatePersistor
+from ..transfer import Transfer
+
+
+def a_transfer(id_, initiator_uuid='user-uuid', recipient_call=None):
+    return Transfer(
+        id_=id_,
+        initiator_uuid=initiator_uuid,
+        initiator_tenant_uuid='tenant-uuid',
+        transferred_call=f'{id_}-transferred',
+        initiator_call=f'{id_}-initiator',
+        recipient_call=recipient_call,
+    )
+
+
+class TestStatePersistor(TestCase):
+    def setUp(self):
+        self.ari = Mock()
+        self.persistor = StatePersistor(self.ari)
+
+    def test_get_by_channel(self):
+        transfer = a_transfer('t1', recipient_call='t1-recipient')
+        self.persistor.upsert(transfer)
+
+        for channel_id in ('t1-transferred', 't1-initiator', 't1-recipient'):
+            result = self.persistor.get_by_channel(channel_id)
+            assert_that(result.id, equal_to('t1'))
+
+        assert_that(
+            calling(self.persistor.get_by_channel).with_args('unknown'),
+            raises(KeyError),
+        )
+
+    def test_get_by_channel_follows_updates(self):
+        transfer = a_transfer('t1')
+        self.persistor.upsert(transfer)
+
+        transfer.recipient_call = 't1-recipient'
+        self.persistor.upsert(transfer)
+
+        assert_that(self.persistor.get_by_channel('t1-recipient').id, equal_to('t1'))
+
+    def test_remove(self):
+        self.persistor.upsert(a_transfer('t1'))
+
+        self.persistor.remove('t1')
+
+        assert_that(calling(self.persistor.get).with_args('t1'), raises(KeyError))
+        assert_that(
+            calling(self.persistor.get_by_channel).with_args('t1-initiator'),
+            raises(KeyError),
+        )
+        assert_that(self.persistor.list_by_user('user-uuid'), empty())
+
+    def test_list_by_user(self):
+        self.persistor.upsert(a_transfer('t1', initiator_uuid='user-1'))
+        self.persistor.upsert(a_transfer('t2', initiator_uuid='user-1'))
+        self.persistor.upsert(a_transfer('t3', initiator_uuid='user-2'))
+
+        result = self.persistor.list_by_user('user-1')
+
+        assert_that([t.id for t in result], contains_inanyorder('t1', 't2'))
+
+    def test_no_ari_request_until_flushed(self):
+        self.persistor.upsert(a_transfer('t1'))
+        self.persistor.get('t1')
+        self.persistor.get_by_channel('t1-initiator')
+        self.persistor.list()
+
+        self.ari.asterisk.setGlobalVar.assert_not_called()
+        self.ari.asterisk.getGlobalVar.assert_not_called()
+
+    def test_flush_writes_changes_in_batch(self):
+        self.persistor.upsert(a_transfer('t1'))
+        self.persistor.upsert(a_transfer('t2'))
+        self.persistor.remove('t2')
+
+        self.persistor.flush()
+
+        set_global_var = self.ari.asterisk.setGlobalVar
+        set_global_var.assert_any_call(
+            variable='XIVO_TRANSFERS_t1',
+            value=json.dumps(a_transfer('t1').to_internal_dict()),
+        )
+        set_global_var.assert_any_call(
+            variable='GLOBAL_DELETE(XIVO_TRANSFERS_t2)', value=''
+        )
+        index_calls = [
+            c
+            for c in set_global_var.call_args_list
+            if c.kwargs['variable'] == 'XIVO_TRANSFERS_INDEX'
+        ]
+        assert_that(
+            index_calls,
+            equal_to([call(variable='XIVO_TRANSFERS_INDEX', value='["t1"]')]),
+        )
+
+        set_global_var.reset_mock()
+        self.persistor.flush()
+        set_global_var.assert_not_called()
+
+    def test_flush_failure_is_retried(self):
+        self.persistor.upsert(a_transfer('t1'))
+        self.ari.asterisk.setGlobalVar.side_effect = Exception('ARI error')
+
+        result = self.persistor.flush()
+
+        assert_that(result, equal_to(False))
+        self.ari.asterisk.setGlobalVar.side_effect = None
+        self.ari.asterisk.setGlobalVar.reset_mock()
+
+        result = self.persistor.flush()
+
+        assert_that(result, equal_to(True))
+        self.ari.asterisk.setGlobalVar.assert_any_call(
+            variable='XIVO_TRANSFERS_INDEX', value='["t1"]'
+        )
+
+    def test_restore(self):
+        persisted = {
+            'XIVO_TRANSFERS_INDEX': json.dumps(['t1', 'missing']),
+            'XIVO_TRANSFERS_t1': json.dumps(a_transfer('t1').to_internal_dict()),
+        }
+
+        def get_global_var(variable):
+            if variable not in persisted:
+                return {'value': ''}
+            return {'value': persisted[variable]}
+
+        self.ari.asterisk.getGlobalVar.side_effect = get_global_var
+
+        self.persistor.restore()
+
+        assert_that([t.id for t in self.persistor.list()], equal_to(['t1']))
+        assert_that(self.persistor.get_by_channel('t1-initiator').id, equal_to('t1'))
+        self.ari.asterisk.setGlobalVar.assert_not_called()
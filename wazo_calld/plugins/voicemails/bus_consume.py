@@ -4,14 +4,14 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Any, Literal, TypedDict
+from typing import TYPE_CHECKING, Any, Literal, TypedDict, cast
 
 from wazo_bus.resources.call_logd.types import VoicemailTranscriptionDataDict
 from wazo_bus.resources.voicemail.types import VoicemailTranscriptionCalldDataDict
-from wazo_confd_client import Client as ConfdClient
 
 from wazo_calld.bus import CoreBusConsumer
 
+from .confd_cache import VoicemailConfdCache
 from .exceptions import VoicemailNotFound
 from .notifier import VoicemailsNotifier
 from .schemas import UnifiedVoicemailMessageSchema
@@ -41,8 +41,8 @@ voicemail_message_schema = UnifiedVoicemailMessageSchema()
 
 
 class TranscriptionBusEventHandler:
-    def __init__(self, confd_client: ConfdClient, notifier: VoicemailsNotifier):
-        self._confd_client = confd_client
+    def __init__(self, confd_cache: VoicemailConfdCache, notifier: VoicemailsNotifier):
+        self._confd_cache = confd_cache
         self._notifier = notifier
 
     def subscribe(self, bus_consumer: CoreBusConsumer) -> None:
@@ -116,18 +116,18 @@ class TranscriptionBusEventHandler:
                 )
 
     def _get_voicemail(self, voicemail_id: int) -> VoicemailDict:
-        return self._confd_client.voicemails.get(voicemail_id)
+        return cast(VoicemailDict, self._confd_cache.get_voicemail(None, voicemail_id))
 
 
 class VoicemailsBusEventHandler:
     def __init__(
         self,
-        confd_client: ConfdClient,
+        confd_cache: VoicemailConfdCache,
         notifier: VoicemailsNotifier,
         voicemail_cache: _VoicemailMessagesCache,
     ):
         # voicemail_cache must not be shared with other objects
-        self._confd_client = confd_client
+        self._confd_cache = confd_cache
         self._notifier = notifier
         self._voicemail_cache = voicemail_cache
 
@@ -154,13 +154,10 @@ class VoicemailsBusEventHandler:
                 )
 
     def _get_voicemail(self, number: str, context: str) -> VoicemailDict:
-        response = self._confd_client.voicemails.list(
-            number=number, context=context, recurse=True
-        )
-        items = response['items']
-        if not items:
+        voicemail = self._confd_cache.find_voicemail(number, context)
+        if voicemail is None:
             raise VoicemailNotFound(number=number, context=context)
-        return items[0]
+        return cast(VoicemailDict, voicemail)
 
     def _send_tenant_notifications_from_diff(
         self, voicemail: VoicemailDict, diff: _VoicemailMessagesDiff
@@ -0,0 +1,102 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import logging
+
+from wazo_confd_client import Client as ConfdClient
+
+from wazo_calld.bus import CoreBusConsumer
+from wazo_calld.plugin_helpers import confd
+from wazo_calld.plugin_helpers.cache import TTLLRUCache
+from wazo_calld.plugin_helpers.exceptions import NoSuchUserVoicemail, NoSuchVoicemail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 10000
+DEFAULT_TTL = 3600
+DEFAULT_NEGATIVE_TTL = 30
+
+INVALIDATING_EVENTS = (
+    'voicemail_created',
+    'voicemail_edited',
+    'voicemail_deleted',
+    'user_voicemail_associated',
+    'user_voicemail_dissociated',
+)
+
+
+def _is_not_found(error):
+    return isinstance(error, (NoSuchVoicemail, NoSuchUserVoicemail))
+
+
+class VoicemailConfdCache:
+    '''
+    Voicemail configurations from wazo-confd, by voicemail id, by user UUID,
+    by mailbox (number, context) and by (tenant, access type).
+
+    A voicemail may be found through several of those keys, so any voicemail
+    or user voicemail event invalidates the whole cache. The TTL only limits
+    staleness if an event is lost.
+    '''
+
+    def __init__(
+        self,
+        confd_client: ConfdClient,
+        max_size: int = DEFAULT_MAX_SIZE,
+        ttl: float | None = DEFAULT_TTL,
+        negative_ttl: float | None = DEFAULT_NEGATIVE_TTL,
+    ):
+        self._confd_client = confd_client
+        self._cache = TTLLRUCache(
+            max_size, ttl, negative_ttl=negative_ttl, is_negative=_is_not_found
+        )
+
+    def subscribe(self, bus_consumer: CoreBusConsumer) -> None:
+        for event in INVALIDATING_EVENTS:
+            bus_consumer.subscribe(event, self._on_voicemail_changed)
+
+    def _on_voicemail_changed(self, event: dict) -> None:
+        logger.debug('voicemail configuration changed, clearing the cache')
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+    def get_voicemail(self, tenant_uuid: str | None, voicemail_id: int) -> dict:
+        return self._cache.get_or_load(
+            ('id', tenant_uuid, voicemail_id),
+            lambda: confd.get_voicemail(tenant_uuid, voicemail_id, self._confd_client),
+        )
+
+    def get_user_voicemail(self, user_uuid: str) -> dict:
+        return self._cache.get_or_load(
+            ('user', user_uuid),
+            lambda: confd.get_user_voicemail(user_uuid, self._confd_client),
+        )
+
+    def find_voicemail(self, number: str, context: str) -> dict | None:
+        voicemails = self._cache.get_or_load(
+            ('mailbox', number, context),
+            lambda: confd.get_all_voicemails(
+                self._confd_client, number=number, context=context, recurse=True
+            ),
+        )
+        return voicemails[0] if voicemails else None
+
+    def list_voicemails(
+        self,
+        tenant_uuid: str,
+        accesstype: str | None = None,
+        recurse: bool = False,
+    ) -> list[dict]:
+        kwargs: dict = {'tenant_uuid': tenant_uuid, 'recurse': recurse}
+        if accesstype is not None:
+            kwargs['accesstype'] = accesstype
+        voicemails = self._cache.get_or_load(
+            ('tenant', tenant_uuid, accesstype, recurse),
+            lambda: confd.get_all_voicemails(self._confd_client, **kwargs),
+        )
+        # the cached list must not be modified by the caller
+        return list(voicemails)
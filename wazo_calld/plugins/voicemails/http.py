@@ -1,9 +1,10 @@
 # Copyright 2016-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import os
 import re
 
-from flask import Response, request
+from flask import Response, request, send_file
 from xivo.tenant_flask_helpers import Tenant
 
 from wazo_calld.auth import (
@@ -155,18 +156,19 @@ class _BaseVoicemailRecordingResource(AuthResource):
     def __init__(self, voicemails_service):
         self._voicemails_service = voicemails_service
 
-    def _get_response(self, recording, message_id):
-        if request.args.get('download') == '1':
-            headers = {
-                'Content-Disposition': 'attachment;filename=vm-msg-{}.wav'.format(
-                    message_id
-                )
-            }
-        else:
-            headers = None
-        return Response(
-            response=recording, status=200, headers=headers, content_type='audio/wav'
+    def _get_response(self, recording_path, message_id):
+        # send_file handles Range, If-None-Match and If-Modified-Since requests
+        response = send_file(
+            os.fsdecode(recording_path),
+            mimetype='audio/wav',
+            as_attachment=request.args.get('download') == '1',
+            download_name=f'vm-msg-{message_id}.wav',
+            conditional=True,
+            etag=True,
         )
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
 
 
 class VoicemailRecordingResource(_BaseVoicemailRecordingResource):
@@ -178,10 +180,10 @@ class VoicemailRecordingResource(_BaseVoicemailRecordingResource):
         tenant = Tenant.autodetect()
         voicemail_id = _validate_voicemail_id(voicemail_id)
         message_id = _validate_message_id(message_id)
-        recording = self._voicemails_service.get_message_recording(
+        recording_path = self._voicemails_service.get_message_recording_path(
             tenant.uuid, voicemail_id, message_id
         )
-        return self._get_response(recording, message_id)
+        return self._get_response(recording_path, message_id)
 
 
 class UserVoicemailRecordingResource(_BaseVoicemailRecordingResource):
@@ -193,10 +195,10 @@ class UserVoicemailRecordingResource(_BaseVoicemailRecordingResource):
         tenant = Tenant.autodetect()
         user_uuid = get_token_user_uuid_from_request()
         message_id = _validate_message_id(message_id)
-        recording = self._voicemails_service.get_user_message_recording(
+        recording_path = self._voicemails_service.get_user_message_recording_path(
             tenant.uuid, user_uuid, message_id
         )
-        return self._get_response(recording, message_id)
+        return self._get_response(recording_path, message_id)
 
 
 def _validate_voicemail_id(voicemail_id):
@@ -257,6 +259,13 @@ class VoicemailGreetingResource(AuthResource):
         tenant = Tenant.autodetect()
         voicemail_id = _validate_voicemail_id(voicemail_id)
         greeting = _validate_greeting(greeting)
+        path = self._service.get_greeting_path(tenant.uuid, voicemail_id, greeting)
+        if path is not None:
+            try:
+                return _greeting_file_response(path, greeting)
+            except FileNotFoundError:
+                # deleted since its path was found, ARI will tell if it is gone
+                pass
         data = self._service.get_greeting(tenant.uuid, voicemail_id, greeting)
         headers = {'Content-Disposition': self.content_dispo_tpl.format(greeting)}
         return Response(
@@ -304,6 +313,13 @@ class UserVoicemailGreetingResource(AuthResource):
     def get(self, greeting):
         user_uuid = get_token_user_uuid_from_request()
         greeting = _validate_greeting(greeting)
+        path = self._service.get_user_greeting_path(user_uuid, greeting)
+        if path is not None:
+            try:
+                return _greeting_file_response(path, greeting)
+            except FileNotFoundError:
+                # deleted since its path was found, ARI will tell if it is gone
+                pass
         data = self._service.get_user_greeting(user_uuid, greeting)
         headers = {'Content-Disposition': self.content_dispo_tpl.format(greeting)}
         return Response(
@@ -362,6 +378,21 @@ def _validate_greeting(greeting):
     raise NoSuchVoicemailGreeting(greeting)
 
 
+def _greeting_file_response(greeting_path, greeting):
+    # send_file handles If-None-Match and If-Modified-Since requests
+    response = send_file(
+        os.fsdecode(greeting_path),
+        mimetype='audio/wav',
+        as_attachment=True,
+        download_name=f'vm-greeting-{greeting}.wav',
+        conditional=True,
+        etag=True,
+    )
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
 class VoicemailMessagesResource(AuthResource):
     def __init__(self, voicemails_service):
         self._voicemails_service = voicemails_service
@@ -0,0 +1,317 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+from .exceptions import VoicemailMessageStorageError
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+ORDER_COLUMNS = ('id', 'caller_id_name', 'duration', 'timestamp')
+
+# A directory modified less than this many nanoseconds ago could be modified
+# again within the same timestamp, so it is not considered up to date.
+RACY_DELAY_NS = 2 * 10**9
+
+_SCHEMA = '''
+CREATE TABLE folder (
+    path BLOB PRIMARY KEY,
+    mtime_ns INTEGER
+);
+CREATE TABLE message (
+    folder_path BLOB NOT NULL,
+    name BLOB NOT NULL,
+    inode INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    caller_id_name TEXT,
+    caller_id_num TEXT,
+    timestamp INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    PRIMARY KEY (folder_path, name)
+);
+CREATE INDEX message_id_idx ON message (id);
+'''
+
+_MESSAGE_COLUMNS = (
+    'id',
+    'caller_id_name',
+    'caller_id_num',
+    'timestamp',
+    'duration',
+)
+_SELECT_MESSAGE = 'SELECT folder_path, name, {} FROM message'.format(
+    ', '.join(_MESSAGE_COLUMNS)
+)
+
+
+def open_index(path, parse_fn):
+    if not path:
+        return None
+    try:
+        return VoicemailMessagesIndex(path, parse_fn)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(
+            'could not open voicemail index %s, listing messages from the '
+            'filesystem: %s',
+            path,
+            e,
+        )
+        return None
+
+
+class VoicemailMessagesIndex:
+    '''
+    SQLite index of the voicemail messages metadata, by folder directory.
+
+    A folder is scanned again when its directory modification time changes,
+    i.e. when a message is added, moved or deleted. Only the message files
+    that changed since the last scan are parsed again.
+    '''
+
+    def __init__(
+        self,
+        path: str,
+        parse_fn: Callable[[bytes], dict],
+        clock: Callable[[], int] = time.time_ns,
+    ):
+        self._parse = parse_fn
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._create_schema()
+        self._folder_mtimes: dict[bytes, int | None] = dict(
+            self._db.execute('SELECT path, mtime_ns FROM folder')
+        )
+
+    def folder_messages(self, folder_path: bytes) -> list[tuple[bytes, dict]]:
+        '''
+        Returns the (name, message_info) of every message of the folder,
+        name being the message file name without extension
+        '''
+        self.refresh([folder_path])
+        with self._lock:
+            rows = self._db.execute(
+                f'{_SELECT_MESSAGE} WHERE folder_path = ?', (folder_path,)
+            ).fetchall()
+        return [(name, _message_info(row)) for _, name, *row in rows]
+
+    def count(
+        self,
+        folder_paths: Iterable[bytes],
+        from_timestamp: int | None = None,
+        until_timestamp: int | None = None,
+    ) -> int:
+        folder_paths = list(folder_paths)
+        self.refresh(folder_paths)
+        where, params = _time_range_clause(from_timestamp, until_timestamp)
+        with self._lock:
+            self._select_folders(folder_paths)
+            (count,) = self._db.execute(
+                'SELECT COUNT(*) FROM message '
+                'JOIN temp.selected_folder ON selected_folder.path = folder_path'
+                f'{where}',
+                params,
+            ).fetchone()
+        return count
+
+    def query(
+        self,
+        folder_paths: Iterable[bytes],
+        order: str | None = None,
+        direction: str | None = 'asc',
+        limit: int | None = None,
+        offset: int | None = None,
+        from_timestamp: int | None = None,
+        until_timestamp: int | None = None,
+    ) -> list[tuple[bytes, dict]]:
+        '''
+        Returns the (folder_path, message_info) of the messages of all given
+        folders, ordered and paginated
+        '''
+        if order is not None and order not in ORDER_COLUMNS:
+            raise ValueError(f'cannot order voicemail messages by {order}')
+
+        folder_paths = list(folder_paths)
+        self.refresh(folder_paths)
+
+        where, params = _time_range_clause(from_timestamp, until_timestamp)
+        sql = (
+            f'{_SELECT_MESSAGE} '
+            'JOIN temp.selected_folder ON selected_folder.path = folder_path'
+            f'{where}'
+        )
+        if order:
+            sort = 'DESC' if direction == 'desc' else 'ASC'
+            sql += f' ORDER BY {order} {sort}, folder_path, name'
+        if limit is not None or offset:
+            sql += ' LIMIT ? OFFSET ?'
+            params += (-1 if limit is None else limit, offset or 0)
+
+        with self._lock:
+            self._select_folders(folder_paths)
+            rows = self._db.execute(sql, params).fetchall()
+        return [(folder_path, _message_info(row)) for folder_path, _, *row in rows]
+
+    def find_message(
+        self, message_id: str, folder_paths: Iterable[bytes]
+    ) -> tuple[bytes, bytes] | None:
+        '''
+        Returns the (folder_path, name) of the message in one of the given
+        folders, as of their last scan
+        '''
+        with self._lock:
+            self._select_folders(folder_paths)
+            return self._db.execute(
+                'SELECT folder_path, name FROM message '
+                'JOIN temp.selected_folder ON selected_folder.path = folder_path '
+                'WHERE id = ?',
+                (message_id,),
+            ).fetchone()
+
+    def refresh(self, folder_paths: Iterable[bytes]) -> None:
+        for folder_path in folder_paths:
+            try:
+                stat = os.stat(folder_path)
+            except FileNotFoundError:
+                # probably: no messages have been left in this folder
+                if folder_path in self._folder_mtimes:
+                    self._forget_folder(folder_path)
+                continue
+            if self._folder_mtimes.get(folder_path, -1) != stat.st_mtime_ns:
+                self._scan_folder(folder_path, stat.st_mtime_ns)
+
+    def _scan_folder(self, folder_path, mtime_ns):
+        with self._lock:
+            known = {
+                name: (inode, file_mtime_ns, size)
+                for name, inode, file_mtime_ns, size in self._db.execute(
+                    'SELECT name, inode, mtime_ns, size FROM message '
+                    'WHERE folder_path = ?',
+                    (folder_path,),
+                )
+            }
+
+        changed = []
+        names = set()
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(b'.txt'):
+                    continue
+                name = entry.name[:-4]
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                names.add(name)
+                signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+                if known.get(name) == signature:
+                    continue
+                try:
+                    info = self._parse(entry.path)
+                except VoicemailMessageStorageError:
+                    if os.path.exists(entry.path):
+                        raise
+                    # the message has been moved or deleted during the scan
+                    names.discard(name)
+                    continue
+                changed.append((name, signature, info))
+
+        if self._clock() - mtime_ns < RACY_DELAY_NS:
+            mtime_ns = None
+
+        deleted = [(folder_path, name) for name in known.keys() - names]
+        with self._lock:
+            self._db.execute('BEGIN')
+            try:
+                self._db.executemany(
+                    'DELETE FROM message WHERE folder_path = ? AND name = ?', deleted
+                )
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO message VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [
+                        (folder_path, name, *signature, *_message_row(info))
+                        for name, signature, info in changed
+                    ],
+                )
+                self._db.execute(
+                    'INSERT OR REPLACE INTO folder VALUES (?, ?)',
+                    (folder_path, mtime_ns),
+                )
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+            self._db.execute('COMMIT')
+            self._folder_mtimes[folder_path] = mtime_ns
+
+        logger.debug(
+            'voicemail index: scanned %s (%s changed, %s deleted)',
+            folder_path,
+            len(changed),
+            len(deleted),
+        )
+
+    def _forget_folder(self, folder_path):
+        with self._lock:
+            self._db.execute('BEGIN')
+            self._db.execute(
+                'DELETE FROM message WHERE folder_path = ?', (folder_path,)
+            )
+            self._db.execute('DELETE FROM folder WHERE path = ?', (folder_path,))
+            self._db.execute('COMMIT')
+            self._folder_mtimes.pop(folder_path, None)
+
+    def _select_folders(self, folder_paths):
+        # This function must be called with self._lock held
+        self._db.execute('DELETE FROM temp.selected_folder')
+        self._db.executemany(
+            'INSERT OR IGNORE INTO temp.selected_folder VALUES (?)',
+            ((folder_path,) for folder_path in folder_paths),
+        )
+
+    def _create_schema(self):
+        (version,) = self._db.execute('PRAGMA user_version').fetchone()
+        if version != SCHEMA_VERSION:
+            logger.info('creating voicemail index (schema version %s)', SCHEMA_VERSION)
+            self._db.executescript(
+                'DROP TABLE IF EXISTS message; DROP TABLE IF EXISTS folder;'
+                f'{_SCHEMA} PRAGMA user_version = {SCHEMA_VERSION};'
+            )
+        self._db.execute(
+            'CREATE TEMP TABLE IF NOT EXISTS selected_folder (path BLOB PRIMARY KEY)'
+        )
+
+
+def _time_range_clause(from_timestamp, until_timestamp):
+    conditions: list[str] = []
+    params: tuple = ()
+    if from_timestamp is not None:
+        conditions.append('timestamp >= ?')
+        params += (from_timestamp,)
+    if until_timestamp is not None:
+        conditions.append('timestamp < ?')
+        params += (until_timestamp,)
+    if not conditions:
+        return '', params
+    return ' WHERE ' + ' AND '.join(conditions), params
+
+
+def _message_row(info):
+    return tuple(info[column] for column in _MESSAGE_COLUMNS)
+
+
+def _message_info(row):
+    info = dict(zip(_MESSAGE_COLUMNS, row))
+    info['empty'] = info['duration'] == 0
+    return info
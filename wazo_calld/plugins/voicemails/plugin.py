@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import logging
+import threading
 
 from wazo_call_logd_client import Client as CallLogdClient
 from wazo_confd_client import Client as ConfdClient
@@ -12,6 +13,7 @@ from xivo.status import Status
 from wazo_calld.types import PluginDependencies, StatusDict
 
 from .bus_consume import TranscriptionBusEventHandler, VoicemailsBusEventHandler
+from .confd_cache import DEFAULT_NEGATIVE_TTL, VoicemailConfdCache
 from .http import (
     UserVoicemailFolderResource,
     UserVoicemailGreetingCopyResource,
@@ -31,6 +33,7 @@ from .http import (
 from .notifier import VoicemailsNotifier
 from .services import VoicemailsService
 from .storage import new_cache, new_filesystem_storage
+from .transcription_cache import VoicemailTranscriptionCache
 
 logger = logging.getLogger(__name__)
 
@@ -49,27 +52,41 @@ class Plugin:
         call_logd_client = CallLogdClient(**config['call_logd'])
 
         notifier = VoicemailsNotifier(bus_publisher)
+        confd_cache_ttl = config['voicemails']['confd_cache_ttl']
+        self._confd_cache = VoicemailConfdCache(
+            confd_client,
+            ttl=confd_cache_ttl,
+            negative_ttl=min(confd_cache_ttl, DEFAULT_NEGATIVE_TTL),
+        )
+        self._confd_cache.subscribe(bus_consumer)
+        self._transcription_cache = VoicemailTranscriptionCache(
+            call_logd_client, ttl=config['voicemails']['transcription_cache_ttl']
+        )
+        self._transcription_cache.subscribe(bus_consumer)
 
         token_changed_subscribe(confd_client.set_token)
         token_changed_subscribe(call_logd_client.set_token)
 
-        voicemail_storage = new_filesystem_storage()
+        voicemail_storage = new_filesystem_storage(
+            index_file=config['voicemails']['index_file']
+        )
         self._voicemail_cache = new_cache(voicemail_storage)
-        try:
-            self._voicemail_cache.refresh_cache()
-        except Exception:
-            logger.exception('fail to refresh voicemail cache')
+        threading.Thread(
+            target=self._refresh_voicemail_cache,
+            name='voicemail_cache_refresh',
+            daemon=True,
+        ).start()
         voicemails_service = VoicemailsService(
-            ari.client, confd_client, voicemail_storage, call_logd_client
+            ari.client, self._confd_cache, voicemail_storage, self._transcription_cache
         )
 
         voicemails_bus_event_handler = VoicemailsBusEventHandler(
-            confd_client, notifier, self._voicemail_cache
+            self._confd_cache, notifier, self._voicemail_cache
         )
         voicemails_bus_event_handler.subscribe(bus_consumer)
 
         transcription_bus_event_handler = TranscriptionBusEventHandler(
-            confd_client, notifier
+            self._confd_cache, notifier
         )
         transcription_bus_event_handler.subscribe(bus_consumer)
 
@@ -147,6 +164,17 @@ class Plugin:
             resource_class_args=[voicemails_service],
         )
 
+    def _refresh_voicemail_cache(self) -> None:
+        try:
+            self._voicemail_cache.refresh_cache()
+        except Exception:
+            logger.exception('fail to refresh voicemail cache')
+
     def _provide_status(self, status: StatusDict) -> None:
-        status['plugins']['voicemails']['status'] = Status.ok
+        ready = self._voicemail_cache.ready
+        status['plugins']['voicemails']['status'] = Status.ok if ready else Status.fail
         status['plugins']['voicemails']['cache_items'] = len(self._voicemail_cache)
+        status['plugins']['voicemails']['confd_cache'] = self._confd_cache.stats()
+        status['plugins']['voicemails']['transcription_cache_items'] = len(
+            self._transcription_cache
+        )
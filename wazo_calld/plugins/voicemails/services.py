@@ -9,7 +9,6 @@ from typing import Literal
 import requests
 from ari.exceptions import ARIHTTPError
 
-from wazo_calld.plugin_helpers import confd
 from wazo_calld.plugin_helpers.exceptions import NoSuchUserVoicemail, NoSuchVoicemail
 
 from .exceptions import (
@@ -25,11 +24,11 @@ VoicemailTypes = Literal["all", "global", "personal"]
 
 
 class VoicemailsService:
-    def __init__(self, ari, confd_client, voicemail_storage, call_logd_client):
+    def __init__(self, ari, confd_cache, voicemail_storage, transcription_cache):
         self._ari = ari
-        self._confd_client = confd_client
+        self._confd_cache = confd_cache
         self._storage = voicemail_storage
-        self._call_logd_client = call_logd_client
+        self._transcription_cache = transcription_cache
 
     def count_user_messages(
         self,
@@ -52,11 +51,9 @@ class VoicemailsService:
         voicemail_id: int | None = None,
         recurse: bool = False,
     ) -> list[dict]:
-        client = self._confd_client
-
         if voicemail_id is not None:
             try:
-                return [confd.get_voicemail(tenant_uuid, voicemail_id, client)]
+                return [self._confd_cache.get_voicemail(tenant_uuid, voicemail_id)]
             except NoSuchVoicemail:
                 return []
 
@@ -64,50 +61,46 @@ class VoicemailsService:
             vm_confs: list[dict] = []
             if voicemail_type in ("all", "personal"):
                 try:
-                    vm_confs.append(confd.get_user_voicemail(user_uuid, client))
+                    vm_confs.append(self._confd_cache.get_user_voicemail(user_uuid))
                 except NoSuchUserVoicemail:
                     pass
             if voicemail_type in ("all", "global"):
                 vm_confs.extend(
-                    confd.get_all_voicemails(
-                        client, tenant_uuid=tenant_uuid, accesstype='global'
-                    )
+                    self._confd_cache.list_voicemails(tenant_uuid, accesstype='global')
                 )
             return vm_confs
 
-        kwargs: dict = {'tenant_uuid': tenant_uuid, 'recurse': recurse}
-        if voicemail_type != "all":
-            kwargs['accesstype'] = voicemail_type
-        return confd.get_all_voicemails(client, **kwargs)
+        accesstype = None if voicemail_type == "all" else voicemail_type
+        return self._confd_cache.list_voicemails(tenant_uuid, accesstype, recurse)
 
     def get_voicemail(self, tenant_uuid, voicemail_id):
-        vm_conf = confd.get_voicemail(tenant_uuid, voicemail_id, self._confd_client)
+        vm_conf = self._confd_cache.get_voicemail(tenant_uuid, voicemail_id)
         voicemail = self._storage.get_voicemail_info(vm_conf)
         messages = [m for f in voicemail['folders'] for m in f['messages']]
         self._enrich_messages_with_transcriptions(messages, {voicemail_id})
         return voicemail
 
     def get_user_voicemail(self, user_uuid):
-        vm_conf = confd.get_user_voicemail(user_uuid, self._confd_client)
+        vm_conf = self._confd_cache.get_user_voicemail(user_uuid)
         voicemail = self._storage.get_voicemail_info(vm_conf)
         messages = [m for f in voicemail['folders'] for m in f['messages']]
         self._enrich_messages_with_transcriptions(messages, {vm_conf['id']})
         return voicemail
 
     def get_folder(self, tenant_uuid, voicemail_id, folder_id):
-        vm_conf = confd.get_voicemail(tenant_uuid, voicemail_id, self._confd_client)
+        vm_conf = self._confd_cache.get_voicemail(tenant_uuid, voicemail_id)
         folder = self._storage.get_folder_info(vm_conf, folder_id)
         self._enrich_messages_with_transcriptions(folder['messages'], {voicemail_id})
         return folder
 
     def get_user_folder(self, user_uuid, folder_id):
-        vm_conf = confd.get_user_voicemail(user_uuid, self._confd_client)
+        vm_conf = self._confd_cache.get_user_voicemail(user_uuid)
         folder = self._storage.get_folder_info(vm_conf, folder_id)
         self._enrich_messages_with_transcriptions(folder['messages'], {vm_conf['id']})
         return folder
 
     def get_message(self, tenant_uuid, voicemail_id, message_id):
-        vm_conf = confd.get_voicemail(tenant_uuid, voicemail_id, self._confd_client)
+        vm_conf = self._confd_cache.get_voicemail(tenant_uuid, voicemail_id)
         message = self._storage.get_message_info(message_id, vm_conf)
         self._enrich_messages_with_transcriptions([message], {voicemail_id})
         return message
@@ -119,19 +112,13 @@ class VoicemailsService:
         self._enrich_messages_with_transcriptions([message], voicemail_ids)
         return message
 
-    def get_message_recording(self, tenant_uuid, voicemail_id, message_id):
-        vm_conf = confd.get_voicemail(tenant_uuid, voicemail_id, self._confd_client)
-        return self._get_message_recording(message_id, vm_conf)
+    def get_message_recording_path(self, tenant_uuid, voicemail_id, message_id):
+        vm_conf = self._confd_cache.get_voicemail(tenant_uuid, voicemail_id)
+        return self._storage.get_message_recording_path(message_id, vm_conf)
 
-    def get_user_message_recording(self, tenant_uuid, user_uuid, message_id):
+    def get_user_message_recording_path(self, tenant_uuid, user_uuid, message_id):
         vm_confs = self._get_voicemails_configs(tenant_uuid, user_uuid=user_uuid)
-        return self._get_message_recording(message_id, *vm_confs)
-
-    def _get_message_recording(self, message_id, *vm_confs):
-        _, recording = self._storage.get_message_info_and_recording(
-            message_id, *vm_confs
-        )
-        return recording
+        return self._storage.get_message_recording_path(message_id, *vm_confs)
 
     def list_user_messages(
         self,
@@ -181,32 +168,39 @@ class VoicemailsService:
         if not vm_confs:
             return {'items': [], 'total': 0, 'filtered': 0}
 
-        all_messages = self._storage.list_messages_infos(
-            *vm_confs, order=order, direction=direction
-        )
-        total = len(all_messages)
-
-        filtered_messages = all_messages
-        if from_ is not None:
-            from_ts = int(from_.timestamp())
-            filtered_messages = [
-                m for m in filtered_messages if m.get('timestamp', 0) >= from_ts
-            ]
-        if until is not None:
-            until_ts = int(until.timestamp())
-            filtered_messages = [
-                m for m in filtered_messages if m.get('timestamp', 0) < until_ts
-            ]
-
+        time_range = {
+            'from_timestamp': int(from_.timestamp()) if from_ is not None else None,
+            'until_timestamp': int(until.timestamp()) if until is not None else None,
+        }
         voicemail_ids = {vm_conf['id'] for vm_conf in vm_confs if 'id' in vm_conf}
-        self._enrich_messages_with_transcriptions(filtered_messages, voicemail_ids)
+        total = self._storage.count_all_messages(*vm_confs)
 
-        if transcribed is not None:
-            filtered_messages = [
-                m
-                for m in filtered_messages
-                if (m.get('transcription') is not None) == transcribed
-            ]
+        if transcribed is None:
+            if from_ is None and until is None:
+                filtered = total
+            else:
+                filtered = self._storage.count_all_messages(*vm_confs, **time_range)
+            items = self._storage.list_messages_infos(
+                *vm_confs,
+                limit=limit,
+                offset=offset,
+                order=order,
+                direction=direction,
+                **time_range,
+            )
+            self._enrich_messages_with_transcriptions(items, voicemail_ids)
+            return {'items': items, 'total': total, 'filtered': filtered}
+
+        # the transcription of every message in the time range is needed to filter
+        filtered_messages = self._storage.list_messages_infos(
+            *vm_confs, order=order, direction=direction, **time_range
+        )
+        self._enrich_messages_with_transcriptions(filtered_messages, voicemail_ids)
+        filtered_messages = [
+            m
+            for m in filtered_messages
+            if (m.get('transcription') is not None) == transcribed
+        ]
         filtered = len(filtered_messages)
 
         start = offset or 0
@@ -218,31 +212,17 @@ class VoicemailsService:
     def _enrich_messages_with_transcriptions(self, messages, voicemail_ids):
         if not messages or not voicemail_ids:
             return
-        try:
-            response = (
-                self._call_logd_client.voicemail_transcription.list_transcriptions(
-                    voicemail_id=','.join(str(v) for v in voicemail_ids),
-                )
-            )
-        except Exception as ex:
-            logger.warning(
-                'Could not fetch voicemail transcriptions from call-logd: %s', str(ex)
-            )
-            return
-        transcriptions_by_message_id = {
-            t['message_id']: t for t in response.get('items', [])
-        }
+        transcriptions = self._transcription_cache.get_transcriptions(voicemail_ids)
 
         for message in messages:
             message_id = message.get('id')
-            if message_id and message_id in transcriptions_by_message_id:
-                t = transcriptions_by_message_id[message_id]
+            if message_id and message_id in transcriptions:
                 message['transcription'] = {
-                    'text': t['transcription_text'],
+                    'text': transcriptions[message_id],
                 }
 
     def move_message(self, tenant_uuid, voicemail_id, message_id, dest_folder_id):
-        vm_conf = confd.get_voicemail(tenant_uuid, voicemail_id, self._confd_client)
+        vm_conf = self._confd_cache.get_voicemail(tenant_uuid, voicemail_id)
         dest_folder = self._storage.get_folder_by_id(dest_folder_id)
         message_info = self._storage.get_message_info(message_id, vm_conf)
         self._move_message(vm_conf, message_info, dest_folder)
@@ -270,7 +250,7 @@ class VoicemailsService:
         self._ari.wazo.moveVoicemailMessage(body=body)
 
     def delete_message(self, tenant_uuid, voicemail_id, message_id):
-        vm_conf = confd.get_voicemail(tenant_uuid, voicemail_id, self._confd_client)
+        vm_conf = self._confd_cache.get_voicemail(tenant_uuid, voicemail_id)
         return self._delete_message(vm_conf, message_id)
 
     def delete_user_message(self, tenant_uuid, user_uuid, message_id):
@@ -293,14 +273,30 @@ class VoicemailsService:
         self._ari.wazo.deleteVoicemailMessage(body=body)
 
     def get_greeting(self, tenant_uuid, voicemail_id, greeting):
-        vm_conf = confd.get_voicemail(tenant_uuid, voicemail_id, self._confd_client)
+        vm_conf = self._confd_cache.get_voicemail(tenant_uuid, voicemail_id)
         return self._get_greeting(vm_conf, greeting)
 
     def get_user_greeting(self, user_uuid, greeting):
-        vm_conf = confd.get_user_voicemail(user_uuid, self._confd_client)
+        vm_conf = self._confd_cache.get_user_voicemail(user_uuid)
         return self._get_greeting(vm_conf, greeting)
 
+    def get_greeting_path(self, tenant_uuid, voicemail_id, greeting):
+        vm_conf = self._confd_cache.get_voicemail(tenant_uuid, voicemail_id)
+        return self._storage.get_greeting_path(vm_conf, greeting)
+
+    def get_user_greeting_path(self, user_uuid, greeting):
+        vm_conf = self._confd_cache.get_user_voicemail(user_uuid)
+        return self._storage.get_greeting_path(vm_conf, greeting)
+
     def _get_greeting(self, vm_conf, greeting):
+        path = self._storage.get_greeting_path(vm_conf, greeting)
+        if path is not None:
+            try:
+                with open(path, 'rb') as f:
+                    return f.read()
+            except FileNotFoundError:
+                # the greeting has just been deleted or changed, ask Asterisk
+                pass
         try:
             return base64.b64decode(
                 self._ari.wazo.getVoicemailGreeting(
@@ -315,14 +311,16 @@ class VoicemailsService:
             raise
 
     def validate_greeting_exists(self, tenant_uuid, voicemail_id, greeting):
-        vm_conf = confd.get_voicemail(tenant_uuid, voicemail_id, self._confd_client)
+        vm_conf = self._confd_cache.get_voicemail(tenant_uuid, voicemail_id)
         return self._validate_greeting_exists(vm_conf, greeting)
 
     def validate_user_greeting_exists(self, user_uuid, greeting):
-        vm_conf = confd.get_user_voicemail(user_uuid, self._confd_client)
+        vm_conf = self._confd_cache.get_user_voicemail(user_uuid)
         return self._validate_greeting_exists(vm_conf, greeting)
 
     def _validate_greeting_exists(self, vm_conf, greeting):
+        if self._storage.get_greeting_path(vm_conf, greeting) is not None:
+            return
         try:
             self._ari.wazo.getVoicemailGreeting(
                 context=vm_conf['context'],
@@ -335,11 +333,11 @@ class VoicemailsService:
             raise
 
     def create_greeting(self, tenant_uuid, voicemail_id, greeting, data):
-        vm_conf = confd.get_voicemail(tenant_uuid, voicemail_id, self._confd_client)
+        vm_conf = self._confd_cache.get_voicemail(tenant_uuid, voicemail_id)
         return self._create_greeting(vm_conf, greeting, data)
 
     def create_user_greeting(self, user_uuid, greeting, data):
-        vm_conf = confd.get_user_voicemail(user_uuid, self._confd_client)
+        vm_conf = self._confd_cache.get_user_voicemail(user_uuid)
         return self._create_greeting(vm_conf, greeting, data)
 
     def _create_greeting(self, vm_conf, greeting, data):
@@ -361,11 +359,11 @@ class VoicemailsService:
             raise
 
     def update_greeting(self, tenant_uuid, voicemail_id, greeting, data):
-        vm_conf = confd.get_voicemail(tenant_uuid, voicemail_id, self._confd_client)
+        vm_conf = self._confd_cache.get_voicemail(tenant_uuid, voicemail_id)
         return self._update_greeting(vm_conf, greeting, data)
 
     def update_user_greeting(self, user_uuid, greeting, data):
-        vm_conf = confd.get_user_voicemail(user_uuid, self._confd_client)
+        vm_conf = self._confd_cache.get_user_voicemail(user_uuid)
         return self._update_greeting(vm_conf, greeting, data)
 
     def _update_greeting(self, vm_conf, greeting, data):
@@ -387,7 +385,7 @@ class VoicemailsService:
             raise
 
     def delete_greeting(self, tenant_uuid, voicemail_id, greeting):
-        vm_conf = confd.get_voicemail(tenant_uuid, voicemail_id, self._confd_client)
+        vm_conf = self._confd_cache.get_voicemail(tenant_uuid, voicemail_id)
         self._ari.wazo.removeVoicemailGreeting(
             context=vm_conf['context'],
             voicemail=vm_conf['number'],
@@ -395,7 +393,7 @@ class VoicemailsService:
         )
 
     def delete_user_greeting(self, user_uuid, greeting):
-        vm_conf = confd.get_user_voicemail(user_uuid, self._confd_client)
+        vm_conf = self._confd_cache.get_user_voicemail(user_uuid)
         self._ari.wazo.removeVoicemailGreeting(
             context=vm_conf['context'],
             voicemail=vm_conf['number'],
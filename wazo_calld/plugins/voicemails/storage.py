@@ -1,10 +1,15 @@
-# Copyright 2016-2025 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2016-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import errno
+import heapq
 import logging
 import os.path
+import sqlite3
+import threading
+import time
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from itertools import chain, islice
 from operator import itemgetter
@@ -12,14 +17,20 @@ from typing import Any, Literal
 
 from xivo import caller_id
 
+from wazo_calld.plugin_helpers.cache import TTLLRUCache
+
 from .exceptions import (
     NoSuchVoicemailFolder,
     NoSuchVoicemailMessage,
     VoicemailMessageStorageError,
 )
+from .index import ORDER_COLUMNS, RACY_DELAY_NS, open_index
 
 logger = logging.getLogger(__name__)
 
+REFRESH_WORKERS = 4
+PARSE_CACHE_SIZE = 20000
+
 
 class _Slicer:
     limit: int | None
@@ -40,6 +51,12 @@ class _Slicer:
         self.direction = direction or "asc"
 
     def __call__(self, iterable: Iterable[Any]) -> list[Any]:
+        if self.order and self.limit is not None:
+            # only keep the items up to the end of the page
+            select = heapq.nlargest if self.direction == "desc" else heapq.nsmallest
+            top = select(self.offset + self.limit, iterable, key=itemgetter(self.order))
+            return top[self.offset :]
+
         # NOTE (jalie): If using a sorting order, we must convert to list beforehand
         # which will require more memory to handle (might be a better way?)
         if self.order:
@@ -52,6 +69,15 @@ class _Slicer:
         return list(islice(iterable, self.offset, stop))
 
 
+# file names of the greetings in the mailbox directory, as app_voicemail
+# stores them
+_GREETING_FILE_NAMES = {
+    'unavailable': b'unavail',
+    'busy': b'busy',
+    'name': b'greet',
+}
+
+
 class VoicemailFolderType:
     new = 'new'
     old = 'old'
@@ -59,7 +85,7 @@ class VoicemailFolderType:
     other = 'other'
 
 
-def new_filesystem_storage(base_path=b'/var/spool/asterisk/voicemail'):
+def new_filesystem_storage(base_path=b'/var/spool/asterisk/voicemail', index_file=None):
     folders = _VoicemailFolders(
         [
             _VoicemailFolder(1, b'INBOX', VoicemailFolderType.new, True),
@@ -70,7 +96,8 @@ def new_filesystem_storage(base_path=b'/var/spool/asterisk/voicemail'):
             _VoicemailFolder(6, b'Friends'),
         ]
     )
-    return _VoicemailFilesystemStorage(base_path, folders)
+    index = open_index(index_file, _read_message_info)
+    return _VoicemailFilesystemStorage(base_path, folders, index)
 
 
 def new_cache(voicemail_storage):
@@ -107,9 +134,10 @@ class _VoicemailFolders:
 
 
 class _VoicemailFilesystemStorage:
-    def __init__(self, base_path, folders):
+    def __init__(self, base_path, folders, index=None):
         self._base_path = base_path
         self._folders = folders
+        self._index = index
 
     def list_voicemails_number_and_context(self):
         for context in os.listdir(self._base_path):
@@ -123,48 +151,50 @@ class _VoicemailFilesystemStorage:
                 for number in numbers:
                     yield number.decode('utf-8'), context
 
-    def get_voicemails_info(self):
-        for context in os.listdir(self._base_path):
-            context_path = os.path.join(self._base_path, context)
-            try:
-                numbers = os.listdir(context_path)
-            except OSError as e:
-                logger.error('unexpected error while listing %s: %s', context_path, e)
-            else:
-                for number in numbers:
-                    vm_conf = _fake_vm_conf(
-                        number.decode('utf-8'), context.decode('utf-8')
-                    )
-                    try:
-                        yield self.get_voicemail_info(vm_conf)
-                    except Exception as e:
-                        logger.exception(
-                            'unexpected error while getting voicemail info %s@%s: %s',
-                            number,
-                            context,
-                            e,
-                        )
-
     def get_voicemail_info(self, vm_conf):
         vm_access = _VoicemailAccess(self._base_path, self._folders, vm_conf)
         vm_info = vm_access.info()
         for folder_access in vm_access.folders():
-            folder_info = folder_access.info()
-            for message_access in folder_access.messages():
-                folder_info['messages'].append(message_access.info())
-            self._sort_messages(folder_info['messages'])
-            vm_info['folders'].append(folder_info)
+            vm_info['folders'].append(self._folder_info(folder_access))
         return vm_info
 
+    def get_folders_signatures(self, vm_conf):
+        '''
+        Returns {folder_id: signature}, where the signature changes when a
+        message is added to, moved or deleted from the folder. The signature is
+        None when the folder was modified too recently to be trusted.
+        '''
+        vm_access = _VoicemailAccess(self._base_path, self._folders, vm_conf)
+        now_ns = time.time_ns()
+        return {
+            folder_access.folder.id: folder_access.signature(now_ns)
+            for folder_access in vm_access.folders()
+        }
+
     def get_folder_info(self, vm_conf, folder_id):
         vm_access = _VoicemailAccess(self._base_path, self._folders, vm_conf)
         folder_access = vm_access.folder(folder_id)
+        return self._folder_info(folder_access)
+
+    def _folder_info(self, folder_access):
         folder_info = folder_access.info()
-        for message_access in folder_access.messages():
-            folder_info['messages'].append(message_access.info())
+        folder_info['messages'] = self._folder_messages_infos(folder_access)
         self._sort_messages(folder_info['messages'])
         return folder_info
 
+    def _folder_messages_infos(self, folder_access):
+        if self._index:
+            try:
+                return [
+                    folder_access.message_info(message_info)
+                    for _, message_info in self._index.folder_messages(
+                        folder_access.path
+                    )
+                ]
+            except sqlite3.Error:
+                logger.exception('voicemail index error, reading the filesystem')
+        return [message_access.info() for message_access in folder_access.messages()]
+
     def get_folder_by_id(self, folder_id):
         return self._folders.get_folder_by_id(folder_id)
 
@@ -172,29 +202,57 @@ class _VoicemailFilesystemStorage:
         return self._folders.get_folder_by_type(folder_type)
 
     def get_message_info(self, message_id, *vm_confs):
-        for vm_conf in vm_confs:
-            vm_access = _VoicemailAccess(self._base_path, self._folders, vm_conf)
-            try:
-                message_access = vm_access.get_message(message_id)
-            except NoSuchVoicemailMessage:
-                continue
-            else:
-                return message_access.info()
+        return self._get_message(message_id, vm_confs).info()
 
-        raise NoSuchVoicemailMessage(message_id)
+    def get_message_recording_path(self, message_id, *vm_confs):
+        return self._get_message(message_id, vm_confs).recording_path()
 
-    def get_message_info_and_recording(self, message_id, *vm_confs):
-        for vm_conf in vm_confs:
-            vm_access = _VoicemailAccess(self._base_path, self._folders, vm_conf)
+    def _get_message(self, message_id, vm_confs):
+        vm = partial(_VoicemailAccess, self._base_path, self._folders)
+        vm_accesses = [vm(conf) for conf in vm_confs]
+        if self._index:
             try:
-                message_access = vm_access.get_message(message_id)
+                return self._get_indexed_message(message_id, vm_accesses)
+            except sqlite3.Error:
+                logger.exception('voicemail index error, reading the filesystem')
+
+        for vm_access in vm_accesses:
+            try:
+                return vm_access.get_message(message_id)
             except NoSuchVoicemailMessage:
                 continue
-            else:
-                return message_access.info(), message_access.recording()
-
         raise NoSuchVoicemailMessage(message_id)
 
+    def _get_indexed_message(self, message_id, vm_accesses):
+        folders = {
+            folder_access.path: folder_access
+            for vm_access in vm_accesses
+            for folder_access in vm_access.folders()
+        }
+        message_access = self._read_indexed_message(message_id, folders)
+        if message_access is None:
+            # the message is new or has been moved since the last folder scan
+            self._index.refresh(folders)
+            message_access = self._read_indexed_message(message_id, folders)
+        if message_access is None:
+            raise NoSuchVoicemailMessage(message_id)
+        return message_access
+
+    def _read_indexed_message(self, message_id, folders):
+        location = self._index.find_message(message_id, folders)
+        if location is None:
+            return None
+        folder_path, name = location
+        if not os.path.exists(os.path.join(folder_path, name + b'.txt')):
+            return None
+        try:
+            message_access = _MessageAccess(folders[folder_path], name + b'.txt')
+        except VoicemailMessageStorageError:
+            return None
+        if message_access.id != message_id:
+            return None
+        return message_access
+
     def list_messages_infos(
         self,
         *vm_confs: dict,
@@ -202,14 +260,86 @@ class _VoicemailFilesystemStorage:
         offset: int | None = None,
         order: str | None = "timestamp",
         direction: Literal["asc", "desc"] | None = "asc",
+        from_timestamp: int | None = None,
+        until_timestamp: int | None = None,
     ) -> list[dict]:
         vm = partial(_VoicemailAccess, self._base_path, self._folders)
-        messages = chain(*(vm(conf).messages() for conf in vm_confs))
+        vm_accesses = [vm(conf) for conf in vm_confs]
+        if self._index and (order is None or order in ORDER_COLUMNS):
+            try:
+                return self._query_messages_infos(
+                    vm_accesses,
+                    limit,
+                    offset,
+                    order,
+                    direction,
+                    from_timestamp,
+                    until_timestamp,
+                )
+            except sqlite3.Error:
+                logger.exception('voicemail index error, reading the filesystem')
+        messages = _filter_time_range(
+            chain(*(vm_access.messages() for vm_access in vm_accesses)),
+            from_timestamp,
+            until_timestamp,
+        )
         return _Slicer(limit, offset, order, direction)(messages)
 
-    def count_all_messages(self, *vm_confs) -> int:
+    def _query_messages_infos(
+        self, vm_accesses, limit, offset, order, direction, *time_range
+    ):
+        folders = {}
+        for vm_access in vm_accesses:
+            vm_info = {'voicemail': vm_access.info()}
+            for folder_access in vm_access.folders():
+                folders[folder_access.path] = folder_access, vm_info
+
+        messages = []
+        for folder_path, message_info in self._index.query(
+            folders, order, direction, limit, offset, *time_range
+        ):
+            folder_access, vm_info = folders[folder_path]
+            messages.append(folder_access.message_info(message_info) | vm_info)
+        return messages
+
+    def count_all_messages(
+        self,
+        *vm_confs,
+        from_timestamp: int | None = None,
+        until_timestamp: int | None = None,
+    ) -> int:
         vm = partial(_VoicemailAccess, self._base_path, self._folders)
-        return sum(vm(conf).messages_count() for conf in vm_confs)
+        vm_accesses = [vm(conf) for conf in vm_confs]
+        if self._index:
+            try:
+                return self._index.count(
+                    (
+                        folder_access.path
+                        for vm_access in vm_accesses
+                        for folder_access in vm_access.folders()
+                    ),
+                    from_timestamp,
+                    until_timestamp,
+                )
+            except sqlite3.Error:
+                logger.exception('voicemail index error, reading the filesystem')
+        if from_timestamp is None and until_timestamp is None:
+            return sum(vm_access.messages_count() for vm_access in vm_accesses)
+        messages = chain(*(vm_access.messages() for vm_access in vm_accesses))
+        return sum(
+            1 for _ in _filter_time_range(messages, from_timestamp, until_timestamp)
+        )
+
+    def get_greeting_path(self, vm_conf, greeting):
+        '''
+        Returns the path of the greeting wav file, or None if the greeting is
+        not stored as a wav file
+        '''
+        vm_access = _VoicemailAccess(self._base_path, self._folders, vm_conf)
+        path = os.path.join(vm_access.path, _GREETING_FILE_NAMES[greeting] + b'.wav')
+        if not os.path.isfile(path):
+            return None
+        return path
 
     def _sort_messages(self, messages):
         messages.sort(key=itemgetter('timestamp'), reverse=True)
@@ -244,11 +374,9 @@ class _VoicemailAccess:
 
     def messages(self):
         vm_info = {"voicemail": self.info()}
-        return [
-            message.info() | vm_info
-            for folder in self.folders()
-            for message in folder.messages()
-        ]
+        for folder in self.folders():
+            for message in folder.messages():
+                yield message.info() | vm_info
 
     def info(self):
         return {
@@ -280,6 +408,17 @@ class _FolderAccess:
 
         return count
 
+    def signature(self, now_ns):
+        try:
+            stat = os.stat(self.path)
+            nb_entries = len(os.listdir(self.path))
+        except FileNotFoundError:
+            # probably: no messages have been left in this folder
+            return (0, 0)
+        if now_ns - stat.st_mtime_ns < RACY_DELAY_NS:
+            return None
+        return (stat.st_mtime_ns, nb_entries)
+
     def messages(self):
         try:
             names = os.listdir(self.path)
@@ -292,6 +431,12 @@ class _FolderAccess:
             if name.endswith(b'.txt'):
                 yield _MessageAccess(self, name)
 
+    def message_info(self, parse_result):
+        info = dict(parse_result)
+        info['folder'] = self.folder
+        info['vm_conf'] = self.vm_access.vm_conf
+        return info
+
     def info(self):
         return {
             'id': self.folder.id,
@@ -303,33 +448,35 @@ class _FolderAccess:
 
 class _MessageInfoParser:
     def __init__(self):
-        self._parse_table = [
-            (b'callerid=', self._extract_value, self._parse_callerid),
-            (b'msg_id=', self._extract_value, self._parse_msg_id),
-            (b'origtime=', self._extract_value, self._parse_origtime),
-            (b'duration=', self._extract_value, self._parse_duration),
-        ]
+        self._parse_table = {
+            b'callerid': self._parse_callerid,
+            b'msg_id': self._parse_msg_id,
+            b'origtime': self._parse_origtime,
+            b'duration': self._parse_duration,
+        }
 
     def parse(self, fobj):
         result: dict = {}
         parsed = set()
         for line in fobj:
-            line = b'='.join([x.strip() for x in line.split(b'=')])
-            for prefix, extract, parse in self._parse_table:
-                if line.startswith(prefix):
-                    parsed.add(prefix)
-                    value = extract(line)
-                    parse(value, result)
+            key, sep, value = line.partition(b'=')
+            if not sep:
+                continue
+            key = key.strip()
+            parse = self._parse_table.get(key)
+            if parse is None or key in parsed:
+                continue
+            parse(value.strip(), result)
+            parsed.add(key)
+            if len(parsed) == len(self._parse_table):
+                # the rest of the file is not needed
+                return result
         # check that everything was parsed
-        for prefix, _, _ in self._parse_table:
-            if prefix not in parsed:
-                raise Exception(f'no line starting with {prefix.decode("utf-8")}')
+        for key in self._parse_table:
+            if key not in parsed:
+                raise Exception(f'no line starting with {key.decode("utf-8")}=')
         return result
 
-    @staticmethod
-    def _extract_value(line):
-        return line.split(b'=', 1)[1].rstrip()
-
     @staticmethod
     def _parse_callerid(value, result):
         value = value.decode('utf-8')
@@ -357,9 +504,36 @@ class _MessageInfoParser:
         result['empty'] = int(value) == 0
 
 
-class _MessageAccess:
-    _MESSAGE_INFO_PARSER = _MessageInfoParser()
+_MESSAGE_INFO_PARSER = _MessageInfoParser()
+
+# parse results of the message files, by (path, inode, mtime_ns, size)
+_MESSAGE_INFO_CACHE = TTLLRUCache(max_size=PARSE_CACHE_SIZE, ttl=None)
+
+
+def _read_message_info(path):
+    try:
+        with open(path, 'rb') as fobj:
+            stat = os.fstat(fobj.fileno())
+            key = (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            parse_result = _MESSAGE_INFO_CACHE.get(key)
+            if parse_result is None:
+                parse_result = _MESSAGE_INFO_PARSER.parse(fobj)
+                _MESSAGE_INFO_CACHE.put(key, parse_result)
+            return parse_result
+    except OSError as e:
+        if e.errno == errno.ENOENT:
+            # probably: the message has been deleted/moved
+            logger.error('could not read voicemail message %s: no such file', path)
+            raise VoicemailMessageStorageError()
+        raise
+    except Exception:
+        logger.error(
+            'error while parsing voicemail message info %s', path, exc_info=True
+        )
+        raise VoicemailMessageStorageError()
+
 
+class _MessageAccess:
     def __init__(self, folder_access, message_info_name):
         self.folder_access = folder_access
         self.name_prefix = os.path.splitext(message_info_name)[0]
@@ -367,69 +541,126 @@ class _MessageAccess:
         self._read_message_info_file()
 
     def _read_message_info_file(self):
-        path = self.path_prefix + b'.txt'
-        try:
-            with open(path, 'rb') as fobj:
-                self.parse_result = self._MESSAGE_INFO_PARSER.parse(fobj)
-            self.id = self.parse_result['id']
-        except OSError as e:
-            if e.errno == errno.ENOENT:
-                # probably: the message has been deleted/moved
-                logger.error('could not read voicemail message %s: no such file', path)
-                raise VoicemailMessageStorageError()
-            raise
-        except Exception:
-            logger.error(
-                'error while parsing voicemail message info %s', path, exc_info=True
-            )
-            raise VoicemailMessageStorageError()
+        self.parse_result = _read_message_info(self.path_prefix + b'.txt')
+        self.id = self.parse_result['id']
 
     def info(self):
-        info = dict(self.parse_result)
-        info['folder'] = self.folder_access.folder
-        info['vm_conf'] = self.folder_access.vm_access.vm_conf
-        return info
+        return self.folder_access.message_info(self.parse_result)
 
-    def recording(self):
+    def recording_path(self):
         path = self.path_prefix + b'.wav'
-        try:
-            with open(path, 'rb') as fobj:
-                return fobj.read()
-        except OSError as e:
-            if e.errno == errno.ENOENT:
-                # probably: the message has been deleted/moved or the recording is not stored as a wav
-                logger.error(
-                    'could not read voicemail recording %s: no such file', path
-                )
-                raise VoicemailMessageStorageError()
-            raise
+        if not os.path.isfile(path):
+            # probably: the message has been deleted/moved or the recording is not stored as a wav
+            logger.error('could not read voicemail recording %s: no such file', path)
+            raise VoicemailMessageStorageError()
+        return path
 
 
 class _VoicemailMessagesCache:
+    '''
+    Messages of every mailbox, by folder, used to compute what changed when
+    Asterisk reports a MessageWaiting event.
+
+    A cache entry is {folder_id: (signature, {message_id: message_info})}; a
+    folder is only read again when its signature changes.
+    '''
+
     _EMPTY_CACHE_ENTRY: dict = {}
 
-    def __init__(self, voicemail_storage, cache_cleanup_counter_max=1500):
+    def __init__(
+        self,
+        voicemail_storage,
+        cache_cleanup_counter_max=1500,
+        refresh_workers=REFRESH_WORKERS,
+    ):
         self._storage = voicemail_storage
         self._cache = {}
         self._cache_cleanup_counter = 0
         self._cache_cleanup_counter_max = cache_cleanup_counter_max
+        self._refresh_workers = refresh_workers
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._ready = False
+
+    @property
+    def ready(self):
+        return self._ready
 
     def refresh_cache(self):
-        self._cache = {}
-        for vm_info in self._storage.get_voicemails_info():
-            cache_entry = self._vm_info_to_cache_entry(vm_info)
-            key = (vm_info['number'], vm_info['context'])
-            self._cache[key] = cache_entry
+        '''
+        Loads every mailbox of the spool. Meant to run in the background: the
+        mailboxes that get_diff already loaded meanwhile are kept.
+        '''
+        with self._lock:
+            self._refreshing = True
+        try:
+            keys = list(self._storage.list_voicemails_number_and_context())
+            with ThreadPoolExecutor(
+                max_workers=self._refresh_workers,
+                thread_name_prefix='voicemail_cache',
+            ) as executor:
+                nb_loaded = sum(executor.map(self._load, keys))
+            logger.info('voicemail cache: loaded %s/%s mailboxes', nb_loaded, len(keys))
+        finally:
+            with self._lock:
+                self._refreshing = False
+            self._ready = True
+
+    def _load(self, key):
+        number, context = key
+        try:
+            cache_entry = self._scan(
+                _fake_vm_conf(number, context), self._EMPTY_CACHE_ENTRY
+            )
+        except Exception:
+            logger.exception(
+                'unexpected error while loading voicemail %s@%s', number, context
+            )
+            return False
+        with self._lock:
+            self._cache.setdefault(key, cache_entry)
+        return True
 
     def get_diff(self, number, context):
         key = (number, context)
         vm_conf = _fake_vm_conf(number, context)
-        old_cache_entry = self._cache.get(key, self._EMPTY_CACHE_ENTRY)
-        new_vm_info = self._storage.get_voicemail_info(vm_conf)
-        new_cache_entry = self._vm_info_to_cache_entry(new_vm_info)
-        self._cache[key] = new_cache_entry
+        with self._lock:
+            old_cache_entry = self._cache.get(key)
+            refreshing = self._refreshing
+        new_cache_entry = self._scan(
+            vm_conf, old_cache_entry or self._EMPTY_CACHE_ENTRY
+        )
+        with self._lock:
+            self._cache[key] = new_cache_entry
         self._maybe_clean_cache()
-        return self._compute_diff(old_cache_entry, new_cache_entry)
+        if old_cache_entry is None and refreshing:
+            # not loaded yet: every message would be reported as created
+            logger.debug('voicemail %s@%s not loaded yet, no diff', number, context)
+            return _VoicemailMessagesDiff()
+        return self._compute_diff(
+            self._messages(old_cache_entry or self._EMPTY_CACHE_ENTRY),
+            self._messages(new_cache_entry),
+        )
+
+    def _scan(self, vm_conf, old_cache_entry):
+        cache_entry = {}
+        signatures = self._storage.get_folders_signatures(vm_conf)
+        for folder_id, signature in signatures.items():
+            old_folder_entry = old_cache_entry.get(folder_id)
+            if (
+                signature is not None
+                and old_folder_entry is not None
+                and old_folder_entry[0] == signature
+            ):
+                cache_entry[folder_id] = old_folder_entry
+                continue
+            folder_info = self._storage.get_folder_info(vm_conf, folder_id)
+            messages = {
+                message_info['id']: message_info
+                for message_info in folder_info['messages']
+            }
+            cache_entry[folder_id] = (signature, messages)
+        return cache_entry
 
     def _maybe_clean_cache(self):
         if self._cache_cleanup_counter == self._cache_cleanup_counter_max:
@@ -440,30 +671,28 @@ class _VoicemailMessagesCache:
 
     def _clean_cache(self):
         logger.info('cleaning voicemail cache')
-        cached_keys = set(self._cache)
-        keys_to_purge = cached_keys.difference(
-            self._storage.list_voicemails_number_and_context()
-        )
-        for key in keys_to_purge:
-            del self._cache[key]
+        existing_keys = set(self._storage.list_voicemails_number_and_context())
+        with self._lock:
+            for key in set(self._cache).difference(existing_keys):
+                del self._cache[key]
 
-    def _vm_info_to_cache_entry(self, vm_info):
-        cache_entry = {}
-        for folder_info in vm_info['folders']:
-            for message_info in folder_info['messages']:
-                cache_entry[message_info['id']] = message_info
-        return cache_entry
+    @staticmethod
+    def _messages(cache_entry):
+        messages = {}
+        for _, folder_messages in cache_entry.values():
+            messages.update(folder_messages)
+        return messages
 
-    def _compute_diff(self, old_cache_entry, new_cache_entry):
+    def _compute_diff(self, old_messages, new_messages):
         diff = _VoicemailMessagesDiff()
-        for message_id, old_message_info in old_cache_entry.items():
-            new_message_info = new_cache_entry.get(message_id)
+        for message_id, old_message_info in old_messages.items():
+            new_message_info = new_messages.get(message_id)
             if new_message_info is None:
                 diff.deleted_messages.append(old_message_info)
             elif old_message_info != new_message_info:
                 diff.updated_messages.append(new_message_info)
-        for message_id, new_message_info in new_cache_entry.items():
-            if message_id not in old_cache_entry:
+        for message_id, new_message_info in new_messages.items():
+            if message_id not in old_messages:
                 diff.created_messages.append(new_message_info)
         return diff
 
@@ -485,6 +714,14 @@ class _VoicemailMessagesDiff:
         )
 
 
+def _filter_time_range(messages, from_timestamp, until_timestamp):
+    if from_timestamp is not None:
+        messages = (m for m in messages if m['timestamp'] >= from_timestamp)
+    if until_timestamp is not None:
+        messages = (m for m in messages if m['timestamp'] < until_timestamp)
+    return messages
+
+
 def _fake_vm_conf(number, context):
     return {
         'id': 0,
@@ -0,0 +1,232 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+'''
+Benchmarks on a synthetic voicemail spool, skipped by default.
+
+Run them with:
+
+    WAZO_CALLD_BENCHMARKS=1 pytest -o log_cli=true -o log_cli_level=INFO \\
+        wazo_calld/plugins/voicemails/tests/test_benchmarks.py
+'''
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from unittest import TestCase, skipUnless
+from unittest.mock import MagicMock, patch
+
+from hamcrest import assert_that, equal_to, has_length
+
+from wazo_calld.plugin_helpers.cache import TTLLRUCache
+
+from .. import storage
+from ..services import VoicemailsService
+from ..storage import (
+    _MessageInfoParser,
+    _read_message_info,
+    _VoicemailFilesystemStorage,
+    new_filesystem_storage,
+)
+from ..transcription_cache import VoicemailTranscriptionCache
+
+logger = logging.getLogger(__name__)
+
+BENCHMARKS_ENABLED = bool(os.environ.get('WAZO_CALLD_BENCHMARKS'))
+
+NB_MAILBOXES = 1000
+NB_MESSAGES_PER_MAILBOX = 100
+PAGE_SIZE = 20
+NB_PARSED_FILES = 10000
+
+MESSAGE_TEMPLATE = '''\
+;
+; Message Information file
+;
+[message]
+origmailbox={number}
+context=default
+macrocontext=
+exten=voicemail
+rdnis={number}
+priority=7
+callerchan=PJSIP/abcdef-00000000
+callerid="Caller {i}" <{i}>
+origdate=Thu Nov  3 07:11:59 PM UTC 2016
+origtime={timestamp}
+category=
+msg_id={timestamp}-{number}-{i:08d}
+flag=
+duration={duration}
+'''
+
+
+def build_spool(path, nb_mailboxes, nb_messages):
+    for m in range(nb_mailboxes):
+        number = str(1000 + m)
+        folder_path = os.path.join(path, b'default', number.encode(), b'INBOX')
+        os.makedirs(folder_path)
+        for i in range(nb_messages):
+            with open(os.path.join(folder_path, b'msg%04d.txt' % i), 'w') as f:
+                f.write(
+                    MESSAGE_TEMPLATE.format(
+                        number=number,
+                        i=i,
+                        timestamp=1700000000 + (i * nb_mailboxes + m) * 60,
+                        duration=i % 60,
+                    )
+                )
+    # make the directories look old enough to be trusted by the index
+    for dirpath, _, _ in os.walk(path):
+        os.utime(dirpath, (0, 0))
+
+
+def vm_conf(m):
+    return {
+        'id': m,
+        'number': str(1000 + m),
+        'context': 'default',
+        'name': f'vm-{m}',
+        'accesstype': 'personal',
+    }
+
+
+@skipUnless(BENCHMARKS_ENABLED, 'WAZO_CALLD_BENCHMARKS is not set')
+class TestTenantMessagesBenchmark(TestCase):
+    spool: bytes
+    vm_confs: list[dict]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.spool = tempfile.mkdtemp().encode()
+        start = time.perf_counter()
+        build_spool(cls.spool, NB_MAILBOXES, NB_MESSAGES_PER_MAILBOX)
+        logger.info(
+            'built a spool of %s messages in %.1fs',
+            NB_MAILBOXES * NB_MESSAGES_PER_MAILBOX,
+            time.perf_counter() - start,
+        )
+        cls.vm_confs = [vm_conf(m) for m in range(NB_MAILBOXES)]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.spool)
+
+    def setUp(self):
+        self.indexed = new_filesystem_storage(self.spool, index_file=':memory:')
+        self.filesystem = _VoicemailFilesystemStorage(self.spool, self.indexed._folders)
+        patcher = patch.object(
+            VoicemailsService, '_get_voicemails_configs', return_value=self.vm_confs
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _service(self, storage):
+        call_logd_client = MagicMock()
+        call_logd_client.voicemail_transcription.list_transcriptions.return_value = {
+            'items': []
+        }
+        return VoicemailsService(
+            MagicMock(),
+            MagicMock(),
+            storage,
+            VoicemailTranscriptionCache(call_logd_client),
+        )
+
+    def _measure(self, name, fn, repeat=3):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - start)
+        logger.info(
+            '%s: first %.3fs, best %.3fs', name, timings[0], min(timings[1:] or timings)
+        )
+        return result
+
+    def test_get_tenant_messages_page(self):
+        params = {
+            'limit': PAGE_SIZE,
+            'offset': 100,
+            'order': 'timestamp',
+            'direction': 'desc',
+            'from_': datetime(2023, 12, 1, tzinfo=timezone.utc),
+        }
+
+        expected = self._measure(
+            'filesystem walk',
+            lambda: self._service(self.filesystem).get_tenant_messages('t', **params),
+            repeat=1,
+        )
+        result = self._measure(
+            'index',
+            lambda: self._service(self.indexed).get_tenant_messages('t', **params),
+        )
+
+        assert_that(result['items'], has_length(PAGE_SIZE))
+        assert_that(result['total'], equal_to(expected['total']))
+        assert_that(result['filtered'], equal_to(expected['filtered']))
+        assert_that(
+            [m['id'] for m in result['items']],
+            equal_to([m['id'] for m in expected['items']]),
+        )
+
+
+class _LineByLineParser(_MessageInfoParser):
+    '''The parser before it stopped at the last required field, for reference'''
+
+    def parse(self, fobj):
+        result: dict = {}
+        for line in fobj:
+            line = b'='.join([x.strip() for x in line.split(b'=')])
+            for key, parse in self._parse_table.items():
+                if line.startswith(key + b'='):
+                    parse(line.split(b'=', 1)[1].rstrip(), result)
+        return result
+
+
+@skipUnless(BENCHMARKS_ENABLED, 'WAZO_CALLD_BENCHMARKS is not set')
+class TestMessageInfoParserBenchmark(TestCase):
+    def setUp(self):
+        self.spool = tempfile.mkdtemp().encode()
+        self.addCleanup(shutil.rmtree, self.spool)
+        build_spool(self.spool, NB_PARSED_FILES // 100, 100)
+        self.paths = [
+            os.path.join(dirpath, name)
+            for dirpath, _, names in os.walk(self.spool)
+            for name in names
+        ]
+
+    def _measure(self, name, fn):
+        start = time.perf_counter()
+        results = [fn(path) for path in self.paths]
+        elapsed = time.perf_counter() - start
+        logger.info('%s: %.3fs, %d files/s', name, elapsed, len(self.paths) / elapsed)
+        return results
+
+    def test_parse(self):
+        line_by_line_parser = _LineByLineParser()
+        parser = _MessageInfoParser()
+
+        def parse_with(parser):
+            def parse(path):
+                with open(path, 'rb') as fobj:
+                    return parser.parse(fobj)
+
+            return parse
+
+        expected = self._measure('line by line', parse_with(line_by_line_parser))
+        result = self._measure('single pass', parse_with(parser))
+        assert_that(result, equal_to(expected))
+
+        with patch.object(
+            storage,
+            '_MESSAGE_INFO_CACHE',
+            TTLLRUCache(max_size=NB_PARSED_FILES, ttl=None),
+        ):
+            self._measure('cache miss', _read_message_info)
+            result = self._measure('cache hit', _read_message_info)
+        assert_that(result, equal_to(expected))
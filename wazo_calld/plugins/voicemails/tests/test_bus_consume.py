@@ -9,6 +9,7 @@ from wazo_calld.plugins.voicemails.bus_consume import (
     TranscriptionBusEventHandler,
     VoicemailsBusEventHandler,
 )
+from wazo_calld.plugins.voicemails.confd_cache import VoicemailConfdCache
 from wazo_calld.plugins.voicemails.exceptions import VoicemailNotFound
 
 
@@ -16,7 +17,9 @@ class TestTranscriptionBusEventHandler:
     def setup_method(self):
         self.confd_client = MagicMock()
         self.notifier = MagicMock()
-        self.handler = TranscriptionBusEventHandler(self.confd_client, self.notifier)
+        self.handler = TranscriptionBusEventHandler(
+            VoicemailConfdCache(self.confd_client), self.notifier
+        )
 
     def _make_event(self, **overrides):
         event = {
@@ -110,7 +113,7 @@ class TestVoicemailsBusEventHandler:
         self.notifier = MagicMock()
         self.voicemail_cache = MagicMock()
         self.handler = VoicemailsBusEventHandler(
-            self.confd_client, self.notifier, self.voicemail_cache
+            VoicemailConfdCache(self.confd_client), self.notifier, self.voicemail_cache
         )
 
     def _make_event(self, mailbox='8000@default'):
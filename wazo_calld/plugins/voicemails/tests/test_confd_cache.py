@@ -0,0 +1,112 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+from hamcrest import assert_that, calling, equal_to, none, raises
+from requests import HTTPError
+
+from wazo_calld.plugin_helpers.exceptions import NoSuchVoicemail
+
+from ..confd_cache import VoicemailConfdCache
+
+VOICEMAIL = {'id': 42, 'number': '1001', 'context': 'default'}
+
+
+class TestVoicemailConfdCache(TestCase):
+    def setUp(self):
+        self.confd_client = Mock()
+        self.confd_client.voicemails.get.return_value = VOICEMAIL
+        self.confd_client.voicemails.list.return_value = {'items': [VOICEMAIL]}
+        self.confd_client.users.return_value.get_voicemail.return_value = VOICEMAIL
+        self.bus_consumer = Mock()
+        self.cache = VoicemailConfdCache(self.confd_client)
+        self.cache.subscribe(self.bus_consumer)
+
+    def test_get_voicemail(self):
+        self.cache.get_voicemail('tenant', 42)
+        result = self.cache.get_voicemail('tenant', 42)
+
+        assert_that(result, equal_to(VOICEMAIL))
+        self.confd_client.voicemails.get.assert_called_once_with(
+            42, tenant_uuid='tenant'
+        )
+
+    def test_get_unknown_voicemail_is_cached(self):
+        self.confd_client.voicemails.get.side_effect = HTTPError(
+            response=Mock(status_code=404)
+        )
+
+        for _ in range(2):
+            assert_that(
+                calling(self.cache.get_voicemail).with_args('tenant', 42),
+                raises(NoSuchVoicemail),
+            )
+
+        self.confd_client.voicemails.get.assert_called_once()
+
+    def test_disabled_cache(self):
+        cache = VoicemailConfdCache(self.confd_client, ttl=0, negative_ttl=0)
+
+        cache.get_voicemail('tenant', 42)
+        cache.get_voicemail('tenant', 42)
+
+        assert_that(self.confd_client.voicemails.get.call_count, equal_to(2))
+
+    def test_get_user_voicemail(self):
+        self.cache.get_user_voicemail('user-uuid')
+        result = self.cache.get_user_voicemail('user-uuid')
+
+        assert_that(result, equal_to(VOICEMAIL))
+        self.confd_client.users.assert_called_once_with('user-uuid')
+
+    def test_find_voicemail(self):
+        self.cache.find_voicemail('1001', 'default')
+        result = self.cache.find_voicemail('1001', 'default')
+
+        assert_that(result, equal_to(VOICEMAIL))
+        self.confd_client.voicemails.list.assert_called_once_with(
+            number='1001', context='default', recurse=True
+        )
+
+    def test_find_unknown_voicemail(self):
+        self.confd_client.voicemails.list.return_value = {'items': []}
+
+        assert_that(self.cache.find_voicemail('1001', 'default'), none())
+
+    def test_list_voicemails(self):
+        self.cache.list_voicemails('tenant', accesstype='global').append({})
+        result = self.cache.list_voicemails('tenant', accesstype='global')
+
+        assert_that(result, equal_to([VOICEMAIL]))
+        self.confd_client.voicemails.list.assert_called_once_with(
+            tenant_uuid='tenant', recurse=False, accesstype='global'
+        )
+
+    def test_voicemail_events_invalidate_the_cache(self):
+        handlers = {
+            call.args[0]: call.args[1]
+            for call in self.bus_consumer.subscribe.call_args_list
+        }
+        self.cache.get_voicemail('tenant', 42)
+        self.cache.list_voicemails('tenant')
+
+        handlers['user_voicemail_associated']({'user': {'uuid': 'user-uuid'}})
+        self.cache.get_voicemail('tenant', 42)
+        self.cache.list_voicemails('tenant')
+
+        assert_that(self.confd_client.voicemails.get.call_count, equal_to(2))
+        assert_that(self.confd_client.voicemails.list.call_count, equal_to(2))
+        assert_that(
+            set(handlers),
+            equal_to(
+                {
+                    'voicemail_created',
+                    'voicemail_edited',
+                    'voicemail_deleted',
+                    'user_voicemail_associated',
+                    'user_voicemail_dissociated',
+                }
+            ),
+        )
@@ -0,0 +1,58 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from unittest.mock import MagicMock, patch
+
+from flask import Flask
+
+from wazo_calld.plugins.voicemails.http import (
+    UserVoicemailGreetingResource,
+    VoicemailGreetingResource,
+)
+
+
+@patch('wazo_calld.plugins.voicemails.http.get_token_user_uuid_from_request')
+@patch('wazo_calld.plugins.voicemails.http.Tenant')
+class TestGreetingResources:
+    def setup_method(self):
+        self.app = Flask(__name__)
+        self.service = MagicMock()
+        self.service.get_greeting.return_value = b'RIFF'
+        self.service.get_user_greeting.return_value = b'RIFF'
+
+    def test_get_greeting_from_the_spool(self, _tenant, _user_uuid, tmp_path):
+        path = tmp_path / 'busy.wav'
+        path.write_bytes(b'RIFF')
+        self.service.get_greeting_path.return_value = bytes(path)
+        resource = VoicemailGreetingResource(self.service)
+
+        with self.app.test_request_context():
+            response = resource.get('42', 'busy')
+            response.direct_passthrough = False
+
+        assert response.get_data() == b'RIFF'
+        self.service.get_greeting.assert_not_called()
+
+    def test_get_greeting_deleted_after_its_path_was_found(
+        self, _tenant, _user_uuid, tmp_path
+    ):
+        self.service.get_greeting_path.return_value = bytes(tmp_path / 'busy.wav')
+        resource = VoicemailGreetingResource(self.service)
+
+        with self.app.test_request_context():
+            response = resource.get('42', 'busy')
+
+        assert response.get_data() == b'RIFF'
+        self.service.get_greeting.assert_called_once()
+
+    def test_get_user_greeting_deleted_after_its_path_was_found(
+        self, _tenant, _user_uuid, tmp_path
+    ):
+        self.service.get_user_greeting_path.return_value = bytes(tmp_path / 'busy.wav')
+        resource = UserVoicemailGreetingResource(self.service)
+
+        with self.app.test_request_context():
+            response = resource.get('busy')
+
+        assert response.get_data() == b'RIFF'
+        self.service.get_user_greeting.assert_called_once()
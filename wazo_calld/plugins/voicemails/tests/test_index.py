@@ -0,0 +1,322 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from hamcrest import (
+    assert_that,
+    calling,
+    contains_exactly,
+    contains_inanyorder,
+    empty,
+    equal_to,
+    has_entries,
+    has_properties,
+    none,
+    raises,
+)
+
+from ..exceptions import NoSuchVoicemailMessage, VoicemailMessageStorageError
+from ..index import VoicemailMessagesIndex, open_index
+from ..storage import (
+    _read_message_info,
+    _VoicemailFilesystemStorage,
+    new_filesystem_storage,
+)
+
+MESSAGE_TEMPLATE = '''\
+[message]
+origmailbox=1001
+context=user
+callerid="Alice" <{number}>
+origtime={timestamp}
+msg_id={msg_id}
+duration={duration}
+'''
+
+FAR_FUTURE = 2**62
+
+
+def write_message(folder_path, name, msg_id, timestamp=1700000000, duration=10):
+    os.makedirs(folder_path, exist_ok=True)
+    with open(os.path.join(folder_path, name + b'.txt'), 'w') as f:
+        f.write(
+            MESSAGE_TEMPLATE.format(
+                number='101', timestamp=timestamp, msg_id=msg_id, duration=duration
+            )
+        )
+
+
+def a_message(name, **info):
+    return contains_exactly(name, has_entries(**info))
+
+
+def touch_dir(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class _SpoolTestCase(TestCase):
+    def setUp(self):
+        self.spool = tempfile.mkdtemp().encode()
+        self.addCleanup(shutil.rmtree, self.spool)
+        self.inbox = os.path.join(self.spool, b'user', b'1001', b'INBOX')
+        self.old = os.path.join(self.spool, b'user', b'1001', b'Old')
+
+
+class TestVoicemailMessagesIndex(_SpoolTestCase):
+    def setUp(self):
+        super().setUp()
+        self.parse = Mock(side_effect=_read_message_info)
+        self.clock = Mock(return_value=FAR_FUTURE)
+        self.index = VoicemailMessagesIndex(':memory:', self.parse, self.clock)
+
+    def test_folder_messages(self):
+        write_message(self.inbox, b'msg0000', 'id-0', duration=0)
+        write_message(self.inbox, b'msg0001', 'id-1')
+
+        result = self.index.folder_messages(self.inbox)
+
+        assert_that(
+            result,
+            contains_inanyorder(
+                a_message(b'msg0000', id='id-0', duration=0, empty=True),
+                a_message(
+                    b'msg0001',
+                    id='id-1',
+                    caller_id_name='Alice',
+                    caller_id_num='101',
+                    timestamp=1700000000,
+                    empty=False,
+                ),
+            ),
+        )
+
+    def test_missing_folder(self):
+        assert_that(self.index.folder_messages(self.inbox), empty())
+
+    def test_unchanged_folder_is_not_scanned_again(self):
+        write_message(self.inbox, b'msg0000', 'id-0')
+        self.index.folder_messages(self.inbox)
+        self.parse.reset_mock()
+
+        result = self.index.folder_messages(self.inbox)
+
+        self.parse.assert_not_called()
+        assert_that(result, contains_exactly(a_message(b'msg0000', id='id-0')))
+
+    def test_only_new_messages_are_parsed(self):
+        write_message(self.inbox, b'msg0000', 'id-0')
+        touch_dir(self.inbox, 1000)
+        self.index.folder_messages(self.inbox)
+        self.parse.reset_mock()
+
+        write_message(self.inbox, b'msg0001', 'id-1')
+        touch_dir(self.inbox, 2000)
+        result = self.index.folder_messages(self.inbox)
+
+        self.parse.assert_called_once_with(os.path.join(self.inbox, b'msg0001.txt'))
+        assert_that(
+            result,
+            contains_inanyorder(
+                a_message(b'msg0000', id='id-0'),
+                a_message(b'msg0001', id='id-1'),
+            ),
+        )
+
+    def test_deleted_messages_and_folders(self):
+        write_message(self.inbox, b'msg0000', 'id-0')
+        write_message(self.inbox, b'msg0001', 'id-1')
+        touch_dir(self.inbox, 1000)
+        self.index.folder_messages(self.inbox)
+
+        os.rename(
+            os.path.join(self.inbox, b'msg0001.txt'),
+            os.path.join(self.inbox, b'msg0000.txt'),
+        )
+        touch_dir(self.inbox, 2000)
+        assert_that(
+            self.index.folder_messages(self.inbox),
+            contains_exactly(a_message(b'msg0000', id='id-1')),
+        )
+
+        shutil.rmtree(self.inbox)
+        assert_that(self.index.folder_messages(self.inbox), empty())
+
+    def test_recently_modified_folder_is_scanned_again(self):
+        write_message(self.inbox, b'msg0000', 'id-0')
+        self.clock.return_value = os.stat(self.inbox).st_mtime_ns
+        self.index.folder_messages(self.inbox)
+
+        write_message(self.inbox, b'msg0001', 'id-1')
+        touch_dir(self.inbox, os.stat(self.inbox).st_mtime_ns - 1)
+
+        assert_that(
+            self.index.folder_messages(self.inbox),
+            contains_inanyorder(
+                a_message(b'msg0000', id='id-0'),
+                a_message(b'msg0001', id='id-1'),
+            ),
+        )
+
+    def test_query(self):
+        write_message(self.inbox, b'msg0000', 'id-0', timestamp=3)
+        write_message(self.inbox, b'msg0001', 'id-1', timestamp=1)
+        write_message(self.old, b'msg0000', 'id-2', timestamp=2)
+        folders = [self.inbox, self.old]
+
+        result = self.index.query(folders, order='timestamp', direction='desc')
+        assert_that(
+            [(path, info['id']) for path, info in result],
+            equal_to([(self.inbox, 'id-0'), (self.old, 'id-2'), (self.inbox, 'id-1')]),
+        )
+
+        result = self.index.query(folders, order='timestamp', limit=1, offset=1)
+        assert_that([info['id'] for _, info in result], equal_to(['id-2']))
+
+        result = self.index.query([self.old], order='id')
+        assert_that([info['id'] for _, info in result], equal_to(['id-2']))
+
+        assert_that(self.index.count(folders), equal_to(3))
+        assert_that(self.index.count([self.old]), equal_to(1))
+
+    def test_persisted_across_restarts(self):
+        db_path = os.path.join(self.spool, b'index.sqlite3').decode()
+        write_message(self.inbox, b'msg0000', 'id-0')
+        touch_dir(self.inbox, 1000)
+        VoicemailMessagesIndex(db_path, self.parse, self.clock).folder_messages(
+            self.inbox
+        )
+        self.parse.reset_mock()
+
+        index = VoicemailMessagesIndex(db_path, self.parse, self.clock)
+
+        assert_that(
+            index.folder_messages(self.inbox),
+            contains_exactly(a_message(b'msg0000', id='id-0')),
+        )
+        self.parse.assert_not_called()
+
+    def test_open_index_failure(self):
+        path = os.path.join(self.spool, b'missing', b'index.sqlite3').decode()
+
+        assert_that(open_index(path, self.parse), none())
+        assert_that(open_index(None, self.parse), none())
+
+
+class TestIndexedStorage(_SpoolTestCase):
+    def setUp(self):
+        super().setUp()
+        write_message(self.inbox, b'msg0000', 'id-0', timestamp=3, duration=5)
+        write_message(self.inbox, b'msg0001', 'id-1', timestamp=1, duration=10)
+        write_message(self.old, b'msg0000', 'id-2', timestamp=2, duration=0)
+        self.vm_conf = {'id': 1, 'number': '1001', 'context': 'user', 'name': 'vm'}
+        self.indexed = new_filesystem_storage(self.spool, index_file=':memory:')
+        self.filesystem = _VoicemailFilesystemStorage(self.spool, self.indexed._folders)
+
+    def test_same_results_as_the_filesystem(self):
+        def both(method, *args, **kwargs):
+            expected = getattr(self.filesystem, method)(*args, **kwargs)
+            result = getattr(self.indexed, method)(*args, **kwargs)
+            assert_that(result, equal_to(expected))
+
+        both('get_voicemail_info', self.vm_conf)
+        both('get_folder_info', self.vm_conf, 1)
+        both('count_all_messages', self.vm_conf)
+        both('list_messages_infos', self.vm_conf)
+        both('list_messages_infos', self.vm_conf, order='timestamp', direction='desc')
+        both('list_messages_infos', self.vm_conf, order='duration', limit=2, offset=1)
+        both('list_messages_infos', self.vm_conf, order='id', direction='desc', limit=1)
+        both('list_messages_infos', self.vm_conf, from_timestamp=2)
+        both(
+            'list_messages_infos',
+            self.vm_conf,
+            order='timestamp',
+            from_timestamp=1,
+            until_timestamp=3,
+            limit=1,
+            offset=1,
+        )
+        both('count_all_messages', self.vm_conf, from_timestamp=2)
+        both('count_all_messages', self.vm_conf, from_timestamp=1, until_timestamp=3)
+
+    def test_index_error_falls_back_to_the_filesystem(self):
+        self.indexed._index._db.close()
+
+        result = self.indexed.list_messages_infos(self.vm_conf, order='timestamp')
+
+        assert_that([m['id'] for m in result], equal_to(['id-1', 'id-2', 'id-0']))
+
+    def test_get_message_info(self):
+        result = self.indexed.get_message_info('id-2', self.vm_conf)
+
+        assert_that(result, has_entries(id='id-2', folder=has_properties(id=2)))
+
+    def test_get_message_info_reads_a_single_file(self):
+        self.indexed.count_all_messages(self.vm_conf)
+
+        with patch(
+            'wazo_calld.plugins.voicemails.storage._read_message_info',
+            side_effect=_read_message_info,
+        ) as read_message_info:
+            result = self.indexed.get_message_info('id-1', self.vm_conf)
+
+        assert_that(result, has_entries(id='id-1', folder=has_properties(id=1)))
+        read_message_info.assert_called_once_with(
+            os.path.join(self.inbox, b'msg0001.txt')
+        )
+
+    def test_get_moved_message_info(self):
+        self.indexed.count_all_messages(self.vm_conf)
+        os.rename(
+            os.path.join(self.inbox, b'msg0001.txt'),
+            os.path.join(self.old, b'msg0001.txt'),
+        )
+
+        result = self.indexed.get_message_info('id-1', self.vm_conf)
+
+        assert_that(result, has_entries(id='id-1', folder=has_properties(id=2)))
+
+    def test_get_message_info_among_many_voicemails(self):
+        other_vm_conf = dict(self.vm_conf, id=2, number='1002')
+        write_message(
+            os.path.join(self.spool, b'user', b'1002', b'INBOX'), b'msg0000', 'id-3'
+        )
+
+        result = self.indexed.get_message_info('id-3', self.vm_conf, other_vm_conf)
+
+        assert_that(result, has_entries(id='id-3', vm_conf=other_vm_conf))
+
+    def test_get_unknown_message_info(self):
+        assert_that(
+            calling(self.indexed.get_message_info).with_args('unknown', self.vm_conf),
+            raises(NoSuchVoicemailMessage),
+        )
+
+    def test_get_message_recording_path(self):
+        recording_path = os.path.join(self.old, b'msg0000.wav')
+        with open(recording_path, 'wb') as f:
+            f.write(b'wav')
+
+        result = self.indexed.get_message_recording_path('id-2', self.vm_conf)
+
+        assert_that(result, equal_to(recording_path))
+        assert_that(
+            calling(self.indexed.get_message_recording_path).with_args(
+                'id-1', self.vm_conf
+            ),
+            raises(VoicemailMessageStorageError),
+        )
+
+    def test_get_folders_signatures(self):
+        touch_dir(self.inbox, 1000)
+
+        result = self.indexed.get_folders_signatures(self.vm_conf)
+
+        assert_that(
+            result,
+            has_entries({1: (1000, 2), 2: none(), 3: (0, 0), 4: (0, 0)}),
+        )
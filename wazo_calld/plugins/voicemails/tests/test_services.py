@@ -1,17 +1,23 @@
 # Copyright 2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from datetime import datetime, timezone
 from unittest.mock import MagicMock
 
 from wazo_calld.plugins.voicemails.services import VoicemailsService
+from wazo_calld.plugins.voicemails.transcription_cache import (
+    VoicemailTranscriptionCache,
+)
 
 
 class TestEnrichMessagesWithTranscriptions:
     def _make_service(self, call_logd_client=None):
         ari = MagicMock()
-        confd_client = MagicMock()
+        confd_cache = MagicMock()
         storage = MagicMock()
-        return VoicemailsService(ari, confd_client, storage, call_logd_client)
+        return VoicemailsService(
+            ari, confd_cache, storage, VoicemailTranscriptionCache(call_logd_client)
+        )
 
     def test_enrichment_success(self):
         call_logd_client = MagicMock()
@@ -78,9 +84,11 @@ class TestEnrichMessagesWithTranscriptions:
 class TestGetUserMessage:
     def _make_service(self, call_logd_client=None):
         ari = MagicMock()
-        confd_client = MagicMock()
+        confd_cache = MagicMock()
         storage = MagicMock()
-        return VoicemailsService(ari, confd_client, storage, call_logd_client)
+        return VoicemailsService(
+            ari, confd_cache, storage, VoicemailTranscriptionCache(call_logd_client)
+        )
 
     def test_get_user_message_enriches_with_transcription(self):
         call_logd_client = MagicMock()
@@ -96,7 +104,7 @@ class TestGetUserMessage:
             'filtered': 1,
         }
         service = self._make_service(call_logd_client)
-        service._confd_client.users(MagicMock()).get_voicemail.return_value = {
+        service._confd_cache.get_user_voicemail.return_value = {
             'id': 42,
             'name': 'vm',
         }
@@ -131,3 +139,119 @@ class TestGetUserMessage:
         result = service.get_user_message('tenant-1', 'user-1', 'msg-1')
 
         assert 'transcription' not in result
+
+
+class TestGetTenantMessages:
+    def _make_service(self):
+        call_logd_client = MagicMock()
+        call_logd_client.voicemail_transcription.list_transcriptions.return_value = {
+            'items': [
+                {
+                    'message_id': 'msg-2',
+                    'transcription_text': 'Hello',
+                    'voicemail_id': 42,
+                }
+            ],
+        }
+        return VoicemailsService(
+            MagicMock(),
+            MagicMock(),
+            MagicMock(),
+            VoicemailTranscriptionCache(call_logd_client),
+        )
+
+    def test_pagination_and_time_range_are_pushed_to_the_storage(self):
+        service = self._make_service()
+        service._get_voicemails_configs = MagicMock(return_value=[{'id': 42}])
+        service._storage.count_all_messages.side_effect = [10, 4]
+        service._storage.list_messages_infos.return_value = [{'id': 'msg-2'}]
+
+        result = service.get_tenant_messages(
+            'tenant-1',
+            limit=1,
+            offset=2,
+            order='timestamp',
+            direction='desc',
+            from_=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        )
+
+        assert result == {
+            'items': [{'id': 'msg-2', 'transcription': {'text': 'Hello'}}],
+            'total': 10,
+            'filtered': 4,
+        }
+        service._storage.list_messages_infos.assert_called_once_with(
+            {'id': 42},
+            limit=1,
+            offset=2,
+            order='timestamp',
+            direction='desc',
+            from_timestamp=1767225600,
+            until_timestamp=None,
+        )
+
+    def test_transcribed_filter(self):
+        service = self._make_service()
+        service._get_voicemails_configs = MagicMock(return_value=[{'id': 42}])
+        service._storage.count_all_messages.return_value = 3
+        service._storage.list_messages_infos.return_value = [
+            {'id': 'msg-1'},
+            {'id': 'msg-2'},
+            {'id': 'msg-3'},
+        ]
+
+        result = service.get_tenant_messages(
+            'tenant-1', limit=1, offset=1, transcribed=False
+        )
+
+        assert result == {'items': [{'id': 'msg-3'}], 'total': 3, 'filtered': 2}
+        service._storage.list_messages_infos.assert_called_once_with(
+            {'id': 42},
+            order=None,
+            direction=None,
+            from_timestamp=None,
+            until_timestamp=None,
+        )
+
+
+class TestGreetings:
+    def setup_method(self):
+        self.service = VoicemailsService(
+            MagicMock(), MagicMock(), MagicMock(), MagicMock()
+        )
+        self.ari = self.service._ari
+        self.storage = self.service._storage
+
+    def test_greeting_exists_without_downloading_it(self, tmp_path):
+        self.storage.get_greeting_path.return_value = bytes(tmp_path / 'busy.wav')
+
+        self.service.validate_user_greeting_exists('user-uuid', 'busy')
+
+        self.ari.wazo.getVoicemailGreeting.assert_not_called()
+
+    def test_greeting_exists_asks_asterisk_when_not_in_the_spool(self):
+        self.storage.get_greeting_path.return_value = None
+
+        self.service.validate_user_greeting_exists('user-uuid', 'busy')
+
+        self.ari.wazo.getVoicemailGreeting.assert_called_once()
+
+    def test_get_greeting_from_the_spool(self, tmp_path):
+        path = tmp_path / 'busy.wav'
+        path.write_bytes(b'RIFF')
+        self.storage.get_greeting_path.return_value = bytes(path)
+
+        result = self.service.get_user_greeting('user-uuid', 'busy')
+
+        assert result == b'RIFF'
+        self.ari.wazo.getVoicemailGreeting.assert_not_called()
+
+    def test_get_greeting_from_asterisk(self, tmp_path):
+        self.storage.get_greeting_path.return_value = bytes(tmp_path / 'gone.wav')
+        self.ari.wazo.getVoicemailGreeting.return_value = {
+            'greeting_base64': 'UklGRg=='
+        }
+
+        result = self.service.get_user_greeting('user-uuid', 'busy')
+
+        assert result == b'RIFF'
@@ -1,9 +1,12 @@
-# Copyright 2016-2024 The Wazo Authors  (see the AUTHORS file)
+# Copyright 2016-2026 The Wazo Authors  (see the AUTHORS file)
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import os
+import shutil
+import tempfile
 from io import BytesIO
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import ANY, Mock, patch
 
 from hamcrest import (
     assert_that,
@@ -11,12 +14,21 @@ from hamcrest import (
     contains_exactly,
     empty,
     equal_to,
+    has_entries,
     has_key,
     not_,
     raises,
 )
 
-from ..storage import _MessageInfoParser, _VoicemailFolder, _VoicemailMessagesCache
+from ..exceptions import VoicemailMessageStorageError
+from ..storage import (
+    _MessageInfoParser,
+    _read_message_info,
+    _Slicer,
+    _VoicemailFolder,
+    _VoicemailMessagesCache,
+    new_filesystem_storage,
+)
 
 
 class TestMessageInfoParser(TestCase):
@@ -96,6 +108,18 @@ msg_id=1478200319-00000000
 '''  # noqa: W291
         assert_that(calling(self._parse).with_args(content), raises(Exception))
 
+    def test_parse_stops_once_all_fields_are_found(self):
+        content = b'''
+callerid="Etienne" <101>
+origtime=1478200319
+msg_id=1478200319-00000000
+duration=12
+duration=not-a-number
+'''
+        result = self._parse(content)
+
+        assert_that(result, has_entries(duration=12))
+
     def test_parse_callerid_unknown(self):
         # happens when app_voicemail write a message with no caller ID information
         self.parser._parse_callerid(b'Unknown', self.result)
@@ -115,15 +139,100 @@ msg_id=1478200319-00000000
         return self.parser.parse(BytesIO(content))
 
 
+class TestReadMessageInfo(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp().encode()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, b'msg0000.txt')
+        parser_patcher = patch(
+            'wazo_calld.plugins.voicemails.storage._MESSAGE_INFO_PARSER.parse',
+            side_effect=_MessageInfoParser().parse,
+        )
+        self.parse = parser_patcher.start()
+        self.addCleanup(parser_patcher.stop)
+
+    def test_unchanged_file_is_parsed_once(self):
+        self._write('msg-1', duration=12)
+
+        result1 = _read_message_info(self.path)
+        result2 = _read_message_info(self.path)
+
+        assert_that(result1, has_entries(id='msg-1', duration=12))
+        assert_that(result2, equal_to(result1))
+        self.parse.assert_called_once()
+
+    def test_modified_file_is_parsed_again(self):
+        self._write('msg-1', duration=12)
+        _read_message_info(self.path)
+
+        self._write('msg-1', duration=123)
+        result = _read_message_info(self.path)
+
+        assert_that(result, has_entries(id='msg-1', duration=123))
+        assert_that(self.parse.call_count, equal_to(2))
+
+    def test_missing_file(self):
+        assert_that(
+            calling(_read_message_info).with_args(self.path),
+            raises(VoicemailMessageStorageError),
+        )
+
+    def _write(self, msg_id, duration):
+        with open(self.path, 'w') as f:
+            f.write(
+                'callerid="Alice" <101>\n'
+                'origtime=1478200319\n'
+                f'msg_id={msg_id}\n'
+                f'duration={duration}\n'
+            )
+
+
+class TestGreetingPath(TestCase):
+    def setUp(self):
+        self.spool = tempfile.mkdtemp().encode()
+        self.addCleanup(shutil.rmtree, self.spool)
+        self.storage = new_filesystem_storage(self.spool)
+        self.vm_conf = {'number': '1001', 'context': 'default'}
+        self.mailbox = os.path.join(self.spool, b'default', b'1001')
+        os.makedirs(self.mailbox)
+
+    def test_greeting_path(self):
+        path = os.path.join(self.mailbox, b'unavail.wav')
+        with open(path, 'wb') as f:
+            f.write(b'RIFF')
+
+        result = self.storage.get_greeting_path(self.vm_conf, 'unavailable')
+
+        assert_that(result, equal_to(path))
+
+    def test_missing_greeting(self):
+        result = self.storage.get_greeting_path(self.vm_conf, 'busy')
+
+        assert_that(result, equal_to(None))
+
+
+class TestSlicer(TestCase):
+    def test_page_is_the_same_as_a_full_sort(self):
+        items = [{'id': i, 'timestamp': (i * 7) % 10} for i in range(20)]
+
+        for direction in ('asc', 'desc'):
+            expected = sorted(
+                items, key=lambda i: i['timestamp'], reverse=direction == 'desc'
+            )[3:8]
+
+            result = _Slicer(5, 3, 'timestamp', direction)(iter(items))
+
+            assert_that(result, equal_to(expected))
+
+
 class TestVoicemailMessagesCache(TestCase):
     def setUp(self):
         self.number = '1001'
         self.context = 'internal'
         self.cache_key = (self.number, self.context)
         self.storage = Mock()
-        self.storage.get_voicemail_info.return_value = {
-            'folders': [],
-        }
+        self.storage.get_folders_signatures.return_value = {1: None}
+        self.storage.get_folder_info.return_value = {'messages': []}
         self.cache = _VoicemailMessagesCache(self.storage)
         self.folder1 = _VoicemailFolder(1, b'Folder1')
         self.folder2 = _VoicemailFolder(1, b'Folder2')
@@ -137,12 +246,8 @@ class TestVoicemailMessagesCache(TestCase):
         }
 
     def test_diff_when_message_created(self):
-        self.storage.get_voicemail_info.return_value = {
-            'folders': [
-                {
-                    'messages': [self.message_info1],
-                }
-            ],
+        self.storage.get_folder_info.return_value = {
+            'messages': [self.message_info1],
         }
 
         diff = self.cache.get_diff(self.number, self.context)
@@ -152,15 +257,11 @@ class TestVoicemailMessagesCache(TestCase):
         assert_that(diff.deleted_messages, empty())
 
     def test_diff_when_message_updated(self):
-        self.storage.get_voicemail_info.return_value = {
-            'folders': [
-                {
-                    'messages': [self.message_info2],
-                }
-            ],
+        self.storage.get_folder_info.return_value = {
+            'messages': [self.message_info2],
         }
         self.cache._cache[self.cache_key] = {
-            self.message_info1['id']: self.message_info1,
+            1: (None, {self.message_info1['id']: self.message_info1}),
         }
 
         diff = self.cache.get_diff(self.number, self.context)
@@ -169,12 +270,24 @@ class TestVoicemailMessagesCache(TestCase):
         assert_that(diff.updated_messages, contains_exactly(self.message_info2))
         assert_that(diff.deleted_messages, empty())
 
-    def test_diff_when_message_deleted(self):
-        self.storage.get_voicemail_info.return_value = {
-            'folders': [],
+    def test_diff_when_message_moved_to_another_folder(self):
+        self.storage.get_folders_signatures.return_value = {1: None, 2: None}
+        self.storage.get_folder_info.side_effect = lambda vm_conf, folder_id: {
+            'messages': [self.message_info2] if folder_id == 2 else [],
+        }
+        self.cache._cache[self.cache_key] = {
+            1: (None, {self.message_info1['id']: self.message_info1}),
         }
+
+        diff = self.cache.get_diff(self.number, self.context)
+
+        assert_that(diff.created_messages, empty())
+        assert_that(diff.updated_messages, contains_exactly(self.message_info2))
+        assert_that(diff.deleted_messages, empty())
+
+    def test_diff_when_message_deleted(self):
         self.cache._cache[self.cache_key] = {
-            self.message_info1['id']: self.message_info1,
+            1: (None, {self.message_info1['id']: self.message_info1}),
         }
 
         diff = self.cache.get_diff(self.number, self.context)
@@ -184,12 +297,8 @@ class TestVoicemailMessagesCache(TestCase):
         assert_that(diff.deleted_messages, contains_exactly(self.message_info1))
 
     def test_diff_twice_in_a_row(self):
-        self.storage.get_voicemail_info.return_value = {
-            'folders': [
-                {
-                    'messages': [self.message_info1],
-                }
-            ],
+        self.storage.get_folder_info.return_value = {
+            'messages': [self.message_info1],
         }
 
         diff1 = self.cache.get_diff(self.number, self.context)
@@ -198,6 +307,78 @@ class TestVoicemailMessagesCache(TestCase):
         assert_that(diff1.created_messages, contains_exactly(self.message_info1))
         assert_that(diff2.created_messages, empty())
 
+    def test_unchanged_folders_are_not_read_again(self):
+        self.storage.get_folders_signatures.return_value = {1: (1000, 2), 2: None}
+        self.cache.get_diff(self.number, self.context)
+        self.storage.get_folder_info.reset_mock()
+
+        self.cache.get_diff(self.number, self.context)
+
+        self.storage.get_folder_info.assert_called_once_with(ANY, 2)
+
+    def test_changed_folders_are_read_again(self):
+        self.storage.get_folders_signatures.return_value = {1: (1000, 2)}
+        self.cache.get_diff(self.number, self.context)
+        self.storage.get_folders_signatures.return_value = {1: (2000, 3)}
+        self.storage.get_folder_info.return_value = {
+            'messages': [self.message_info1],
+        }
+
+        diff = self.cache.get_diff(self.number, self.context)
+
+        assert_that(diff.created_messages, contains_exactly(self.message_info1))
+
+    def test_refresh_cache(self):
+        key1 = ('1001', 'default')
+        key2 = ('1002', 'default')
+        self.storage.list_voicemails_number_and_context.return_value = [key1, key2]
+        self.storage.get_folder_info.return_value = {
+            'messages': [self.message_info1],
+        }
+
+        assert_that(self.cache.ready, equal_to(False))
+
+        self.cache.refresh_cache()
+
+        assert_that(self.cache.ready, equal_to(True))
+        assert_that(self.cache._cache, has_entries({key1: ANY, key2: ANY}))
+        diff = self.cache.get_diff(*key1)
+        assert_that(diff.is_empty(), equal_to(True))
+
+    def test_refresh_cache_keeps_mailboxes_loaded_meanwhile(self):
+        loaded_entry: dict = {1: (None, {})}
+        self.cache._cache[self.cache_key] = loaded_entry
+        self.storage.list_voicemails_number_and_context.return_value = [self.cache_key]
+        self.storage.get_folder_info.return_value = {
+            'messages': [self.message_info1],
+        }
+
+        self.cache.refresh_cache()
+
+        assert_that(self.cache._cache[self.cache_key], equal_to(loaded_entry))
+
+    def test_refresh_cache_errors_are_skipped(self):
+        key1 = ('1001', 'default')
+        key2 = ('1002', 'default')
+        self.storage.list_voicemails_number_and_context.return_value = [key1, key2]
+        self.storage.get_folder_info.side_effect = [Exception(), {'messages': []}]
+
+        self.cache.refresh_cache()
+
+        assert_that(self.cache.ready, equal_to(True))
+        assert_that(len(self.cache), equal_to(1))
+
+    def test_no_diff_for_mailboxes_not_loaded_yet_while_refreshing(self):
+        self.storage.get_folder_info.return_value = {
+            'messages': [self.message_info1],
+        }
+        self.cache._refreshing = True
+
+        diff = self.cache.get_diff(self.number, self.context)
+
+        assert_that(diff.is_empty(), equal_to(True))
+        assert_that(self.cache._cache, has_key(self.cache_key))
+
     def test_cache_cleanup(self):
         key1 = ('1001', 'default')
         key2 = ('1002', 'default')
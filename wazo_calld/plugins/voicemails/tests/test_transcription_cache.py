@@ -0,0 +1,111 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+from hamcrest import assert_that, empty, equal_to
+
+from ..transcription_cache import VoicemailTranscriptionCache
+
+
+def a_transcription(voicemail_id, message_id, text):
+    return {
+        'voicemail_id': voicemail_id,
+        'message_id': message_id,
+        'transcription_text': text,
+    }
+
+
+class TestVoicemailTranscriptionCache(TestCase):
+    def setUp(self):
+        self.call_logd_client = Mock()
+        self.list_transcriptions = (
+            self.call_logd_client.voicemail_transcription.list_transcriptions
+        )
+        self.list_transcriptions.return_value = {
+            'items': [
+                a_transcription(1, 'msg-1', 'hello'),
+                a_transcription(2, 'msg-2', 'goodbye'),
+            ]
+        }
+        self.clock = Mock(return_value=0)
+        self.cache = VoicemailTranscriptionCache(
+            self.call_logd_client, max_voicemails=3, ttl=60, clock=self.clock
+        )
+
+    def test_loaded_once(self):
+        self.cache.get_transcriptions({1, 2, 3})
+        result = self.cache.get_transcriptions({1, 2, 3})
+
+        assert_that(result, equal_to({'msg-1': 'hello', 'msg-2': 'goodbye'}))
+        self.list_transcriptions.assert_called_once_with(voicemail_id='1,2,3')
+
+    def test_only_missing_voicemails_are_loaded(self):
+        self.cache.get_transcriptions({1})
+        self.list_transcriptions.reset_mock()
+
+        self.cache.get_transcriptions({1, 2})
+
+        self.list_transcriptions.assert_called_once_with(voicemail_id='2')
+
+    def test_call_logd_unavailable(self):
+        self.list_transcriptions.side_effect = Exception('connection refused')
+
+        assert_that(self.cache.get_transcriptions({1}), empty())
+        assert_that(len(self.cache), equal_to(0))
+
+    def test_updated_by_bus_events(self):
+        bus_consumer = Mock()
+        self.cache.subscribe(bus_consumer)
+        handlers = {
+            call.args[0]: call.args[1] for call in bus_consumer.subscribe.call_args_list
+        }
+        self.cache.get_transcriptions({1, 2})
+
+        handlers['call_logd_voicemail_transcription_created'](
+            a_transcription(1, 'msg-3', 'new')
+        )
+        handlers['call_logd_voicemail_transcription_deleted'](
+            a_transcription(2, 'msg-2', 'goodbye')
+        )
+        handlers['call_logd_voicemail_transcription_created'](
+            a_transcription(4, 'msg-4', 'not loaded')
+        )
+        result = self.cache.get_transcriptions({1, 2})
+
+        assert_that(result, equal_to({'msg-1': 'hello', 'msg-3': 'new'}))
+        self.list_transcriptions.assert_called_once()
+
+    def test_event_while_loading_is_not_lost(self):
+        def list_transcriptions(**kwargs):
+            self.cache._on_transcription_created(a_transcription(1, 'msg-3', 'new'))
+            return {'items': [a_transcription(1, 'msg-1', 'hello')]}
+
+        self.list_transcriptions.side_effect = list_transcriptions
+
+        self.cache.get_transcriptions({1})
+
+        assert_that(len(self.cache), equal_to(0))
+
+    def test_least_recently_used_voicemails_are_evicted(self):
+        self.cache.get_transcriptions({1, 2, 3})
+        self.cache.get_transcriptions({1})
+        self.list_transcriptions.reset_mock()
+
+        self.cache.get_transcriptions({4})
+        self.cache.get_transcriptions({1, 3})
+
+        assert_that(len(self.cache), equal_to(3))
+        assert_that(
+            [call.kwargs for call in self.list_transcriptions.call_args_list],
+            equal_to([{'voicemail_id': '4'}]),
+        )
+
+    def test_expiration(self):
+        self.cache.get_transcriptions({1})
+
+        self.clock.return_value = 60
+        self.cache.get_transcriptions({1})
+
+        assert_that(self.list_transcriptions.call_count, equal_to(2))
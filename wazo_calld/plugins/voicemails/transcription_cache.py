@@ -0,0 +1,147 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+from wazo_bus.resources.call_logd.types import VoicemailTranscriptionDataDict
+from wazo_call_logd_client import Client as CallLogdClient
+
+from wazo_calld.bus import CoreBusConsumer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_VOICEMAILS = 1000
+DEFAULT_TTL = 3600
+
+
+class VoicemailTranscriptionCache:
+    '''
+    Transcription texts of the voicemail messages, by voicemail, loaded from
+    wazo-call-logd on demand and kept up to date by its bus events.
+
+    Only the most recently used voicemails are kept. The TTL only limits
+    staleness if an event is lost.
+    '''
+
+    def __init__(
+        self,
+        call_logd_client: CallLogdClient,
+        max_voicemails: int = DEFAULT_MAX_VOICEMAILS,
+        ttl: float | None = DEFAULT_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._call_logd_client = call_logd_client
+        self._max_voicemails = max_voicemails
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # {voicemail_id: (expires_at, {message_id: transcription_text})}
+        self._voicemails: OrderedDict[
+            int, tuple[float | None, dict[str, str]]
+        ] = OrderedDict()
+        self._changes = 0
+
+    def __len__(self):
+        return len(self._voicemails)
+
+    def subscribe(self, bus_consumer: CoreBusConsumer) -> None:
+        bus_consumer.subscribe(
+            'call_logd_voicemail_transcription_created',
+            self._on_transcription_created,
+        )
+        bus_consumer.subscribe(
+            'call_logd_voicemail_transcription_deleted',
+            self._on_transcription_deleted,
+        )
+
+    def get_transcriptions(self, voicemail_ids: Iterable[int]) -> dict[str, str]:
+        '''
+        Returns {message_id: transcription_text} for the messages of the given
+        voicemails. Voicemails that cannot be loaded are skipped.
+        '''
+        result: dict[str, str] = {}
+        missing = set()
+        with self._lock:
+            for voicemail_id in voicemail_ids:
+                transcriptions = self._lookup(voicemail_id)
+                if transcriptions is None:
+                    missing.add(voicemail_id)
+                else:
+                    result.update(transcriptions)
+            changes = self._changes
+
+        if missing:
+            result.update(self._load(missing, changes))
+        return result
+
+    def _load(self, voicemail_ids, changes):
+        try:
+            response = (
+                self._call_logd_client.voicemail_transcription.list_transcriptions(
+                    voicemail_id=','.join(str(v) for v in sorted(voicemail_ids)),
+                )
+            )
+        except Exception as ex:
+            logger.warning(
+                'Could not fetch voicemail transcriptions from call-logd: %s', str(ex)
+            )
+            return {}
+
+        loaded: dict[int, dict[str, str]] = {
+            voicemail_id: {} for voicemail_id in voicemail_ids
+        }
+        for item in response.get('items', []):
+            transcriptions = loaded.get(item['voicemail_id'])
+            if transcriptions is not None:
+                transcriptions[item['message_id']] = item['transcription_text']
+
+        with self._lock:
+            if changes == self._changes:
+                # otherwise an event arrived while loading, do not keep stale data
+                for voicemail_id, transcriptions in loaded.items():
+                    self._insert(voicemail_id, transcriptions)
+
+        result = {}
+        for transcriptions in loaded.values():
+            result.update(transcriptions)
+        return result
+
+    def _on_transcription_created(self, event: VoicemailTranscriptionDataDict) -> None:
+        with self._lock:
+            self._changes += 1
+            transcriptions = self._lookup(event['voicemail_id'])
+            if transcriptions is not None:
+                transcriptions[event['message_id']] = event['transcription_text']
+
+    def _on_transcription_deleted(self, event: VoicemailTranscriptionDataDict) -> None:
+        with self._lock:
+            self._changes += 1
+            transcriptions = self._lookup(event['voicemail_id'])
+            if transcriptions is not None:
+                transcriptions.pop(event['message_id'], None)
+
+    def _lookup(self, voicemail_id):
+        # This function must be called with self._lock held
+        entry = self._voicemails.get(voicemail_id)
+        if entry is None:
+            return None
+        expires_at, transcriptions = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._voicemails[voicemail_id]
+            return None
+        self._voicemails.move_to_end(voicemail_id)
+        return transcriptions
+
+    def _insert(self, voicemail_id, transcriptions):
+        # This function must be called with self._lock held
+        expires_at = None if self._ttl is None else self._clock() + self._ttl
+        self._voicemails[voicemail_id] = (expires_at, transcriptions)
+        self._voicemails.move_to_end(voicemail_id)
+        while len(self._voicemails) > self._max_voicemails:
+            self._voicemails.popitem(last=False)
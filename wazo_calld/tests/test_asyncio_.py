@@ -0,0 +1,64 @@
+# Copyright 2026 The Wazo Authors  (see the AUTHORS file)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import threading
+from unittest import TestCase
+from unittest.mock import Mock
+
+from hamcrest import assert_that, equal_to
+
+from ..asyncio_ import CoreAsyncio
+
+
+class TestCoreAsyncioTimers(TestCase):
+    def setUp(self):
+        self.asyncio = CoreAsyncio()
+        self.thread = threading.Thread(target=self.asyncio.run)
+        self.thread.start()
+
+    def tearDown(self):
+        self.asyncio.stop()
+        self.thread.join()
+
+    def test_timer_fires(self):
+        fired = threading.Event()
+        callback = Mock(side_effect=lambda *args: fired.set())
+
+        timer = self.asyncio.call_later(0.01, callback, 'a', 'b')
+
+        assert fired.wait(timeout=5)
+        callback.assert_called_once_with('a', 'b')
+        assert_that(timer.armed, equal_to(False))
+        assert_that(self.asyncio.armed_timers, equal_to(0))
+
+    def test_cancelled_timer_does_not_fire(self):
+        callback = Mock()
+        fired = threading.Event()
+
+        timer = self.asyncio.call_later(0.05, callback)
+        assert_that(self.asyncio.armed_timers, equal_to(1))
+        timer.cancel()
+        self.asyncio.call_later(0.1, fired.set)
+
+        assert fired.wait(timeout=5)
+        callback.assert_not_called()
+        assert_that(self.asyncio.armed_timers, equal_to(0))
+
+    def test_many_timers_do_not_create_threads(self):
+        threads_before = threading.active_count()
+
+        timers = [self.asyncio.call_later(60, Mock()) for _ in range(1000)]
+
+        assert_that(self.asyncio.armed_timers, equal_to(1000))
+        assert_that(threading.active_count(), equal_to(threads_before))
+        for timer in timers:
+            timer.cancel()
+        assert_that(self.asyncio.armed_timers, equal_to(0))
+
+    def test_provide_status(self):
+        status: dict = {'timers': {}}
+        self.asyncio.call_later(60, Mock())
+
+        self.asyncio.provide_status(status)
+
+        assert_that(status['timers']['armed'], equal_to(1))
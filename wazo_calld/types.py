@@ -112,6 +112,17 @@ class ServiceDiscoveryConfigDict(TypedDict):
     retry_interval: int
 
 
+class DialMobileConfigDict(TypedDict):
+    contact_dialer_workers: int
+    confd_cache_ttl: int
+
+
+class VoicemailsConfigDict(TypedDict):
+    index_file: str | None
+    confd_cache_ttl: int
+    transcription_cache_ttl: int
+
+
 class CalldConfigDict(TypedDict):
     config_file: str
     extra_config_files: str
@@ -127,12 +138,14 @@ class CalldConfigDict(TypedDict):
     call_logd: CallLogdConfigDict
     confd: ConfdConfigDict
     consul: ConsulConfigDict
+    dial_mobile: DialMobileConfigDict
     enabled_plugins: dict[str, bool]
     max_meeting_participants: int
     phoned: PhonedConfigDict
     remote_credentials: dict[str, Any]
     rest_api: RestApiConfigDict
     service_discovery: ServiceDiscoveryConfigDict
+    voicemails: VoicemailsConfigDict
 
 
 class PluginDependencies(TypedDict):